@@ -206,6 +206,14 @@ class JSONEncoder(object):
         '{"foo": ["bar", "baz"]}'
 
         """
+        if (c_encode is not None and self.indent is None and
+                self.encoding == 'utf-8' and
+                type(self.item_separator) is str and
+                type(self.key_separator) is str):
+            return c_encode(o, self.skipkeys, self.ensure_ascii,
+                            self.check_circular, self.allow_nan,
+                            self.sort_keys, self.item_separator,
+                            self.key_separator, self.default)
         if self.check_circular:
             markers = {}
         else:
@@ -534,5 +542,6 @@ class JSONEncoder(object):
 # overwrite some helpers here with more efficient versions
 try:
     from _pypyjson import raw_encode_basestring_ascii
+    from _pypyjson import encode as c_encode
 except ImportError:
-    pass
+    c_encode = None
@@ -625,3 +625,9 @@ def load(f):
 def loads(str):
     f = StringIO(str)
     return Unpickler(f).load()
+
+# the interp-level versions, when available
+try:
+    from _cpickle import Pickler, Unpickler, dumps, loads
+except ImportError:
+    pass
@@ -22,7 +22,10 @@ import math as _math
 import struct as _struct
 
 # for cpyext, use these as base classes
-from __pypy__._pypydatetime import dateinterop, deltainterop, timeinterop
+from __pypy__._pypydatetime import (dateinterop, datetimeinterop,
+                                    deltainterop, timeinterop, set_types)
+# proleptic Gregorian ordinals, considering 01-Jan-0001 as day 1
+from __pypy__._pypydatetime import ymd2ord as _ymd2ord, ord2ymd as _ord2ymd
 
 _SENTINEL = object()
 
@@ -60,11 +63,6 @@ def _is_leap(year):
     "year -> 1 if leap year, else 0."
     return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
 
-def _days_before_year(year):
-    "year -> number of days before January 1st of year."
-    y = year - 1
-    return y*365 + y//4 - y//100 + y//400
-
 def _days_in_month(year, month):
     "year, month -> number of days in that month in that year."
     assert 1 <= month <= 12, month
@@ -77,31 +75,6 @@ def _days_before_month(year, month):
     assert 1 <= month <= 12, 'month must be in 1..12'
     return _DAYS_BEFORE_MONTH[month] + (month > 2 and _is_leap(year))
 
-def _ymd2ord(year, month, day):
-    "year, month, day -> ordinal, considering 01-Jan-0001 as day 1."
-    assert 1 <= month <= 12, 'month must be in 1..12'
-    dim = _days_in_month(year, month)
-    assert 1 <= day <= dim, ('day must be in 1..%d' % dim)
-    return (_days_before_year(year) +
-            _days_before_month(year, month) +
-            day)
-
-_DI400Y = _days_before_year(401)    # number of days in 400 years
-_DI100Y = _days_before_year(101)    #    "    "   "   " 100   "
-_DI4Y   = _days_before_year(5)      #    "    "   "   "   4   "
-
-# A 4-year cycle has an extra leap day over what we'd get from pasting
-# together 4 single years.
-assert _DI4Y == 4 * 365 + 1
-
-# Similarly, a 400-year cycle has an extra leap day over what we'd get from
-# pasting together 4 100-year cycles.
-assert _DI400Y == 4 * _DI100Y + 1
-
-# OTOH, a 100-year cycle has one fewer leap day than we'd get from
-# pasting together 25 4-year cycles.
-assert _DI100Y == 25 * _DI4Y - 1
-
 _US_PER_US = 1
 _US_PER_MS = 1000
 _US_PER_SECOND = 1000000
@@ -111,68 +84,6 @@ _US_PER_HOUR = 3600000000
 _US_PER_DAY = 86400000000
 _US_PER_WEEK = 604800000000
 
-def _ord2ymd(n):
-    "ordinal -> (year, month, day), considering 01-Jan-0001 as day 1."
-
-    # n is a 1-based index, starting at 1-Jan-1.  The pattern of leap years
-    # repeats exactly every 400 years.  The basic strategy is to find the
-    # closest 400-year boundary at or before n, then work with the offset
-    # from that boundary to n.  Life is much clearer if we subtract 1 from
-    # n first -- then the values of n at 400-year boundaries are exactly
-    # those divisible by _DI400Y:
-    #
-    #     D  M   Y            n              n-1
-    #     -- --- ----        ----------     ----------------
-    #     31 Dec -400        -_DI400Y       -_DI400Y -1
-    #      1 Jan -399         -_DI400Y +1   -_DI400Y      400-year boundary
-    #     ...
-    #     30 Dec  000        -1             -2
-    #     31 Dec  000         0             -1
-    #      1 Jan  001         1              0            400-year boundary
-    #      2 Jan  001         2              1
-    #      3 Jan  001         3              2
-    #     ...
-    #     31 Dec  400         _DI400Y        _DI400Y -1
-    #      1 Jan  401         _DI400Y +1     _DI400Y      400-year boundary
-    n -= 1
-    n400, n = divmod(n, _DI400Y)
-    year = n400 * 400 + 1   # ..., -399, 1, 401, ...
-
-    # Now n is the (non-negative) offset, in days, from January 1 of year, to
-    # the desired date.  Now compute how many 100-year cycles precede n.
-    # Note that it's possible for n100 to equal 4!  In that case 4 full
-    # 100-year cycles precede the desired day, which implies the desired
-    # day is December 31 at the end of a 400-year cycle.
-    n100, n = divmod(n, _DI100Y)
-
-    # Now compute how many 4-year cycles precede it.
-    n4, n = divmod(n, _DI4Y)
-
-    # And now how many single years.  Again n1 can be 4, and again meaning
-    # that the desired day is December 31 at the end of the 4-year cycle.
-    n1, n = divmod(n, 365)
-
-    year += n100 * 100 + n4 * 4 + n1
-    if n1 == 4 or n100 == 4:
-        assert n == 0
-        return year-1, 12, 31
-
-    # Now the year is correct, and n is the offset from January 1.  We find
-    # the month via an estimate that's either exact or one too large.
-    leapyear = n1 == 3 and (n4 != 24 or n100 == 3)
-    assert leapyear == _is_leap(year)
-    month = (n + 50) >> 5
-    preceding = _DAYS_BEFORE_MONTH[month] + (month > 2 and leapyear)
-    if preceding > n:  # estimate is too large
-        month -= 1
-        preceding -= _DAYS_IN_MONTH[month] + (month == 2 and leapyear)
-    n -= preceding
-    assert 0 <= n < _days_in_month(year, month)
-
-    # Now the year and month are correct, and n is the offset from the
-    # start of that month:  we're done!
-    return year, month, n+1
-
 # Month and day names.  For localized versions, see the calendar module.
 _MONTHNAMES = [None, "Jan", "Feb", "Mar", "Apr", "May", "Jun",
                      "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
@@ -184,13 +95,6 @@ def _build_struct_time(y, m, d, hh, mm, ss, dstflag):
     dnum = _days_before_month(y, m) + d
     return _timemodule.struct_time((y, m, d, hh, mm, ss, wday, dnum, dstflag))
 
-def _format_time(hh, mm, ss, us):
-    # Skip trailing microseconds when us==0.
-    result = "%02d:%02d:%02d" % (hh, mm, ss)
-    if us:
-        result += ".%06d" % us
-    return result
-
 # Correctly substitute for %z and %Z escapes in strftime formats.
 def _wrap_strftime(object, format, timetuple):
     year = timetuple[0]
@@ -285,51 +189,6 @@ def _check_utc_offset(name, offset):
         raise ValueError("%s()=%d, must be in -1439..1439" % (name, offset))
     return offset
 
-def _check_int_field(value):
-    if isinstance(value, int):
-        return int(value)
-    if not isinstance(value, float):
-        try:
-            value = value.__int__()
-        except AttributeError:
-            pass
-        else:
-            if isinstance(value, int):
-                return int(value)
-            elif isinstance(value, long):
-                return int(long(value))
-            raise TypeError('__int__ method should return an integer')
-        raise TypeError('an integer is required')
-    raise TypeError('integer argument expected, got float')
-
-def _check_date_fields(year, month, day):
-    year = _check_int_field(year)
-    month = _check_int_field(month)
-    day = _check_int_field(day)
-    if not MINYEAR <= year <= MAXYEAR:
-        raise ValueError('year must be in %d..%d' % (MINYEAR, MAXYEAR), year)
-    if not 1 <= month <= 12:
-        raise ValueError('month must be in 1..12', month)
-    dim = _days_in_month(year, month)
-    if not 1 <= day <= dim:
-        raise ValueError('day must be in 1..%d' % dim, day)
-    return year, month, day
-
-def _check_time_fields(hour, minute, second, microsecond):
-    hour = _check_int_field(hour)
-    minute = _check_int_field(minute)
-    second = _check_int_field(second)
-    microsecond = _check_int_field(microsecond)
-    if not 0 <= hour <= 23:
-        raise ValueError('hour must be in 0..23', hour)
-    if not 0 <= minute <= 59:
-        raise ValueError('minute must be in 0..59', minute)
-    if not 0 <= second <= 59:
-        raise ValueError('second must be in 0..59', second)
-    if not 0 <= microsecond <= 999999:
-        raise ValueError('microsecond must be in 0..999999', microsecond)
-    return hour, minute, second, microsecond
-
 def _check_tzinfo_arg(tz):
     if tz is not None and not isinstance(tz, tzinfo):
         raise TypeError("tzinfo argument must be None or of a tzinfo subclass")
@@ -453,7 +312,8 @@ class timedelta(deltainterop):
     Representation: (days, seconds, microseconds).  Why?  Because I
     felt like it.
     """
-    __slots__ = '_days', '_seconds', '_microseconds', '_hashcode'
+    # the fields and their accessors are inherited from deltainterop
+    __slots__ = ()
 
     def __new__(cls, days=_SENTINEL, seconds=_SENTINEL, microseconds=_SENTINEL,
                 milliseconds=_SENTINEL, minutes=_SENTINEL, hours=_SENTINEL, weeks=_SENTINEL):
@@ -495,12 +355,7 @@ class timedelta(deltainterop):
         if not -_MAX_DELTA_DAYS <= d <= _MAX_DELTA_DAYS:
             raise OverflowError("days=%d; must have magnitude <= %d" % (d, _MAX_DELTA_DAYS))
 
-        self = deltainterop.__new__(cls)
-        self._days = d
-        self._seconds = s
-        self._microseconds = us
-        self._hashcode = -1
-        return self
+        return deltainterop.__new__(cls, d, s, us)
 
     def _to_microseconds(self):
         return ((self._days * _SECONDS_PER_DAY + self._seconds) * _US_PER_SECOND +
@@ -535,63 +390,8 @@ class timedelta(deltainterop):
         """Total seconds in the duration."""
         return self._to_microseconds() / 10**6
 
-    # Read-only field accessors
-    @property
-    def days(self):
-        """days"""
-        return self._days
-
-    @property
-    def seconds(self):
-        """seconds"""
-        return self._seconds
-
-    @property
-    def microseconds(self):
-        """microseconds"""
-        return self._microseconds
-
-    def __add__(self, other):
-        if isinstance(other, timedelta):
-            # for CPython compatibility, we cannot use
-            # our __class__ here, but need a real timedelta
-            return timedelta._create(self._days + other._days,
-                                     self._seconds + other._seconds,
-                                     self._microseconds + other._microseconds,
-                                     True)
-        return NotImplemented
-
-    def __sub__(self, other):
-        if isinstance(other, timedelta):
-            # for CPython compatibility, we cannot use
-            # our __class__ here, but need a real timedelta
-            return timedelta._create(self._days - other._days,
-                                     self._seconds - other._seconds,
-                                     self._microseconds - other._microseconds,
-                                     True)
-        return NotImplemented
-
-    def __neg__(self):
-        # for CPython compatibility, we cannot use
-        # our __class__ here, but need a real timedelta
-        return timedelta._create(-self._days,
-                                 -self._seconds,
-                                 -self._microseconds,
-                                 True)
-
-    def __pos__(self):
-        # for CPython compatibility, we cannot use
-        # our __class__ here, but need a real timedelta
-        return timedelta._create(self._days,
-                                 self._seconds,
-                                 self._microseconds,
-                                 False)
-
-    def __abs__(self):
-        if self._days < 0:
-            return -self
-        else:
-            return self
+    # __add__, __sub__, __neg__, __pos__ and __abs__ are inherited from
+    # deltainterop
 
     def __mul__(self, other):
         if not isinstance(other, (int, long)):
@@ -647,19 +447,7 @@ class timedelta(deltainterop):
         else:
             _cmperror(self, other)
 
-    def _cmp(self, other):
-        assert isinstance(other, timedelta)
-        return _cmp(self._getstate(), other._getstate())
-
-    def __hash__(self):
-        if self._hashcode == -1:
-            self._hashcode = hash(self._getstate())
-        return self._hashcode
-
-    def __nonzero__(self):
-        return (self._days != 0 or
-                self._seconds != 0 or
-                self._microseconds != 0)
+    # __hash__ is inherited from deltainterop
 
     # Pickle support.
 
@@ -701,7 +489,8 @@ class date(dateinterop):
     Properties (readonly):
     year, month, day
     """
-    __slots__ = '_year', '_month', '_day', '_hashcode'
+    # the fields and their accessors are inherited from dateinterop
+    __slots__ = ()
 
     def __new__(cls, year, month=None, day=None):
         """Constructor.
@@ -715,15 +504,8 @@ class date(dateinterop):
             # Pickle support
             self = dateinterop.__new__(cls)
             self.__setstate(year)
-            self._hashcode = -1
             return self
-        year, month, day = _check_date_fields(year, month, day)
-        self = dateinterop.__new__(cls)
-        self._year = year
-        self._month = month
-        self._day = day
-        self._hashcode = -1
-        return self
+        return dateinterop.__new__(cls, year, month, day)
 
     # Additional constructors
 
@@ -802,26 +584,10 @@ class date(dateinterop):
         - http://www.w3.org/TR/NOTE-datetime
         - http://www.cl.cam.ac.uk/~mgk25/iso-time.html
         """
-        return "%04d-%02d-%02d" % (self._year, self._month, self._day)
+        return self._format_date()
 
     __str__ = isoformat
 
-    # Read-only field accessors
-    @property
-    def year(self):
-        """year (1-9999)"""
-        return self._year
-
-    @property
-    def month(self):
-        """month (1-12)"""
-        return self._month
-
-    @property
-    def day(self):
-        """day (1-31)"""
-        return self._day
-
     # Standard conversions, __cmp__, __hash__ (and helpers)
 
     def timetuple(self):
@@ -829,14 +595,6 @@ class date(dateinterop):
         return _build_struct_time(self._year, self._month, self._day,
                                   0, 0, 0, -1)
 
-    def toordinal(self):
-        """Return proleptic Gregorian ordinal for the year, month and day.
-
-        January 1 of year 1 is day 1.  Only the year, month and day values
-        contribute to the result.
-        """
-        return _ymd2ord(self._year, self._month, self._day)
-
     def replace(self, year=None, month=None, day=None):
         """Return a new date with new values for the specified fields."""
         if year is None:
@@ -897,55 +655,10 @@ class date(dateinterop):
         else:
             _cmperror(self, other)
 
-    def _cmp(self, other):
-        assert isinstance(other, date)
-        y, m, d = self._year, self._month, self._day
-        y2, m2, d2 = other._year, other._month, other._day
-        return _cmp((y, m, d), (y2, m2, d2))
-
-    def __hash__(self):
-        "Hash."
-        if self._hashcode == -1:
-            self._hashcode = hash(self._getstate())
-        return self._hashcode
-
-    # Computations
-
-    def _add_timedelta(self, other, factor):
-        y, m, d = _normalize_date(
-            self._year,
-            self._month,
-            self._day + other.days * factor)
-        return date(y, m, d)
-
-    def __add__(self, other):
-        "Add a date to a timedelta."
-        if isinstance(other, timedelta):
-            return self._add_timedelta(other, 1)
-        return NotImplemented
-
-    __radd__ = __add__
-
-    def __sub__(self, other):
-        """Subtract two dates, or a date and a timedelta."""
-        if isinstance(other, date):
-            days1 = self.toordinal()
-            days2 = other.toordinal()
-            return timedelta._create(days1 - days2, 0, 0, False)
-        if isinstance(other, timedelta):
-            return self._add_timedelta(other, -1)
-        return NotImplemented
-
-    def weekday(self):
-        "Return day of the week, where Monday == 0 ... Sunday == 6."
-        return (self.toordinal() + 6) % 7
-
-    # Day-of-the-week and week-of-the-year, according to ISO
+    # __hash__, and the computations __add__, __radd__ and __sub__, are
+    # inherited from dateinterop
 
-    def isoweekday(self):
-        "Return day of the week, where Monday == 1 ... Sunday == 7."
-        # 1-Jan-0001 is a Monday
-        return self.toordinal() % 7 or 7
+    # Week-of-the-year, according to ISO
 
     def isocalendar(self):
         """Return a 3-tuple containing ISO year, week number, and weekday.
@@ -1090,7 +803,8 @@ class time(timeinterop):
     Properties (readonly):
     hour, minute, second, microsecond, tzinfo
     """
-    __slots__ = '_hour', '_minute', '_second', '_microsecond', '_tzinfo', '_hashcode'
+    # the fields and their accessors are inherited from timeinterop
+    __slots__ = ()
 
     def __new__(cls, hour=0, minute=0, second=0, microsecond=0, tzinfo=None):
         """Constructor.
@@ -1105,41 +819,13 @@ class time(timeinterop):
             # Pickle support
             self = timeinterop.__new__(cls)
             self.__setstate(hour, minute or None)
-            self._hashcode = -1
             return self
-        hour, minute, second, microsecond = _check_time_fields(
-            hour, minute, second, microsecond)
+        self = timeinterop.__new__(cls, hour, minute, second, microsecond,
+                                   tzinfo)
         _check_tzinfo_arg(tzinfo)
-        self = timeinterop.__new__(cls)
-        self._hour = hour
-        self._minute = minute
-        self._second = second
-        self._microsecond = microsecond
-        self._tzinfo = tzinfo
-        self._hashcode = -1
         return self
 
     # Read-only field accessors
-    @property
-    def hour(self):
-        """hour (0-23)"""
-        return self._hour
-
-    @property
-    def minute(self):
-        """minute (0-59)"""
-        return self._minute
-
-    @property
-    def second(self):
-        """second (0-59)"""
-        return self._second
-
-    @property
-    def microsecond(self):
-        """microsecond (0-999999)"""
-        return self._microsecond
-
     @property
     def tzinfo(self):
         """timezone info object"""
@@ -1199,10 +885,7 @@ class time(timeinterop):
             base_compare = myoff == otoff
 
         if base_compare:
-            return _cmp((self._hour, self._minute, self._second,
-                         self._microsecond),
-                        (other._hour, other._minute, other._second,
-                         other._microsecond))
+            return self._cmp_naive(other)
         if myoff is None or otoff is None:
             raise TypeError("can't compare offset-naive and offset-aware times")
         myhhmm = self._hour * 60 + self._minute - myoff
@@ -1210,19 +893,7 @@ class time(timeinterop):
         return _cmp((myhhmm, self._second, self._microsecond),
                     (othhmm, other._second, other._microsecond))
 
-    def __hash__(self):
-        """Hash."""
-        if self._hashcode == -1:
-            tzoff = self._utcoffset()
-            if not tzoff:  # zero or None
-                self._hashcode = hash(self._getstate()[0])
-            else:
-                h, m = divmod(self.hour * 60 + self.minute - tzoff, 60)
-                if 0 <= h < 24:
-                    self._hashcode = hash(time(h, m, self.second, self.microsecond))
-                else:
-                    self._hashcode = hash((h, m, self.second, self.microsecond))
-        return self._hashcode
+    # __hash__ is inherited from timeinterop
 
     # Conversion to string
 
@@ -1262,8 +933,7 @@ class time(timeinterop):
         This is 'HH:MM:SS.mmmmmm+zz:zz', or 'HH:MM:SS+zz:zz' if
         self.microsecond == 0.
         """
-        s = _format_time(self._hour, self._minute, self._second,
-                         self._microsecond)
+        s = self._format_time()
         tz = self._tzstr()
         if tz:
             s += tz
@@ -1401,65 +1071,33 @@ time.min = time(0, 0, 0)
 time.max = time(23, 59, 59, 999999)
 time.resolution = timedelta(microseconds=1)
 
-class datetime(date):
+class datetime(date, datetimeinterop):
     """datetime(year, month, day[, hour[, minute[, second[, microsecond[,tzinfo]]]]])
 
     The year, month and day arguments are required. tzinfo may be None, or an
     instance of a tzinfo subclass. The remaining arguments may be ints or longs.
     """
-    __slots__ = date.__slots__ + time.__slots__
+    __slots__ = ()
 
     def __new__(cls, year, month=None, day=None, hour=0, minute=0, second=0,
                 microsecond=0, tzinfo=None):
         if isinstance(year, bytes) and len(year) == 10 and \
                 1 <= ord(year[2]) <= 12:
             # Pickle support
-            self = dateinterop.__new__(cls)
+            self = datetimeinterop.__new__(cls)
             self.__setstate(year, month)
-            self._hashcode = -1
             return self
         elif isinstance(year, tuple) and len(year) == 7:
             # Used by internal functions where the arguments are guaranteed to
             # be valid.
             year, month, day, hour, minute, second, microsecond = year
-        else:
-            year, month, day = _check_date_fields(year, month, day)
-            hour, minute, second, microsecond = _check_time_fields(
-                hour, minute, second, microsecond)
+        self = datetimeinterop.__new__(cls, year, month, day, hour, minute,
+                                       second, microsecond, tzinfo)
         _check_tzinfo_arg(tzinfo)
-        self = dateinterop.__new__(cls)
-        self._year = year
-        self._month = month
-        self._day = day
-        self._hour = hour
-        self._minute = minute
-        self._second = second
-        self._microsecond = microsecond
-        self._tzinfo = tzinfo
-        self._hashcode = -1
         return self
 
-    # Read-only field accessors
-    @property
-    def hour(self):
-        """hour (0-23)"""
-        return self._hour
-
-    @property
-    def minute(self):
-        """minute (0-59)"""
-        return self._minute
-
-    @property
-    def second(self):
-        """second (0-59)"""
-        return self._second
-
-    @property
-    def microsecond(self):
-        """microsecond (0-999999)"""
-        return self._microsecond
-
+    # Read-only field accessors; the others are inherited from
+    # datetimeinterop
     @property
     def tzinfo(self):
         """timezone info object"""
@@ -1626,9 +1264,7 @@ class datetime(date):
         Optional argument sep specifies the separator between date and
         time, default 'T'.
         """
-        s = ("%04d-%02d-%02d%c" % (self._year, self._month, self._day, sep) +
-             _format_time(self._hour, self._minute, self._second,
-                          self._microsecond))
+        s = self._format_datetime(sep)
         off = self._utcoffset()
         if off is not None:
             if off < 0:
@@ -1793,12 +1429,7 @@ class datetime(date):
             base_compare = myoff == otoff
 
         if base_compare:
-            return _cmp((self._year, self._month, self._day,
-                         self._hour, self._minute, self._second,
-                         self._microsecond),
-                        (other._year, other._month, other._day,
-                         other._hour, other._minute, other._second,
-                         other._microsecond))
+            return self._cmp_naive(other)
         if myoff is None or otoff is None:
             raise TypeError("can't compare offset-naive and offset-aware datetimes")
         # XXX What follows could be done more efficiently...
@@ -1807,58 +1438,8 @@ class datetime(date):
             return -1
         return diff and 1 or 0
 
-    def _add_timedelta(self, other, factor):
-        result = _normalize_datetime(
-            self._year,
-            self._month,
-            self._day + other.days * factor,
-            self._hour,
-            self._minute,
-            self._second + other.seconds * factor,
-            self._microsecond + other.microseconds * factor)
-        return datetime(result, tzinfo=self._tzinfo)
-
-    def __add__(self, other):
-        "Add a datetime and a timedelta."
-        if not isinstance(other, timedelta):
-            return NotImplemented
-        return self._add_timedelta(other, 1)
-
-    __radd__ = __add__
-
-    def __sub__(self, other):
-        "Subtract two datetimes, or a datetime and a timedelta."
-        if not isinstance(other, datetime):
-            if isinstance(other, timedelta):
-                return self._add_timedelta(other, -1)
-            return NotImplemented
-
-        delta_d = self.toordinal() - other.toordinal()
-        delta_s = (self._hour - other._hour) * 3600 + \
-                  (self._minute - other._minute) * 60 + \
-                  (self._second - other._second)
-        delta_us = self._microsecond - other._microsecond
-        base = timedelta._create(delta_d, delta_s, delta_us, True)
-        if self._tzinfo is other._tzinfo:
-            return base
-        myoff = self._utcoffset()
-        otoff = other._utcoffset()
-        if myoff == otoff:
-            return base
-        if myoff is None or otoff is None:
-            raise TypeError("can't subtract offset-naive and offset-aware datetimes")
-        return base + timedelta(minutes = otoff-myoff)
-
-    def __hash__(self):
-        if self._hashcode == -1:
-            tzoff = self._utcoffset()
-            if tzoff is None:
-                self._hashcode = hash(self._getstate()[0])
-            else:
-                days = _ymd2ord(self.year, self.month, self.day)
-                seconds = self.hour * 3600 + (self.minute - tzoff) * 60 + self.second
-                self._hashcode = hash(timedelta(days, seconds, self.microsecond))
-        return self._hashcode
+    # __hash__, and the computations __add__, __radd__ and __sub__, are
+    # inherited from datetimeinterop
 
     # Pickle support.
 
@@ -1890,6 +1471,10 @@ class datetime(date):
         return (self.__class__, self._getstate())
 
 
+# the results of the arithmetic done by the interp-level base classes are
+# instances of these classes
+set_types(date, datetime, timedelta)
+
 datetime.min = datetime(1, 1, 1)
 datetime.max = datetime(9999, 12, 31, 23, 59, 59, 999999)
 datetime.resolution = timedelta(microseconds=1)
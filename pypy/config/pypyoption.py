@@ -36,7 +36,8 @@ working_modules.update([
     "cStringIO", "thread", "itertools", "pyexpat", "cpyext", "array",
     "binascii", "_multiprocessing", '_warnings', "_collections",
     "_multibytecodec", "micronumpy", "_continuation", "_cffi_backend",
-    "_csv", "_cppyy", "_pypyjson", "_jitlog",
+    "_csv", "_cppyy", "_pypyjson", "_jitlog", "_cpickle",
+    "_heapq", "_bisect", "_functools",
     # "_hashlib", "crypt"
 ])
 
@@ -203,6 +204,26 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                    "enable optimized ways to store lists of primitives ",
                    default=True),
 
+        BoolOption("withnarrowintlists",
+                   "store lists of small integers as arrays of 8, 16 or "
+                   "32 bits",
+                   default=False,
+                   requires=[("objspace.std.withliststrategies", True)]),
+
+        BoolOption("withsmalldicts",
+                   "store dicts with a few keys of the same type as two "
+                   "short lists instead of a hash table",
+                   default=False),
+
+        BoolOption("withsharedkeydicts",
+                   "let dicts with string keys that are filled in the same "
+                   "order share their keys",
+                   default=False),
+
+        BoolOption("withintbitsets",
+                   "store sets of integers in a small range as bitmaps",
+                   default=False),
+
         BoolOption("withmethodcachecounter",
                    "try to cache methods and provide a counter in __pypy__. "
                    "for testing purposes only.",
@@ -257,6 +278,10 @@ def set_pypy_opt_level(config, level):
     if level == 'mem':
         config.objspace.std.suggest(withprebuiltint=True)
         config.objspace.std.suggest(withliststrategies=True)
+        config.objspace.std.suggest(withnarrowintlists=True)
+        config.objspace.std.suggest(withintbitsets=True)
+        config.objspace.std.suggest(withsmalldicts=True)
+        config.objspace.std.suggest(withsharedkeydicts=True)
         if not IS_64_BITS:
             config.objspace.std.suggest(withsmalllong=True)
 
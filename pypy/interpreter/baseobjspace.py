@@ -1100,6 +1100,13 @@ class ObjSpace(object):
         """
         return None
 
+    def listview_utf8(self, w_list):
+        """ Return a list of utf8-encoded strings out of a list or set of
+        unicode.  If the argument is not a list or a set, or does not contain
+        only unicode, return None.  May return None anyway.
+        """
+        return None
+
     def listview_int(self, w_list):
         """ Return a list of unwrapped int out of a list of int. If the
         argument is not a list or does not contain only int, return None.
@@ -96,6 +96,7 @@ class PyCode(eval.Code):
         self._signature = make_signature(self)
         self._initialize()
         self._init_ready()
+        self._init_warmup()
         self.new_code_hook()
 
     def frame_stores_global(self, w_globals):
@@ -137,10 +138,14 @@ class PyCode(eval.Code):
 
         init_mapdict_cache(self)
         self._globals_caches = [None] * len(self.co_names_w)
+        self._module_attr_caches = None     # allocated when first used
 
     def _init_ready(self):
         "This is a hook for the vmprof module, which overrides this method."
 
+    def _init_warmup(self):
+        "This is a hook for the pypyjit module, which overrides this method."
+
     def _cleanup_(self):
         if (self.magic == cpython_magic and
             '__pypy__' not in sys.builtin_module_names):
@@ -6,11 +6,12 @@ import sys
 
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
-from pypy.interpreter.gateway import interp2app, unwrap_spec, WrappedDefault
+from pypy.interpreter.gateway import (
+    applevel, interp2app, unwrap_spec, WrappedDefault)
 from pypy.interpreter.typedef import TypeDef
 from rpython.rlib import jit, rarithmetic
 from rpython.rlib.objectmodel import specialize
-from rpython.rlib.rarithmetic import r_uint, intmask
+from rpython.rlib.rarithmetic import r_uint, intmask, ovfcheck
 from rpython.rlib.rbigint import rbigint
 
 
@@ -147,6 +148,20 @@ max_jitdriver = jit.JitDriver(name='max',
         greens=['has_key', 'has_item', 'greenkey'], reds='auto',
         get_printable_location=get_printable_location)
 
+@specialize.call_location()
+def _min_max_unwrapped(items, implementation_of):
+    # same logic as below, but the items are unwrapped ints or floats
+    result = items[0]
+    for i in range(1, len(items)):
+        item = items[i]
+        if implementation_of == "max":
+            if item > result:
+                result = item
+        else:
+            if item < result:
+                result = item
+    return result
+
 @specialize.arg(3)
 def min_max_sequence(space, w_sequence, w_key, implementation_of):
     if implementation_of == "max":
@@ -155,6 +170,14 @@ def min_max_sequence(space, w_sequence, w_key, implementation_of):
     else:
         compare = space.lt
         jitdriver = min_jitdriver
+    if w_key is None:
+        intlist = space.listview_int(w_sequence)
+        if intlist:
+            return space.newint(_min_max_unwrapped(intlist, implementation_of))
+        floatlist = space.listview_float(w_sequence)
+        if floatlist:
+            return space.newfloat(
+                _min_max_unwrapped(floatlist, implementation_of))
     w_iter = space.iter(w_sequence)
     greenkey = space.iterator_greenkey(w_iter)
     has_key = w_key is not None
@@ -250,6 +273,203 @@ def min(space, __args__):
     return min_max(space, __args__, "min")
 
 
+app = applevel(r'''
+def _regular_sum(sequence, start):
+    # Default implementation for sum (no specialization)
+    last = start
+    for x in sequence:
+        # Very intentionally *not* +=, that would have different semantics if
+        # start was a mutable type, such as a list
+        last = last + x
+    return last
+
+def _list_sum(sequence, start):
+    # Specialization avoiding quadratic complexity for lists
+    iterator = iter(sequence)
+
+    try:
+        first = next(iterator)
+    except StopIteration:
+        return start
+
+    if type(first) is not list:
+        return _regular_sum(iterator, start + first)
+
+    last = start + first
+    for item in iterator:
+        if type(item) is list:
+            last += item
+        else:
+            # Non-trivial sum. Use _regular_sum.
+            return _regular_sum(iterator, last + item)
+
+    return last
+
+def _tuple_sum(sequence, start):
+    # Specialization avoiding quadratic complexity for tuples
+    iterator = iter(sequence)
+
+    try:
+        first = next(iterator)
+    except StopIteration:
+        return start
+
+    if type(first) is not tuple:
+        return _regular_sum(iterator, start + first)
+
+    last = list(start)
+    last.extend(first)
+    for item in iterator:
+        if type(item) is tuple:
+            last.extend(item)
+        else:
+            # Non-trivial sum. Cast back to tuple and use regular_sum.
+            return _regular_sum(iterator, tuple(last) + item)
+
+    return tuple(last)
+''', filename=__file__)
+
+list_sum = app.interphook("_list_sum")
+tuple_sum = app.interphook("_tuple_sum")
+
+def get_printable_location_sum(mode, greenkey):
+    return "sum [mode=%d, %s]" % (mode, greenkey.iterator_greenkey_printable())
+
+sum_jitdriver = jit.JitDriver(name='sum',
+        greens=['mode', 'greenkey'], reds='auto',
+        get_printable_location=get_printable_location_sum)
+
+# the current sum, while it is unboxed: an int, then a float
+SUM_INT, SUM_FLOAT, SUM_OBJECT = range(3)
+
+def _sum_int_list(space, intlist, w_start):
+    from pypy.objspace.std.floatobject import W_FloatObject
+    if type(w_start) is W_FloatObject:
+        floatval = space.float_w(w_start)
+        for intval in intlist:
+            floatval += float(intval)
+        return space.newfloat(floatval)
+    total = space.int_w(w_start)
+    i = 0
+    while i < len(intlist):
+        try:
+            total = ovfcheck(total + intlist[i])
+        except OverflowError:
+            # continue with a long, like int.__add__() does
+            bigtotal = rbigint.fromint(total)
+            while i < len(intlist):
+                bigtotal = bigtotal.int_add(intlist[i])
+                i += 1
+            return space.newlong_from_rbigint(bigtotal)
+        i += 1
+    return space.newint(total)
+
+def _sum_float_list(space, floatlist, w_start):
+    total = space.float_w(w_start)
+    for floatval in floatlist:
+        total += floatval
+    return space.newfloat(total)
+
+def _sum_iterable(space, w_sequence, w_start):
+    from pypy.objspace.std.floatobject import W_FloatObject
+    from pypy.objspace.std.intobject import W_IntObject
+    if type(w_start) is W_IntObject or type(w_start) is W_FloatObject:
+        intlist = space.listview_int(w_sequence)
+        if intlist is not None:
+            if not intlist:
+                return w_start
+            return _sum_int_list(space, intlist, w_start)
+        floatlist = space.listview_float(w_sequence)
+        if floatlist is not None:
+            if not floatlist:
+                return w_start
+            return _sum_float_list(space, floatlist, w_start)
+
+    # As long as we only see exact ints and floats, the sum is kept
+    # unboxed.  Then it continues with space.add(), like the app-level
+    # loop 'last = last + x'.
+    w_iter = space.iter(w_sequence)
+    greenkey = space.iterator_greenkey(w_iter)
+    intval = 0
+    floatval = 0.0
+    w_last = w_start
+    if type(w_start) is W_IntObject:
+        mode = SUM_INT
+        intval = space.int_w(w_start)
+    elif type(w_start) is W_FloatObject:
+        mode = SUM_FLOAT
+        floatval = space.float_w(w_start)
+    else:
+        mode = SUM_OBJECT
+    has_item = False
+    while True:
+        sum_jitdriver.jit_merge_point(mode=mode, greenkey=greenkey)
+        try:
+            w_item = space.next(w_iter)
+        except OperationError as e:
+            if not e.match(space, space.w_StopIteration):
+                raise
+            break
+        has_item = True
+        if mode == SUM_INT:
+            if type(w_item) is W_IntObject:
+                try:
+                    intval = ovfcheck(intval + space.int_w(w_item))
+                    continue
+                except OverflowError:
+                    pass
+            elif type(w_item) is W_FloatObject:
+                mode = SUM_FLOAT
+                floatval = float(intval) + space.float_w(w_item)
+                continue
+            mode = SUM_OBJECT
+            w_last = space.newint(intval)
+        elif mode == SUM_FLOAT:
+            if type(w_item) is W_FloatObject:
+                floatval += space.float_w(w_item)
+                continue
+            elif type(w_item) is W_IntObject:
+                floatval += float(space.int_w(w_item))
+                continue
+            mode = SUM_OBJECT
+            w_last = space.newfloat(floatval)
+        w_last = space.add(w_last, w_item)
+    if not has_item:
+        return w_start
+    if mode == SUM_INT:
+        return space.newint(intval)
+    if mode == SUM_FLOAT:
+        return space.newfloat(floatval)
+    return w_last
+
+@unwrap_spec(w_start=WrappedDefault(0))
+def sum(space, w_sequence, w_start):
+    """sum(sequence[, start]) -> value
+
+Returns the sum of a sequence of numbers (NOT strings) plus the value
+of parameter 'start' (which defaults to 0).  When the sequence is
+empty, returns start."""
+    if space.isinstance_w(w_start, space.w_basestring):
+        raise oefmt(space.w_TypeError, "sum() can't sum strings")
+
+    # Avoiding isinstance here, since subclasses can override `+`
+    w_type = space.type(w_start)
+    if space.is_w(w_type, space.w_list):
+        return list_sum(space, w_sequence, w_start)
+    if space.is_w(w_type, space.w_tuple):
+        return tuple_sum(space, w_sequence, w_start)
+
+    return _sum_iterable(space, w_sequence, w_start)
+
+@unwrap_spec(w_cmp=WrappedDefault(None), w_key=WrappedDefault(None),
+             w_reverse=WrappedDefault(False))
+def sorted(space, w_iterable, w_cmp, w_key, w_reverse):
+    "sorted(iterable, cmp=None, key=None, reverse=False) --> new sorted list"
+    w_sorted = space.call_function(space.w_list, w_iterable)
+    space.call_method(w_sorted, "sort", w_cmp, w_key, w_reverse)
+    return w_sorted
+
+
 
 class W_Enumerate(W_Root):
     def __init__(self, w_iter_or_list, start, w_start):
@@ -15,10 +15,8 @@ class Module(MixedModule):
         'print'         : 'app_io.print_',
 
         'apply'         : 'app_functional.apply',
-        'sorted'        : 'app_functional.sorted',
         'any'           : 'app_functional.any',
         'all'           : 'app_functional.all',
-        'sum'           : 'app_functional.sum',
         'map'           : 'app_functional.map',
         'reduce'        : 'app_functional.reduce',
         'filter'        : 'app_functional.filter',
@@ -84,6 +82,8 @@ class Module(MixedModule):
         'enumerate'     : 'functional.W_Enumerate',
         'min'           : 'functional.min',
         'max'           : 'functional.max',
+        'sum'           : 'functional.sum',
+        'sorted'        : 'functional.sorted',
         'reversed'      : 'functional.reversed',
         'super'         : 'descriptor.W_Super',
         'staticmethod'  : 'pypy.interpreter.function.StaticMethod',
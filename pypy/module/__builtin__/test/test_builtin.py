@@ -231,6 +231,31 @@ class AppTestBuiltinApp:
                 return 42
         assert sum([Foo()], None) == 42
 
+    def test_sum_unboxed(self):
+        import sys
+        assert sum([sys.maxint, 1]) == sys.maxint + 1
+        assert type(sum([sys.maxint, 1, -1])) is long
+        assert sum([sys.maxint, 1, -1]) == sys.maxint
+        assert type(sum([1, 2])) is int
+        assert sum([1, 2], 0.5) == 3.5
+        assert sum([1.5, 2.5], 1) == 5.0
+        assert type(sum([], 0.5)) is float
+        start = 2 ** 100
+        assert sum([], start) is start
+        assert sum(x for x in range(5)) == 10
+        assert sum((x for x in [1, 2.5, 3]), 1) == 7.5
+        assert sum(iter([sys.maxint, sys.maxint]), 2) == 2 * sys.maxint + 2
+        assert sum(iter([1, True, 2.5, 1L])) == 5.5
+        assert type(sum(iter([1, 1L]))) is long
+        assert repr(sum(iter([-0.0]), -0.0)) == '-0.0'
+        assert repr(sum(iter([0.1] * 10))) == repr(sum([0.1] * 10))
+        #
+        class Foo(object):
+            def __radd__(self, other):
+                return other - 100
+        assert sum(iter([1, 2, Foo(), 3])) == -94
+        assert sum(iter([1.5, Foo()])) == -98.5
+
     def test_sum_fast_path(self):
         # Fast paths for expected behaviour
         start = []
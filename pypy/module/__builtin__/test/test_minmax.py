@@ -83,3 +83,23 @@ class AppTestMinList:
 
     def test_min_mixed(self):
         assert min(['1', 2, 3, 'aa']) == 2
+
+    def test_min_max_int_list(self):
+        import sys
+        l = [5, -sys.maxint - 1, sys.maxint, 3]
+        assert min(l) == -sys.maxint - 1
+        assert max(l) == sys.maxint
+        assert type(max(l)) is int
+        assert max(set([1, 7, 3])) == 7
+
+    def test_min_max_float_list(self):
+        nan = float('nan')
+        assert max([1.5, 0.5, 2.5]) == 2.5
+        assert min([1.5, 0.5, 2.5]) == 0.5
+        l = [nan, 1.0, 2.0]
+        assert repr(max(l)) == 'nan'
+        assert repr(min(l)) == 'nan'
+        assert max([1.0, nan, 2.0]) == 2.0
+        assert repr(max([0.0, -0.0])) == '0.0'
+        assert repr(min([0.0, -0.0])) == '0.0'
+        assert repr(min([-0.0, 0.0])) == '-0.0'
@@ -1,24 +1,719 @@
 from pypy.interpreter.baseobjspace import W_Root
-from pypy.interpreter.typedef import TypeDef
-from pypy.interpreter.gateway import interp2app
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+from pypy.interpreter.gateway import interp2app, unwrap_spec, WrappedDefault
+from rpython.rlib.objectmodel import specialize, compute_hash
+from rpython.rlib.rstring import StringBuilder
 from rpython.tool.sourcetools import func_with_new_name
 
-def create_class(name):
-    class W_Class(W_Root):
-        'builtin base clasee for datetime.%s to allow interop with cpyext' % name
-        def descr_new__(space, w_type):
-            return space.allocate_instance(W_Class, w_type)
+MINYEAR = 1
+MAXYEAR = 9999
 
-    W_Class.typedef = TypeDef(name,
-        __new__ = interp2app(func_with_new_name(
-                                    W_Class.descr_new__.im_func,
-                                    '%s_new' % (name,))),
-        )
-    W_Class.typedef.acceptable_as_base_class = True
-    return W_Class
+DAYS_IN_MONTH = [-1, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+DAYS_BEFORE_MONTH = [-1, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304,
+                     334]
 
-W_DateTime_Time = create_class('pypydatetime_time')
-W_DateTime_Date = create_class('pypydatetime_date')
-W_DateTime_Delta = create_class('pypydatetime_delta')
+MAX_ORDINAL = 3652059  # date(9999, 12, 31).toordinal()
+MAX_DELTA_DAYS = 999999999
 
+DI400Y = 146097     # number of days in 400 years
+DI100Y = 36524      #    "    "   "   " 100   "
+DI4Y = 1461         #    "    "   "   "   4   "
 
+
+def is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+def days_before_year(year):
+    y = year - 1
+    return y * 365 + y // 4 - y // 100 + y // 400
+
+def days_in_month(year, month):
+    if month == 2 and is_leap(year):
+        return 29
+    return DAYS_IN_MONTH[month]
+
+def days_before_month(year, month):
+    result = DAYS_BEFORE_MONTH[month]
+    if month > 2 and is_leap(year):
+        result += 1
+    return result
+
+def _ymd2ord(year, month, day):
+    return days_before_year(year) + days_before_month(year, month) + day
+
+def _ord2ymd(n):
+    # n is a 1-based index, starting at 1-Jan-1.  The pattern of leap years
+    # repeats exactly every 400 years.  The basic strategy is to find the
+    # closest 400-year boundary at or before n, then work with the offset
+    # from that boundary to n.  Life is much clearer if we subtract 1 from
+    # n first -- then the values of n at 400-year boundaries are exactly
+    # those divisible by DI400Y.
+    n -= 1
+    n400 = n // DI400Y
+    n = n % DI400Y
+    year = n400 * 400 + 1   # ..., -399, 1, 401, ...
+
+    # Now n is the (non-negative) offset, in days, from January 1 of year, to
+    # the desired date.  Now compute how many 100-year cycles precede n.
+    # Note that it's possible for n100 to equal 4!  In that case 4 full
+    # 100-year cycles precede the desired day, which implies the desired
+    # day is December 31 at the end of a 400-year cycle.
+    n100 = n // DI100Y
+    n = n % DI100Y
+
+    # Now compute how many 4-year cycles precede it.
+    n4 = n // DI4Y
+    n = n % DI4Y
+
+    # And now how many single years.  Again n1 can be 4, and again meaning
+    # that the desired day is December 31 at the end of the 4-year cycle.
+    n1 = n // 365
+    n = n % 365
+
+    year += n100 * 100 + n4 * 4 + n1
+    if n1 == 4 or n100 == 4:
+        return year - 1, 12, 31
+
+    # Now the year is correct, and n is the offset from January 1.  We find
+    # the month via an estimate that's either exact or one too large.
+    leapyear = n1 == 3 and (n4 != 24 or n100 == 3)
+    month = (n + 50) >> 5
+    preceding = DAYS_BEFORE_MONTH[month]
+    if month > 2 and leapyear:
+        preceding += 1
+    if preceding > n:  # estimate is too large
+        month -= 1
+        preceding -= DAYS_IN_MONTH[month]
+        if month == 2 and leapyear:
+            preceding -= 1
+    # Now the year and month are correct, and n - preceding is the offset
+    # from the start of that month
+    return year, month, n - preceding + 1
+
+@unwrap_spec(year=int, month=int, day=int)
+def ymd2ord(space, year, month, day):
+    "year, month, day -> ordinal, considering 01-Jan-0001 as day 1."
+    if not 1 <= month <= 12:
+        raise oefmt(space.w_ValueError, "month must be in 1..12")
+    return space.newint(_ymd2ord(year, month, day))
+
+@unwrap_spec(n=int)
+def ord2ymd(space, n):
+    "ordinal -> (year, month, day), considering 01-Jan-0001 as day 1."
+    year, month, day = _ord2ymd(n)
+    return space.newtuple([space.newint(year), space.newint(month),
+                           space.newint(day)])
+
+def append_padded(builder, value, width):
+    s = str(value)
+    for i in range(width - len(s)):
+        builder.append('0')
+    builder.append(s)
+
+def _format_time(builder, hour, minute, second, microsecond):
+    append_padded(builder, hour, 2)
+    builder.append(':')
+    append_padded(builder, minute, 2)
+    builder.append(':')
+    append_padded(builder, second, 2)
+    if microsecond:
+        builder.append('.')
+        append_padded(builder, microsecond, 6)
+
+def cmp_int(a, b):
+    if a < b:
+        return -1
+    if a > b:
+        return 1
+    return 0
+
+def normalize_pair(hi, lo, factor):
+    if not 0 <= lo <= factor - 1:
+        hi += lo // factor
+        lo = lo % factor
+    return hi, lo
+
+def hash_fields(a, b, c, d=0):
+    # -1 means that the hash is not computed yet
+    result = compute_hash((a, b, c, d))
+    if result == -1:
+        result = -2
+    return result
+
+def hash_delta(days, seconds, microseconds):
+    seconds, microseconds = normalize_pair(seconds, microseconds, 1000000)
+    days, seconds = normalize_pair(days, seconds, 24 * 3600)
+    return hash_fields(days, seconds, microseconds)
+
+def utcoffset_w(space, w_obj):
+    # calls the app-level _utcoffset(), which checks the result of the
+    # tzinfo and returns it as a number of minutes, or None
+    return space.call_method(w_obj, '_utcoffset')
+
+
+class DateTimeState(object):
+    """The types of the results of the arithmetic: the interp-level base
+    types, until datetime.py registers its own classes with set_types()."""
+
+    def __init__(self, space):
+        self.w_date_type = space.gettypeobject(W_DateTime_Date.typedef)
+        self.w_datetime_type = space.gettypeobject(
+            W_DateTime_DateTime.typedef)
+        self.w_delta_type = space.gettypeobject(W_DateTime_Delta.typedef)
+
+def set_types(space, w_date, w_datetime, w_timedelta):
+    """set_types(date, datetime, timedelta)
+
+    Use these classes for the results of the arithmetic on dates, datetimes
+    and timedeltas."""
+    for w_type, typedef in [(w_date, W_DateTime_Date.typedef),
+                            (w_datetime, W_DateTime_DateTime.typedef),
+                            (w_timedelta, W_DateTime_Delta.typedef)]:
+        w_base = space.gettypeobject(typedef)
+        if not (space.isinstance_w(w_type, space.w_type) and
+                space.issubtype_w(w_type, w_base)):
+            raise oefmt(space.w_TypeError, "expected a subclass of '%N'",
+                        w_base)
+    state = space.fromcache(DateTimeState)
+    state.w_date_type = w_date
+    state.w_datetime_type = w_datetime
+    state.w_delta_type = w_timedelta
+
+def new_date(space, ordinal):
+    if not 1 <= ordinal <= MAX_ORDINAL:
+        raise oefmt(space.w_OverflowError, "date value out of range")
+    w_type = space.fromcache(DateTimeState).w_date_type
+    w_date = space.allocate_instance(W_DateTime_Date, w_type)
+    W_DateTime_Date.__init__(w_date)
+    w_date.year, w_date.month, w_date.day = _ord2ymd(ordinal)
+    return w_date
+
+def new_datetime(space, ordinal, seconds, microsecond, w_tzinfo):
+    # 'seconds' is the normalized number of seconds since midnight
+    if not 1 <= ordinal <= MAX_ORDINAL:
+        raise oefmt(space.w_OverflowError, "date value out of range")
+    w_type = space.fromcache(DateTimeState).w_datetime_type
+    w_dt = space.allocate_instance(W_DateTime_DateTime, w_type)
+    W_DateTime_DateTime.__init__(w_dt, space)
+    w_dt.year, w_dt.month, w_dt.day = _ord2ymd(ordinal)
+    w_dt.hour = seconds // 3600
+    w_dt.minute = seconds // 60 % 60
+    w_dt.second = seconds % 60
+    w_dt.microsecond = microsecond
+    w_dt.w_tzinfo = w_tzinfo
+    return w_dt
+
+def new_delta(space, days, seconds, microseconds):
+    seconds, microseconds = normalize_pair(seconds, microseconds, 1000000)
+    days, seconds = normalize_pair(days, seconds, 24 * 3600)
+    if not -MAX_DELTA_DAYS <= days <= MAX_DELTA_DAYS:
+        raise oefmt(space.w_OverflowError,
+                    "days=%d; must have magnitude <= %d",
+                    days, MAX_DELTA_DAYS)
+    w_type = space.fromcache(DateTimeState).w_delta_type
+    w_delta = space.allocate_instance(W_DateTime_Delta, w_type)
+    W_DateTime_Delta.__init__(w_delta, days, seconds, microseconds)
+    return w_delta
+
+def check_int_field(space, w_value):
+    """Returns 'w_value' converted to an int or long, like the date and
+    time constructors of CPython do."""
+    if space.isinstance_w(w_value, space.w_int):
+        return space.int(w_value)
+    if space.isinstance_w(w_value, space.w_float):
+        raise oefmt(space.w_TypeError, "integer argument expected, got float")
+    w_method = space.lookup(w_value, '__int__')
+    if w_method is None:
+        raise oefmt(space.w_TypeError, "an integer is required")
+    w_result = space.get_and_call_function(w_method, w_value)
+    if not (space.isinstance_w(w_result, space.w_int) or
+            space.isinstance_w(w_result, space.w_long)):
+        raise oefmt(space.w_TypeError,
+                    "__int__ method should return an integer")
+    return w_result
+
+def check_field(space, w_value, name, low, high):
+    w_value = check_int_field(space, w_value)
+    try:
+        value = space.int_w(w_value)
+    except OperationError as e:
+        if not e.match(space, space.w_OverflowError):
+            raise
+    else:
+        if low <= value <= high:
+            return value
+    w_message = space.newtext("%s must be in %d..%d" % (name, low, high))
+    raise OperationError(space.w_ValueError,
+                         space.newtuple2(w_message, w_value))
+
+
+def make_int_field(name, cls):
+    "initialization-time only"
+    def fget(space, obj):
+        return space.newint(getattr(obj, name))
+    def fset(space, obj, w_value):
+        setattr(obj, name, space.int_w(w_value))
+    fget = func_with_new_name(fget, 'fget_%s_%s' % (cls.__name__, name))
+    fset = func_with_new_name(fset, 'fset_%s_%s' % (cls.__name__, name))
+    return GetSetProperty(fget, fset, cls=cls)
+
+def make_readonly_int_field(name, cls, doc):
+    "initialization-time only"
+    def fget(space, obj):
+        return space.newint(getattr(obj, name))
+    def fset(space, obj, w_value):
+        # an AttributeError, like the one of CPython's datetime
+        raise oefmt(space.w_AttributeError,
+                    "attribute '%s' of '%T' objects is not writable",
+                    name, obj)
+    fget = func_with_new_name(fget, 'fget_%s_%s' % (cls.__name__, name))
+    fset = func_with_new_name(fset, 'fset_%s_%s' % (cls.__name__, name))
+    return GetSetProperty(fget, fset, cls=cls, doc=doc)
+
+def make_tzinfo_field(cls):
+    "initialization-time only"
+    def fget(space, obj):
+        return obj.w_tzinfo
+    def fset(space, obj, w_value):
+        obj.w_tzinfo = w_value
+    fget = func_with_new_name(fget, 'fget_%s_tzinfo' % (cls.__name__,))
+    fset = func_with_new_name(fset, 'fset_%s_tzinfo' % (cls.__name__,))
+    return GetSetProperty(fget, fset, cls=cls)
+
+
+class W_DateTime_Date(W_Root):
+    """Base class for datetime.date, storing the fields unboxed."""
+
+    def __init__(self):
+        self.year = MINYEAR
+        self.month = 1
+        self.day = 1
+        self.hashcode = -1
+
+    @staticmethod
+    @unwrap_spec(w_month=WrappedDefault(None), w_day=WrappedDefault(None))
+    def descr_new__(space, w_type, w_year=None, w_month=None, w_day=None):
+        self = space.allocate_instance(W_DateTime_Date, w_type)
+        W_DateTime_Date.__init__(self)
+        if w_year is None:
+            # the fields are filled in later, e.g. from a pickled state
+            return self
+        self._init_date_fields(space, w_year, w_month, w_day)
+        return self
+
+    def _init_date_fields(self, space, w_year, w_month, w_day):
+        self.year = check_field(space, w_year, "year", MINYEAR, MAXYEAR)
+        self.month = check_field(space, w_month, "month", 1, 12)
+        self.day = check_field(space, w_day, "day", 1,
+                               days_in_month(self.year, self.month))
+
+    def _toordinal(self):
+        return _ymd2ord(self.year, self.month, self.day)
+
+    def descr_toordinal(self, space):
+        """Return proleptic Gregorian ordinal for the year, month and day.
+
+        January 1 of year 1 is day 1.  Only the year, month and day values
+        contribute to the result.
+        """
+        return space.newint(self._toordinal())
+
+    def descr_weekday(self, space):
+        "Return day of the week, where Monday == 0 ... Sunday == 6."
+        return space.newint((self._toordinal() + 6) % 7)
+
+    def descr_isoweekday(self, space):
+        "Return day of the week, where Monday == 1 ... Sunday == 7."
+        # 1-Jan-0001 is a Monday
+        return space.newint(self._toordinal() % 7 or 7)
+
+    def _append_date(self, builder):
+        append_padded(builder, self.year, 4)
+        builder.append('-')
+        append_padded(builder, self.month, 2)
+        builder.append('-')
+        append_padded(builder, self.day, 2)
+
+    def descr_format_date(self, space):
+        """Returns 'YYYY-MM-DD'."""
+        builder = StringBuilder(10)
+        self._append_date(builder)
+        return space.newtext(builder.build())
+
+    def _cmp_date(self, other):
+        if self.year != other.year:
+            return cmp_int(self.year, other.year)
+        if self.month != other.month:
+            return cmp_int(self.month, other.month)
+        return cmp_int(self.day, other.day)
+
+    def descr_cmp(self, space, w_other):
+        """Compares the year, month and day fields; returns -1, 0 or 1."""
+        other = space.interp_w(W_DateTime_Date, w_other)
+        return space.newint(self._cmp_date(other))
+
+    def descr_hash(self, space):
+        if self.hashcode == -1:
+            self.hashcode = hash_fields(self.year, self.month, self.day)
+        return space.newint(self.hashcode)
+
+    def descr_add(self, space, w_other):
+        "Add a date to a timedelta."
+        if isinstance(w_other, W_DateTime_Delta):
+            return new_date(space, self._toordinal() + w_other.days)
+        return space.w_NotImplemented
+
+    def descr_sub(self, space, w_other):
+        """Subtract two dates, or a date and a timedelta."""
+        if isinstance(w_other, W_DateTime_Date):
+            return new_delta(space,
+                             self._toordinal() - w_other._toordinal(), 0, 0)
+        if isinstance(w_other, W_DateTime_Delta):
+            return new_date(space, self._toordinal() - w_other.days)
+        return space.w_NotImplemented
+
+
+class W_DateTime_DateTime(W_DateTime_Date):
+    """Base class for datetime.datetime, adding the time fields and the
+    tzinfo to the ones of the dates."""
+
+    def __init__(self, space):
+        W_DateTime_Date.__init__(self)
+        self.hour = 0
+        self.minute = 0
+        self.second = 0
+        self.microsecond = 0
+        self.w_tzinfo = space.w_None
+
+    @staticmethod
+    @unwrap_spec(w_month=WrappedDefault(None), w_day=WrappedDefault(None),
+                 w_hour=WrappedDefault(0), w_minute=WrappedDefault(0),
+                 w_second=WrappedDefault(0), w_microsecond=WrappedDefault(0))
+    def descr_new__(space, w_type, w_year=None, w_month=None, w_day=None,
+                    w_hour=None, w_minute=None, w_second=None,
+                    w_microsecond=None, w_tzinfo=None):
+        self = space.allocate_instance(W_DateTime_DateTime, w_type)
+        W_DateTime_DateTime.__init__(self, space)
+        if w_year is None:
+            # the fields are filled in later, e.g. from a pickled state
+            return self
+        self._init_date_fields(space, w_year, w_month, w_day)
+        self.hour = check_field(space, w_hour, "hour", 0, 23)
+        self.minute = check_field(space, w_minute, "minute", 0, 59)
+        self.second = check_field(space, w_second, "second", 0, 59)
+        self.microsecond = check_field(space, w_microsecond, "microsecond",
+                                       0, 999999)
+        if w_tzinfo is not None:
+            self.w_tzinfo = w_tzinfo
+        return self
+
+    def _seconds_of_day(self):
+        return self.hour * 3600 + self.minute * 60 + self.second
+
+    def descr_format_datetime(self, space, w_sep):
+        """Returns 'YYYY-MM-DD', the separator, and the time as
+        'HH:MM:SS[.mmmmmm]'."""
+        if space.isinstance_w(w_sep, space.w_int):
+            sep = space.int_w(w_sep)
+            if not 0 <= sep < 256:
+                raise oefmt(space.w_OverflowError,
+                            "%%c arg not in range(256)")
+            sepchar = chr(sep)
+        elif (space.isinstance_w(w_sep, space.w_bytes) and
+                space.len_w(w_sep) == 1):
+            sepchar = space.bytes_w(w_sep)[0]
+        else:
+            raise oefmt(space.w_TypeError, "%%c requires int or char")
+        builder = StringBuilder(26)
+        self._append_date(builder)
+        builder.append(sepchar)
+        _format_time(builder, self.hour, self.minute, self.second,
+                     self.microsecond)
+        return space.newtext(builder.build())
+
+    def descr_cmp_naive(self, space, w_other):
+        """Compares all the fields except tzinfo; returns -1, 0 or 1."""
+        other = space.interp_w(W_DateTime_DateTime, w_other)
+        result = self._cmp_date(other)
+        if result == 0:
+            result = cmp_time_fields(self, other)
+        return space.newint(result)
+
+    def descr_hash(self, space):
+        if self.hashcode == -1:
+            seconds = self._seconds_of_day()
+            if not space.is_none(self.w_tzinfo):
+                w_offset = utcoffset_w(space, self)
+                if not space.is_none(w_offset):
+                    seconds -= space.int_w(w_offset) * 60
+            self.hashcode = hash_delta(self._toordinal(), seconds,
+                                       self.microsecond)
+        return space.newint(self.hashcode)
+
+    def _add_delta(self, space, delta, factor):
+        seconds, microsecond = normalize_pair(
+            self._seconds_of_day() + delta.seconds * factor,
+            self.microsecond + delta.microseconds * factor, 1000000)
+        days, seconds = normalize_pair(
+            self._toordinal() + delta.days * factor, seconds, 24 * 3600)
+        return new_datetime(space, days, seconds, microsecond, self.w_tzinfo)
+
+    def descr_add(self, space, w_other):
+        "Add a datetime and a timedelta."
+        if isinstance(w_other, W_DateTime_Delta):
+            return self._add_delta(space, w_other, 1)
+        return space.w_NotImplemented
+
+    def descr_sub(self, space, w_other):
+        "Subtract two datetimes, or a datetime and a timedelta."
+        if isinstance(w_other, W_DateTime_Delta):
+            return self._add_delta(space, w_other, -1)
+        if not isinstance(w_other, W_DateTime_DateTime):
+            return space.w_NotImplemented
+        days = self._toordinal() - w_other._toordinal()
+        seconds = self._seconds_of_day() - w_other._seconds_of_day()
+        microseconds = self.microsecond - w_other.microsecond
+        if not space.is_w(self.w_tzinfo, w_other.w_tzinfo):
+            w_myoff = utcoffset_w(space, self)
+            w_otoff = utcoffset_w(space, w_other)
+            if space.is_none(w_myoff) or space.is_none(w_otoff):
+                if not (space.is_none(w_myoff) and space.is_none(w_otoff)):
+                    raise oefmt(space.w_TypeError,
+                        "can't subtract offset-naive and offset-aware "
+                        "datetimes")
+            else:
+                seconds += (space.int_w(w_otoff) -
+                            space.int_w(w_myoff)) * 60
+        return new_delta(space, days, seconds, microseconds)
+
+
+class W_DateTime_Time(W_Root):
+    """Base class for datetime.time, storing the fields unboxed."""
+
+    def __init__(self, space):
+        self.hour = 0
+        self.minute = 0
+        self.second = 0
+        self.microsecond = 0
+        self.w_tzinfo = space.w_None
+        self.hashcode = -1
+
+    @staticmethod
+    @unwrap_spec(w_minute=WrappedDefault(0), w_second=WrappedDefault(0),
+                 w_microsecond=WrappedDefault(0))
+    def descr_new__(space, w_type, w_hour=None, w_minute=None, w_second=None,
+                    w_microsecond=None, w_tzinfo=None):
+        self = space.allocate_instance(W_DateTime_Time, w_type)
+        W_DateTime_Time.__init__(self, space)
+        if w_hour is None:
+            # the fields are filled in later, e.g. from a pickled state
+            return self
+        self.hour = check_field(space, w_hour, "hour", 0, 23)
+        self.minute = check_field(space, w_minute, "minute", 0, 59)
+        self.second = check_field(space, w_second, "second", 0, 59)
+        self.microsecond = check_field(space, w_microsecond, "microsecond",
+                                       0, 999999)
+        if w_tzinfo is not None:
+            self.w_tzinfo = w_tzinfo
+        return self
+
+    def descr_cmp_naive(self, space, w_other):
+        """Compares all the fields except tzinfo; returns -1, 0 or 1."""
+        other = space.interp_w(W_DateTime_Time, w_other)
+        return space.newint(cmp_time_fields(self, other))
+
+    def descr_format_time(self, space):
+        """Returns 'HH:MM:SS.mmmmmm', or 'HH:MM:SS' if microsecond is zero."""
+        builder = StringBuilder(15)
+        _format_time(builder, self.hour, self.minute, self.second,
+                     self.microsecond)
+        return space.newtext(builder.build())
+
+    def descr_hash(self, space):
+        if self.hashcode == -1:
+            hour = self.hour
+            minute = self.minute
+            if not space.is_none(self.w_tzinfo):
+                w_offset = utcoffset_w(space, self)
+                if not space.is_none(w_offset):
+                    hour, minute = normalize_pair(
+                        hour, minute - space.int_w(w_offset), 60)
+            self.hashcode = hash_fields(hour, minute, self.second,
+                                        self.microsecond)
+        return space.newint(self.hashcode)
+
+
+@specialize.argtype(0)
+def cmp_time_fields(a, b):
+    # 'a' and 'b' are both W_DateTime_DateTime or both W_DateTime_Time
+    if a.hour != b.hour:
+        return cmp_int(a.hour, b.hour)
+    if a.minute != b.minute:
+        return cmp_int(a.minute, b.minute)
+    if a.second != b.second:
+        return cmp_int(a.second, b.second)
+    return cmp_int(a.microsecond, b.microsecond)
+
+
+class W_DateTime_Delta(W_Root):
+    """Base class for datetime.timedelta, storing the normalized days,
+    seconds and microseconds unboxed."""
+
+    def __init__(self, days, seconds, microseconds):
+        self.days = days
+        self.seconds = seconds
+        self.microseconds = microseconds
+        self.hashcode = -1
+
+    @staticmethod
+    @unwrap_spec(days=int, seconds=int, microseconds=int)
+    def descr_new__(space, w_type, days=0, seconds=0, microseconds=0):
+        """Builds a timedelta from fields that are already normalized."""
+        self = space.allocate_instance(W_DateTime_Delta, w_type)
+        W_DateTime_Delta.__init__(self, days, seconds, microseconds)
+        return self
+
+    def descr_cmp(self, space, w_other):
+        """Compares two timedeltas; returns -1, 0 or 1."""
+        other = space.interp_w(W_DateTime_Delta, w_other)
+        if self.days != other.days:
+            result = cmp_int(self.days, other.days)
+        elif self.seconds != other.seconds:
+            result = cmp_int(self.seconds, other.seconds)
+        else:
+            result = cmp_int(self.microseconds, other.microseconds)
+        return space.newint(result)
+
+    def descr_nonzero(self, space):
+        return space.newbool(self.days != 0 or self.seconds != 0 or
+                             self.microseconds != 0)
+
+    def descr_hash(self, space):
+        if self.hashcode == -1:
+            self.hashcode = hash_fields(self.days, self.seconds,
+                                        self.microseconds)
+        return space.newint(self.hashcode)
+
+    # the results are always real timedeltas, even for subclasses, like
+    # in CPython
+
+    def descr_add(self, space, w_other):
+        if isinstance(w_other, W_DateTime_Delta):
+            return new_delta(space, self.days + w_other.days,
+                             self.seconds + w_other.seconds,
+                             self.microseconds + w_other.microseconds)
+        return space.w_NotImplemented
+
+    def descr_sub(self, space, w_other):
+        if isinstance(w_other, W_DateTime_Delta):
+            return new_delta(space, self.days - w_other.days,
+                             self.seconds - w_other.seconds,
+                             self.microseconds - w_other.microseconds)
+        return space.w_NotImplemented
+
+    def descr_neg(self, space):
+        return new_delta(space, -self.days, -self.seconds, -self.microseconds)
+
+    def descr_pos(self, space):
+        return new_delta(space, self.days, self.seconds, self.microseconds)
+
+    def descr_abs(self, space):
+        if self.days < 0:
+            return self.descr_neg(space)
+        return self
+
+
+W_DateTime_Date.typedef = TypeDef('pypydatetime_date',
+    __doc__ = W_DateTime_Date.__doc__,
+    __new__ = interp2app(W_DateTime_Date.descr_new__),
+    _year = make_int_field('year', W_DateTime_Date),
+    _month = make_int_field('month', W_DateTime_Date),
+    _day = make_int_field('day', W_DateTime_Date),
+    _hashcode = make_int_field('hashcode', W_DateTime_Date),
+    year = make_readonly_int_field('year', W_DateTime_Date, "year (1-9999)"),
+    month = make_readonly_int_field('month', W_DateTime_Date,
+                                    "month (1-12)"),
+    day = make_readonly_int_field('day', W_DateTime_Date, "day (1-31)"),
+    toordinal = interp2app(W_DateTime_Date.descr_toordinal),
+    weekday = interp2app(W_DateTime_Date.descr_weekday),
+    isoweekday = interp2app(W_DateTime_Date.descr_isoweekday),
+    _format_date = interp2app(W_DateTime_Date.descr_format_date),
+    _cmp = interp2app(W_DateTime_Date.descr_cmp),
+    __hash__ = interp2app(W_DateTime_Date.descr_hash),
+    __add__ = interp2app(W_DateTime_Date.descr_add),
+    __radd__ = interp2app(W_DateTime_Date.descr_add),
+    __sub__ = interp2app(W_DateTime_Date.descr_sub),
+    )
+W_DateTime_Date.typedef.acceptable_as_base_class = True
+
+W_DateTime_DateTime.typedef = TypeDef('pypydatetime_datetime',
+    W_DateTime_Date.typedef,
+    __doc__ = W_DateTime_DateTime.__doc__,
+    __new__ = interp2app(W_DateTime_DateTime.descr_new__),
+    _hour = make_int_field('hour', W_DateTime_DateTime),
+    _minute = make_int_field('minute', W_DateTime_DateTime),
+    _second = make_int_field('second', W_DateTime_DateTime),
+    _microsecond = make_int_field('microsecond', W_DateTime_DateTime),
+    _tzinfo = make_tzinfo_field(W_DateTime_DateTime),
+    hour = make_readonly_int_field('hour', W_DateTime_DateTime,
+                                   "hour (0-23)"),
+    minute = make_readonly_int_field('minute', W_DateTime_DateTime,
+                                     "minute (0-59)"),
+    second = make_readonly_int_field('second', W_DateTime_DateTime,
+                                     "second (0-59)"),
+    microsecond = make_readonly_int_field('microsecond', W_DateTime_DateTime,
+                                          "microsecond (0-999999)"),
+    _format_datetime = interp2app(W_DateTime_DateTime.descr_format_datetime),
+    _cmp_naive = interp2app(W_DateTime_DateTime.descr_cmp_naive),
+    __hash__ = interp2app(W_DateTime_DateTime.descr_hash),
+    __add__ = interp2app(W_DateTime_DateTime.descr_add),
+    __radd__ = interp2app(W_DateTime_DateTime.descr_add),
+    __sub__ = interp2app(W_DateTime_DateTime.descr_sub),
+    )
+W_DateTime_DateTime.typedef.acceptable_as_base_class = True
+
+W_DateTime_Time.typedef = TypeDef('pypydatetime_time',
+    __doc__ = W_DateTime_Time.__doc__,
+    __new__ = interp2app(W_DateTime_Time.descr_new__),
+    _hour = make_int_field('hour', W_DateTime_Time),
+    _minute = make_int_field('minute', W_DateTime_Time),
+    _second = make_int_field('second', W_DateTime_Time),
+    _microsecond = make_int_field('microsecond', W_DateTime_Time),
+    _tzinfo = make_tzinfo_field(W_DateTime_Time),
+    _hashcode = make_int_field('hashcode', W_DateTime_Time),
+    hour = make_readonly_int_field('hour', W_DateTime_Time, "hour (0-23)"),
+    minute = make_readonly_int_field('minute', W_DateTime_Time,
+                                     "minute (0-59)"),
+    second = make_readonly_int_field('second', W_DateTime_Time,
+                                     "second (0-59)"),
+    microsecond = make_readonly_int_field('microsecond', W_DateTime_Time,
+                                          "microsecond (0-999999)"),
+    _cmp_naive = interp2app(W_DateTime_Time.descr_cmp_naive),
+    _format_time = interp2app(W_DateTime_Time.descr_format_time),
+    __hash__ = interp2app(W_DateTime_Time.descr_hash),
+    )
+W_DateTime_Time.typedef.acceptable_as_base_class = True
+
+W_DateTime_Delta.typedef = TypeDef('pypydatetime_delta',
+    __doc__ = W_DateTime_Delta.__doc__,
+    __new__ = interp2app(W_DateTime_Delta.descr_new__),
+    _days = make_int_field('days', W_DateTime_Delta),
+    _seconds = make_int_field('seconds', W_DateTime_Delta),
+    _microseconds = make_int_field('microseconds', W_DateTime_Delta),
+    _hashcode = make_int_field('hashcode', W_DateTime_Delta),
+    days = make_readonly_int_field('days', W_DateTime_Delta, "days"),
+    seconds = make_readonly_int_field('seconds', W_DateTime_Delta,
+                                      "seconds"),
+    microseconds = make_readonly_int_field('microseconds', W_DateTime_Delta,
+                                           "microseconds"),
+    _cmp = interp2app(W_DateTime_Delta.descr_cmp),
+    __nonzero__ = interp2app(W_DateTime_Delta.descr_nonzero),
+    __hash__ = interp2app(W_DateTime_Delta.descr_hash),
+    __add__ = interp2app(W_DateTime_Delta.descr_add),
+    __sub__ = interp2app(W_DateTime_Delta.descr_sub),
+    __neg__ = interp2app(W_DateTime_Delta.descr_neg),
+    __pos__ = interp2app(W_DateTime_Delta.descr_pos),
+    __abs__ = interp2app(W_DateTime_Delta.descr_abs),
+    )
+W_DateTime_Delta.typedef.acceptable_as_base_class = True
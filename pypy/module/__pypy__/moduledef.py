@@ -63,9 +63,13 @@ class OsModule(MixedModule):
 class PyPyDateTime(MixedModule):
     appleveldefs = {}
     interpleveldefs = {
-        'dateinterop'  : 'interp_pypydatetime.W_DateTime_Date',
-        'timeinterop'  : 'interp_pypydatetime.W_DateTime_Time',
-        'deltainterop' : 'interp_pypydatetime.W_DateTime_Delta',
+        'dateinterop'     : 'interp_pypydatetime.W_DateTime_Date',
+        'datetimeinterop' : 'interp_pypydatetime.W_DateTime_DateTime',
+        'timeinterop'     : 'interp_pypydatetime.W_DateTime_Time',
+        'deltainterop'    : 'interp_pypydatetime.W_DateTime_Delta',
+        'ymd2ord'         : 'interp_pypydatetime.ymd2ord',
+        'ord2ymd'         : 'interp_pypydatetime.ord2ymd',
+        'set_types'       : 'interp_pypydatetime.set_types',
     }
 
 class PyPyBufferable(MixedModule):
@@ -0,0 +1,242 @@
+
+class AppTestPyPyDateTime(object):
+    spaceconfig = dict(usemodules=['__pypy__', 'struct', 'time'])
+
+    def test_ordinals(self):
+        from __pypy__._pypydatetime import ymd2ord, ord2ymd
+        assert ymd2ord(1, 1, 1) == 1
+        assert ymd2ord(1970, 1, 1) == 719163
+        assert ymd2ord(2000, 3, 1) == 730180
+        for n in [1, 59, 60, 365, 366, 730180, 730179, 146097, 146098,
+                  3652059]:
+            assert ymd2ord(*ord2ymd(n)) == n
+        assert ord2ymd(730179) == (2000, 2, 29)
+        assert ord2ymd(3652059) == (9999, 12, 31)
+        assert ord2ymd(0) == (0, 12, 31)
+        raises(ValueError, ymd2ord, 2000, 13, 1)
+
+    def test_date_fields(self):
+        from __pypy__._pypydatetime import dateinterop, datetimeinterop
+        d = dateinterop.__new__(dateinterop, 2000, 2, 29)
+        assert (d.year, d.month, d.day) == (2000, 2, 29)
+        assert d._hashcode == -1
+        assert not hasattr(d, '_hour')
+        raises(TypeError, dateinterop.__new__, dateinterop, 2000, 2, 29, 12)
+        raises(AttributeError, "d.year = 2001")
+        d._year = 2004
+        assert d.year == 2004
+        assert d.toordinal() == 731640
+        assert d.weekday() == 6
+        assert d.isoweekday() == 7
+        assert d._format_date() == '2004-02-29'
+        dt = datetimeinterop.__new__(datetimeinterop, 2004, 2, 29, 12, 30)
+        assert isinstance(dt, dateinterop)
+        assert (dt.year, dt.month, dt.day) == (2004, 2, 29)
+        assert (dt.hour, dt.minute, dt.second, dt.microsecond) == (12, 30,
+                                                                   0, 0)
+        assert dt._tzinfo is None
+        raises(AttributeError, "dt.hour = 1")
+        assert dt.toordinal() == 731640
+        assert dt._format_date() == '2004-02-29'
+        assert dt._format_datetime(' ') == '2004-02-29 12:30:00'
+        dt._microsecond = 5
+        assert dt._format_datetime('T') == '2004-02-29T12:30:00.000005'
+        assert dt._format_datetime(84) == '2004-02-29T12:30:00.000005'
+        raises(TypeError, dt._format_datetime, 'ab')
+        raises(TypeError, dt._format_datetime, u'T')
+        raises(TypeError, dt._format_datetime, '')
+        raises(OverflowError, dt._format_datetime, 256)
+
+    def test_date_checks(self):
+        from __pypy__._pypydatetime import dateinterop, datetimeinterop
+        new = dateinterop.__new__
+        exc = raises(ValueError, new, dateinterop, 2001, 2, 29)
+        assert exc.value.args == ('day must be in 1..28', 29)
+        exc = raises(ValueError, new, dateinterop, 10000, 1, 1)
+        assert exc.value.args == ('year must be in 1..9999', 10000)
+        exc = raises(ValueError, datetimeinterop.__new__, datetimeinterop,
+                     2000, 1, 1, 24)
+        assert exc.value.args == ('hour must be in 0..23', 24)
+        exc = raises(ValueError, new, dateinterop, 10**20, 1, 1)
+        assert exc.value.args == ('year must be in 1..9999', 10**20)
+        exc = raises(TypeError, new, dateinterop, 2000.0, 1, 1)
+        assert str(exc.value) == 'integer argument expected, got float'
+        exc = raises(TypeError, new, dateinterop, 2000, None, 1)
+        assert str(exc.value) == 'an integer is required'
+        class Int(object):
+            def __int__(self):
+                return 2000L
+        assert new(dateinterop, Int(), True, 1L).year == 2000
+
+    def test_cmp(self):
+        from __pypy__._pypydatetime import (dateinterop, timeinterop,
+                                            deltainterop)
+        from __pypy__._pypydatetime import datetimeinterop
+        def d(*args):
+            return dateinterop.__new__(dateinterop, *args)
+        def dt(*args):
+            return datetimeinterop.__new__(datetimeinterop, *args)
+        assert d(2000, 1, 1)._cmp(dt(2000, 1, 1, 5)) == 0
+        assert dt(2000, 1, 1)._cmp_naive(dt(2000, 1, 1, 5)) == -1
+        raises(TypeError, dt(2000, 1, 1)._cmp_naive, d(2000, 1, 1))
+        assert d(2000, 1, 2)._cmp(d(2000, 1, 1)) == 1
+        assert d(1999, 12, 31)._cmp(d(2000, 1, 1)) == -1
+        raises(TypeError, d(2000, 1, 1)._cmp, 5)
+        def t(*args):
+            return timeinterop.__new__(timeinterop, *args)
+        assert t(1, 2, 3, 4)._cmp_naive(t(1, 2, 3, 4)) == 0
+        assert t(1, 2, 3, 5)._cmp_naive(t(1, 2, 3, 4)) == 1
+        assert t(0, 59)._cmp_naive(t(1)) == -1
+        def td(*args):
+            return deltainterop.__new__(deltainterop, *args)
+        assert td(1, 2, 3)._cmp(td(1, 2, 3)) == 0
+        assert td(-1, 86399)._cmp(td(0)) == -1
+        assert not td()
+        assert td(0, 0, 1)
+
+    def test_time_fields(self):
+        from __pypy__._pypydatetime import timeinterop
+        t = timeinterop.__new__(timeinterop, 1, 2, 3, 4, 'tz')
+        assert (t.hour, t.minute, t.second, t.microsecond) == (1, 2, 3, 4)
+        assert t._tzinfo == 'tz'
+        assert t._format_time() == '01:02:03.000004'
+        t._microsecond = 0
+        assert t._format_time() == '01:02:03'
+        exc = raises(ValueError, timeinterop.__new__, timeinterop, 1, 60)
+        assert exc.value.args == ('minute must be in 0..59', 60)
+
+    def test_delta_arithmetic(self):
+        from __pypy__._pypydatetime import deltainterop
+        def td(*args):
+            return deltainterop.__new__(deltainterop, *args)
+        def fields(x):
+            return (x.days, x.seconds, x.microseconds)
+        assert fields(td(1, 86399, 999999) + td(0, 0, 1)) == (2, 0, 0)
+        assert fields(td(1) - td(0, 0, 1)) == (0, 86399, 999999)
+        assert fields(-td(0, 0, 1)) == (-1, 86399, 999999)
+        assert fields(+td(1, 2, 3)) == (1, 2, 3)
+        assert fields(abs(td(-1, 86399))) == (0, 1, 0)
+        exc = raises(OverflowError, "td(999999999) + td(1)")
+        assert str(exc.value) == ('days=1000000000; must have magnitude '
+                                  '<= 999999999')
+        assert td(1).__add__(5) is NotImplemented
+        assert hash(td(1, 2, 3)) == hash(td(1, 2, 3))
+        assert hash(td(1, 2, 3)) != hash(td(1, 2, 4))
+
+    def test_date_arithmetic(self):
+        from __pypy__._pypydatetime import (dateinterop, datetimeinterop,
+                                            deltainterop)
+        def td(*args):
+            return deltainterop.__new__(deltainterop, *args)
+        d = dateinterop.__new__(dateinterop, 2000, 2, 28)
+        d2 = d + td(2, 86399)
+        assert type(d2) is dateinterop
+        assert (d2.year, d2.month, d2.day) == (2000, 3, 1)
+        d2 = td(-59) + d
+        assert (d2.year, d2.month, d2.day) == (1999, 12, 31)
+        d2 = d - td(365)
+        assert (d2.year, d2.month, d2.day) == (1999, 2, 28)
+        delta = d - dateinterop.__new__(dateinterop, 1999, 2, 28)
+        assert (delta.days, delta.seconds) == (365, 0)
+        raises(OverflowError, "d + td(3000000)")
+        raises(OverflowError, "d - td(800000)")
+        assert d.__add__(d) is NotImplemented
+        assert d.__sub__(5) is NotImplemented
+        assert hash(d) == hash(dateinterop.__new__(dateinterop, 2000, 2, 28))
+        assert d._hashcode == hash(d)
+        dt = datetimeinterop.__new__(datetimeinterop, 2000, 2, 28, 23, 59,
+                                     59, 999999)
+        dt2 = dt + td(0, 0, 1)
+        assert type(dt2) is datetimeinterop
+        assert (dt2.year, dt2.month, dt2.day, dt2.hour, dt2.minute,
+                dt2.second, dt2.microsecond) == (2000, 2, 29, 0, 0, 0, 0)
+        dt2 = dt - td(1, 1)
+        assert (dt2.day, dt2.hour, dt2.second) == (27, 23, 58)
+        delta = dt - dt2
+        assert (delta.days, delta.seconds, delta.microseconds) == (1, 1, 0)
+        assert dt.__sub__(d) is NotImplemented
+        raises(OverflowError, "dt + td(3000000)")
+
+    def test_datetime_module(self):
+        import datetime
+        d = datetime.datetime(2015, 6, 8, 12, 34, 56)
+        assert d.year == 2015 and d.second == 56
+        assert d.isoformat() == '2015-06-08T12:34:56'
+        assert str(d.date()) == '2015-06-08'
+        assert str(d.time()) == '12:34:56'
+        assert d + datetime.timedelta(days=366) == datetime.datetime(
+            2016, 6, 8, 12, 34, 56)
+        assert d - datetime.datetime(2015, 1, 1) == datetime.timedelta(
+            158, 45296)
+        assert d > datetime.datetime(2015, 6, 8, 12, 34, 55, 999999)
+        assert datetime.date(2015, 6, 8) < datetime.date(2015, 6, 9)
+        assert datetime.date.fromordinal(d.toordinal()) == d.date()
+        assert hash(d) == hash(datetime.datetime(2015, 6, 8, 12, 34, 56))
+        raises(TypeError, datetime.datetime, 2015, 6, 8, tzinfo=5)
+        exc = raises(ValueError, datetime.date, 2015, 2, 29)
+        assert exc.value.args == ('day must be in 1..28', 29)
+        class sub(datetime.date):
+            pass
+        s = sub(2015, 6, 8)
+        s.extra = 1
+        assert s == datetime.date(2015, 6, 8)
+        assert not hasattr(datetime.date(2015, 6, 8), '__dict__')
+
+    def test_datetime_module_arithmetic(self):
+        import datetime
+        class D(datetime.date):
+            pass
+        class DT(datetime.datetime):
+            pass
+        class TD(datetime.timedelta):
+            pass
+        assert type(TD(1) + TD(2)) is datetime.timedelta
+        assert type(-TD(1)) is datetime.timedelta
+        assert type(D(2015, 6, 8) + TD(1)) is datetime.date
+        assert type(D(2015, 6, 8) - D(2015, 6, 1)) is datetime.timedelta
+        d = DT(2015, 6, 8, 12) - TD(hours=13)
+        assert type(d) is datetime.datetime
+        assert d == datetime.datetime(2015, 6, 7, 23)
+        assert datetime.datetime.__bases__[0] is datetime.date
+        assert isinstance(d, datetime.date)
+        raises(OverflowError, "datetime.date.max + datetime.timedelta(1)")
+        raises(TypeError, "datetime.date(2015, 6, 8) + 1")
+        raises(TypeError, "datetime.datetime(2015, 6, 8) - "
+                          "datetime.date(2015, 6, 8)")
+        raises(TypeError, datetime.datetime(2015, 6, 8).isoformat, 'ab')
+        raises(TypeError, datetime.datetime(2015, 6, 8).isoformat, u'T')
+        assert datetime.datetime(2015, 6, 8).isoformat(' ') == (
+            '2015-06-08 00:00:00')
+        from __pypy__._pypydatetime import set_types
+        raises(TypeError, set_types, datetime.date, datetime.date,
+               datetime.timedelta)
+        set_types(D, DT, TD)
+        try:
+            assert type(D(2015, 6, 8) + TD(1)) is D
+        finally:
+            set_types(datetime.date, datetime.datetime, datetime.timedelta)
+
+    def test_datetime_module_tz(self):
+        import datetime
+        class FixedOffset(datetime.tzinfo):
+            def __init__(self, minutes):
+                self.minutes = minutes
+            def utcoffset(self, dt):
+                return datetime.timedelta(minutes=self.minutes)
+            def dst(self, dt):
+                return datetime.timedelta(0)
+        tz1 = FixedOffset(60)
+        tz2 = FixedOffset(-30)
+        d1 = datetime.datetime(2015, 6, 8, 12, 0, tzinfo=tz1)
+        d2 = datetime.datetime(2015, 6, 8, 12, 30, tzinfo=tz2)
+        assert d1 - d2 == datetime.timedelta(hours=-2)
+        assert d1 == datetime.datetime(2015, 6, 8, 10, 30, tzinfo=tz2)
+        assert hash(d1) == hash(datetime.datetime(2015, 6, 8, 10, 30,
+                                                  tzinfo=tz2))
+        raises(TypeError, "d1 - datetime.datetime(2015, 6, 8)")
+        assert (d1 + datetime.timedelta(1)).tzinfo is tz1
+        t1 = datetime.time(12, 10, tzinfo=tz1)
+        t2 = datetime.time(10, 40, tzinfo=tz2)
+        assert t1 == t2
+        assert hash(t1) == hash(t2)
+        assert hash(datetime.time(1, 2)) == hash(datetime.time(1, 2))
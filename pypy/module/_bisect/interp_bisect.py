@@ -0,0 +1,130 @@
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec, WrappedDefault
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.listobject import W_ListObject
+
+
+def make_unboxed_bisect_functions():
+    # work directly on the storage of lists using the IntegerListStrategy or
+    # the FloatListStrategy
+    def bisect_left(l, x, lo, hi):
+        while lo < hi:
+            mid = lo + ((hi - lo) >> 1)
+            if l[mid] < x:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def bisect_right(l, x, lo, hi):
+        while lo < hi:
+            mid = lo + ((hi - lo) >> 1)
+            if x < l[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    return bisect_left, bisect_right
+
+_bisect_left_int, _bisect_right_int = make_unboxed_bisect_functions()
+_bisect_left_float, _bisect_right_float = make_unboxed_bisect_functions()
+
+
+def internal_bisect(space, w_a, w_x, lo, w_hi, right):
+    if lo < 0:
+        raise oefmt(space.w_ValueError, "lo must be non-negative")
+    if space.is_none(w_hi):
+        hi = space.len_w(w_a)
+    else:
+        hi = space.int_w(w_hi)
+    if type(w_a) is W_ListObject and hi <= w_a.length():
+        if type(w_x) is W_IntObject:
+            intlist = w_a.getstorage_int()
+            if intlist is not None:
+                x = space.int_w(w_x)
+                if right:
+                    return _bisect_right_int(intlist, x, lo, hi)
+                return _bisect_left_int(intlist, x, lo, hi)
+        elif type(w_x) is W_FloatObject:
+            floatlist = w_a.getstorage_float()
+            if floatlist is not None:
+                floatval = space.float_w(w_x)
+                if right:
+                    return _bisect_right_float(floatlist, floatval, lo, hi)
+                return _bisect_left_float(floatlist, floatval, lo, hi)
+    while lo < hi:
+        mid = lo + ((hi - lo) >> 1)
+        w_litem = space.getitem(w_a, space.newint(mid))
+        if right:
+            if space.is_true(space.lt(w_x, w_litem)):
+                hi = mid
+            else:
+                lo = mid + 1
+        else:
+            if space.is_true(space.lt(w_litem, w_x)):
+                lo = mid + 1
+            else:
+                hi = mid
+    return lo
+
+def internal_insort(space, w_a, w_x, lo, w_hi, right):
+    index = internal_bisect(space, w_a, w_x, lo, w_hi, right)
+    if type(w_a) is W_ListObject:
+        w_a.descr_insert(space, index, w_x)
+    else:
+        space.call_method(w_a, 'insert', space.newint(index), w_x)
+
+
+@unwrap_spec(lo=int, w_hi=WrappedDefault(None))
+def bisect_right(space, w_a, w_x, lo=0, w_hi=None):
+    """bisect_right(a, x[, lo[, hi]]) -> index
+
+Return the index where to insert item x in list a, assuming a is sorted.
+
+The return value i is such that all e in a[:i] have e <= x, and all e in
+a[i:] have e > x.  So if x already appears in the list, i points just
+beyond the rightmost x already there
+
+Optional args lo (default 0) and hi (default len(a)) bound the
+slice of a to be searched."""
+    return space.newint(internal_bisect(space, w_a, w_x, lo, w_hi, True))
+
+@unwrap_spec(lo=int, w_hi=WrappedDefault(None))
+def bisect_left(space, w_a, w_x, lo=0, w_hi=None):
+    """bisect_left(a, x[, lo[, hi]]) -> index
+
+Return the index where to insert item x in list a, assuming a is sorted.
+
+The return value i is such that all e in a[:i] have e < x, and all e in
+a[i:] have e >= x.  So if x already appears in the list, i points just
+before the leftmost x already there.
+
+Optional args lo (default 0) and hi (default len(a)) bound the
+slice of a to be searched."""
+    return space.newint(internal_bisect(space, w_a, w_x, lo, w_hi, False))
+
+@unwrap_spec(lo=int, w_hi=WrappedDefault(None))
+def insort_right(space, w_a, w_x, lo=0, w_hi=None):
+    """insort_right(a, x[, lo[, hi]])
+
+Insert item x in list a, and keep it sorted assuming a is sorted.
+
+If x is already in a, insert it to the right of the rightmost x.
+
+Optional args lo (default 0) and hi (default len(a)) bound the
+slice of a to be searched."""
+    internal_insort(space, w_a, w_x, lo, w_hi, True)
+
+@unwrap_spec(lo=int, w_hi=WrappedDefault(None))
+def insort_left(space, w_a, w_x, lo=0, w_hi=None):
+    """insort_left(a, x[, lo[, hi]])
+
+Insert item x in list a, and keep it sorted assuming a is sorted.
+
+If x is already in a, insert it to the left of the leftmost x.
+
+Optional args lo (default 0) and hi (default len(a)) bound the
+slice of a to be searched."""
+    internal_insort(space, w_a, w_x, lo, w_hi, False)
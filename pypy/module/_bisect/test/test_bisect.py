@@ -0,0 +1,93 @@
+
+class AppTestBisect(object):
+    spaceconfig = dict(usemodules=['_bisect'])
+
+    def test_bisect_left(self):
+        from _bisect import bisect_left
+        for a in [[], [1, 2, 2, 3, 5], [1.0, 2.0, 2.0, 3.0, 5.0],
+                  ['a', 'b', 'b', 'c', 'e'], (1, 2, 2, 3, 5)]:
+            for i, x in enumerate(a):
+                assert bisect_left(a, x) == list(a).index(x)
+        a = [1, 2, 2, 3, 5]
+        assert bisect_left(a, 0) == 0
+        assert bisect_left(a, 4) == 4
+        assert bisect_left(a, 6) == 5
+        assert bisect_left(a, 2.5) == 3
+        assert bisect_left(a, 2, 2) == 2
+        assert bisect_left(a, 5, 0, 3) == 3
+        assert bisect_left(a, 5, hi=3) == 3
+        assert bisect_left([1.5, 2.5], 2) == 1
+
+    def test_bisect_right(self):
+        from _bisect import bisect_right, bisect
+        assert bisect is bisect_right
+        for a in [[1, 2, 2, 3, 5], [1.0, 2.0, 2.0, 3.0, 5.0],
+                  ['a', 'b', 'b', 'c', 'e'], xrange(1, 6)]:
+            for i, x in enumerate(a):
+                assert bisect_right(a, x) == len([y for y in a if y <= x])
+        a = [1, 2, 2, 3, 5]
+        assert bisect_right(a, 2) == 3
+        assert bisect_right(a, 2.0) == 3
+        assert bisect_right(a, 6) == 5
+        assert bisect_right(a, 0) == 0
+        assert bisect_right(a, 5, 0, 3) == 3
+        assert bisect_right(a, 1, 3) == 3
+        assert bisect_right(a, 5, 1, None) == 5
+
+    def test_errors(self):
+        from _bisect import bisect_left, bisect_right, insort
+        raises(ValueError, bisect_left, [1, 2], 1, -1)
+        raises(ValueError, bisect_right, [1, 2], 1, -1)
+        raises(ValueError, insort, [1, 2], 1, -1)
+        raises(IndexError, bisect_right, [1, 2], 1, 0, 10)
+        raises(TypeError, bisect_right, 5, 1)
+
+    def test_insort(self):
+        from _bisect import insort_left, insort_right, insort
+        assert insort is insort_right
+        ints = [(i * 7919) % 101 for i in range(100)]
+        for data in [ints, [x / 7.0 for x in ints], map(str, ints)]:
+            a = []
+            b = []
+            for x in data:
+                insort_left(a, x)
+                insort_right(b, x)
+            assert a == sorted(data)
+            assert b == sorted(data)
+        a = [1, 1.0]
+        insort_left(a, 1L)
+        assert [type(x) for x in a] == [long, int, float]
+        insort_right(a, True)
+        assert [type(x) for x in a] == [long, int, float, bool]
+        a = [1, 2]
+        insort_right(a, 10, 5)
+        assert a == [1, 2, 10]
+
+    def test_insort_sequence(self):
+        from _bisect import insort_left
+        class List(list):
+            def insert(self, index, item):
+                list.insert(self, index, (index, item))
+        a = List([10, 30])
+        insort_left(a, 20)
+        assert a == [10, (1, 20), 30]
+        class Seq(object):
+            def __init__(self):
+                self.data = []
+            def __len__(self):
+                return len(self.data)
+            def __getitem__(self, index):
+                return self.data[index]
+            def insert(self, index, item):
+                self.data.insert(index, item)
+        s = Seq()
+        for x in [3, 1, 2]:
+            insort_left(s, x)
+        assert s.data == [1, 2, 3]
+
+    def test_bisect_module(self):
+        import bisect
+        assert bisect.bisect.__module__ == '_bisect'
+        a = [1, 3]
+        bisect.insort(a, 2)
+        assert a == [1, 2, 3]
@@ -0,0 +1,1022 @@
+"""The Pickler of cPickle, written at interp-level.
+
+It writes the same opcodes as the Pickler of lib-python's pickle.py, with
+the memo numbering of cPickle, into a StringBuilder that is passed to the
+write() method of the file once per dump().  The exact built-in types are
+pickled without going through app-level; everything else goes through
+copy_reg.dispatch_table, __reduce_ex__() and __reduce__() like in pickle.py.
+"""
+
+from rpython.rlib import rutf8
+from rpython.rlib.rarithmetic import longlongmask
+from rpython.rlib.rstring import StringBuilder
+from rpython.rlib.rstruct.ieee import float_pack
+
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+from pypy.objspace.std.dictmultiobject import W_DictMultiObject
+
+
+HIGHEST_PROTOCOL = 2
+
+# the number of items written by one APPENDS or SETITEMS, like in pickle.py
+BATCHSIZE = 1000
+
+# the output is passed to file.write() when it grows larger than this
+WRITE_BUFFER_SIZE = 64 * 1024
+
+MARK            = '('
+STOP            = '.'
+POP             = '0'
+POP_MARK        = '1'
+DUP             = '2'
+FLOAT           = 'F'
+INT             = 'I'
+BININT          = 'J'
+BININT1         = 'K'
+LONG            = 'L'
+BININT2         = 'M'
+NONE            = 'N'
+PERSID          = 'P'
+BINPERSID       = 'Q'
+REDUCE          = 'R'
+STRING          = 'S'
+BINSTRING       = 'T'
+SHORT_BINSTRING = 'U'
+UNICODE         = 'V'
+BINUNICODE      = 'X'
+APPEND          = 'a'
+BUILD           = 'b'
+GLOBAL          = 'c'
+DICT            = 'd'
+EMPTY_DICT      = '}'
+APPENDS         = 'e'
+GET             = 'g'
+BINGET          = 'h'
+INST            = 'i'
+LONG_BINGET     = 'j'
+LIST            = 'l'
+EMPTY_LIST      = ']'
+OBJ             = 'o'
+PUT             = 'p'
+BINPUT          = 'q'
+LONG_BINPUT     = 'r'
+SETITEM         = 's'
+TUPLE           = 't'
+EMPTY_TUPLE     = ')'
+SETITEMS        = 'u'
+BINFLOAT        = 'G'
+TRUE            = 'I01\n'
+FALSE           = 'I00\n'
+
+# protocol 2
+PROTO           = '\x80'
+NEWOBJ          = '\x81'
+EXT1            = '\x82'
+EXT2            = '\x83'
+EXT4            = '\x84'
+TUPLE1          = '\x85'
+TUPLE2          = '\x86'
+TUPLE3          = '\x87'
+NEWTRUE         = '\x88'
+NEWFALSE        = '\x89'
+LONG1           = '\x8a'
+LONG4           = '\x8b'
+
+TUPLESIZE2CODE = [EMPTY_TUPLE, TUPLE1, TUPLE2, TUPLE3]
+
+
+class State(object):
+    """The app-level objects that are shared with pickle.py and copy_reg,
+    imported the first time that they are needed."""
+
+    def __init__(self, space):
+        self.w_PicklingError = None
+
+    def init(self, space):
+        w_builtins = space.getbuiltinmodule('__builtin__')
+        w_copy_reg = space.call_method(
+            w_builtins, '__import__', space.newtext("copy_reg"))
+        self.w_dispatch_table = space.getattr(
+            w_copy_reg, space.newtext("dispatch_table"))
+        self.w_extension_registry = space.getattr(
+            w_copy_reg, space.newtext("_extension_registry"))
+        self.w_inverted_registry = space.getattr(
+            w_copy_reg, space.newtext("_inverted_registry"))
+        self.w_extension_cache = space.getattr(
+            w_copy_reg, space.newtext("_extension_cache"))
+
+        w_types = space.call_method(
+            w_builtins, '__import__', space.newtext("types"))
+        self.w_InstanceType = space.getattr(
+            w_types, space.newtext("InstanceType"))
+        self.w_ClassType = space.getattr(w_types, space.newtext("ClassType"))
+        self.w_FunctionType = space.getattr(
+            w_types, space.newtext("FunctionType"))
+        self.w_BuiltinFunctionType = space.getattr(
+            w_types, space.newtext("BuiltinFunctionType"))
+        self.w_ModuleType = space.getattr(w_types, space.newtext("ModuleType"))
+
+        w_pickle = space.call_method(
+            w_builtins, '__import__', space.newtext("pickle"))
+        self.w_UnpicklingError = space.getattr(
+            w_pickle, space.newtext("UnpicklingError"))
+        self.w_whichmodule = space.getattr(
+            w_pickle, space.newtext("whichmodule"))
+        # last, because it tells that init() was called
+        self.w_PicklingError = space.getattr(
+            w_pickle, space.newtext("PicklingError"))
+
+def get_state(space):
+    state = space.fromcache(State)
+    if state.w_PicklingError is None:
+        state.init(space)
+    return state
+
+
+def find_global(space, w_module, w_name):
+    """Returns getattr(sys.modules[module], name) after importing module."""
+    w_builtins = space.getbuiltinmodule('__builtin__')
+    space.call_method(w_builtins, '__import__', w_module)
+    w_modules = space.sys.get('modules')
+    w_mod = space.getitem(w_modules, w_module)
+    return space.getattr(w_mod, w_name)
+
+def encode_long(bigint):
+    """Returns the minimal two's complement little-endian representation of
+    a long, which is empty for 0."""
+    if not bigint.tobool():
+        return ''
+    nbytes = (bigint.bit_length() >> 3) + 1
+    data = bigint.tobytes(nbytes, 'little', True)
+    # a negative long may have one redundant sign byte
+    if (bigint.get_sign() < 0 and nbytes > 1 and
+            ord(data[nbytes - 1]) == 0xff and
+            ord(data[nbytes - 2]) & 0x80 != 0):
+        end = nbytes - 1
+        assert end >= 0
+        data = data[:end]
+    return data
+
+def append_int32(builder, x):
+    builder.append(chr(x & 0xff))
+    builder.append(chr((x >> 8) & 0xff))
+    builder.append(chr((x >> 16) & 0xff))
+    builder.append(chr((x >> 24) & 0xff))
+
+def append_raw_unicode_escaped(builder, utf8):
+    """Like utf8.encode('raw-unicode-escape'), but also escapes the
+    backslash and the newline, which protocol 0 cannot store."""
+    HEX = '0123456789abcdef'
+    pos = 0
+    while pos < len(utf8):
+        ch = rutf8.codepoint_at_pos(utf8, pos)
+        pos = rutf8.next_codepoint_pos(utf8, pos)
+        if ch == ord('\\') or ch == ord('\n') or ch >= 0x100:
+            if ch >= 0x10000:
+                builder.append('\\U')
+                digits = 8
+            else:
+                builder.append('\\u')
+                digits = 4
+            for i in range(digits - 1, -1, -1):
+                builder.append(HEX[(ch >> (4 * i)) & 0xf])
+        else:
+            builder.append(chr(ch))
+
+
+def check_protocol(space, proto):
+    if proto < 0:
+        return HIGHEST_PROTOCOL
+    if proto > HIGHEST_PROTOCOL:
+        raise oefmt(space.w_ValueError,
+                    "pickle protocol %d asked for; the highest available "
+                    "protocol is %d", proto, HIGHEST_PROTOCOL)
+    return proto
+
+
+class W_Pickler(W_Root):
+    def __init__(self, space, w_file, proto):
+        self.space = space
+        self.state = get_state(space)
+        # None for the list-based picklers, whose output is returned by
+        # getvalue()
+        self.w_write = None
+        if w_file is not None:
+            self.w_write = space.getattr(w_file, space.newtext('write'))
+        self.proto = proto
+        self.bin = proto >= 1
+        self.fast = 0
+        # {object: index}, using the identity of the objects
+        self.memo = {}
+        self.w_persistent_id = None
+        # the persistent_id() used by the current dump(), which can also be
+        # a method of a subclass
+        self.w_pid_func = None
+        self.builder = StringBuilder()
+
+    def write(self, s):
+        self.builder.append(s)
+
+    def flush(self):
+        if self.w_write is not None:
+            data = self.builder.build()
+            self.builder = StringBuilder()
+            self.space.call_function(self.w_write, self.space.newbytes(data))
+
+    def maybe_flush(self):
+        if (self.w_write is not None and
+                self.builder.getlength() > WRITE_BUFFER_SIZE):
+            self.flush()
+
+    def pickling_error(self, msg):
+        return OperationError(self.state.w_PicklingError,
+                              self.space.newtext(msg))
+
+    # ____________________________________________________________
+    # memo
+
+    def memoize(self, w_obj):
+        if self.fast:
+            return
+        # cPickle starts counting at one
+        index = len(self.memo) + 1
+        self.write_put(index)
+        self.memo[w_obj] = index
+
+    def write_put(self, index):
+        if self.bin:
+            if index < 256:
+                self.write(BINPUT)
+                self.write(chr(index))
+            else:
+                self.write(LONG_BINPUT)
+                append_int32(self.builder, index)
+        else:
+            self.write(PUT)
+            self.write(str(index))
+            self.write('\n')
+
+    def write_get(self, index):
+        if self.bin:
+            if index < 256:
+                self.write(BINGET)
+                self.write(chr(index))
+            else:
+                self.write(LONG_BINGET)
+                append_int32(self.builder, index)
+        else:
+            self.write(GET)
+            self.write(str(index))
+            self.write('\n')
+
+    # ____________________________________________________________
+    # dispatch
+
+    def dump(self, w_obj):
+        space = self.space
+        if self.w_write is not None:
+            self.builder = StringBuilder()
+        w_pid_func = space.findattr(self, space.newtext('persistent_id'))
+        if w_pid_func is not None and space.is_w(w_pid_func, space.w_None):
+            w_pid_func = None
+        self.w_pid_func = w_pid_func
+        if self.proto >= 2:
+            self.write(PROTO)
+            self.write(chr(self.proto))
+        self.save(w_obj)
+        self.write(STOP)
+        self.flush()
+
+    def save(self, w_obj):
+        space = self.space
+        if self.w_pid_func is not None:
+            w_pid = space.call_function(self.w_pid_func, w_obj)
+            if not space.is_w(w_pid, space.w_None):
+                self.save_pers(w_pid)
+                return
+
+        index = self.memo.get(w_obj, -1)
+        if index >= 0:
+            self.write_get(index)
+            return
+
+        state = self.state
+        w_type = space.type(w_obj)
+        if space.is_w(w_obj, space.w_None):
+            self.write(NONE)
+        elif space.is_w(w_type, space.w_bool):
+            self.save_bool(space.is_true(w_obj))
+        elif space.is_w(w_type, space.w_int):
+            self.save_int(space.int_w(w_obj))
+        elif space.is_w(w_type, space.w_long):
+            self.save_long(w_obj)
+        elif space.is_w(w_type, space.w_float):
+            self.save_float(w_obj)
+        elif space.is_w(w_type, space.w_bytes):
+            self.save_string(w_obj)
+        elif space.is_w(w_type, space.w_unicode):
+            self.save_unicode(w_obj)
+        elif space.is_w(w_type, space.w_tuple):
+            self.save_tuple(w_obj)
+        elif space.is_w(w_type, space.w_list):
+            self.save_list(w_obj)
+        elif space.is_w(w_type, space.w_dict):
+            self.save_dict(w_obj)
+        elif space.is_w(w_type, state.w_InstanceType):
+            self.save_inst(w_obj)
+        elif space.is_w(w_type, state.w_FunctionType):
+            self.save_function(w_obj)
+        elif (space.is_w(w_type, space.w_type) or
+                space.is_w(w_type, state.w_ClassType) or
+                space.is_w(w_type, state.w_BuiltinFunctionType)):
+            self.save_global(w_obj, None)
+        else:
+            self.save_reduced(w_obj, w_type)
+
+    def save_reduced(self, w_obj, w_type):
+        space = self.space
+        w_reduce = space.finditem(self.state.w_dispatch_table, w_type)
+        if w_reduce is not None:
+            w_rv = space.call_function(w_reduce, w_obj)
+        else:
+            # a class with a custom metaclass is saved as a regular class
+            if space.issubtype_w(w_type, space.w_type):
+                self.save_global(w_obj, None)
+                return
+            w_reduce = space.findattr(w_obj, space.newtext('__reduce_ex__'))
+            if w_reduce is not None:
+                w_rv = space.call_function(w_reduce, space.newint(self.proto))
+            else:
+                w_reduce = space.findattr(w_obj, space.newtext('__reduce__'))
+                if w_reduce is None:
+                    raise oefmt(self.state.w_PicklingError,
+                                "Can't pickle %R object: %R",
+                                space.getattr(w_type,
+                                              space.newtext('__name__')),
+                                w_obj)
+                w_rv = space.call_function(w_reduce)
+        self.save_reduce_value(w_obj, w_reduce, w_rv)
+
+    def save_reduce_value(self, w_obj, w_reduce, w_rv):
+        """Saves the result of reduce(), which is either the name of a global
+        or a tuple with two to five items."""
+        space = self.space
+        w_rv_type = space.type(w_rv)
+        if space.is_w(w_rv_type, space.w_bytes):
+            self.save_global(w_obj, w_rv)
+            return
+        if not space.is_w(w_rv_type, space.w_tuple):
+            raise oefmt(self.state.w_PicklingError,
+                        "%R must return string or tuple", w_reduce)
+        items_w = space.fixedview(w_rv)
+        if not 2 <= len(items_w) <= 5:
+            raise oefmt(self.state.w_PicklingError,
+                        "Tuple returned by %R must have two to five elements",
+                        w_reduce)
+        w_state = w_listitems = w_dictitems = None
+        if len(items_w) > 2 and not space.is_w(items_w[2], space.w_None):
+            w_state = items_w[2]
+        if len(items_w) > 3 and not space.is_w(items_w[3], space.w_None):
+            w_listitems = items_w[3]
+        if len(items_w) > 4 and not space.is_w(items_w[4], space.w_None):
+            w_dictitems = items_w[4]
+        self.save_reduce(items_w[0], items_w[1], w_state, w_listitems,
+                         w_dictitems, w_obj)
+
+    def save_reduce(self, w_func, w_args, w_state, w_listitems, w_dictitems,
+                    w_obj):
+        space = self.space
+        if not space.isinstance_w(w_args, space.w_tuple):
+            raise self.pickling_error("args from reduce() should be a tuple")
+        if space.findattr(w_func, space.newtext('__call__')) is None:
+            raise self.pickling_error("func from reduce should be callable")
+
+        if self.proto >= 2 and self.is_newobj(w_func):
+            args_w = space.fixedview(w_args)
+            if not args_w:
+                raise self.pickling_error("__newobj__ arglist is empty")
+            w_cls = args_w[0]
+            if space.findattr(w_cls, space.newtext('__new__')) is None:
+                raise self.pickling_error(
+                    "args[0] from __newobj__ args has no __new__")
+            if w_obj is not None and not space.is_w(
+                    w_cls, space.getattr(w_obj, space.newtext('__class__'))):
+                raise self.pickling_error(
+                    "args[0] from __newobj__ args has the wrong class")
+            self.save(w_cls)
+            self.save(space.newtuple(args_w[1:]))
+            self.write(NEWOBJ)
+        else:
+            self.save(w_func)
+            self.save(w_args)
+            self.write(REDUCE)
+
+        if w_obj is not None:
+            # if the object is in the memo already, it is recursive: throw
+            # away what was built and fetch the object from the memo
+            index = self.memo.get(w_obj, -1)
+            if index >= 0:
+                self.write(POP)
+                self.write_get(index)
+            else:
+                self.memoize(w_obj)
+
+        if w_listitems is not None:
+            self.batch_appends(w_listitems)
+        if w_dictitems is not None:
+            self.batch_setitems(w_dictitems)
+        if w_state is not None:
+            self.save(w_state)
+            self.write(BUILD)
+
+    def is_newobj(self, w_func):
+        space = self.space
+        w_name = space.findattr(w_func, space.newtext('__name__'))
+        return (w_name is not None and
+                space.eq_w(w_name, space.newtext('__newobj__')))
+
+    def save_pers(self, w_pid):
+        if self.bin:
+            self.save(w_pid)
+            self.write(BINPERSID)
+        else:
+            self.write(PERSID)
+            self.write(self.space.text_w(self.space.str(w_pid)))
+            self.write('\n')
+
+    # ____________________________________________________________
+    # the built-in types
+
+    def save_bool(self, value):
+        if self.proto >= 2:
+            self.write(NEWTRUE if value else NEWFALSE)
+        else:
+            self.write(TRUE if value else FALSE)
+
+    def save_int(self, value):
+        if self.bin:
+            if value >= 0:
+                if value <= 0xff:
+                    self.write(BININT1)
+                    self.write(chr(value))
+                    return
+                if value <= 0xffff:
+                    self.write(BININT2)
+                    self.write(chr(value & 0xff))
+                    self.write(chr(value >> 8))
+                    return
+            high_bits = value >> 31
+            if high_bits == 0 or high_bits == -1:
+                self.write(BININT)
+                append_int32(self.builder, value)
+                return
+        # text pickle, or an int that does not fit in 4 bytes
+        self.write(INT)
+        self.write(str(value))
+        self.write('\n')
+
+    def save_long(self, w_obj):
+        space = self.space
+        if self.proto >= 2:
+            data = encode_long(space.bigint_w(w_obj))
+            n = len(data)
+            if n < 256:
+                self.write(LONG1)
+                self.write(chr(n))
+            else:
+                self.write(LONG4)
+                append_int32(self.builder, n)
+            self.write(data)
+            return
+        self.write(LONG)
+        self.write(space.text_w(space.repr(w_obj)))
+        self.write('\n')
+
+    def save_float(self, w_obj):
+        space = self.space
+        if self.bin:
+            self.write(BINFLOAT)
+            value = longlongmask(float_pack(space.float_w(w_obj), 8))
+            for i in range(7, -1, -1):
+                self.write(chr((value >> (i * 8)) & 0xff))
+        else:
+            self.write(FLOAT)
+            self.write(space.text_w(space.repr(w_obj)))
+            self.write('\n')
+
+    def save_string(self, w_obj):
+        space = self.space
+        if self.bin:
+            s = space.bytes_w(w_obj)
+            n = len(s)
+            if n < 256:
+                self.write(SHORT_BINSTRING)
+                self.write(chr(n))
+            else:
+                self.write(BINSTRING)
+                append_int32(self.builder, n)
+            self.write(s)
+        else:
+            self.write(STRING)
+            self.write(space.bytes_w(space.repr(w_obj)))
+            self.write('\n')
+        self.memoize(w_obj)
+
+    def save_unicode(self, w_obj):
+        utf8 = self.space.utf8_w(w_obj)
+        if self.bin:
+            self.write(BINUNICODE)
+            append_int32(self.builder, len(utf8))
+            self.write(utf8)
+        else:
+            self.write(UNICODE)
+            append_raw_unicode_escaped(self.builder, utf8)
+            self.write('\n')
+        self.memoize(w_obj)
+
+    def save_tuple(self, w_obj):
+        space = self.space
+        items_w = space.fixedview(w_obj)
+        n = len(items_w)
+        if n == 0:
+            if self.proto:
+                self.write(EMPTY_TUPLE)
+            else:
+                self.write(MARK)
+                self.write(TUPLE)
+            return
+
+        if n <= 3 and self.proto >= 2:
+            for w_item in items_w:
+                self.save(w_item)
+            # see the comment below
+            index = self.memo.get(w_obj, -1)
+            if index >= 0:
+                for i in range(n):
+                    self.write(POP)
+                self.write_get(index)
+            else:
+                self.write(TUPLESIZE2CODE[n])
+                self.memoize(w_obj)
+            return
+
+        self.write(MARK)
+        for w_item in items_w:
+            self.save(w_item)
+
+        index = self.memo.get(w_obj, -1)
+        if index >= 0:
+            # the tuple was not in the memo before its items were saved, so
+            # it is recursive: throw away the items and fetch the tuple,
+            # which is already built, from the memo
+            if self.proto:
+                self.write(POP_MARK)
+            else:
+                for i in range(n + 1):
+                    self.write(POP)
+            self.write_get(index)
+            return
+        self.write(TUPLE)
+        self.memoize(w_obj)
+
+    def save_list(self, w_obj):
+        if self.bin:
+            self.write(EMPTY_LIST)
+        else:
+            self.write(MARK)
+            self.write(LIST)
+        self.memoize(w_obj)
+        intlist = None
+        if self.w_pid_func is None:
+            intlist = self.space.listview_int(w_obj)
+        if intlist is not None:
+            self.save_int_list_items(intlist)
+        else:
+            self.save_list_items(self.space.fixedview(w_obj)[:])
+
+    def save_int_list_items(self, intlist):
+        # the items of a list with the int strategy are written unboxed
+        i = 0
+        while i < len(intlist):
+            n = min(len(intlist) - i, BATCHSIZE)
+            if self.bin and n > 1:
+                self.write(MARK)
+            for j in range(i, i + n):
+                self.save_int(intlist[j])
+                if not self.bin:
+                    self.write(APPEND)
+            if self.bin:
+                self.write(APPENDS if n > 1 else APPEND)
+            i += n
+            self.maybe_flush()
+
+    def save_list_items(self, items_w):
+        i = 0
+        while i < len(items_w):
+            n = min(len(items_w) - i, BATCHSIZE)
+            if self.bin and n > 1:
+                self.write(MARK)
+            for j in range(i, i + n):
+                self.save(items_w[j])
+                if not self.bin:
+                    self.write(APPEND)
+            if self.bin:
+                self.write(APPENDS if n > 1 else APPEND)
+            i += n
+            self.maybe_flush()
+
+    def batch_appends(self, w_iter):
+        """Saves the items of an iterator returned by __reduce__()."""
+        space = self.space
+        while True:
+            items_w = []
+            while len(items_w) < BATCHSIZE:
+                try:
+                    w_item = space.next(w_iter)
+                except OperationError as e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    break
+                items_w.append(w_item)
+            if not items_w:
+                break
+            self.save_list_items(items_w)
+            if len(items_w) < BATCHSIZE:
+                break
+
+    def save_dict(self, w_obj):
+        space = self.space
+        if space.finditem_str(w_obj, '__name__') is not None:
+            # a module dictionary is saved as getattr(module, '__dict__')
+            w_module = self.get_module_of_dict(w_obj)
+            if w_module is not None:
+                w_args = space.newtuple2(w_module, space.newtext('__dict__'))
+                w_getattr = space.getattr(
+                    space.getbuiltinmodule('__builtin__'),
+                    space.newtext('getattr'))
+                self.save_reduce(w_getattr, w_args, None, None, None, w_obj)
+                return
+        if self.bin:
+            self.write(EMPTY_DICT)
+        else:
+            self.write(MARK)
+            self.write(DICT)
+        self.memoize(w_obj)
+        assert isinstance(w_obj, W_DictMultiObject)
+        iteritems = w_obj.iteritems()
+        while True:
+            keys_w = []
+            values_w = []
+            while len(keys_w) < BATCHSIZE:
+                w_key, w_value = iteritems.next_item()
+                if w_key is None:
+                    break
+                keys_w.append(w_key)
+                values_w.append(w_value)
+            if not keys_w:
+                break
+            self.save_dict_items(keys_w, values_w)
+            if len(keys_w) < BATCHSIZE:
+                break
+
+    def get_module_of_dict(self, w_dict):
+        """Returns the module whose __dict__ is 'w_dict', or None."""
+        space = self.space
+        w_name = space.finditem_str(w_dict, '__name__')
+        if w_name is None or not space.is_w(space.type(w_name),
+                                            space.w_bytes):
+            return None
+        w_module = space.finditem(space.sys.get('modules'), w_name)
+        if w_module is None or not space.is_w(space.type(w_module),
+                                              self.state.w_ModuleType):
+            return None
+        w_module_dict = space.findattr(w_module, space.newtext('__dict__'))
+        if w_module_dict is None or not space.is_w(w_module_dict, w_dict):
+            return None
+        return w_module
+
+    def save_dict_items(self, keys_w, values_w):
+        n = len(keys_w)
+        if self.bin and n > 1:
+            self.write(MARK)
+        for i in range(n):
+            self.save(keys_w[i])
+            self.save(values_w[i])
+            if not self.bin:
+                self.write(SETITEM)
+        if self.bin:
+            self.write(SETITEMS if n > 1 else SETITEM)
+        self.maybe_flush()
+
+    def batch_setitems(self, w_iter):
+        """Saves the (key, value) pairs of an iterator returned by
+        __reduce__()."""
+        space = self.space
+        while True:
+            keys_w = []
+            values_w = []
+            while len(keys_w) < BATCHSIZE:
+                try:
+                    w_item = space.next(w_iter)
+                except OperationError as e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    break
+                w_key, w_value = space.fixedview(w_item, 2)
+                keys_w.append(w_key)
+                values_w.append(w_value)
+            if not keys_w:
+                break
+            self.save_dict_items(keys_w, values_w)
+            if len(keys_w) < BATCHSIZE:
+                break
+
+    # ____________________________________________________________
+    # instances of old-style classes, functions and classes
+
+    def save_inst(self, w_obj):
+        space = self.space
+        w_cls = space.getattr(w_obj, space.newtext('__class__'))
+        w_getinitargs = space.findattr(w_obj,
+                                       space.newtext('__getinitargs__'))
+        if w_getinitargs is not None:
+            args_w = space.listview(space.call_function(w_getinitargs))
+        else:
+            args_w = []
+
+        self.write(MARK)
+        if self.bin:
+            self.save(w_cls)
+            for w_arg in args_w:
+                self.save(w_arg)
+            self.write(OBJ)
+        else:
+            for w_arg in args_w:
+                self.save(w_arg)
+            self.write(INST)
+            self.write(space.text_w(
+                space.getattr(w_cls, space.newtext('__module__'))))
+            self.write('\n')
+            self.write(space.text_w(
+                space.getattr(w_cls, space.newtext('__name__'))))
+            self.write('\n')
+        self.memoize(w_obj)
+
+        w_getstate = space.findattr(w_obj, space.newtext('__getstate__'))
+        if w_getstate is not None:
+            w_stuff = space.call_function(w_getstate)
+        else:
+            w_stuff = space.getattr(w_obj, space.newtext('__dict__'))
+        self.save(w_stuff)
+        self.write(BUILD)
+
+    def save_function(self, w_obj):
+        space = self.space
+        try:
+            self.save_global(w_obj, None)
+            return
+        except OperationError as e:
+            if not e.match(space, self.state.w_PicklingError):
+                raise
+            operr = e
+        w_reduce = space.finditem(self.state.w_dispatch_table,
+                                  space.type(w_obj))
+        if w_reduce is not None:
+            w_rv = space.call_function(w_reduce, w_obj)
+        else:
+            w_reduce = space.findattr(w_obj, space.newtext('__reduce_ex__'))
+            if w_reduce is not None:
+                w_rv = space.call_function(w_reduce, space.newint(self.proto))
+            else:
+                w_reduce = space.findattr(w_obj, space.newtext('__reduce__'))
+                if w_reduce is None:
+                    raise operr
+                w_rv = space.call_function(w_reduce)
+        self.save_reduce_value(w_obj, w_reduce, w_rv)
+
+    def save_global(self, w_obj, w_name):
+        space = self.space
+        state = self.state
+        if w_name is None:
+            w_name = space.getattr(w_obj, space.newtext('__name__'))
+        w_module = space.findattr(w_obj, space.newtext('__module__'))
+        if w_module is None or space.is_w(w_module, space.w_None):
+            w_module = space.call_function(state.w_whichmodule, w_obj, w_name)
+
+        try:
+            w_klass = find_global(space, w_module, w_name)
+        except OperationError as e:
+            if not (e.match(space, space.w_ImportError) or
+                    e.match(space, space.w_KeyError) or
+                    e.match(space, space.w_AttributeError)):
+                raise
+            raise oefmt(state.w_PicklingError,
+                        "Can't pickle %R: it's not found as %s.%s",
+                        w_obj, space.text_w(w_module), space.text_w(w_name))
+        if not space.is_w(w_klass, w_obj):
+            raise oefmt(state.w_PicklingError,
+                        "Can't pickle %R: it's not the same object as %s.%s",
+                        w_obj, space.text_w(w_module), space.text_w(w_name))
+
+        if self.proto >= 2:
+            w_code = space.finditem(state.w_extension_registry,
+                                    space.newtuple2(w_module, w_name))
+            if w_code is not None and space.is_true(w_code):
+                code = space.int_w(w_code)
+                if code <= 0xff:
+                    self.write(EXT1)
+                    self.write(chr(code))
+                elif code <= 0xffff:
+                    self.write(EXT2)
+                    self.write(chr(code & 0xff))
+                    self.write(chr(code >> 8))
+                else:
+                    self.write(EXT4)
+                    append_int32(self.builder, code)
+                return
+
+        self.write(GLOBAL)
+        self.write(space.text_w(w_module))
+        self.write('\n')
+        self.write(space.text_w(w_name))
+        self.write('\n')
+        self.memoize(w_obj)
+
+    # ____________________________________________________________
+    # app-level interface
+
+    def descr_dump(self, space, w_obj):
+        """dump(obj) -- Write a pickle of the object to the file."""
+        self.dump(w_obj)
+        return self
+
+    def descr_clear_memo(self, space):
+        """clear_memo() -- Clear the memo of the pickler."""
+        self.memo.clear()
+
+    @unwrap_spec(clear=int)
+    def descr_getvalue(self, space, clear=1):
+        """getvalue() -- Return the data written by a list-based pickler."""
+        if self.w_write is not None:
+            return space.w_None
+        data = self.builder.build()
+        if clear:
+            self.builder = StringBuilder()
+        return space.newbytes(data)
+
+    def get_w_memo(self):
+        # the same format as the memo of pickle.py: {id(obj): (index, obj)}
+        space = self.space
+        w_memo = space.newdict()
+        for w_obj, index in self.memo.iteritems():
+            space.setitem(w_memo, space.id(w_obj),
+                          space.newtuple2(space.newint(index), w_obj))
+        return w_memo
+
+    def descr_get_memo(self, space):
+        return W_PicklerMemoProxy(self)
+
+    def descr_set_memo(self, space, w_memo):
+        if isinstance(w_memo, W_PicklerMemoProxy):
+            w_memo = w_memo.pickler.get_w_memo()
+        if not space.isinstance_w(w_memo, space.w_dict):
+            raise oefmt(space.w_TypeError, "memo must be a dictionary")
+        memo = {}
+        for w_value in space.listview(space.call_method(w_memo, 'values')):
+            w_index, w_obj = space.fixedview(w_value, 2)
+            memo[w_obj] = space.int_w(w_index)
+        self.memo = memo
+
+    def descr_get_persistent_id(self, space):
+        if self.w_persistent_id is None:
+            raise oefmt(space.w_AttributeError, "persistent_id")
+        return self.w_persistent_id
+
+    def descr_set_persistent_id(self, space, w_value):
+        self.w_persistent_id = w_value
+
+    def descr_get_fast(self, space):
+        return space.newint(self.fast)
+
+    def descr_set_fast(self, space, w_value):
+        self.fast = space.int_w(w_value)
+
+    def descr_get_binary(self, space):
+        return space.newbool(self.bin)
+
+    def descr_set_binary(self, space, w_value):
+        self.bin = space.is_true(w_value)
+
+
+class W_PicklerMemoProxy(W_Root):
+    """The 'memo' attribute of a Pickler.  The memo itself is an RPython
+    dict: reading it through the proxy builds a dict in the format of
+    pickle.py, but clear() empties the memo of the pickler.  The proxy
+    cannot be modified in another way."""
+
+    def __init__(self, pickler):
+        self.pickler = pickler
+
+    def descr_clear(self, space):
+        """clear() -- Clear the memo of the pickler."""
+        self.pickler.memo.clear()
+
+    def descr_copy(self, space):
+        """copy() -- Return a dict copy of the memo."""
+        return self.pickler.get_w_memo()
+
+    def descr_len(self, space):
+        return space.newint(len(self.pickler.memo))
+
+    def descr_getitem(self, space, w_key):
+        return space.getitem(self.pickler.get_w_memo(), w_key)
+
+    def descr_contains(self, space, w_key):
+        return space.contains(self.pickler.get_w_memo(), w_key)
+
+    def descr_iter(self, space):
+        return space.iter(self.pickler.get_w_memo())
+
+    def descr_eq(self, space, w_other):
+        return space.eq(self.pickler.get_w_memo(), w_other)
+
+    def descr_ne(self, space, w_other):
+        return space.ne(self.pickler.get_w_memo(), w_other)
+
+    def descr_get(self, space, w_key, w_default=None):
+        return space.call_method(self.pickler.get_w_memo(), 'get', w_key,
+                                 w_default or space.w_None)
+
+    def descr_keys(self, space):
+        return space.call_method(self.pickler.get_w_memo(), 'keys')
+
+    def descr_values(self, space):
+        return space.call_method(self.pickler.get_w_memo(), 'values')
+
+    def descr_items(self, space):
+        return space.call_method(self.pickler.get_w_memo(), 'items')
+
+W_PicklerMemoProxy.typedef = TypeDef("cPickle.PicklerMemoProxy",
+    __len__ = interp2app(W_PicklerMemoProxy.descr_len),
+    __getitem__ = interp2app(W_PicklerMemoProxy.descr_getitem),
+    __contains__ = interp2app(W_PicklerMemoProxy.descr_contains),
+    __iter__ = interp2app(W_PicklerMemoProxy.descr_iter),
+    __eq__ = interp2app(W_PicklerMemoProxy.descr_eq),
+    __ne__ = interp2app(W_PicklerMemoProxy.descr_ne),
+    clear = interp2app(W_PicklerMemoProxy.descr_clear),
+    copy = interp2app(W_PicklerMemoProxy.descr_copy),
+    get = interp2app(W_PicklerMemoProxy.descr_get),
+    keys = interp2app(W_PicklerMemoProxy.descr_keys),
+    values = interp2app(W_PicklerMemoProxy.descr_values),
+    items = interp2app(W_PicklerMemoProxy.descr_items),
+)
+W_PicklerMemoProxy.typedef.acceptable_as_base_class = False
+
+
+def descr__new__(space, w_subtype, w_file=None, w_protocol=None):
+    if w_protocol is None and (w_file is None or
+                               space.isinstance_w(w_file, space.w_int)):
+        # Pickler() and Pickler(protocol) make a list-based pickler
+        w_protocol = w_file
+        w_file = None
+    proto = 0
+    if w_protocol is not None and not space.is_w(w_protocol, space.w_None):
+        proto = check_protocol(space, space.int_w(w_protocol))
+    w_self = space.allocate_instance(W_Pickler, w_subtype)
+    W_Pickler.__init__(space.interp_w(W_Pickler, w_self), space, w_file,
+                       proto)
+    return w_self
+
+W_Pickler.typedef = TypeDef("cPickle.Pickler",
+    __doc__ = """Pickler(file, protocol=0) -- Create a pickler.
+
+This takes a file-like object for writing a pickle data stream.
+The optional protocol argument tells the pickler to use the given
+protocol; supported protocols are 0, 1, 2.  A negative protocol selects
+the highest protocol.  Pickler() and Pickler(protocol) create a pickler
+whose output is returned by getvalue().""",
+    __new__ = interp2app(descr__new__),
+    dump = interp2app(W_Pickler.descr_dump),
+    clear_memo = interp2app(W_Pickler.descr_clear_memo),
+    getvalue = interp2app(W_Pickler.descr_getvalue),
+    memo = GetSetProperty(W_Pickler.descr_get_memo, W_Pickler.descr_set_memo),
+    persistent_id = GetSetProperty(W_Pickler.descr_get_persistent_id,
+                                   W_Pickler.descr_set_persistent_id),
+    fast = GetSetProperty(W_Pickler.descr_get_fast, W_Pickler.descr_set_fast),
+    binary = GetSetProperty(W_Pickler.descr_get_binary,
+                            W_Pickler.descr_set_binary),
+)
+
+
+def dumps(space, w_obj, w_protocol=None):
+    """dumps(obj, protocol=0) -- Return a string containing a pickle of
+    the object."""
+    proto = 0
+    if w_protocol is not None and not space.is_w(w_protocol, space.w_None):
+        proto = check_protocol(space, space.int_w(w_protocol))
+    pickler = W_Pickler(space, None, proto)
+    pickler.dump(w_obj)
+    return space.newbytes(pickler.builder.build())
@@ -0,0 +1,558 @@
+"""The Unpickler of cPickle, written at interp-level.
+
+It reads the opcodes of protocols 0 to 2 directly from the string given to
+loads(), or from a cStringIO object, or else through the read() and
+readline() methods of the file.  The marks are kept in a separate list of
+stack positions, and lists and dicts are built with space.newlist() and
+the dict strategies, so that their items end up unboxed when possible.
+"""
+
+from rpython.rlib.rarithmetic import intmask
+from rpython.rlib.rbigint import rbigint
+from rpython.rlib.rstruct.ieee import unpack_float
+
+from pypy.interpreter import unicodehelper
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import interp2app
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+from pypy.module._cpickle import interp_pickler as op
+from pypy.module._cpickle.interp_pickler import (
+    HIGHEST_PROTOCOL, find_global, get_state)
+from pypy.module.cStringIO.interp_stringio import W_InputOutputType
+from pypy.objspace.std.dictmultiobject import W_DictMultiObject
+
+
+class W_Unpickler(W_Root):
+    def __init__(self, space, w_file, data):
+        self.space = space
+        self.state = get_state(space)
+        # exactly one of 'data', 'stringio' and 'w_read' is not None
+        self.data = data
+        self.pos = 0
+        self.stringio = None
+        self.w_read = None
+        self.w_readline = None
+        if isinstance(w_file, W_InputOutputType):
+            self.stringio = w_file
+        elif w_file is not None:
+            self.w_read = space.getattr(w_file, space.newtext('read'))
+            self.w_readline = space.getattr(w_file,
+                                            space.newtext('readline'))
+        # {index: object}
+        self.memo = {}
+        self.w_persistent_load = None
+        self.w_find_global = None
+        # the persistent_load() and find_global() used by the current
+        # load(), which can also be methods of a subclass
+        self.w_pload_func = None
+        self.w_find_func = None
+        self.stack_w = []
+        # the positions in the stack of the marks
+        self.marks = []
+
+    def unpickling_error(self, msg):
+        return OperationError(self.state.w_UnpicklingError,
+                              self.space.newtext(msg))
+
+    # ____________________________________________________________
+    # input
+
+    def read(self, n):
+        """Returns the next 'n' bytes, or raises EOFError."""
+        if self.data is not None:
+            start = self.pos
+            if n > len(self.data) - start:
+                raise OperationError(self.space.w_EOFError,
+                                     self.space.w_None)
+            self.pos = start + n
+            return self.data[start:start + n]
+        if self.stringio is not None:
+            self.stringio.check_closed()
+            s = self.stringio.read(n)
+        else:
+            w_s = self.space.call_function(self.w_read, self.space.newint(n))
+            s = self.space.bytes_w(w_s)
+        if len(s) < n:
+            raise OperationError(self.space.w_EOFError, self.space.w_None)
+        return s
+
+    def read_byte(self):
+        if self.data is not None:
+            pos = self.pos
+            if pos >= len(self.data):
+                raise OperationError(self.space.w_EOFError,
+                                     self.space.w_None)
+            self.pos = pos + 1
+            return ord(self.data[pos])
+        return ord(self.read(1)[0])
+
+    def read_int32(self):
+        s = self.read(4)
+        x = (ord(s[0]) | (ord(s[1]) << 8) | (ord(s[2]) << 16) |
+             (ord(s[3]) << 24))
+        # sign-extend
+        return intmask((x ^ 0x80000000) - 0x80000000)
+
+    def readline(self):
+        """Returns the next line without its final newline."""
+        if self.data is not None:
+            start = self.pos
+            end = self.data.find('\n', start)
+            if end < 0:
+                raise self.unpickling_error("pickle data was truncated")
+            self.pos = end + 1
+            return self.data[start:end]
+        if self.stringio is not None:
+            self.stringio.check_closed()
+            line = self.stringio.readline()
+        else:
+            line = self.space.bytes_w(
+                self.space.call_function(self.w_readline))
+        if not line or line[len(line) - 1] != '\n':
+            raise self.unpickling_error("pickle data was truncated")
+        end = len(line) - 1
+        assert end >= 0
+        return line[:end]
+
+    # ____________________________________________________________
+    # stack
+
+    def push(self, w_obj):
+        self.stack_w.append(w_obj)
+
+    def pop(self):
+        if len(self.stack_w) <= self.top_mark():
+            raise self.unpickling_error("unpickling stack underflow")
+        return self.stack_w.pop()
+
+    def top(self):
+        if len(self.stack_w) <= self.top_mark():
+            raise self.unpickling_error("unpickling stack underflow")
+        return self.stack_w[-1]
+
+    def top_mark(self):
+        if self.marks:
+            return self.marks[-1]
+        return 0
+
+    def pop_mark(self):
+        """Removes the topmost mark, and returns the objects above it."""
+        if not self.marks:
+            raise self.unpickling_error("could not find MARK")
+        k = self.marks.pop()
+        items_w = self.stack_w[k:]
+        del self.stack_w[k:]
+        return items_w
+
+    # ____________________________________________________________
+    # the main loop
+
+    def load(self):
+        space = self.space
+        self.w_pload_func = space.findattr(self,
+                                           space.newtext('persistent_load'))
+        self.w_find_func = space.findattr(self, space.newtext('find_global'))
+        self.stack_w = []
+        self.marks = []
+        while True:
+            key = chr(self.read_byte())
+            if key == op.STOP:
+                break
+            self.dispatch(key)
+        w_res = self.pop()
+        self.stack_w = []
+        return w_res
+
+    def dispatch(self, key):
+        space = self.space
+        if key == op.BINPUT:
+            self.memo[self.read_byte()] = self.top()
+        elif key == op.BINGET:
+            self.load_get(self.read_byte())
+        elif key == op.SHORT_BINSTRING:
+            self.push(space.newbytes(self.read(self.read_byte())))
+        elif key == op.BINUNICODE:
+            self.load_binunicode()
+        elif key == op.BININT1:
+            self.push(space.newint(self.read_byte()))
+        elif key == op.BININT2:
+            lo = self.read_byte()
+            self.push(space.newint(lo | (self.read_byte() << 8)))
+        elif key == op.BININT:
+            self.push(space.newint(self.read_int32()))
+        elif key == op.BINFLOAT:
+            self.push(space.newfloat(unpack_float(self.read(8), True)))
+        elif key == op.MARK:
+            self.marks.append(len(self.stack_w))
+        elif key == op.EMPTY_LIST:
+            self.push(space.newlist([]))
+        elif key == op.EMPTY_DICT:
+            self.push(space.newdict())
+        elif key == op.EMPTY_TUPLE:
+            self.push(space.newtuple([]))
+        elif key == op.APPEND:
+            w_value = self.pop()
+            self.append_items(self.top(), [w_value])
+        elif key == op.APPENDS:
+            items_w = self.pop_mark()
+            self.append_items(self.top(), items_w)
+        elif key == op.SETITEM:
+            w_value = self.pop()
+            w_key = self.pop()
+            self.set_items(self.top(), [w_key, w_value])
+        elif key == op.SETITEMS:
+            items_w = self.pop_mark()
+            self.set_items(self.top(), items_w)
+        elif key == op.TUPLE1:
+            w_a = self.pop()
+            self.push(space.newtuple([w_a]))
+        elif key == op.TUPLE2:
+            w_b = self.pop()
+            w_a = self.pop()
+            self.push(space.newtuple2(w_a, w_b))
+        elif key == op.TUPLE3:
+            w_c = self.pop()
+            w_b = self.pop()
+            w_a = self.pop()
+            self.push(space.newtuple([w_a, w_b, w_c]))
+        elif key == op.TUPLE:
+            self.push(space.newtuple(self.pop_mark()[:]))
+        elif key == op.LIST:
+            self.push(space.newlist(self.pop_mark()))
+        elif key == op.DICT:
+            w_dict = space.newdict()
+            self.set_items(w_dict, self.pop_mark())
+            self.push(w_dict)
+        elif key == op.NONE:
+            self.push(space.w_None)
+        elif key == op.NEWTRUE:
+            self.push(space.w_True)
+        elif key == op.NEWFALSE:
+            self.push(space.w_False)
+        elif key == op.LONG_BINPUT:
+            index = self.read_int32()
+            if index < 0:
+                raise oefmt(space.w_ValueError,
+                            "negative LONG_BINPUT argument")
+            self.memo[index] = self.top()
+        elif key == op.LONG_BINGET:
+            self.load_get(self.read_int32())
+        elif key == op.BINSTRING:
+            n = self.read_int32()
+            if n < 0:
+                raise self.unpickling_error(
+                    "BINSTRING pickle has negative byte count")
+            self.push(space.newbytes(self.read(n)))
+        elif key == op.LONG1:
+            self.load_long_bytes(self.read_byte())
+        elif key == op.LONG4:
+            n = self.read_int32()
+            if n < 0:
+                raise self.unpickling_error(
+                    "LONG pickle has negative byte count")
+            self.load_long_bytes(n)
+        elif key == op.GLOBAL:
+            module = self.readline()
+            name = self.readline()
+            self.push(self.find_class(space.newtext(module),
+                                      space.newtext(name)))
+        elif key == op.REDUCE:
+            w_args = self.pop()
+            w_func = self.pop()
+            self.push(space.call(w_func, w_args))
+        elif key == op.NEWOBJ:
+            self.load_newobj()
+        elif key == op.BUILD:
+            w_state = self.pop()
+            self.load_build(self.top(), w_state)
+        elif key == op.PROTO:
+            proto = self.read_byte()
+            if proto > HIGHEST_PROTOCOL:
+                raise oefmt(space.w_ValueError,
+                            "unsupported pickle protocol: %d", proto)
+        elif key == op.POP:
+            if self.marks and self.marks[-1] == len(self.stack_w):
+                self.marks.pop()
+            else:
+                self.pop()
+        elif key == op.POP_MARK:
+            self.pop_mark()
+        elif key == op.DUP:
+            self.push(self.top())
+        elif key == op.OBJ:
+            items_w = self.pop_mark()
+            if not items_w:
+                raise self.unpickling_error("unpickling stack underflow")
+            self.instantiate(items_w[0], items_w[1:])
+        elif key == op.INST:
+            module = self.readline()
+            name = self.readline()
+            w_klass = self.find_class(space.newtext(module),
+                                      space.newtext(name))
+            self.instantiate(w_klass, self.pop_mark())
+        elif key == op.EXT1:
+            self.load_extension(self.read_byte())
+        elif key == op.EXT2:
+            lo = self.read_byte()
+            self.load_extension(lo | (self.read_byte() << 8))
+        elif key == op.EXT4:
+            self.load_extension(self.read_int32())
+        elif key == op.PERSID:
+            self.load_persistent(space.newbytes(self.readline()))
+        elif key == op.BINPERSID:
+            self.load_persistent(self.pop())
+        elif key == op.PUT:
+            self.memo[self.parse_index(self.readline())] = self.top()
+        elif key == op.GET:
+            self.load_get(self.parse_index(self.readline()))
+        elif key == op.INT:
+            self.load_int(self.readline())
+        elif key == op.LONG:
+            self.push(space.call_function(space.w_long,
+                                          space.newbytes(self.readline()),
+                                          space.newint(0)))
+        elif key == op.FLOAT:
+            self.push(space.call_function(space.w_float,
+                                          space.newbytes(self.readline())))
+        elif key == op.STRING:
+            self.load_string(self.readline())
+        elif key == op.UNICODE:
+            utf8, length = unicodehelper.decode_raw_unicode_escape(
+                space, self.readline())
+            self.push(space.newutf8(utf8, length))
+        else:
+            raise oefmt(self.state.w_UnpicklingError,
+                        "invalid load key, '%s'.", key)
+
+    # ____________________________________________________________
+    # the opcodes that need more than a few lines
+
+    def parse_index(self, line):
+        space = self.space
+        return space.int_w(space.call_function(space.w_int,
+                                               space.newbytes(line)))
+
+    def load_get(self, index):
+        w_obj = self.memo.get(index, None)
+        if w_obj is None:
+            raise OperationError(self.space.w_KeyError,
+                                 self.space.newint(index))
+        self.push(w_obj)
+
+    def load_int(self, line):
+        space = self.space
+        if line == '00':
+            self.push(space.w_False)
+        elif line == '01':
+            self.push(space.w_True)
+        else:
+            self.push(space.call_function(space.w_int, space.newbytes(line)))
+
+    def load_long_bytes(self, n):
+        data = self.read(n)
+        self.push(self.space.newlong_from_rbigint(
+            rbigint.frombytes(data, 'little', True)))
+
+    def load_string(self, rep):
+        space = self.space
+        n = len(rep)
+        if n < 2 or rep[0] != rep[n - 1] or (rep[0] != "'" and
+                                              rep[0] != '"'):
+            raise oefmt(space.w_ValueError, "insecure string pickle")
+        end = n - 1
+        assert end >= 1
+        self.push(space.call_method(space.newbytes(rep[1:end]), 'decode',
+                                    space.newtext('string-escape')))
+
+    def load_binunicode(self):
+        n = self.read_int32()
+        if n < 0:
+            raise self.unpickling_error(
+                "BINUNICODE pickle has negative byte count")
+        s = self.read(n)
+        length = unicodehelper.check_utf8_or_raise(self.space, s)
+        self.push(self.space.newutf8(s, length))
+
+    def append_items(self, w_list, items_w):
+        space = self.space
+        if len(items_w) == 1:
+            space.call_method(w_list, 'append', items_w[0])
+        else:
+            space.call_method(w_list, 'extend', space.newlist(items_w))
+
+    def set_items(self, w_dict, items_w):
+        space = self.space
+        if len(items_w) & 1:
+            raise self.unpickling_error("odd number of items for SETITEMS")
+        if space.is_w(space.type(w_dict), space.w_dict):
+            assert isinstance(w_dict, W_DictMultiObject)
+            for i in range(0, len(items_w), 2):
+                w_dict.setitem(items_w[i], items_w[i + 1])
+        else:
+            for i in range(0, len(items_w), 2):
+                space.setitem(w_dict, items_w[i], items_w[i + 1])
+
+    def find_class(self, w_module, w_name):
+        space = self.space
+        if self.w_find_func is not None:
+            if space.is_w(self.w_find_func, space.w_None):
+                raise self.unpickling_error(
+                    "Global and instance pickles are not supported.")
+            return space.call_function(self.w_find_func, w_module, w_name)
+        return find_global(space, w_module, w_name)
+
+    def instantiate(self, w_klass, args_w):
+        space = self.space
+        if (not args_w and
+                space.is_w(space.type(w_klass), self.state.w_ClassType) and
+                space.findattr(w_klass,
+                               space.newtext('__getinitargs__')) is None):
+            # an instance of an old-style class, without calling __init__
+            self.push(space.call_function(self.state.w_InstanceType,
+                                          w_klass))
+            return
+        try:
+            w_value = space.call(w_klass, space.newtuple(args_w[:]))
+        except OperationError as e:
+            if not e.match(space, space.w_TypeError):
+                raise
+            w_name = space.getattr(w_klass, space.newtext('__name__'))
+            raise oefmt(space.w_TypeError, "in constructor for %s: %s",
+                        space.text_w(w_name),
+                        space.text_w(space.str(e.get_w_value(space))))
+        self.push(w_value)
+
+    def load_newobj(self):
+        space = self.space
+        w_args = self.pop()
+        w_cls = self.pop()
+        args_w = [w_cls] + space.fixedview(w_args)
+        w_new = space.getattr(w_cls, space.newtext('__new__'))
+        self.push(space.call(w_new, space.newtuple(args_w)))
+
+    def load_extension(self, code):
+        space = self.space
+        state = self.state
+        w_code = space.newint(code)
+        w_obj = space.finditem(state.w_extension_cache, w_code)
+        if w_obj is not None:
+            self.push(w_obj)
+            return
+        w_key = space.finditem(state.w_inverted_registry, w_code)
+        if w_key is None or not space.is_true(w_key):
+            raise oefmt(space.w_ValueError,
+                        "unregistered extension code %d", code)
+        w_module, w_name = space.fixedview(w_key, 2)
+        w_obj = self.find_class(w_module, w_name)
+        space.setitem(state.w_extension_cache, w_code, w_obj)
+        self.push(w_obj)
+
+    def load_persistent(self, w_pid):
+        if self.w_pload_func is None:
+            raise self.unpickling_error(
+                "A load persistent id instruction was encountered,\n"
+                "but no persistent_load function was specified.")
+        self.push(self.space.call_function(self.w_pload_func, w_pid))
+
+    def load_build(self, w_inst, w_state):
+        space = self.space
+        w_setstate = space.findattr(w_inst, space.newtext('__setstate__'))
+        if w_setstate is not None:
+            space.call_function(w_setstate, w_state)
+            return
+        w_slotstate = None
+        if (space.isinstance_w(w_state, space.w_tuple) and
+                space.len_w(w_state) == 2):
+            w_state, w_slotstate = space.fixedview(w_state, 2)
+        if space.is_true(w_state):
+            w_dict = space.getattr(w_inst, space.newtext('__dict__'))
+            try:
+                w_iter = space.iter(space.call_method(w_state, 'iteritems'))
+                while True:
+                    try:
+                        w_item = space.next(w_iter)
+                    except OperationError as e:
+                        if not e.match(space, space.w_StopIteration):
+                            raise
+                        break
+                    w_key, w_value = space.fixedview(w_item, 2)
+                    if space.is_w(space.type(w_key), space.w_bytes):
+                        w_key = space.new_interned_w_str(w_key)
+                    space.setitem(w_dict, w_key, w_value)
+            except OperationError as e:
+                # the keys of the state don't have to be strings
+                if not e.match(space, space.w_TypeError):
+                    raise
+                space.call_method(w_dict, 'update', w_state)
+        if w_slotstate is not None and space.is_true(w_slotstate):
+            for w_item in space.listview(space.call_method(w_slotstate,
+                                                           'items')):
+                w_key, w_value = space.fixedview(w_item, 2)
+                space.setattr(w_inst, w_key, w_value)
+
+    # ____________________________________________________________
+    # app-level interface
+
+    def descr_load(self, space):
+        """load() -- Read a pickled object from the file."""
+        return self.load()
+
+    def descr_get_memo(self, space):
+        w_memo = space.newdict()
+        for index, w_obj in self.memo.iteritems():
+            space.setitem(w_memo, space.newint(index), w_obj)
+        return w_memo
+
+    def descr_set_memo(self, space, w_memo):
+        if not space.isinstance_w(w_memo, space.w_dict):
+            raise oefmt(space.w_TypeError, "memo must be a dictionary")
+        memo = {}
+        for w_item in space.listview(space.call_method(w_memo, 'items')):
+            w_index, w_obj = space.fixedview(w_item, 2)
+            memo[space.int_w(w_index)] = w_obj
+        self.memo = memo
+
+    def descr_get_persistent_load(self, space):
+        if self.w_persistent_load is None:
+            raise oefmt(space.w_AttributeError, "persistent_load")
+        return self.w_persistent_load
+
+    def descr_set_persistent_load(self, space, w_value):
+        self.w_persistent_load = w_value
+
+    def descr_get_find_global(self, space):
+        if self.w_find_global is None:
+            raise oefmt(space.w_AttributeError, "find_global")
+        return self.w_find_global
+
+    def descr_set_find_global(self, space, w_value):
+        self.w_find_global = w_value
+
+
+def descr__new__(space, w_subtype, w_file):
+    w_self = space.allocate_instance(W_Unpickler, w_subtype)
+    W_Unpickler.__init__(space.interp_w(W_Unpickler, w_self), space, w_file,
+                         None)
+    return w_self
+
+W_Unpickler.typedef = TypeDef("cPickle.Unpickler",
+    __doc__ = """Unpickler(file) -- Create an unpickler.
+
+This takes a file-like object for reading a pickle data stream.  The
+protocol of the pickle is detected automatically.""",
+    __new__ = interp2app(descr__new__),
+    load = interp2app(W_Unpickler.descr_load),
+    memo = GetSetProperty(W_Unpickler.descr_get_memo,
+                          W_Unpickler.descr_set_memo),
+    persistent_load = GetSetProperty(W_Unpickler.descr_get_persistent_load,
+                                     W_Unpickler.descr_set_persistent_load),
+    find_global = GetSetProperty(W_Unpickler.descr_get_find_global,
+                                 W_Unpickler.descr_set_find_global),
+)
+
+
+def loads(space, w_data):
+    """loads(string) -- Load a pickle from the given string."""
+    unpickler = W_Unpickler(space, None, space.bytes_w(w_data))
+    return unpickler.load()
@@ -0,0 +1,14 @@
+from pypy.interpreter.mixedmodule import MixedModule
+
+class Module(MixedModule):
+    """Implementation in RPython of the core of the 'cPickle' module"""
+
+    appleveldefs = {}
+
+    interpleveldefs = {
+        'Pickler'          : 'interp_pickler.W_Pickler',
+        'Unpickler'        : 'interp_unpickler.W_Unpickler',
+        'dumps'            : 'interp_pickler.dumps',
+        'loads'            : 'interp_unpickler.loads',
+        'HIGHEST_PROTOCOL' : 'space.newint(2)',
+        }
@@ -0,0 +1,291 @@
+class AppTestPickler(object):
+    spaceconfig = dict(usemodules=['_cpickle', 'struct', 'binascii',
+                                   'cStringIO'])
+
+    def setup_class(cls):
+        cls.w_make_module = cls.space.appexec([], """():
+            def make_module(**classes):
+                import sys, types
+                mod = types.ModuleType('test_cpickle_classes')
+                for name, cls in classes.items():
+                    cls.__module__ = mod.__name__
+                    setattr(mod, name, cls)
+                sys.modules[mod.__name__] = mod
+                return mod
+            return make_module
+        """)
+        cls.w_del_module = cls.space.appexec([], """():
+            def del_module(mod):
+                import sys
+                del sys.modules[mod.__name__]
+            return del_module
+        """)
+
+    def test_same_as_pickle(self):
+        import _cpickle, pickle
+        class Memo(pickle.Pickler):
+            # the memo of cPickle starts counting at one
+            def memoize(self, obj):
+                self.memo[id(None)] = None
+                return pickle.Pickler.memoize(self, obj)
+        s = 'spam'
+        objs = [None, True, False, 0, 1, -1, 255, 256, 65535, 65536,
+                2**31 - 1, -2**31, 2**31, -2**31 - 1, 2**70, -2**70, 0L,
+                255L, -256L, 1.5, -0.0, 1e300, 'abc', 'x' * 300,
+                u'abc', u'\xe9\u1234\U00012345\\\n', (), (1,), (1, 2),
+                (1, 2, 3), (1, 2, 3, 4), [], [1, 2], range(2500),
+                [1.5, 'a'] * 700, {}, {'a': 1, 2: [3]}, [s, s, (s, s)],
+                len, int, pickle.Pickler]
+        for proto in [0, 1, 2]:
+            for obj in objs:
+                import cStringIO
+                f = cStringIO.StringIO()
+                Memo(f, proto).dump(obj)
+                expected = f.getvalue()
+                assert _cpickle.dumps(obj, proto) == expected, (obj, proto)
+                assert _cpickle.loads(expected) == obj
+
+    def test_dump_file(self):
+        import _cpickle
+        l = []
+        class F(object):
+            def write(self, data):
+                l.append(data)
+        p = _cpickle.Pickler(F(), 2)
+        assert p.dump([1, 'a']) is p
+        assert p.dump('a') is p
+        assert len(l) == 2
+        assert _cpickle.loads(l[0]) == [1, 'a']
+        # the memo is kept between dumps
+        assert l[1] == '\x80\x02h\x02.'
+        p.clear_memo()
+        p.dump('a')
+        assert l[2] == '\x80\x02U\x01aq\x01.'
+        assert p.getvalue() is None
+
+    def test_list_based_pickler(self):
+        import _cpickle
+        p = _cpickle.Pickler(1)
+        p.dump(1)
+        assert p.getvalue() == 'K\x01.'
+        assert p.getvalue() == ''
+        p = _cpickle.Pickler()
+        p.dump(1)
+        assert p.getvalue() == 'I1\n.'
+
+    def test_protocol(self):
+        import _cpickle
+        assert _cpickle.dumps(1, -1) == '\x80\x02K\x01.'
+        assert _cpickle.dumps(1, None) == 'I1\n.'
+        exc = raises(ValueError, _cpickle.dumps, 1, 3)
+        assert str(exc.value) == ("pickle protocol 3 asked for; the highest "
+                                  "available protocol is 2")
+
+    def test_recursive(self):
+        import _cpickle
+        l = []
+        l.append(l)
+        d = {}
+        d[1] = d
+        t = ([],)
+        t[0].append(t)
+        for proto in [0, 1, 2]:
+            l1 = _cpickle.loads(_cpickle.dumps(l, proto))
+            assert l1[0] is l1
+            d1 = _cpickle.loads(_cpickle.dumps(d, proto))
+            assert d1[1] is d1
+            t1 = _cpickle.loads(_cpickle.dumps(t, proto))
+            assert t1[0][0] is t1
+
+    def test_reduce(self):
+        import _cpickle, copy_reg
+        class A(object):
+            def __init__(self, x):
+                self.x = x
+            def __eq__(self, other):
+                return type(other) is A and self.__dict__ == other.__dict__
+        class B(object):
+            pass
+        mod = self.make_module(A=A, B=B)
+        try:
+            a = A([1, 2])
+            a.y = a
+            for proto in [0, 1, 2]:
+                s = _cpickle.dumps(a, proto)
+                assert ('\x81' in s) == (proto == 2)
+                a1 = _cpickle.loads(s)
+                assert type(a1) is A
+                assert a1.x == [1, 2] and a1.y is a1
+            copy_reg.pickle(B, lambda b: (A, (5,)))
+            try:
+                assert _cpickle.loads(_cpickle.dumps(B(), 2)) == A(5)
+            finally:
+                del copy_reg.dispatch_table[B]
+        finally:
+            self.del_module(mod)
+
+    def test_old_style_instance(self):
+        import _cpickle
+        class C:
+            pass
+        class D:
+            def __getinitargs__(self):
+                return (1, 2)
+            def __init__(self, a, b):
+                self.args = a, b
+            def __getstate__(self):
+                return {'x': 5}
+        mod = self.make_module(C=C, D=D)
+        try:
+            c = C()
+            c.a = 42
+            for proto in [0, 1, 2]:
+                c1 = _cpickle.loads(_cpickle.dumps(c, proto))
+                assert c1.__class__ is C and c1.a == 42
+                d1 = _cpickle.loads(_cpickle.dumps(D(3, 4), proto))
+                assert d1.__class__ is D and d1.args == (1, 2) and d1.x == 5
+        finally:
+            self.del_module(mod)
+
+    def test_extension_registry(self):
+        import _cpickle, copy_reg, collections
+        copy_reg.add_extension('collections', 'OrderedDict', 300)
+        try:
+            s = _cpickle.dumps(collections.OrderedDict, 2)
+            assert s == '\x80\x02\x83\x2c\x01.'
+            copy_reg.clear_extension_cache()
+            assert _cpickle.loads(s) is collections.OrderedDict
+            assert _cpickle.dumps(collections.OrderedDict, 1) != s
+        finally:
+            copy_reg.remove_extension('collections', 'OrderedDict', 300)
+
+    def test_persistent_id(self):
+        import _cpickle, cStringIO
+        for proto in [0, 1, 2]:
+            f = cStringIO.StringIO()
+            p = _cpickle.Pickler(f, proto)
+            p.persistent_id = lambda obj: str(obj) if obj == 5 else None
+            p.dump([4, 5, 6])
+            u = _cpickle.Unpickler(cStringIO.StringIO(f.getvalue()))
+            u.persistent_load = lambda pid: ('loaded', pid)
+            assert u.load() == [4, ('loaded', '5'), 6]
+            u = _cpickle.Unpickler(cStringIO.StringIO(f.getvalue()))
+            raises(Exception, u.load)
+
+    def test_subclass(self):
+        import _cpickle, cStringIO
+        class P(_cpickle.Pickler):
+            def persistent_id(self, obj):
+                if obj == 'x':
+                    return 'pid'
+        class U(_cpickle.Unpickler):
+            def persistent_load(self, pid):
+                return 'loaded ' + pid
+            def find_global(self, module, name):
+                return (module, name)
+        f = cStringIO.StringIO()
+        P(f, 2).dump(['x', 'y', len])
+        u = U(cStringIO.StringIO(f.getvalue()))
+        assert u.load() == ['loaded pid', 'y', ('__builtin__', 'len')]
+
+    def test_memo_attribute(self):
+        import _cpickle, cStringIO
+        data = ['abc', 'abc', 44]
+        f = cStringIO.StringIO()
+        p = _cpickle.Pickler(f)
+        p.dump(data)
+        memo = p.memo
+        assert len(memo) == 2
+        assert memo[id(data)] == (1, data)
+        assert id(data) in memo
+        assert memo.get(id(f)) is None
+        assert type(memo.copy()) is dict
+        primed = _cpickle.Pickler(cStringIO.StringIO())
+        primed.memo = memo
+        assert primed.memo == memo
+        primed.memo = memo.copy()
+        assert primed.memo == memo
+        raises(TypeError, "memo[5] = (3, None)")
+
+        u = _cpickle.Unpickler(cStringIO.StringIO(f.getvalue()))
+        data1 = u.load()
+        u2 = _cpickle.Unpickler(cStringIO.StringIO('g1\n.'))
+        u2.memo = u.memo
+        assert u2.load() is data1
+
+    def test_memo_clear(self):
+        import _cpickle, cStringIO
+        data = ['abc']
+        f = cStringIO.StringIO()
+        p = _cpickle.Pickler(f, 2)
+        p.dump(data)
+        first = f.getvalue()
+        memo = p.memo
+        p.memo.clear()
+        assert len(memo) == 0
+        f.seek(0)
+        f.truncate()
+        p.dump(data)
+        # no back-reference to the objects of the first dump
+        assert f.getvalue() == first
+        assert 'h' not in first
+
+
+class AppTestUnpickler(object):
+    spaceconfig = dict(usemodules=['_cpickle', 'struct', 'binascii',
+                                   'cStringIO'])
+
+    def test_strategies(self):
+        import _cpickle, __pypy__
+        l = _cpickle.loads(_cpickle.dumps(range(3000), 2))
+        assert l == range(3000)
+        assert __pypy__.strategy(l) == 'IntegerListStrategy'
+        l = _cpickle.loads(_cpickle.dumps([1.5, 2.5], 2))
+        assert __pypy__.strategy(l) == 'FloatListStrategy'
+        d = _cpickle.loads(_cpickle.dumps({'a': 1, 'b': 2}, 2))
+        assert d == {'a': 1, 'b': 2}
+        assert 'Object' not in __pypy__.strategy(d)
+
+    def test_text_opcodes(self):
+        import _cpickle
+        assert _cpickle.loads("I42\n.") == 42
+        assert _cpickle.loads("I01\n.") is True
+        assert _cpickle.loads("I12345678901234567890\n.") == \
+            12345678901234567890
+        assert _cpickle.loads("L12L\n.") == 12L
+        assert _cpickle.loads("F1.5\n.") == 1.5
+        assert _cpickle.loads("S'a\\nb'\np1\n.") == 'a\nb'
+        assert _cpickle.loads("V\\u1234a\np1\n.") == u'\u1234a'
+        assert _cpickle.loads("(I1\nI2\nl(I3\ntp1\ng1\n.") == (3,)
+
+    def test_errors(self):
+        import _cpickle, pickle
+        raises(EOFError, _cpickle.loads, '')
+        raises(EOFError, _cpickle.loads, 'X\0\0\0T')
+        raises(EOFError, _cpickle.loads, 'K')
+        raises(pickle.UnpicklingError, _cpickle.loads, '0.')
+        raises(pickle.UnpicklingError, _cpickle.loads, 't.')
+        raises(pickle.UnpicklingError, _cpickle.loads, '(0.')
+        raises(pickle.UnpicklingError, _cpickle.loads, 'I1')
+        raises(KeyError, _cpickle.loads, 'h\x05.')
+        raises(ValueError, _cpickle.loads, '\x80\x03N.')
+        raises(ValueError, _cpickle.loads, "S'abc\n.")
+        exc = raises(pickle.UnpicklingError, _cpickle.loads, 'z')
+        assert str(exc.value) == "invalid load key, 'z'."
+
+    def test_find_global_none(self):
+        import _cpickle, cStringIO, pickle
+        u = _cpickle.Unpickler(cStringIO.StringIO('c__builtin__\nlen\n.'))
+        u.find_global = None
+        raises(pickle.UnpicklingError, u.load)
+
+    def test_multiple_loads(self):
+        import _cpickle, StringIO, cStringIO
+        s = _cpickle.dumps([1, 'a'], 2) + _cpickle.dumps((2,), 0)
+        for cls in [StringIO.StringIO, cStringIO.StringIO]:
+            f = cls(s)
+            u = _cpickle.Unpickler(f)
+            assert u.load() == [1, 'a']
+            assert u.load() == (2,)
+            assert f.tell() == len(s)
+            raises(EOFError, u.load)
@@ -0,0 +1,197 @@
+from pypy.interpreter.argument import Arguments
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import interp2app
+from pypy.interpreter.typedef import (
+    TypeDef, GetSetProperty, descr_get_dict, make_weakref_descr)
+from rpython.rlib import jit
+
+
+def store_keywords(space, w_kwds, __args__):
+    """Store the keyword arguments of '__args__' into the dict 'w_kwds',
+    overriding the existing entries with the same name."""
+    keywords = __args__.keywords
+    if keywords is None:
+        return
+    keywords_w = __args__.keywords_w
+    keyword_names_w = __args__.keyword_names_w
+    limit = len(keywords)
+    if keyword_names_w is not None:
+        limit -= len(keyword_names_w)
+    for i in range(len(keywords)):
+        if i < limit:
+            space.setitem_str(w_kwds, keywords[i], keywords_w[i])
+        else:
+            space.setitem(w_kwds, keyword_names_w[i - limit], keywords_w[i])
+
+
+class W_Partial(W_Root):
+    """partial(func, *args, **keywords) - new function with partial application
+    of the given arguments and keywords.
+    """
+
+    def __init__(self, space, w_func, w_args, w_keywords):
+        self.space = space
+        self.w_func = w_func
+        self.w_args = w_args            # an exact tuple
+        self.w_keywords = w_keywords    # an exact dict
+        self.w_dict = None
+
+    def getdict(self, space):
+        if self.w_dict is None:
+            self.w_dict = space.newdict(instance=True)
+        return self.w_dict
+
+    def getdictvalue(self, space, attr):
+        # don't create the dict only to look up an attribute in it
+        if self.w_dict is None:
+            return None
+        return space.finditem_str(self.w_dict, attr)
+
+    def setdict(self, space, w_dict):
+        if not space.isinstance_w(w_dict, space.w_dict):
+            raise oefmt(space.w_TypeError,
+                        "setting partial object's dictionary to a non-dict")
+        self.w_dict = w_dict
+
+    def descr_del_dict(self, space):
+        raise oefmt(space.w_TypeError,
+                    "a partial object's dictionary may not be deleted")
+
+    def descr_get_func(self, space):
+        return self.w_func
+
+    def descr_get_args(self, space):
+        return self.w_args
+
+    def descr_get_keywords(self, space):
+        return self.w_keywords
+
+    def descr_call(self, space, __args__):
+        # the stored and the new positional arguments are concatenated into
+        # a single list, and keyword arguments are only copied into a new
+        # dict if the partial has some
+        stored_w = space.fixedview(self.w_args)
+        args_w = __args__.arguments_w
+        if stored_w:
+            args_w = stored_w + args_w
+        if space.len_w(self.w_keywords) == 0:
+            if not stored_w:
+                return space.call_args(self.w_func, __args__)
+            return space.call_args(self.w_func,
+                                   __args__.replace_arguments(args_w))
+        w_kwds = space.call_method(self.w_keywords, 'copy')
+        store_keywords(space, w_kwds, __args__)
+        return space.call_args(self.w_func,
+                               Arguments(space, args_w, w_starstararg=w_kwds))
+
+    def descr_reduce(self, space):
+        w_dict = self.w_dict
+        if w_dict is None:
+            w_dict = space.w_None
+        return space.newtuple([
+            space.type(self),
+            space.newtuple([self.w_func]),
+            space.newtuple([self.w_func, self.w_args, self.w_keywords,
+                            w_dict])])
+
+    def descr_setstate(self, space, w_state):
+        if not space.isinstance_w(w_state, space.w_tuple):
+            raise oefmt(space.w_TypeError, "invalid partial state")
+        state_w = space.fixedview(w_state)
+        if len(state_w) != 4:
+            raise oefmt(space.w_TypeError, "invalid partial state")
+        w_func, w_args, w_keywords, w_dict = state_w
+        if (not space.is_true(space.callable(w_func)) or
+                not space.isinstance_w(w_args, space.w_tuple) or
+                not (space.is_none(w_keywords) or
+                     space.isinstance_w(w_keywords, space.w_dict))):
+            raise oefmt(space.w_TypeError, "invalid partial state")
+        if not space.is_w(space.type(w_args), space.w_tuple):
+            w_args = space.newtuple(space.fixedview(w_args)[:])
+        if space.is_none(w_keywords):
+            w_keywords = space.newdict()
+        elif not space.is_w(space.type(w_keywords), space.w_dict):
+            w_keywords = space.call_function(space.w_dict, w_keywords)
+        if space.is_none(w_dict):
+            w_dict = None
+        self.w_func = w_func
+        self.w_args = w_args
+        self.w_keywords = w_keywords
+        self.w_dict = w_dict
+
+
+def descr_new_partial(space, w_subtype, __args__):
+    args_w = __args__.arguments_w
+    if len(args_w) < 1:
+        raise oefmt(space.w_TypeError,
+                    "type 'partial' takes at least one argument")
+    w_func = args_w[0]
+    if not space.is_true(space.callable(w_func)):
+        raise oefmt(space.w_TypeError, "the first argument must be callable")
+    w_args = space.newtuple(args_w[1:])
+    w_keywords = space.newdict()
+    store_keywords(space, w_keywords, __args__)
+    w_partial = space.allocate_instance(W_Partial, w_subtype)
+    W_Partial.__init__(w_partial, space, w_func, w_args, w_keywords)
+    return w_partial
+
+W_Partial.typedef = TypeDef("functools.partial",
+    __doc__ = W_Partial.__doc__,
+    __new__ = interp2app(descr_new_partial),
+    __call__ = interp2app(W_Partial.descr_call),
+    __reduce__ = interp2app(W_Partial.descr_reduce),
+    __setstate__ = interp2app(W_Partial.descr_setstate),
+    __dict__ = GetSetProperty(descr_get_dict, W_Partial.setdict,
+                              W_Partial.descr_del_dict, cls=W_Partial),
+    __weakref__ = make_weakref_descr(W_Partial),
+    func = GetSetProperty(W_Partial.descr_get_func,
+        doc="function object to use in future partial calls"),
+    args = GetSetProperty(W_Partial.descr_get_args,
+        doc="tuple of arguments to future partial calls"),
+    keywords = GetSetProperty(W_Partial.descr_get_keywords,
+        doc="dictionary of keyword arguments to future partial calls"),
+)
+
+
+def get_printable_location(greenkey):
+    return "reduce [%s]" % (greenkey.iterator_greenkey_printable(),)
+
+reduce_jitdriver = jit.JitDriver(name='reduce',
+        greens=['greenkey'], reds='auto',
+        get_printable_location=get_printable_location)
+
+def reduce(space, w_func, w_sequence, w_initial=None):
+    """reduce(function, sequence[, initial]) -> value
+
+Apply a function of two arguments cumulatively to the items of a sequence,
+from left to right, so as to reduce the sequence to a single value.
+For example, reduce(lambda x, y: x+y, [1, 2, 3, 4, 5]) calculates
+((((1+2)+3)+4)+5).  If initial is present, it is placed before the items
+of the sequence in the calculation, and serves as a default when the
+sequence is empty."""
+    try:
+        w_iter = space.iter(w_sequence)
+    except OperationError as e:
+        if e.match(space, space.w_TypeError):
+            raise oefmt(space.w_TypeError,
+                        "reduce() arg 2 must support iteration")
+        raise
+    greenkey = space.iterator_greenkey(w_iter)
+    w_result = w_initial
+    while True:
+        reduce_jitdriver.jit_merge_point(greenkey=greenkey)
+        try:
+            w_item = space.next(w_iter)
+        except OperationError as e:
+            if not e.match(space, space.w_StopIteration):
+                raise
+            break
+        if w_result is None:
+            w_result = w_item
+        else:
+            w_result = space.call_function(w_func, w_result, w_item)
+    if w_result is None:
+        raise oefmt(space.w_TypeError,
+                    "reduce() of empty sequence with no initial value")
+    return w_result
@@ -0,0 +1,11 @@
+from pypy.interpreter.mixedmodule import MixedModule
+
+class Module(MixedModule):
+    """Tools that operate on functions."""
+
+    appleveldefs = {}
+
+    interpleveldefs = {
+        'partial' : 'interp_functools.W_Partial',
+        'reduce'  : 'interp_functools.reduce',
+        }
@@ -0,0 +1,123 @@
+
+class AppTestPartial(object):
+    spaceconfig = dict(usemodules=['_functools', 'struct', 'binascii'])
+
+    def test_basic(self):
+        from _functools import partial
+        def capture(*args, **kw):
+            return args, kw
+        p = partial(capture, 1, 2, a=10, b=20)
+        assert p(3, 4, b=30, c=40) == ((1, 2, 3, 4), dict(a=10, b=30, c=40))
+        assert p() == ((1, 2), dict(a=10, b=20))
+        assert p.func is capture
+        assert p.args == (1, 2)
+        assert p.args is p.args
+        assert p.keywords == dict(a=10, b=20)
+        assert p.keywords == dict(a=10, b=20)    # not modified by the calls
+        p = partial(capture)
+        assert p(1, x=2) == ((1,), dict(x=2))
+        assert p.keywords == {}
+        assert partial(capture, **{}).keywords == {}
+        p = partial(capture, 5)
+        assert p(6, y=7) == ((5, 6), dict(y=7))
+        p = partial(capture, z=1)
+        assert p(2) == ((2,), dict(z=1))
+        p = partial(dict, self=42)
+        assert p(other=43) == {'self': 42, 'other': 43}
+
+    def test_errors(self):
+        from _functools import partial
+        raises(TypeError, partial)
+        exc = raises(TypeError, partial, 2)
+        assert str(exc.value) == "the first argument must be callable"
+        def f(x):
+            return 1 / x
+        raises(ZeroDivisionError, partial(f, 0))
+        raises(TypeError, partial(f, 1), 2)
+
+    def test_attributes(self):
+        from _functools import partial
+        p = partial(hex)
+        raises((TypeError, AttributeError), setattr, p, 'func', map)
+        raises((TypeError, AttributeError), setattr, p, 'args', ())
+        raises((TypeError, AttributeError), setattr, p, 'keywords', {})
+        exc = raises(TypeError, "del p.__dict__")
+        assert str(exc.value) == (
+            "a partial object's dictionary may not be deleted")
+        raises(AttributeError, "del p.zzz")
+        p.attr = 5
+        assert p.__dict__ == {'attr': 5}
+        raises(TypeError, setattr, p, '__dict__', 5)
+        p.__dict__ = {'x': 1}
+        assert p.x == 1
+
+    def test_subclass_and_weakref(self):
+        from _functools import partial
+        import weakref
+        class P(partial):
+            def __init__(self, func, *args, **kw):
+                self.initialized = True
+        p = P(max, 5)
+        assert p(3) == 5
+        assert p.initialized
+        assert type(p) is P
+        r = weakref.ref(p)
+        assert r() is p
+
+    def test_reduce_setstate(self):
+        from _functools import partial
+        def capture(*args, **kw):
+            return args, kw
+        p = partial(capture, 1, a=2)
+        assert p.__reduce__() == (partial, (capture,),
+                                  (capture, (1,), {'a': 2}, None))
+        p.attr = 3
+        assert p.__reduce__()[2][3] == {'attr': 3}
+        p.__setstate__((capture, (5,), None, None))
+        assert p(6) == ((5, 6), {})
+        assert p.keywords == {}
+        assert p.__dict__ == {}
+        p.__setstate__((max, (), {'x': 1}, {'y': 2}))
+        assert p.func is max
+        assert p.y == 2
+        raises(TypeError, p.__setstate__, (capture, (), {}))
+        raises(TypeError, p.__setstate__, [capture, (), {}, None])
+        raises(TypeError, p.__setstate__, (None, (), {}, None))
+        raises(TypeError, p.__setstate__, (capture, [], {}, None))
+        raises(TypeError, p.__setstate__, (capture, (), [], None))
+
+    def test_pickle(self):
+        from _functools import partial
+        import pickle
+        p = partial(max, 1, 2)
+        p.attr = 'x'
+        p2 = pickle.loads(pickle.dumps(p))
+        assert p2.func is max
+        assert p2.args == (1, 2)
+        assert p2.attr == 'x'
+        assert p2() == 2
+
+
+class AppTestReduce(object):
+    spaceconfig = dict(usemodules=['_functools'])
+
+    def test_reduce(self):
+        from _functools import reduce
+        assert reduce(lambda x, y: x + y, ['a', 'b', 'c'], '') == 'abc'
+        assert reduce(lambda x, y: x * y, range(2, 8), 1) == 5040
+        assert reduce(lambda x, y: x + y, iter([1, 2, 3])) == 6
+        assert reduce(lambda x, y: x + y, [], None) is None
+        assert reduce(42, "1") == "1"
+        assert reduce(42, "", "1") == "1"
+        raises(TypeError, reduce)
+        raises(TypeError, reduce, 42, (42, 42))
+        exc = raises(TypeError, reduce, 42, 42)
+        assert str(exc.value) == "reduce() arg 2 must support iteration"
+        exc = raises(TypeError, reduce, lambda x, y: x, [])
+        assert str(exc.value) == (
+            "reduce() of empty sequence with no initial value")
+
+    def test_functools_module(self):
+        import functools
+        assert functools.partial.__module__ == 'functools'
+        assert functools.reduce(lambda x, y: x - y, [10, 3, 2]) == 5
@@ -0,0 +1,346 @@
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.module.__builtin__.interp_classobj import W_InstanceObject
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.listobject import W_ListObject
+
+
+def check_heap(space, w_heap):
+    if not isinstance(w_heap, W_ListObject):
+        raise oefmt(space.w_TypeError, "heap argument must be a list")
+    return w_heap
+
+def has_lt(space, w_x):
+    # hasattr(x, '__lt__'), without building a bound method in the common
+    # case of a new-style object whose type defines it
+    if (not isinstance(w_x, W_InstanceObject) and
+            space.lookup(w_x, '__lt__') is not None):
+        return True
+    return space.findattr(w_x, space.newtext('__lt__')) is not None
+
+def cmp_lt(space, w_x, w_y):
+    # Use __lt__ if available; otherwise, try __le__.
+    if has_lt(space, w_x):
+        return space.is_true(space.lt(w_x, w_y))
+    return not space.is_true(space.le(w_y, w_x))
+
+def check_size(space, w_heap, size):
+    if w_heap.length() != size:
+        raise oefmt(space.w_RuntimeError, "list changed size during iteration")
+
+# ____________________________________________________________
+# generic versions, working on any list and comparing with the objspace.
+# With max_heap=True they maintain the reversed invariant, which is used
+# by nsmallest().
+
+def _siftdown(space, w_heap, startpos, pos, max_heap=False):
+    size = w_heap.length()
+    if pos >= size:
+        raise oefmt(space.w_IndexError, "index out of range")
+    w_newitem = w_heap.getitem(pos)
+    # Follow the path to the root, moving parents down until finding a place
+    # newitem fits.
+    while pos > startpos:
+        parentpos = (pos - 1) >> 1
+        w_parent = w_heap.getitem(parentpos)
+        if max_heap:
+            lt = cmp_lt(space, w_parent, w_newitem)
+        else:
+            lt = cmp_lt(space, w_newitem, w_parent)
+        check_size(space, w_heap, size)
+        if not lt:
+            break
+        w_heap.setitem(pos, w_parent)
+        pos = parentpos
+    w_heap.setitem(pos, w_newitem)
+
+def _siftup(space, w_heap, pos, max_heap=False):
+    endpos = w_heap.length()
+    startpos = pos
+    if pos >= endpos:
+        raise oefmt(space.w_IndexError, "index out of range")
+    w_newitem = w_heap.getitem(pos)
+    # Bubble up the smaller child until hitting a leaf.
+    childpos = 2 * pos + 1    # leftmost child position
+    while childpos < endpos:
+        # Set childpos to index of smaller child.
+        rightpos = childpos + 1
+        if rightpos < endpos:
+            w_child = w_heap.getitem(childpos)
+            w_right = w_heap.getitem(rightpos)
+            if max_heap:
+                lt = cmp_lt(space, w_right, w_child)
+            else:
+                lt = cmp_lt(space, w_child, w_right)
+            check_size(space, w_heap, endpos)
+            if not lt:
+                childpos = rightpos
+        # Move the smaller child up.
+        w_heap.setitem(pos, w_heap.getitem(childpos))
+        pos = childpos
+        childpos = 2 * pos + 1
+    # The leaf at pos is empty now.  Put newitem there, and bubble it up
+    # to its final resting place (by sifting its parents down).
+    w_heap.setitem(pos, w_newitem)
+    _siftdown(space, w_heap, startpos, pos, max_heap)
+
+# ____________________________________________________________
+# unboxed versions, working directly on the storage of lists using the
+# IntegerListStrategy or the FloatListStrategy.  Comparing two ints or two
+# floats cannot run app-level code, so the list cannot change under our feet.
+
+def make_unboxed_heap_functions(lt):
+    def siftdown(l, startpos, pos):
+        newitem = l[pos]
+        while pos > startpos:
+            parentpos = (pos - 1) >> 1
+            parent = l[parentpos]
+            if not lt(newitem, parent):
+                break
+            l[pos] = parent
+            pos = parentpos
+        l[pos] = newitem
+
+    def siftup(l, pos):
+        endpos = len(l)
+        startpos = pos
+        newitem = l[pos]
+        childpos = 2 * pos + 1
+        while childpos < endpos:
+            rightpos = childpos + 1
+            if rightpos < endpos and not lt(l[childpos], l[rightpos]):
+                childpos = rightpos
+            l[pos] = l[childpos]
+            pos = childpos
+            childpos = 2 * pos + 1
+        l[pos] = newitem
+        siftdown(l, startpos, pos)
+
+    def heapify(l):
+        for i in range(len(l) // 2 - 1, -1, -1):
+            siftup(l, i)
+
+    def pushpop(l, item):
+        # 'l' must not be empty; returns the item that was popped
+        returnitem = l[0]
+        if not lt(returnitem, item):
+            return item
+        l[0] = item
+        siftup(l, 0)
+        return returnitem
+
+    return siftdown, siftup, heapify, pushpop
+
+def _lt(x, y):
+    return x < y
+
+def _gt(x, y):
+    return y < x
+
+(_siftdown_int, _siftup_int, _heapify_int,
+ _pushpop_int) = make_unboxed_heap_functions(_lt)
+(_siftdown_float, _siftup_float, _heapify_float,
+ _pushpop_float) = make_unboxed_heap_functions(_lt)
+(_, _, _heapify_int_max,
+ _pushpop_int_max) = make_unboxed_heap_functions(_gt)
+(_, _, _heapify_float_max,
+ _pushpop_float_max) = make_unboxed_heap_functions(_gt)
+
+# ____________________________________________________________
+
+def _heapify(space, w_heap, max_heap=False):
+    intlist = w_heap.getstorage_int()
+    if intlist is not None:
+        if max_heap:
+            _heapify_int_max(intlist)
+        else:
+            _heapify_int(intlist)
+        return
+    floatlist = w_heap.getstorage_float()
+    if floatlist is not None:
+        if max_heap:
+            _heapify_float_max(floatlist)
+        else:
+            _heapify_float(floatlist)
+        return
+    # Transform bottom-up.  The largest index there's any point to looking at
+    # is the largest with a child index in-range, so must have 2*i + 1 < n,
+    # or i < (n-1)/2.  If n is even = 2*j, this is (2*j-1)/2 = j-1/2 so
+    # j-1 is the largest, which is n//2 - 1.  If n is odd = 2*j+1, this is
+    # (2*j+1-1)/2 = j so j-1 is the largest, and that's again n//2-1.
+    for i in range(w_heap.length() // 2 - 1, -1, -1):
+        _siftup(space, w_heap, i, max_heap)
+
+def _pushpop(space, w_heap, w_item, max_heap=False):
+    if w_heap.length() == 0:
+        return w_item
+    intlist = w_heap.getstorage_int()
+    if intlist is not None and type(w_item) is W_IntObject:
+        item = space.int_w(w_item)
+        if max_heap:
+            returnitem = _pushpop_int_max(intlist, item)
+        else:
+            returnitem = _pushpop_int(intlist, item)
+        return space.newint(returnitem)
+    floatlist = w_heap.getstorage_float()
+    if floatlist is not None and type(w_item) is W_FloatObject:
+        floatitem = space.float_w(w_item)
+        if max_heap:
+            returnfloat = _pushpop_float_max(floatlist, floatitem)
+        else:
+            returnfloat = _pushpop_float(floatlist, floatitem)
+        return space.newfloat(returnfloat)
+    w_top = w_heap.getitem(0)
+    if max_heap:
+        lt = cmp_lt(space, w_item, w_top)
+    else:
+        lt = cmp_lt(space, w_top, w_item)
+    if not lt:
+        return w_item
+    if w_heap.length() == 0:
+        raise oefmt(space.w_IndexError, "index out of range")
+    w_returnitem = w_heap.getitem(0)
+    w_heap.setitem(0, w_item)
+    _siftup(space, w_heap, 0, max_heap)
+    return w_returnitem
+
+def _first_items(space, n, w_iterable):
+    # returns (list of the first n items, iterator over the remaining ones)
+    w_iter = space.iter(w_iterable)
+    w_result = space.newlist([])
+    while w_result.length() < n:
+        try:
+            w_item = space.next(w_iter)
+        except OperationError as e:
+            if not e.match(space, space.w_StopIteration):
+                raise
+            break
+        w_result.append(w_item)
+    return w_result, w_iter
+
+def _pushpop_all(space, w_heap, w_iter, max_heap):
+    while True:
+        try:
+            w_item = space.next(w_iter)
+        except OperationError as e:
+            if not e.match(space, space.w_StopIteration):
+                raise
+            break
+        _pushpop(space, w_heap, w_item, max_heap)
+
+# ____________________________________________________________
+
+
+def heappush(space, w_heap, w_item):
+    """Push item onto heap, maintaining the heap invariant."""
+    w_heap = check_heap(space, w_heap)
+    w_heap.append(w_item)
+    intlist = w_heap.getstorage_int()
+    if intlist is not None:
+        _siftdown_int(intlist, 0, len(intlist) - 1)
+        return
+    floatlist = w_heap.getstorage_float()
+    if floatlist is not None:
+        _siftdown_float(floatlist, 0, len(floatlist) - 1)
+        return
+    _siftdown(space, w_heap, 0, w_heap.length() - 1)
+
+def heappop(space, w_heap):
+    """Pop the smallest item off the heap, maintaining the heap invariant."""
+    w_heap = check_heap(space, w_heap)
+    if w_heap.length() == 0:
+        raise oefmt(space.w_IndexError, "index out of range")
+    intlist = w_heap.getstorage_int()
+    if intlist is not None:
+        lastelt = intlist.pop()
+        if intlist:
+            returnitem = intlist[0]
+            intlist[0] = lastelt
+            _siftup_int(intlist, 0)
+            return space.newint(returnitem)
+        return space.newint(lastelt)
+    floatlist = w_heap.getstorage_float()
+    if floatlist is not None:
+        lastfloat = floatlist.pop()
+        if floatlist:
+            returnfloat = floatlist[0]
+            floatlist[0] = lastfloat
+            _siftup_float(floatlist, 0)
+            return space.newfloat(returnfloat)
+        return space.newfloat(lastfloat)
+    w_lastelt = w_heap.pop_end()
+    if w_heap.length() == 0:
+        return w_lastelt
+    w_returnitem = w_heap.getitem(0)
+    w_heap.setitem(0, w_lastelt)
+    _siftup(space, w_heap, 0)
+    return w_returnitem
+
+def heapreplace(space, w_heap, w_item):
+    """heapreplace(heap, item) -> value. Pop and return the current smallest
+value, and add the new item.
+
+This is more efficient than heappop() followed by heappush(), and can be
+more appropriate when using a fixed-size heap.  Note that the value
+returned may be larger than item!  That constrains reasonable uses of
+this routine unless written as part of a conditional replacement:
+
+    if item > heap[0]:
+        item = heapreplace(heap, item)
+"""
+    w_heap = check_heap(space, w_heap)
+    if w_heap.length() == 0:
+        raise oefmt(space.w_IndexError, "index out of range")
+    w_returnitem = w_heap.getitem(0)
+    w_heap.setitem(0, w_item)
+    intlist = w_heap.getstorage_int()
+    if intlist is not None:
+        _siftup_int(intlist, 0)
+        return w_returnitem
+    floatlist = w_heap.getstorage_float()
+    if floatlist is not None:
+        _siftup_float(floatlist, 0)
+        return w_returnitem
+    _siftup(space, w_heap, 0)
+    return w_returnitem
+
+def heappushpop(space, w_heap, w_item):
+    """heappushpop(heap, item) -> value. Push item on the heap, then pop and
+return the smallest item from the heap. The combined action runs more
+efficiently than heappush() followed by a separate call to heappop()."""
+    w_heap = check_heap(space, w_heap)
+    return _pushpop(space, w_heap, w_item)
+
+def heapify(space, w_heap):
+    """Transform list into a heap, in-place, in O(len(heap)) time."""
+    w_heap = check_heap(space, w_heap)
+    _heapify(space, w_heap)
+
+@unwrap_spec(n=int)
+def nlargest(space, n, w_iterable):
+    """Find the n largest elements in a dataset.
+
+Equivalent to:  sorted(iterable, reverse=True)[:n]
+"""
+    w_result, w_iter = _first_items(space, n, w_iterable)
+    if w_result.length() == 0:
+        return w_result
+    _heapify(space, w_result)
+    _pushpop_all(space, w_result, w_iter, False)
+    w_result.descr_sort(space, reverse=True)
+    return w_result
+
+@unwrap_spec(n=int)
+def nsmallest(space, n, w_iterable):
+    """Find the n smallest elements in a dataset.
+
+Equivalent to:  sorted(iterable)[:n]
+"""
+    w_result, w_iter = _first_items(space, n, w_iterable)
+    if w_result.length() == 0:
+        return w_result
+    _heapify(space, w_result, max_heap=True)
+    _pushpop_all(space, w_result, w_iter, True)
+    w_result.descr_sort(space)
+    return w_result
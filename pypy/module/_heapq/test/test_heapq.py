@@ -0,0 +1,126 @@
+
+class AppTestHeapq(object):
+    spaceconfig = dict(usemodules=['_heapq'])
+
+    def w_check_invariant(self, heap):
+        for pos in range(1, len(heap)):
+            assert heap[(pos - 1) >> 1] <= heap[pos]
+
+    def test_push_pop(self):
+        from _heapq import heappush, heappop
+        ints = [(i * 7919) % 1009 for i in range(200)]
+        for data in [ints, [x / 7.0 for x in ints], map(str, ints),
+                     [(x % 10, i) for i, x in enumerate(ints)]]:
+            heap = []
+            for item in data:
+                heappush(heap, item)
+                self.check_invariant(heap)
+            results = []
+            while heap:
+                results.append(heappop(heap))
+                self.check_invariant(heap)
+            assert results == sorted(data)
+
+    def test_heapify(self):
+        from _heapq import heapify
+        for size in range(30):
+            ints = [(i * 7919) % 101 for i in range(size)]
+            for heap in [ints, [x / 7.0 for x in ints],
+                         [x * 1L for x in ints]]:
+                heapify(heap)
+                self.check_invariant(heap)
+        raises(TypeError, heapify, None)
+        raises(TypeError, heapify, (1, 2))
+
+    def test_mixed_types(self):
+        from _heapq import heappush, heappop, heapify
+        heap = [5, 3, 8]
+        heapify(heap)
+        heappush(heap, 4.5)
+        heappush(heap, 1L)
+        assert [heappop(heap) for i in range(5)] == [1, 3, 4.5, 5, 8]
+        heap = []
+        heappush(heap, 2.5)
+        heappush(heap, 7)
+        heappush(heap, 1.5)
+        assert heappop(heap) == 1.5
+        assert heap == [2.5, 7]
+
+    def test_replace_pushpop(self):
+        from _heapq import heapreplace, heappushpop
+        heap = [1, 3, 2]
+        assert heapreplace(heap, 5) == 1
+        assert heap == [2, 3, 5]
+        assert heappushpop(heap, 1) == 1
+        assert heappushpop(heap, 4) == 2
+        assert heap == [3, 4, 5]
+        assert heappushpop(heap, 6.5) == 3
+        assert heap == [4, 6.5, 5]
+        assert heappushpop([], 'x') == 'x'
+        raises(IndexError, heapreplace, [], 1)
+
+    def test_errors(self):
+        from _heapq import heappush, heappop, heapreplace, heappushpop
+        raises(TypeError, heappush, None, 1)
+        raises(TypeError, heappop, (1,))
+        raises(TypeError, heapreplace, None, 1)
+        raises(TypeError, heappushpop, None, 1)
+        exc = raises(IndexError, heappop, [])
+        assert str(exc.value) == 'index out of range'
+        raises(TypeError, heappush, [1], 1, 2)
+
+    def test_comparison_fallback(self):
+        from _heapq import heappush, heappop
+        class LE:
+            def __init__(self, x):
+                self.x = x
+            def __le__(self, other):
+                return self.x <= other.x
+        class NewLE(LE, object):
+            pass
+        for cls in [LE, NewLE]:
+            heap = []
+            for x in [5, 2, 7, 1]:
+                heappush(heap, cls(x))
+            assert [heappop(heap).x for i in range(4)] == [1, 2, 5, 7]
+
+    def test_list_changed_size(self):
+        from _heapq import heappush
+        class Evil(object):
+            def __lt__(self, other):
+                del heap[:]
+                return True
+        heap = [Evil(), Evil()]
+        raises((RuntimeError, IndexError), heappush, heap, Evil())
+
+    def test_subclass(self):
+        from _heapq import heappush, heappop
+        class L(list):
+            pass
+        heap = L()
+        for x in [3, 1, 2]:
+            heappush(heap, x)
+        assert [heappop(heap) for i in range(3)] == [1, 2, 3]
+
+    def test_nlargest_nsmallest(self):
+        from _heapq import nlargest, nsmallest
+        ints = [(i * 7919) % 1009 for i in range(200)]
+        for data in [ints, [x / 7.0 for x in ints], map(str, ints),
+                     [(x % 10, i) for i, x in enumerate(ints)]]:
+            assert nlargest(-1, data) == nsmallest(-1, data) == []
+            for n in [0, 1, 5, 199, 200, 500]:
+                assert nlargest(n, data) == sorted(data, reverse=True)[:n]
+                assert nsmallest(n, data) == sorted(data)[:n]
+                assert nsmallest(n, iter(data)) == sorted(data)[:n]
+        assert nsmallest(3, [5, 1.5, 4, 2L, 3]) == [1.5, 2, 3]
+        assert nlargest(2, [5, 1.5, 4, 2L, 3.5]) == [5, 4]
+        raises(TypeError, nlargest, 1, None)
+
+    def test_heapq_module(self):
+        import heapq
+        assert heapq.heappush.__module__ == '_heapq'
+        assert heapq._nsmallest.__module__ == '_heapq'
+        assert heapq.nsmallest(3, [5, 1, 4, 2, 3]) == [1, 2, 3]
+        assert heapq.nsmallest(2, [5, 1, 4], key=lambda x: -x) == [5, 4]
+        assert heapq.nlargest(2, [5, 1, 4, 2, 3]) == [5, 4]
+        assert list(heapq.merge([1, 3], [2, 4])) == [1, 2, 3, 4]
@@ -26,7 +26,7 @@ class State(object):
         self.w_BufferTooShort = space.getattr(w_module, space.newtext("BufferTooShort"))
 
         self.w_picklemodule = space.call_method(
-            w_builtins, '__import__', space.newtext("pickle"))
+            w_builtins, '__import__', space.newtext("cPickle"))
 
 def BufferTooShort(space, w_data):
     w_BufferTooShort = space.fromcache(State).w_BufferTooShort
@@ -0,0 +1,19 @@
+from _pypyjson import StreamDecoder
+
+
+def iterload(f, items=False, chunksize=65536):
+    """Yield the JSON values read from the file-like object 'f', one after the
+    other, without keeping the whole text in memory.
+
+    'f' can contain several documents, concatenated or separated by
+    whitespace or newlines (NDJSON).  If 'items' is true, 'f' must contain a
+    single array instead, and its elements are yielded."""
+    decoder = StreamDecoder(items)
+    while True:
+        chunk = f.read(chunksize)
+        if not chunk:
+            break
+        for value in decoder.feed(chunk):
+            yield value
+    for value in decoder.close():
+        yield value
@@ -78,6 +78,9 @@ class JSONDecoder(W_Root):
         self.w_empty_string = space.newutf8("", 0)
 
         self.s = s
+        # the size of the whole message, which is larger than len(s) if s is
+        # only one piece of it (see interp_stream.py)
+        self.total_size = len(s)
 
         # we put our string in a raw buffer so:
         # 1) we automatically get the '\0' sentinel at the end of the string,
@@ -122,6 +125,26 @@ class JSONDecoder(W_Root):
             if jsonmap.is_state_blocked():
                 self._devolve_jsonmap_dict(w_obj)
 
+    def reuse_caches(self, other):
+        """ Take over the string caches of the decoder 'other', which decoded
+        the previous piece of the same message. """
+        self.cache_keys = other.cache_keys
+        self.cache_values = other.cache_values
+        self.lru_cache = other.lru_cache
+        self.lru_index = other.lru_index
+        self.scratch = other.scratch
+
+    def decode_document(self):
+        """ Decode the whole string, which must contain exactly one value. """
+        w_res = self.decode_any(0)
+        i = self.skip_whitespace(self.pos)
+        if i < len(self.s):
+            start = i
+            end = len(self.s) - 1
+            raise oefmt(self.space.w_ValueError,
+                        "Extra data: char %d - %d", start, end)
+        return w_res
+
     def getslice(self, start, end):
         assert start >= 0
         assert end >= 0
@@ -569,7 +592,7 @@ class JSONDecoder(W_Root):
             contextmap.decoded_strings += 1
             if not contextmap.should_cache_strings():
                 cache = False
-        if len(self.s) < self.MIN_SIZE_FOR_STRING_CACHE:
+        if self.total_size < self.MIN_SIZE_FOR_STRING_CACHE:
             cache = False
 
         if not cache:
@@ -1184,14 +1207,7 @@ def loads(space, w_s):
     s = space.bytes_w(w_s)
     decoder = JSONDecoder(space, s)
     try:
-        w_res = decoder.decode_any(0)
-        i = decoder.skip_whitespace(decoder.pos)
-        if i < len(s):
-            start = i
-            end = len(s) - 1
-            raise oefmt(space.w_ValueError,
-                        "Extra data: char %d - %d", start, end)
-        return w_res
+        return decoder.decode_document()
     finally:
         decoder.close()
 
@@ -1,6 +1,11 @@
+import math
+
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib import rutf8
+from rpython.rlib.rfloat import isfinite
 from pypy.interpreter import unicodehelper
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
 
 
 HEX = '0123456789abcdef'
@@ -45,6 +50,15 @@ def raw_encode_basestring_ascii(space, w_string):
         sb = StringBuilder(len(s))
         first = 0
 
+    _append_escaped_ascii(sb, s, first)
+    res = sb.build()
+    return space.newtext(res)
+
+
+def _append_escaped_ascii(sb, s, first):
+    """Append the utf-8 string 's' to 'sb', escaping everything that is
+    not printable ASCII.  The first 'first' characters are skipped.
+    """
     it = rutf8.Utf8StringIterator(s)
     for i in range(first):
         it.next()
@@ -77,5 +91,335 @@ def raw_encode_basestring_ascii(space, w_string):
                 sb.append(HEX[(s2 >> 4) & 0x0f])
                 sb.append(HEX[s2 & 0x0f])
 
-    res = sb.build()
-    return space.newtext(res)
+
+def _append_escaped(sb, s):
+    """Append the string 's' to 'sb', escaping only the characters that
+    JSON requires to be escaped.  Returns True if 's' contains non-ASCII
+    bytes.
+    """
+    nonascii = False
+    start = 0
+    for i in range(len(s)):
+        c = s[i]
+        if c == '"' or c == '\\':
+            sb.append_slice(s, start, i)
+            sb.append('\\')
+            sb.append(c)
+            start = i + 1
+        elif c < ' ':
+            sb.append_slice(s, start, i)
+            sb.append(ESCAPE_BEFORE_SPACE[ord(c)])
+            start = i + 1
+        elif ord(c) >= 0x80:
+            nonascii = True
+    sb.append_slice(s, start, len(s))
+    return nonascii
+
+
+class JSONEncoder(object):
+    """ Serializes objects into JSON like json.JSONEncoder.encode() does
+    when there is no indent and the encoding is utf-8.
+    """
+
+    def __init__(self, space, skipkeys, ensure_ascii, check_circular,
+                 allow_nan, sort_keys, item_separator, key_separator,
+                 w_default):
+        self.space = space
+        self.skipkeys = skipkeys
+        self.ensure_ascii = ensure_ascii
+        self.allow_nan = allow_nan
+        self.sort_keys = sort_keys
+        self.item_separator = item_separator
+        self.key_separator = key_separator
+        self.w_default = w_default
+        if check_circular:
+            self.markers = {}
+        else:
+            self.markers = None
+        self.builder = StringBuilder()
+        # only used if not ensure_ascii: the result is unicode if any
+        # unicode string was written, which only works if no str written
+        # contains non-ASCII bytes
+        self.has_unicode = False
+        self.w_nonascii_bytes = None
+
+    def encode(self, w_obj):
+        space = self.space
+        self.encode_any(w_obj)
+        res = self.builder.build()
+        if not self.has_unicode:
+            return space.newbytes(res)
+        if self.w_nonascii_bytes is not None:
+            # raises the UnicodeDecodeError that mixing the two would give
+            space.call_method(self.w_nonascii_bytes, 'decode',
+                              space.newtext('ascii'))
+        return space.newutf8(res, rutf8.codepoints_in_utf8(res))
+
+    def encode_any(self, w_obj):
+        space = self.space
+        if space.isinstance_w(w_obj, space.w_bytes):
+            self.write_bytes(space.bytes_w(w_obj), w_obj)
+        elif space.isinstance_w(w_obj, space.w_unicode):
+            self.write_unicode(space.utf8_w(w_obj))
+        elif space.is_w(w_obj, space.w_None):
+            self.builder.append('null')
+        elif space.is_w(w_obj, space.w_True):
+            self.builder.append('true')
+        elif space.is_w(w_obj, space.w_False):
+            self.builder.append('false')
+        elif (space.isinstance_w(w_obj, space.w_int) or
+                space.isinstance_w(w_obj, space.w_long)):
+            self.builder.append(self.intstr(w_obj))
+        elif space.isinstance_w(w_obj, space.w_float):
+            self.builder.append(self.floatstr(space.float_w(w_obj)))
+        elif (space.isinstance_w(w_obj, space.w_list) or
+                space.isinstance_w(w_obj, space.w_tuple)):
+            self.encode_list(w_obj)
+        elif space.isinstance_w(w_obj, space.w_dict):
+            self.encode_dict(w_obj)
+        else:
+            self.mark(w_obj)
+            w_res = space.call_function(self.w_default, w_obj)
+            self.encode_any(w_res)
+            self.unmark(w_obj)
+
+    def write_bytes(self, s, w_string=None):
+        space = self.space
+        self.builder.append('"')
+        if self.ensure_ascii:
+            for i in range(len(s)):
+                if ord(s[i]) >= 0x80:
+                    unicodehelper.check_utf8_or_raise(space, s)
+                    break
+            _append_escaped_ascii(self.builder, s, 0)
+        else:
+            if (_append_escaped(self.builder, s) and
+                    self.w_nonascii_bytes is None):
+                if w_string is None:
+                    w_string = space.newbytes(s)
+                self.w_nonascii_bytes = w_string
+        self.builder.append('"')
+
+    def write_unicode(self, utf8):
+        self.builder.append('"')
+        if self.ensure_ascii:
+            _append_escaped_ascii(self.builder, utf8, 0)
+        else:
+            self.has_unicode = True
+            _append_escaped(self.builder, utf8)
+        self.builder.append('"')
+
+    def intstr(self, w_obj):
+        space = self.space
+        if space.is_w(space.type(w_obj), space.w_int):
+            return str(space.int_w(w_obj))
+        return space.bytes_w(space.str(w_obj))
+
+    def floatstr(self, x):
+        from pypy.objspace.std.floatobject import float_repr
+        if isfinite(x):
+            return float_repr(x)
+        if not self.allow_nan:
+            raise oefmt(self.space.w_ValueError,
+                        "Out of range float values are not JSON "
+                        "compliant: %s", float_repr(x))
+        if math.isnan(x):
+            return 'NaN'
+        elif x > 0.0:
+            return 'Infinity'
+        else:
+            return '-Infinity'
+
+    def mark(self, w_obj):
+        if self.markers is not None:
+            if w_obj in self.markers:
+                raise oefmt(self.space.w_ValueError,
+                            "Circular reference detected")
+            self.markers[w_obj] = None
+
+    def unmark(self, w_obj):
+        if self.markers is not None:
+            del self.markers[w_obj]
+
+    def encode_list(self, w_list):
+        space = self.space
+        # lists with an unboxed strategy are written without boxing
+        intlist = space.listview_int(w_list)
+        if intlist is not None:
+            self.write_list_of_ints(w_list, intlist)
+            return
+        floatlist = space.listview_float(w_list)
+        if floatlist is not None:
+            self.write_list_of_floats(w_list, floatlist)
+            return
+        items_w = space.fixedview(w_list)
+        if not items_w:
+            self.builder.append('[]')
+            return
+        self.mark(w_list)
+        self.builder.append('[')
+        for i in range(len(items_w)):
+            if i > 0:
+                self.builder.append(self.item_separator)
+            self.encode_any(items_w[i])
+        self.builder.append(']')
+        self.unmark(w_list)
+
+    def write_list_of_ints(self, w_list, intlist):
+        if not intlist:
+            self.builder.append('[]')
+            return
+        self.mark(w_list)
+        self.builder.append('[')
+        for i in range(len(intlist)):
+            if i > 0:
+                self.builder.append(self.item_separator)
+            self.builder.append(str(intlist[i]))
+        self.builder.append(']')
+        self.unmark(w_list)
+
+    def write_list_of_floats(self, w_list, floatlist):
+        if not floatlist:
+            self.builder.append('[]')
+            return
+        self.mark(w_list)
+        self.builder.append('[')
+        for i in range(len(floatlist)):
+            if i > 0:
+                self.builder.append(self.item_separator)
+            self.builder.append(self.floatstr(floatlist[i]))
+        self.builder.append(']')
+        self.unmark(w_list)
+
+    def encode_dict(self, w_dict):
+        from pypy.objspace.std.dictmultiobject import W_DictObject
+        space = self.space
+        if type(w_dict) is W_DictObject and not self.sort_keys:
+            # dicts with string keys are written without boxing the keys
+            keys, values_w = w_dict.view_as_kwargs()
+            if keys is not None:
+                self.write_dict_with_bytes_keys(w_dict, keys, values_w)
+                return
+        keys_w, values_w = self.get_items(w_dict)
+        if not keys_w:
+            self.builder.append('{}')
+            return
+        self.mark(w_dict)
+        self.builder.append('{')
+        first = True
+        for i in range(len(keys_w)):
+            w_key = keys_w[i]
+            if (space.isinstance_w(w_key, space.w_bytes) or
+                    space.isinstance_w(w_key, space.w_unicode)):
+                key = None
+            else:
+                key = self.keystr(w_key)
+                if key is None:
+                    continue
+            if first:
+                first = False
+            else:
+                self.builder.append(self.item_separator)
+            if key is None:
+                self.encode_any(w_key)
+            else:
+                self.builder.append('"')
+                self.builder.append(key)
+                self.builder.append('"')
+            self.builder.append(self.key_separator)
+            self.encode_any(values_w[i])
+        self.builder.append('}')
+        self.unmark(w_dict)
+
+    def write_dict_with_bytes_keys(self, w_dict, keys, values_w):
+        if not keys:
+            self.builder.append('{}')
+            return
+        self.mark(w_dict)
+        self.builder.append('{')
+        for i in range(len(keys)):
+            if i > 0:
+                self.builder.append(self.item_separator)
+            self.write_bytes(keys[i])
+            self.builder.append(self.key_separator)
+            self.encode_any(values_w[i])
+        self.builder.append('}')
+        self.unmark(w_dict)
+
+    def get_items(self, w_dict):
+        """ Returns the keys and the values of the dict, in the order
+        d.iteritems() gives them, or sorted by key if 'sort_keys'.
+        """
+        from pypy.objspace.std.dictmultiobject import W_DictObject
+        from pypy.objspace.std.listobject import CustomKeySort, KeyContainer
+        space = self.space
+        keys_w = []
+        values_w = []
+        if type(w_dict) is W_DictObject and not self.sort_keys:
+            iterator = w_dict.iteritems()
+            while True:
+                w_key, w_value = iterator.next_item()
+                if w_key is None:
+                    break
+                keys_w.append(w_key)
+                values_w.append(w_value)
+            return keys_w, values_w
+        if self.sort_keys:
+            w_items = space.call_method(w_dict, 'items')
+        else:
+            w_items = space.call_method(w_dict, 'iteritems')
+        for w_item in space.listview(w_items):
+            w_key, w_value = space.fixedview(w_item, 2)
+            keys_w.append(w_key)
+            values_w.append(w_value)
+        if self.sort_keys and len(keys_w) > 1:
+            sort_list = [KeyContainer(keys_w[i], values_w[i])
+                         for i in range(len(keys_w))]
+            sorter = CustomKeySort(sort_list, len(sort_list))
+            sorter.space = space
+            sorter.w_cmp = None
+            sorter.sort()
+            for i in range(len(sort_list)):
+                container = sort_list[i]
+                assert isinstance(container, KeyContainer)
+                keys_w[i] = container.w_key
+                values_w[i] = container.w_item
+        return keys_w, values_w
+
+    def keystr(self, w_key):
+        """ Returns the string used for a key that is not a string, or None
+        if the key is skipped.
+        """
+        space = self.space
+        if space.isinstance_w(w_key, space.w_float):
+            key = self.floatstr(space.float_w(w_key))
+        elif space.is_w(w_key, space.w_True):
+            key = 'true'
+        elif space.is_w(w_key, space.w_False):
+            key = 'false'
+        elif space.is_w(w_key, space.w_None):
+            key = 'null'
+        elif (space.isinstance_w(w_key, space.w_int) or
+                space.isinstance_w(w_key, space.w_long)):
+            key = self.intstr(w_key)
+        elif self.skipkeys:
+            return None
+        else:
+            raise oefmt(space.w_TypeError, "key %R is not a string", w_key)
+        return key
+
+
+@unwrap_spec(skipkeys=bool, ensure_ascii=bool, check_circular=bool,
+             allow_nan=bool, sort_keys=bool, item_separator='text',
+             key_separator='text')
+def encode(space, w_obj, skipkeys, ensure_ascii, check_circular, allow_nan,
+           sort_keys, item_separator, key_separator, w_default):
+    """encode(obj, skipkeys, ensure_ascii, check_circular, allow_nan,
+              sort_keys, item_separator, key_separator, default)
+
+    Serialize 'obj' to a JSON string like json.JSONEncoder.encode() does
+    without indentation and with the utf-8 encoding."""
+    encoder = JSONEncoder(space, skipkeys, ensure_ascii, check_circular,
+                          allow_nan, sort_keys, item_separator,
+                          key_separator, w_default)
+    return encoder.encode(w_obj)
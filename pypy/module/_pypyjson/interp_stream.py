@@ -0,0 +1,220 @@
+from rpython.rlib.rstring import StringBuilder
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef
+from pypy.module._pypyjson.interp_decoder import JSONDecoder, is_whitespace
+
+
+def ends_scalar(ch):
+    return (is_whitespace(ch) or ch == ',' or ch == ']' or ch == '}' or
+            ch == '[' or ch == '{' or ch == '"')
+
+
+class W_StreamDecoder(W_Root):
+    """ Decodes a stream of JSON text that is fed in chunks of any size.
+
+    The stream is split into units without decoding it: either the
+    top-level values of a stream of concatenated or newline-delimited
+    documents, or, with 'items', the elements of a single top-level
+    array.  Every unit is decoded as soon as it is complete, so only the
+    text of the current unit is kept in memory.  The string caches are
+    passed from one unit to the next, until they hold more than
+    MAX_CACHED_STRINGS strings, and the maps of the decoded dicts are
+    shared anyway.
+    """
+
+    # the caches are dropped when they grow larger than this, otherwise a
+    # long stream of distinct keys would keep all of them alive
+    MAX_CACHED_STRINGS = 4096
+
+    def __init__(self, space, items):
+        self.space = space
+        self.items = items
+        # the depth of the brackets around the units: 1 for the array
+        # around the items, 0 otherwise
+        self.base_depth = 1 if items else 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.in_scalar = False
+        self.in_unit = False
+        # the beginnings of the current unit, from previous chunks
+        self.pieces = StringBuilder()
+        # the number of bytes in the chunks fed before the current one
+        self.offset = 0
+        # only for 'items'
+        self.array_start = -1
+        self.array_done = False
+        self.need_comma = False
+        self.num_items = 0
+        self.last_decoder = None
+
+    @unwrap_spec(items=bool)
+    def descr__new__(space, w_subtype, items=False):
+        return W_StreamDecoder(space, items)
+
+    def descr_feed(self, space, w_chunk):
+        """feed(chunk) -> list
+
+        Feed the next chunk of the JSON text and return the values that are
+        complete now."""
+        if space.isinstance_w(w_chunk, space.w_unicode):
+            raise oefmt(space.w_TypeError,
+                        "Expected utf8-encoded str, got unicode")
+        chunk = space.bytes_w(w_chunk)
+        values_w = []
+        start = 0
+        if self.in_unit:
+            start = -1     # the unit started in an earlier chunk
+        i = 0
+        while i < len(chunk):
+            ch = chunk[i]
+            if self.in_unit:
+                end = self.scan_unit(ch, i)
+                if end < 0:
+                    i += 1
+                    continue
+                values_w.append(self.decode_unit(chunk, start, end))
+                if end == i:
+                    continue    # a scalar ended, look at 'ch' again
+            else:
+                self.scan_between_units(ch, i)
+                if self.in_unit:
+                    start = i
+            i += 1
+        if self.in_unit:
+            if start < 0:
+                self.pieces.append(chunk)
+            else:
+                self.pieces.append_slice(chunk, start, len(chunk))
+        self.offset += len(chunk)
+        return space.newlist(values_w)
+
+    def scan_unit(self, ch, i):
+        """ Scans the character 'ch' at index 'i' of a unit.  Returns the
+        index of the end of the unit, if 'ch' ends it, or -1. """
+        if self.in_string:
+            if self.escaped:
+                self.escaped = False
+            elif ch == '\\':
+                self.escaped = True
+            elif ch == '"':
+                self.in_string = False
+                if self.depth == self.base_depth:
+                    return i + 1
+            return -1
+        if self.in_scalar:
+            if ends_scalar(ch):
+                return i
+            return -1
+        if ch == '"':
+            self.in_string = True
+        elif ch == '[' or ch == '{':
+            self.depth += 1
+        elif ch == ']' or ch == '}':
+            self.depth -= 1
+            if self.depth == self.base_depth:
+                return i + 1
+        return -1
+
+    def scan_between_units(self, ch, i):
+        """ Scans the character 'ch' at index 'i', which is outside of any
+        unit. """
+        if is_whitespace(ch):
+            return
+        if self.items:
+            if self.array_done:
+                raise oefmt(self.space.w_ValueError,
+                            "Extra data: char %d", self.offset + i)
+            if self.array_start < 0:
+                if ch != '[':
+                    raise oefmt(self.space.w_ValueError,
+                                "Expected '[' at char %d", self.offset + i)
+                self.array_start = self.offset + i
+                self.depth = 1
+                return
+            if ch == ']' and (self.need_comma or self.num_items == 0):
+                self.array_done = True
+                self.depth = 0
+                return
+            if ch == ',' and self.need_comma:
+                self.need_comma = False
+                return
+            if self.need_comma or ch == ',' or ch == ']':
+                raise oefmt(self.space.w_ValueError,
+                            "Unexpected '%s' when decoding array (char %d)",
+                            ch, self.offset + i)
+        self.in_unit = True
+        if ch == '"':
+            self.in_string = True
+        elif ch == '[' or ch == '{':
+            self.depth += 1
+        else:
+            self.in_scalar = True
+
+    def decode_unit(self, chunk, start, end):
+        """ Decodes the unit that ends at index 'end' of 'chunk', and
+        started at index 'start' or in an earlier chunk if 'start' is -1.
+        """
+        if start < 0:
+            self.pieces.append_slice(chunk, 0, end)
+            s = self.pieces.build()
+            self.pieces = StringBuilder()
+        else:
+            assert end >= start
+            s = chunk[start:end]
+        self.in_unit = False
+        self.in_scalar = False
+        if self.items:
+            self.need_comma = True
+            self.num_items += 1
+        return self.decode_string(s)
+
+    def decode_string(self, s):
+        decoder = JSONDecoder(self.space, s)
+        last = self.last_decoder
+        if (last is not None and
+                len(last.cache_keys) + len(last.cache_values) <=
+                    self.MAX_CACHED_STRINGS):
+            decoder.reuse_caches(last)
+        decoder.total_size += self.offset
+        try:
+            w_res = decoder.decode_document()
+        finally:
+            decoder.close()
+        self.last_decoder = decoder
+        return w_res
+
+    def descr_close(self, space):
+        """close() -> list
+
+        Signal the end of the JSON text and return the values that are
+        complete now.  Raises ValueError if the text ends in the middle of
+        a value."""
+        values_w = []
+        if self.in_unit:
+            # a scalar at the very end, or an error
+            s = self.pieces.build()
+            self.pieces = StringBuilder()
+            self.in_unit = False
+            values_w.append(self.decode_string(s))
+            if self.items:
+                self.need_comma = True
+                self.num_items += 1
+        if self.items and not self.array_done:
+            if self.array_start < 0:
+                raise oefmt(space.w_ValueError,
+                            "No JSON array could be decoded")
+            raise oefmt(space.w_ValueError,
+                        "Unterminated array starting at char %d",
+                        self.array_start)
+        return space.newlist(values_w)
+
+
+W_StreamDecoder.typedef = TypeDef("_pypyjson.StreamDecoder",
+    __new__ = interp2app(W_StreamDecoder.descr__new__.im_func),
+    feed = interp2app(W_StreamDecoder.descr_feed),
+    close = interp2app(W_StreamDecoder.descr_close),
+)
+W_StreamDecoder.typedef.acceptable_as_base_class = False
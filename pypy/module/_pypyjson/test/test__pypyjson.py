@@ -120,6 +120,36 @@ class TestJson(object):
             assert w_z is w_y
             dec.close()
 
+    def test_reuse_caches(self):
+        dec1 = JSONDecoder(self.space, '"abc" "abc"')
+        dec1.MIN_SIZE_FOR_STRING_CACHE = 0
+        dec1.decode_string(1)
+        w_x = dec1.decode_string(dec1.skip_whitespace(dec1.pos) + 1)
+        dec1.close()
+        dec2 = JSONDecoder(self.space, '"abc"')
+        dec2.reuse_caches(dec1)
+        dec2.total_size += 11
+        assert dec2.total_size == 16
+        dec2.MIN_SIZE_FOR_STRING_CACHE = 16
+        assert dec2.decode_document() is w_x
+        dec2.close()
+
+    def test_stream_decoder_caches_bounded(self):
+        from pypy.module._pypyjson.interp_stream import W_StreamDecoder
+        space = self.space
+        dec = W_StreamDecoder(space, False)
+        dec.MAX_CACHED_STRINGS = 50
+        sizes = []
+        for i in range(300):
+            chunk = '{"key%d": "value%d"} "value%d" ' % (i, i, i)
+            dec.descr_feed(space, space.newbytes(chunk))
+            last = dec.last_decoder
+            sizes.append(len(last.cache_keys) + len(last.cache_values))
+        assert max(sizes) <= 51
+        assert 0 < sizes[-1]
+        # the caches are still passed on while they are small
+        assert sizes[10] == 11
+
     def _make_some_maps(self):
         # base -> m1 -> m2 -> m3
         #                \-> m4
@@ -274,7 +304,7 @@ class TestJson(object):
 
 
 class AppTest(object):
-    spaceconfig = {"objspace.usemodules._pypyjson": True}
+    spaceconfig = {"usemodules": ['_pypyjson', 'struct', '_sre']}
 
     def test_raise_on_unicode(self):
         import _pypyjson
@@ -513,6 +543,129 @@ class AppTest(object):
         assert check("\\\"\b\f\n\r\t") == '\\\\\\"\\b\\f\\n\\r\\t'
         assert check("\x07") == "\\u0007"
 
+    def test_encode(self):
+        import _pypyjson
+        def default(o):
+            raise TypeError(repr(o) + " is not JSON serializable")
+        def encode(o, skipkeys=False, ensure_ascii=True, check_circular=True,
+                   allow_nan=True, sort_keys=False, separators=(', ', ': '),
+                   default=default):
+            return _pypyjson.encode(o, skipkeys, ensure_ascii,
+                                    check_circular, allow_nan, sort_keys,
+                                    separators[0], separators[1], default)
+        assert encode(None) == 'null'
+        assert encode(True) == 'true'
+        assert encode(False) == 'false'
+        assert encode(42) == '42'
+        assert encode(-2 ** 100) == str(-2 ** 100)
+        assert encode(1.5) == '1.5'
+        assert encode(1e100) == '1e+100'
+        assert encode(float('nan')) == 'NaN'
+        assert encode([float('inf'), -float('inf')]) == '[Infinity, -Infinity]'
+        exc = raises(ValueError, encode, [float('nan')], allow_nan=False)
+        assert str(exc.value) == (
+            "Out of range float values are not JSON compliant: nan")
+        assert encode("a\"b\\c\n\x01") == '"a\\"b\\\\c\\n\\u0001"'
+        assert encode(u"\xe4\U00012345") == '"\\u00e4\\ud808\\udf45"'
+        raises(UnicodeDecodeError, encode, "\xc0")
+        assert encode([]) == '[]'
+        assert encode(()) == '[]'
+        assert encode({}) == '{}'
+        assert encode([1, 2, 3]) == '[1, 2, 3]'
+        assert encode([1.5, 2.5]) == '[1.5, 2.5]'
+        assert encode([1, "a", u"b", None, [{}]]) == (
+            '[1, "a", "b", null, [{}]]')
+        assert encode((1, (2,))) == '[1, [2]]'
+        assert encode([1, [2]], separators=(',', ':')) == '[1,[2]]'
+        assert encode({"a": 1}) == '{"a": 1}'
+        assert encode({"a": [1, {"b": None}]}, separators=(',', ':')) == (
+            '{"a":[1,{"b":null}]}')
+        assert encode({u"\xe4": 1}) == '{"\\u00e4": 1}'
+        assert encode({2: 2, 1.5: 2, True: 3, None: 4},
+                      sort_keys=True) == (
+            '{"null": 4, "true": 3, "1.5": 2, "2": 2}')
+        assert encode({"b": 1, "a": 2, "c": 3}, sort_keys=True) == (
+            '{"a": 2, "b": 1, "c": 3}')
+        exc = raises(TypeError, encode, {(1,): 2})
+        assert str(exc.value) == "key (1,) is not a string"
+        assert encode({(1,): 2, "a": 3}, skipkeys=True) == '{"a": 3}'
+
+    def test_encode_not_ensure_ascii(self):
+        import _pypyjson
+        def encode(o):
+            return _pypyjson.encode(o, False, False, True, True, False,
+                                    ', ', ': ', None)
+        res = encode(["a\n", "\xc3\xa4"])
+        assert res == '["a\\n", "\xc3\xa4"]'
+        assert type(res) is str
+        res = encode({u"\xe4": u"\u1234\""})
+        assert res == u'{"\xe4": "\u1234\\""}'
+        assert type(res) is unicode
+        res = encode(["a", u"b"])
+        assert res == u'["a", "b"]'
+        assert type(res) is unicode
+        raises(UnicodeDecodeError, encode, ["\xc3\xa4", u"b"])
+
+    def test_encode_default_and_circular(self):
+        import _pypyjson
+        class A(object):
+            pass
+        def default(o):
+            if isinstance(o, A):
+                return ["A"]
+            raise TypeError("nope")
+        def encode(o, check_circular=True):
+            return _pypyjson.encode(o, False, True, check_circular, True,
+                                    False, ', ', ': ', default)
+        assert encode([A(), {"a": A()}]) == '[["A"], {"a": ["A"]}]'
+        raises(TypeError, encode, [object()])
+        l = [1]
+        l.append(l)
+        exc = raises(ValueError, encode, l)
+        assert str(exc.value) == "Circular reference detected"
+        d = {}
+        d["x"] = [d]
+        raises(ValueError, encode, d)
+        a = A()
+        def default(o):
+            return [o]
+        exc = raises(ValueError, _pypyjson.encode, a, False, True, True,
+                     True, False, ', ', ': ', default)
+        assert str(exc.value) == "Circular reference detected"
+        shared = [1]
+        assert encode([shared, shared]) == '[[1], [1]]'
+
+    def test_encode_subclasses(self):
+        import _pypyjson
+        class MyInt(int):
+            def __str__(self):
+                return "7"
+        class MyFloat(float):
+            def __repr__(self):
+                return "nope"
+        class MyList(list):
+            def __iter__(self):
+                return iter([1, 2])
+        class MyDict(dict):
+            def iteritems(self):
+                return iter([("x", 1)])
+        def encode(o):
+            return _pypyjson.encode(o, False, True, True, True, False,
+                                    ', ', ': ', None)
+        assert encode([MyInt(3), MyFloat(1.5)]) == '[7, 1.5]'
+        assert encode(MyList([5])) == '[1, 2]'
+        assert encode(MyDict(a=5)) == '{"x": 1}'
+
+    def test_json_encoder_uses_encode(self):
+        import json
+        data = {"a": [1, 2.5, None, True], "b": {"c": u"\xe4"}}
+        assert json.dumps(data, sort_keys=True) == (
+            '{"a": [1, 2.5, null, true], "b": {"c": "\\u00e4"}}')
+        assert json.dumps(data, sort_keys=True, indent=1) == (
+            '{\n "a": [\n  1, \n  2.5, \n  null, \n  true\n ], \n'
+            ' "b": {\n  "c": "\\u00e4"\n }\n}')
+        assert json.dumps(set([1]), default=list) == '[1]'
+
     def test_error_position(self):
         import _pypyjson
         test_cases = [
@@ -541,3 +694,55 @@ class AppTest(object):
         a = '{"abc": "4", "k": 1, "k": 1.5, "c": null, "k": 2}'
         d = _pypyjson.loads(a)
         assert d == {u"abc": u"4", u"c": None, u"k": 2}
+
+    def test_stream_decoder(self):
+        import _pypyjson
+        text = '{"a": [1, "x]"]} 12 "s\\"}" \n[true, {}]\nnull 1.5'
+        expected = [{u"a": [1, u"x]"]}, 12, u's"}', [True, {}], None, 1.5]
+        for size in [1, 2, 3, 7, len(text)]:
+            dec = _pypyjson.StreamDecoder()
+            res = []
+            for i in range(0, len(text), size):
+                res.extend(dec.feed(text[i:i + size]))
+            res.extend(dec.close())
+            assert res == expected
+
+    def test_stream_decoder_items(self):
+        import _pypyjson
+        text = ' [1, {"b": [2, 3]}, "]", -4 , [] ] '
+        expected = [1, {u"b": [2, 3]}, u"]", -4, []]
+        for size in [1, 2, 5, len(text)]:
+            dec = _pypyjson.StreamDecoder(items=True)
+            res = []
+            for i in range(0, len(text), size):
+                res.extend(dec.feed(text[i:i + size]))
+            res.extend(dec.close())
+            assert res == expected
+        dec = _pypyjson.StreamDecoder(items=True)
+        assert dec.feed('[]') == []
+        assert dec.close() == []
+
+    def test_stream_decoder_errors(self):
+        import _pypyjson
+        raises(ValueError, _pypyjson.StreamDecoder(items=True).feed, '{')
+        raises(ValueError, _pypyjson.StreamDecoder(items=True).feed, '[1 2]')
+        raises(ValueError, _pypyjson.StreamDecoder(items=True).feed, '[1,,2]')
+        raises(ValueError, _pypyjson.StreamDecoder(items=True).feed, '[1] 2')
+        dec = _pypyjson.StreamDecoder(items=True)
+        assert dec.feed('[1, 2') == [1]
+        raises(ValueError, dec.close)
+        dec = _pypyjson.StreamDecoder()
+        assert dec.feed('{"a": 1} {"b":') == [{u"a": 1}]
+        raises(ValueError, dec.close)
+        raises(ValueError, _pypyjson.StreamDecoder().feed, '{"a" 1}')
+        raises(TypeError, _pypyjson.StreamDecoder().feed, u'1')
+
+    def test_iterload(self):
+        import _pypyjson
+        from StringIO import StringIO
+        f = StringIO('{"id": 1}\n{"id": 2}\n{"id": 3}\n')
+        res = list(_pypyjson.iterload(f, chunksize=4))
+        assert res == [{u"id": 1}, {u"id": 2}, {u"id": 3}]
+        f = StringIO('[{"id": 1}, {"id": 2}]')
+        res = list(_pypyjson.iterload(f, items=True, chunksize=3))
+        assert res == [{u"id": 1}, {u"id": 2}]
@@ -58,6 +58,7 @@ class GcStats(object):
                      'peak_memory', 'peak_allocated_memory', 'total_arena_memory',
                      'total_rawmalloced_memory', 'nursery_size',
                      'peak_arena_memory', 'peak_rawmalloced_memory',
+                     'trimmed_arena_memory',
                      ):
             setattr(self, item, self._format(getattr(self._s, item)))
         self.memory_used_sum = self._format(self._s.total_gc_memory + self._s.total_memory_pressure +
@@ -88,7 +89,7 @@ class GcStats(object):
 
     Total memory allocated:
     GC allocated:            %s (peak: %s)
-       in arenas:            %s
+       in arenas:            %s (returned to the OS: %s)
        rawmalloced:          %s
        nursery:              %s
     raw assembler allocated: %s%s
@@ -105,7 +106,7 @@ class GcStats(object):
            self.memory_used_sum,
 
            self.total_allocated_memory, self.peak_allocated_memory,
-              self.peak_arena_memory,
+              self.peak_arena_memory, self.trimmed_arena_memory,
               self.peak_rawmalloced_memory,
               self.nursery_size,
            self.jit_backend_allocated,
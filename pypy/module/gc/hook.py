@@ -44,7 +44,7 @@ class LowLevelGcHooks(GcHooks):
         action.pinned_objects = pinned_objects
         action.fire()
 
-    def on_gc_collect_step(self, duration, oldstate, newstate):
+    def on_gc_collect_step(self, duration, oldstate, newstate, time_limited):
         action = self.w_hooks.gc_collect_step
         action.count += 1
         action.duration += duration
@@ -52,6 +52,8 @@ class LowLevelGcHooks(GcHooks):
         action.duration_max = max(action.duration_max, duration)
         action.oldstate = oldstate
         action.newstate = newstate
+        if time_limited:
+            action.time_limited += 1
         action.fire()
 
     def on_gc_collect(self, num_major_collects,
@@ -185,6 +187,7 @@ class GcCollectStepHookAction(NoRecursiveAction):
         self.duration = 0.0
         self.duration_min = inf
         self.duration_max = 0.0
+        self.time_limited = 0
 
     def fix_annotation(self):
         # the annotation of the class and its attributes must be completed
@@ -197,6 +200,7 @@ class GcCollectStepHookAction(NoRecursiveAction):
             self.duration_max = NonConstant(-53.2)
             self.oldstate = NonConstant(-42)
             self.newstate = NonConstant(-42)
+            self.time_limited = NonConstant(-42)
             self.fire()
 
     def _do_perform(self, ec, frame):
@@ -207,7 +211,8 @@ class GcCollectStepHookAction(NoRecursiveAction):
             self.duration_max,
             self.oldstate,
             self.newstate,
-            rgc.is_done__states(self.oldstate, self.newstate))
+            rgc.is_done__states(self.oldstate, self.newstate),
+            self.time_limited)
         self.reset()
         self.space.call_function(self.w_callable, w_stats)
 
@@ -289,7 +294,7 @@ class W_GcCollectStepStats(W_Root):
     GC_STATES = tuple(incminimark.GC_STATES + ['USERDEL'])
 
     def __init__(self, count, duration, duration_min, duration_max,
-                 oldstate, newstate, major_is_done):
+                 oldstate, newstate, major_is_done, time_limited=0):
         self.count = count
         self.duration = duration
         self.duration_min = duration_min
@@ -297,6 +302,7 @@ class W_GcCollectStepStats(W_Root):
         self.oldstate = oldstate
         self.newstate = newstate
         self.major_is_done = major_is_done
+        self.time_limited = time_limited
 
 
 class W_GcCollectStats(W_Root):
@@ -373,7 +379,8 @@ W_GcCollectStepStats.typedef = TypeDef(
         "duration_min",
         "duration_max",
         "oldstate",
-        "newstate"))
+        "newstate",
+        "time_limited"))
     )
 
 W_GcCollectStats.typedef = TypeDef(
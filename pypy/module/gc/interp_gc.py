@@ -135,6 +135,32 @@ def collect_step(space):
     w_stats = sc.do()
     return w_stats
 
+def freeze(space):
+    """
+    Run a full collection, then move all the objects that survive into a
+    permanent generation: they are never freed, and the GC does not touch
+    them any more.  Call it before fork() to keep the memory of the
+    objects shared with the child processes.
+    """
+    if not rgc.freeze_heap():
+        raise oefmt(space.w_RuntimeError,
+                    "cannot freeze the heap while objects are pinned")
+    _run_finalizers(space)
+
+def get_freeze_count(space):
+    """
+    Return the number of objects in the permanent generation.
+    """
+    return space.newint(rgc.get_stats(rgc.FROZEN_OBJECTS))
+
+def trim_free_memory(space):
+    """
+    Return to the OS the memory of the free pages kept by the GC, without
+    waiting for them to stay unused for PYPY_GC_TRIM_AFTER major
+    collections.  Return the number of bytes returned to the OS.
+    """
+    return space.newint(rgc.trim_free_memory())
+
 # ____________________________________________________________
 
 @unwrap_spec(filename='fsencode')
@@ -23,6 +23,9 @@ class Module(MixedModule):
                 })
             self.interpleveldefs.update({
                 'collect_step': 'interp_gc.collect_step',
+                'trim_free_memory': 'interp_gc.trim_free_memory',
+                'freeze': 'interp_gc.freeze',
+                'get_freeze_count': 'interp_gc.get_freeze_count',
                 'get_rpy_roots': 'referents.get_rpy_roots',
                 'get_rpy_referents': 'referents.get_rpy_referents',
                 'get_rpy_memory_usage': 'referents.get_rpy_memory_usage',
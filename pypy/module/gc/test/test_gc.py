@@ -119,6 +119,18 @@ class AppTestGC(object):
         assert n >= 2 # at least one step + 1 finalizing
         assert X.deleted == 3
 
+    def test_freeze(self):
+        import gc
+        l = [[i] for i in range(100)]
+        gc.freeze()
+        gc.collect()
+        assert l[42] == [42]
+
+    def test_trim_free_memory(self):
+        import gc
+        res = gc.trim_free_memory()
+        assert isinstance(res, int) and res >= 0
+
 class AppTestGcDumpHeap(object):
     pytestmark = py.test.mark.xfail(run=False)
 
@@ -16,9 +16,11 @@ class AppTestGcHooks(object):
         def fire_gc_minor(space, duration, total_memory_used, pinned_objects):
             gchooks.fire_gc_minor(duration, total_memory_used, pinned_objects)
 
-        @unwrap_spec(ObjSpace, int, int, int)
-        def fire_gc_collect_step(space, duration, oldstate, newstate):
-            gchooks.fire_gc_collect_step(duration, oldstate, newstate)
+        @unwrap_spec(ObjSpace, int, int, int, int)
+        def fire_gc_collect_step(space, duration, oldstate, newstate,
+                                 time_limited=0):
+            gchooks.fire_gc_collect_step(duration, oldstate, newstate,
+                                         bool(time_limited))
 
         @unwrap_spec(ObjSpace, int, int, int, r_uint, r_uint, r_uint, r_uint)
         def fire_gc_collect(space, a, b, c, d, e, f, g):
@@ -28,9 +30,9 @@ class AppTestGcHooks(object):
         def fire_many(space):
             gchooks.fire_gc_minor(5.0, 0, 0)
             gchooks.fire_gc_minor(7.0, 0, 0)
-            gchooks.fire_gc_collect_step(5.0, 0, 0)
-            gchooks.fire_gc_collect_step(15.0, 0, 0)
-            gchooks.fire_gc_collect_step(22.0, 0, 0)
+            gchooks.fire_gc_collect_step(5.0, 0, 0, True)
+            gchooks.fire_gc_collect_step(15.0, 0, 0, False)
+            gchooks.fire_gc_collect_step(22.0, 0, 0, True)
             gchooks.fire_gc_collect(1, 2, 3, 4, 5, 6, 7)
 
         cls.w_fire_gc_minor = space.wrap(interp2app(fire_gc_minor))
@@ -79,13 +81,16 @@ class AppTestGcHooks(object):
                         stats.duration,
                         stats.oldstate,
                         stats.newstate,
-                        stats.major_is_done))
+                        stats.major_is_done,
+                        stats.time_limited))
         gc.hooks.on_gc_collect_step = on_gc_collect_step
         self.fire_gc_collect_step(10, SCANNING, MARKING)
         self.fire_gc_collect_step(40, FINALIZING, SCANNING)
+        self.fire_gc_collect_step(50, MARKING, MARKING, 1)
         assert lst == [
-            (1, 10, SCANNING, MARKING, False),
-            (1, 40, FINALIZING, SCANNING, True),
+            (1, 10, SCANNING, MARKING, False, 0),
+            (1, 40, FINALIZING, SCANNING, True, 0),
+            (1, 50, MARKING, MARKING, False, 1),
             ]
         #
         gc.hooks.on_gc_collect_step = None
@@ -144,7 +149,8 @@ class AppTestGcHooks(object):
 
             def on_gc_collect_step(self, stats):
                 self.steps.append((stats.count, stats.duration,
-                                   stats.duration_min, stats.duration_max))
+                                   stats.duration_min, stats.duration_max,
+                                   stats.time_limited))
 
             on_gc_collect = None
 
@@ -152,7 +158,7 @@ class AppTestGcHooks(object):
         gc.hooks.set(myhooks)
         self.fire_many()
         assert myhooks.minors == [(2, 12, 5, 7)]
-        assert myhooks.steps == [(3, 42, 5, 22)]
+        assert myhooks.steps == [(3, 42, 5, 22, 2)]
 
     def test_clear_queue(self):
         import gc
@@ -249,6 +249,17 @@ def trace_next_iteration(space, next_instr, is_being_profiled, w_pycode):
         'pypyjit', r_uint(next_instr), int(is_being_profiled), ll_pycode)
     return space.w_None
 
+@unwrap_spec(next_instr=int, is_being_profiled=bool, w_pycode=PyCode)
+@dont_look_inside
+def trace_on_first_entry(space, next_instr, is_being_profiled, w_pycode):
+    """ Start tracing the next time this position is reached, without
+    waiting for the counters to reach the JIT thresholds
+    """
+    ll_pycode = cast_instance_to_gcref(w_pycode)
+    jit_hooks.trace_on_first_entry(
+        'pypyjit', r_uint(next_instr), int(is_being_profiled), ll_pycode)
+    return space.w_None
+
 @unwrap_spec(hash=r_uint)
 @dont_look_inside
 def trace_next_iteration_hash(space, hash):
@@ -35,16 +35,21 @@ def wrap_greenkey(space, jitdriver, greenkey, greenkey_repr):
         return space.w_None
     jitdriver_name = jitdriver.name
     if jitdriver_name == 'pypyjit':
-        next_instr = greenkey[0].getint()
-        is_being_profiled = greenkey[1].getint()
-        ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
-                                         greenkey[2].getref_base())
-        pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+        next_instr, is_being_profiled, pycode = unwrap_pypyjit_greenkey(
+            greenkey)
         return space.newtuple([pycode, space.newint(next_instr),
                                space.newbool(bool(is_being_profiled))])
     else:
         return space.newtext(greenkey_repr)
 
+def unwrap_pypyjit_greenkey(greenkey):
+    next_instr = greenkey[0].getint()
+    is_being_profiled = greenkey[1].getint()
+    ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
+                                     greenkey[2].getref_base())
+    pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+    return next_instr, is_being_profiled, pycode
+
 @unwrap_spec(operations=bool)
 def set_compile_hook(space, w_hook, operations=True):
     """ set_compile_hook(hook, operations=True)
@@ -397,6 +402,16 @@ def get_stats_asmmemmgr(space):
     m2 = jit_hooks.stats_asmmemmgr_used(None)
     return space.newtuple2(space.newint(m1), space.newint(m2))
 
+def get_stats_memmgr(space):
+    """Returns information about the loops kept alive by the JIT, as a
+    tuple (number_of_loops, machine_code_size, number_of_loops_evicted).
+    Loops are evicted when the 'code_memory_limit' parameter is exceeded."""
+    n = jit_hooks.stats_memmgr_alive_loops(None)
+    size = jit_hooks.stats_memmgr_code_size(None)
+    evicted = jit_hooks.stats_memmgr_evicted(None)
+    return space.newtuple([space.newint(n), space.newint(size),
+                           space.newint(evicted)])
+
 def enable_debug(space):
     """ Set the jit debugging - completely necessary for some stats to work,
     most notably assembler counters.
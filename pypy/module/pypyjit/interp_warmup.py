@@ -0,0 +1,296 @@
+""" Warm-restart cache and hotness profiles for the JIT.
+
+Compiled machine code cannot be reused by another process: the traces
+refer to the addresses of prebuilt and GC objects, and their descrs only
+make sense in the process that created them.  What we can remember is
+*where* the JIT decided to compile loops.  When the cache is enabled, the
+greenkey of every compiled loop is recorded together with an identity of
+its code object, and the list is written to the cache directory at exit.
+On the next start, when a code object with the same identity is created,
+its recorded positions are marked with jit_hooks.trace_on_first_entry(),
+so that they are traced as soon as they are reached instead of after
+counting up to the thresholds again.  The code objects that already exist
+when the cache is enabled are found by walking the heap once.
+
+A hotness profile is the same information, dumped to and loaded from an
+explicit file.  The positions of a loaded profile are marked with
+jit_hooks.mark_as_hot() instead: they are traced after counting up to the
+lower 'profile_threshold'.
+"""
+
+import os
+
+from rpython.rlib import jit_hooks, rgc
+from rpython.rlib.jit import dont_look_inside
+from rpython.rlib.objectmodel import specialize
+from rpython.rlib.rarithmetic import r_uint, intmask
+from rpython.rlib.rstring import StringBuilder
+from rpython.rtyper.annlowlevel import cast_instance_to_gcref
+from pypy.interpreter.error import oefmt, wrap_oserror
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.pycode import PyCode
+
+CACHE_FILENAME = 'pypyjit-warmup.txt'
+
+
+class Position(object):
+    """A position in a code object where loops were compiled.  'count' is
+    the number of loops compiled there, which is a measure of how hot it is.
+    If 'eager' is true, the position is traced on first entry; otherwise it
+    is only counted with the lower 'profile_threshold'."""
+
+    def __init__(self, next_instr, is_being_profiled, count, eager):
+        self.next_instr = next_instr
+        self.is_being_profiled = is_being_profiled
+        self.count = count
+        self.eager = eager
+
+
+class WarmupCache(object):
+    def __init__(self, space):
+        self.space = space
+        self.dirname = None
+        self.recording = False
+        # code key -> list of Positions, read from the cache file or from
+        # a hotness profile, and not yet matched with a code object
+        self.pending = {}
+        # code key -> list of Positions, to be saved
+        self.entries = {}
+
+    def is_enabled(self):
+        return self.recording
+
+    def add_entry(self, key, next_instr, is_being_profiled, count=1):
+        lst = self.entries.get(key, None)
+        if lst is None:
+            lst = []
+            self.entries[key] = lst
+        for position in lst:
+            if (position.next_instr == next_instr and
+                    position.is_being_profiled == is_being_profiled):
+                position.count += count
+                return
+        lst.append(Position(next_instr, is_being_profiled, count, False))
+
+    def code_created(self, pycode):
+        key = code_key(pycode)
+        lst = self.pending.get(key, None)
+        if lst is None:
+            return
+        del self.pending[key]
+        for position in lst:
+            if 0 <= position.next_instr < len(pycode.co_code):
+                if position.eager:
+                    trace_on_first_entry(pycode, position.next_instr,
+                                         position.is_being_profiled)
+                else:
+                    mark_as_hot(pycode, position.next_instr,
+                                position.is_being_profiled)
+                self.add_entry(key, position.next_instr,
+                               position.is_being_profiled, position.count)
+
+    def match_existing_code(self):
+        """Call code_created() on the code objects that already exist."""
+        if not _can_walk_heap(self.space):
+            return
+        if not self.pending or not rgc.has_gcflag_extra():
+            return
+        for pycode in rgc.do_get_objects(try_cast_gcref_to_pycode):
+            self.code_created(pycode)
+            if not self.pending:
+                break
+
+    def loop_compiled(self, greenkey):
+        from pypy.module.pypyjit.interp_resop import unwrap_pypyjit_greenkey
+        next_instr, is_being_profiled, pycode = unwrap_pypyjit_greenkey(
+            greenkey)
+        self.add_entry(code_key(pycode), next_instr, is_being_profiled)
+
+    def load(self, data, eager):
+        for line in data.split('\n'):
+            parts = line.split('\t', 3)
+            if len(parts) != 4:
+                continue
+            try:
+                next_instr = int(parts[0])
+                is_being_profiled = int(parts[1])
+                count = int(parts[2])
+            except ValueError:
+                continue
+            key = parts[3]
+            lst = self.pending.get(key, None)
+            if lst is None:
+                lst = []
+                self.pending[key] = lst
+            lst.append(Position(next_instr, is_being_profiled, count, eager))
+
+    def dump(self):
+        builder = StringBuilder()
+        _dump_positions(builder, self.entries)
+        # entries loaded from a previous run whose code was not seen yet
+        _dump_positions(builder, self.pending)
+        return builder.build()
+
+    def get_filename(self):
+        return os.path.join(self.dirname, CACHE_FILENAME)
+
+    def save(self):
+        if self.dirname is None:
+            return
+        _write_file(self.get_filename(), self.dump())
+
+
+def _dump_positions(builder, positions):
+    for key, lst in positions.items():
+        for position in lst:
+            builder.append('%d\t%d\t%d\t%s\n' % (position.next_instr,
+                                                 position.is_being_profiled,
+                                                 position.count, key))
+
+def code_key(pycode):
+    """Identify a code object across processes: a checksum of the
+    bytecode, and the location where it was defined."""
+    x = r_uint(2166136261)
+    for c in pycode.co_code:
+        x = (x ^ r_uint(ord(c))) * r_uint(16777619)
+    x &= r_uint(0xFFFFFFFF)
+    name = pycode.co_name.replace('\t', ' ').replace('\n', ' ')
+    filename = pycode.co_filename.replace('\t', ' ').replace('\n', ' ')
+    return '%x:%d:%s:%s' % (intmask(x), pycode.co_firstlineno, name, filename)
+
+@specialize.memo()
+def _can_walk_heap(space):
+    # hack: the fake objspace doesn't know about the attributes of PyCode
+    return not hasattr(space, 'is_fake_objspace')
+
+def try_cast_gcref_to_pycode(gcref):
+    return rgc.try_cast_gcref_to_instance(PyCode, gcref)
+
+@dont_look_inside
+def trace_on_first_entry(pycode, next_instr, is_being_profiled):
+    ll_pycode = cast_instance_to_gcref(pycode)
+    jit_hooks.trace_on_first_entry(
+        'pypyjit', r_uint(next_instr), is_being_profiled, ll_pycode)
+
+@dont_look_inside
+def mark_as_hot(pycode, next_instr, is_being_profiled):
+    ll_pycode = cast_instance_to_gcref(pycode)
+    jit_hooks.mark_as_hot(
+        'pypyjit', r_uint(next_instr), is_being_profiled, ll_pycode)
+
+
+def _init_warmup(pycode):
+    cache = pycode.space.fromcache(WarmupCache)
+    if cache.pending:
+        cache.code_created(pycode)
+
+PyCode._init_warmup = _init_warmup
+
+
+def _read_file(filename):
+    fd = os.open(filename, os.O_RDONLY, 0)
+    try:
+        builder = StringBuilder()
+        while True:
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            builder.append(data)
+    finally:
+        os.close(fd)
+    return builder.build()
+
+def _write_file(filename, data):
+    tmpname = filename + '.tmp'
+    fd = os.open(tmpname, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0666)
+    try:
+        while data:
+            count = os.write(fd, data)
+            data = data[count:]
+    finally:
+        os.close(fd)
+    os.rename(tmpname, filename)
+
+@unwrap_spec(dirname='fsencode')
+def enable_warmup_cache(space, dirname):
+    """ enable_warmup_cache(dirname)
+
+    Enable the warm-restart cache stored in the directory 'dirname'.
+    The positions where loops were compiled by previous runs are loaded
+    from there, and are traced as soon as they are reached again in this
+    process.  The loops compiled by this process are recorded and written
+    back to the directory at exit, or by save_warmup_cache().
+    """
+    cache = space.fromcache(WarmupCache)
+    if cache.dirname is not None:
+        raise oefmt(space.w_ValueError, "the warmup cache is already enabled")
+    if not os.path.isdir(dirname):
+        raise oefmt(space.w_ValueError, "not a directory: '%s'", dirname)
+    cache.dirname = dirname
+    cache.recording = True
+    filename = cache.get_filename()
+    if os.path.exists(filename):
+        try:
+            data = _read_file(filename)
+        except OSError as e:
+            raise wrap_oserror(space, e, filename)
+        cache.load(data, eager=True)
+        cache.match_existing_code()
+
+def save_warmup_cache(space):
+    """ save_warmup_cache()
+
+    Write the warm-restart cache to its directory now.  This is done
+    automatically at exit.
+    """
+    cache = space.fromcache(WarmupCache)
+    if cache.dirname is None:
+        raise oefmt(space.w_ValueError, "the warmup cache is not enabled")
+    try:
+        cache.save()
+    except OSError as e:
+        raise wrap_oserror(space, e, cache.get_filename())
+
+def record_hotness_profile(space):
+    """ record_hotness_profile()
+
+    Start recording the places where loops are compiled, for
+    dump_hotness_profile().  Also enabled by enable_warmup_cache().
+    """
+    space.fromcache(WarmupCache).recording = True
+
+@unwrap_spec(filename='fsencode')
+def dump_hotness_profile(space, filename):
+    """ dump_hotness_profile(filename)
+
+    Write the hotness profile to the given file: the places where loops
+    were compiled since record_hotness_profile() was called, with the
+    number of loops compiled at each place, plus the places of the
+    profiles loaded by load_hotness_profile() that were not reached.
+    """
+    cache = space.fromcache(WarmupCache)
+    if not cache.recording:
+        raise oefmt(space.w_ValueError,
+                    "the hotness profile is not being recorded")
+    try:
+        _write_file(filename, cache.dump())
+    except OSError as e:
+        raise wrap_oserror(space, e, filename)
+
+@unwrap_spec(filename='fsencode')
+def load_hotness_profile(space, filename):
+    """ load_hotness_profile(filename)
+
+    Load a hotness profile written by dump_hotness_profile().  The places
+    it lists are known to be hot: in their code objects, which may already
+    exist or be created later, these places are counted with the
+    'profile_threshold' JIT parameter instead of the normal thresholds.
+    Code that is not in the profile keeps the normal thresholds.
+    """
+    cache = space.fromcache(WarmupCache)
+    try:
+        data = _read_file(filename)
+    except OSError as e:
+        raise wrap_oserror(space, e, filename)
+    cache.load(data, eager=False)
+    cache.match_existing_code()
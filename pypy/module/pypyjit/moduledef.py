@@ -14,11 +14,18 @@ class Module(MixedModule):
         'trace_next_iteration': 'interp_jit.trace_next_iteration',
         'trace_next_iteration_hash': 'interp_jit.trace_next_iteration_hash',
         'releaseall': 'interp_jit.releaseall',
+        'trace_on_first_entry': 'interp_jit.trace_on_first_entry',
+        'enable_warmup_cache': 'interp_warmup.enable_warmup_cache',
+        'save_warmup_cache': 'interp_warmup.save_warmup_cache',
+        'record_hotness_profile': 'interp_warmup.record_hotness_profile',
+        'dump_hotness_profile': 'interp_warmup.dump_hotness_profile',
+        'load_hotness_profile': 'interp_warmup.load_hotness_profile',
         'set_compile_hook': 'interp_resop.set_compile_hook',
         'set_abort_hook': 'interp_resop.set_abort_hook',
         'set_trace_too_long_hook': 'interp_resop.set_trace_too_long_hook',
         'get_stats_snapshot': 'interp_resop.get_stats_snapshot',
         'get_stats_asmmemmgr': 'interp_resop.get_stats_asmmemmgr',
+        'get_stats_memmgr': 'interp_resop.get_stats_memmgr',
         # those things are disabled because they have bugs, but if
         # they're found to be useful, fix test_ztranslation_jit_stats
         # in the backend first. get_stats_snapshot still produces
@@ -36,6 +43,7 @@ class Module(MixedModule):
         # force the __extend__ hacks to occur early
         from pypy.module.pypyjit.interp_jit import pypyjitdriver
         from pypy.module.pypyjit.hooks import pypy_hooks
+        from pypy.module.pypyjit import interp_warmup   # PyCode._init_warmup
         # add the 'defaults' attribute
         from rpython.rlib.jit import PARAMETERS
         space = self.space
@@ -43,3 +51,10 @@ class Module(MixedModule):
         w_obj = space.wrap(PARAMETERS)
         space.setattr(self, space.newtext('defaults'), w_obj)
         pypy_hooks.space = space
+
+    def shutdown(self, space):
+        from pypy.module.pypyjit.interp_warmup import WarmupCache
+        try:
+            space.fromcache(WarmupCache).save()
+        except OSError:
+            pass    # ignore errors at exit
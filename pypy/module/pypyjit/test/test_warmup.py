@@ -0,0 +1,163 @@
+import py
+from pypy.interpreter.gateway import interp2app
+from pypy.interpreter.pycode import PyCode
+from rpython.jit.metainterp.history import JitCellToken, ConstInt, ConstPtr
+from rpython.rtyper.annlowlevel import cast_instance_to_base_ptr
+from rpython.rtyper.lltypesystem import lltype, llmemory
+from rpython.rlib import rgc
+from rpython.rlib.jit import JitDebugInfo
+from pypy.module.pypyjit.interp_jit import pypyjitdriver
+from pypy.module.pypyjit.hooks import pypy_hooks
+from pypy.module.pypyjit import interp_warmup
+
+
+class MockJitDriverSD(object):
+    jitdriver = pypyjitdriver
+
+
+class AppTestWarmupCache(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+        space = cls.space
+        traced = []
+
+        def interp_on_compile(w_code, next_instr):
+            ll_code = cast_instance_to_base_ptr(w_code)
+            code_gcref = lltype.cast_opaque_ptr(llmemory.GCREF, ll_code)
+            greenkey = [ConstInt(next_instr), ConstInt(0),
+                        ConstPtr(code_gcref)]
+            di_loop = JitDebugInfo(MockJitDriverSD, None, JitCellToken(),
+                                   [], 'loop', greenkey)
+            if pypy_hooks.are_hooks_enabled():
+                pypy_hooks.after_compile(di_loop)
+
+        def interp_get_traced():
+            return space.newlist([space.newtuple([pycode,
+                                                  space.newint(next_instr),
+                                                  space.newtext(how)])
+                                  for pycode, next_instr, how in traced])
+
+        def interp_reset():
+            cache = space.fromcache(interp_warmup.WarmupCache)
+            cache.__init__(space)
+            del traced[:]
+            del roots[:]
+
+        def trace_on_first_entry(pycode, next_instr, is_being_profiled):
+            traced.append((pycode, next_instr, 'eager'))
+
+        def mark_as_hot(pycode, next_instr, is_being_profiled):
+            traced.append((pycode, next_instr, 'hot'))
+
+        # the heap seen by match_existing_code(): only these objects
+        roots = []
+        def interp_add_root(w_obj):
+            roots.append(w_obj)
+
+        cls.roots = roots
+        cls.orig_get_rpy_roots = rgc.get_rpy_roots
+        rgc.get_rpy_roots = lambda: map(rgc._GcRef, roots) + [rgc.NULL_GCREF]
+        cls.orig_trace_on_first_entry = interp_warmup.trace_on_first_entry
+        cls.orig_mark_as_hot = interp_warmup.mark_as_hot
+        interp_warmup.trace_on_first_entry = trace_on_first_entry
+        interp_warmup.mark_as_hot = mark_as_hot
+        cls.w_on_compile = space.wrap(interp2app(interp_on_compile,
+                                                 unwrap_spec=[PyCode, int]))
+        cls.w_get_traced = space.wrap(interp2app(interp_get_traced))
+        cls.w_reset = space.wrap(interp2app(interp_reset))
+        cls.w_add_root = space.wrap(interp2app(interp_add_root))
+        cls.w_tmpdir = space.wrap(str(py.test.ensuretemp('pypyjit_warmup')))
+
+    def teardown_class(cls):
+        rgc.get_rpy_roots = cls.orig_get_rpy_roots
+        interp_warmup.trace_on_first_entry = cls.orig_trace_on_first_entry
+        interp_warmup.mark_as_hot = cls.orig_mark_as_hot
+
+    def test_enable_errors(self):
+        import pypyjit, os
+        self.reset()
+        raises(ValueError, pypyjit.save_warmup_cache)
+        raises(ValueError, pypyjit.enable_warmup_cache,
+               os.path.join(self.tmpdir, 'does-not-exist'))
+        pypyjit.enable_warmup_cache(self.tmpdir)
+        raises(ValueError, pypyjit.enable_warmup_cache, self.tmpdir)
+
+    def test_save_and_reload(self):
+        import pypyjit, os
+        self.reset()
+        src = "def f(n):\n    while n > 0:\n        n -= 1\n"
+        filename = os.path.join(self.tmpdir, 'pypyjit-warmup.txt')
+        if os.path.exists(filename):
+            os.unlink(filename)
+        pypyjit.enable_warmup_cache(self.tmpdir)
+        code = compile(src, 'foo.py', 'exec').co_consts[0]
+        self.on_compile(code, 3)
+        self.on_compile(code, 3)
+        pypyjit.save_warmup_cache()
+        with open(filename) as f:
+            lines = f.readlines()
+        assert len(lines) == 1
+        assert lines[0].startswith('3\t0\t2\t')
+        assert lines[0].rstrip().endswith(':1:f:foo.py')
+        #
+        # simulate a new process
+        self.reset()
+        pypyjit.enable_warmup_cache(self.tmpdir)
+        compile(src.replace('n -= 1', 'n = n - 1'), 'foo.py', 'exec')
+        assert self.get_traced() == []
+        code2 = compile(src, 'foo.py', 'exec').co_consts[0]
+        assert self.get_traced() == [(code2, 3, 'eager')]
+        # only the first code object with this identity is marked
+        compile(src, 'foo.py', 'exec')
+        assert self.get_traced() == [(code2, 3, 'eager')]
+        pypyjit.save_warmup_cache()
+        with open(filename) as f:
+            assert f.readlines() == lines
+
+    def test_code_created_before_enabling(self):
+        import pypyjit, os
+        self.reset()
+        src = "def h(n):\n    while n > 0:\n        n -= 1\n"
+        filename = os.path.join(self.tmpdir, 'pypyjit-warmup.txt')
+        if os.path.exists(filename):
+            os.unlink(filename)
+        pypyjit.enable_warmup_cache(self.tmpdir)
+        code = compile(src, 'baz.py', 'exec').co_consts[0]
+        self.on_compile(code, 3)
+        pypyjit.save_warmup_cache()
+        #
+        # simulate a new process, where the code object is created
+        # before the cache is enabled
+        self.reset()
+        code2 = compile(src, 'baz.py', 'exec').co_consts[0]
+        other = compile(src, 'other.py', 'exec').co_consts[0]
+        self.add_root([other, (code2,)])
+        assert self.get_traced() == []
+        pypyjit.enable_warmup_cache(self.tmpdir)
+        assert self.get_traced() == [(code2, 3, 'eager')]
+
+    def test_hotness_profile(self):
+        import pypyjit, os
+        self.reset()
+        src = "def g(n):\n    while n > 0:\n        n -= 1\n"
+        filename = os.path.join(self.tmpdir, 'profile.txt')
+        raises(ValueError, pypyjit.dump_hotness_profile, filename)
+        pypyjit.record_hotness_profile()
+        code = compile(src, 'bar.py', 'exec').co_consts[0]
+        self.on_compile(code, 3)
+        pypyjit.dump_hotness_profile(filename)
+        with open(filename) as f:
+            data = f.read()
+        assert data.startswith('3\t0\t1\t')
+        assert data.endswith(':1:g:bar.py\n')
+        #
+        # simulate a new process
+        self.reset()
+        pypyjit.load_hotness_profile(filename)
+        code2 = compile(src, 'bar.py', 'exec').co_consts[0]
+        assert self.get_traced() == [(code2, 3, 'hot')]
+        raises(OSError, pypyjit.load_hotness_profile,
+               os.path.join(self.tmpdir, 'does-not-exist'))
@@ -11,9 +11,11 @@ like: (on the left, without the new bytecodes; on the right, with them)
 """
 
 from pypy.interpreter import function
+from pypy.interpreter.module import Module
 from rpython.rlib import jit
 from pypy.objspace.std.mapdict import LOOKUP_METHOD_mapdict, \
     LOOKUP_METHOD_mapdict_fill_cache_method
+from pypy.objspace.std.celldict import LOAD_ATTR_module_cached
 
 
 # This module exports two extra methods for StdObjSpaceFrame implementing
@@ -38,6 +40,13 @@ def LOOKUP_METHOD(f, nameindex, *ignored):
         # mapdict has an extra-fast version of this function
         if LOOKUP_METHOD_mapdict(f, nameindex, w_obj):
             return
+        # and modules use the cells of the module dict for the common case
+        #   module.function(args..)
+        if isinstance(w_obj, Module):
+            f.pushvalue(LOAD_ATTR_module_cached(f.getcode(), w_obj,
+                                                nameindex))
+            f.pushvalue_none()
+            return
 
     w_name = f.getname_w(nameindex)
     w_value = None
@@ -149,12 +149,19 @@ class ModuleDictStrategy(DictStrategy):
 
     def clear(self, w_dict):
         self.unerase(w_dict.dstorage).clear()
+        if self.caches is not None:
+            for cache in self.caches.itervalues():
+                cache.cell = None
         self.mutated()
 
     def popitem(self, w_dict):
         space = self.space
         d = self.unerase(w_dict.dstorage)
         key, cell = d.popitem()
+        if self.caches:
+            cache = self.caches.get(key, None)
+            if cache:
+                cache.cell = None
         self.mutated()
         return _wrapkey(space, key), unwrap_cell(self.space, cell)
 
@@ -325,3 +332,54 @@ def STORE_GLOBAL_cached(self, nameindex, next_instr):
             assert cache.valid and cache.ref is not None
             pycode._globals_caches[nameindex] = cache.ref
 
+
+
+# ____________________________________________________________
+# caching of module attributes, e.g. 'os.path' or 'string.join(...)'
+
+class ModuleAttrCache(object):
+    """A per-instruction cache for LOAD_ATTR and LOOKUP_METHOD on a module:
+    the GlobalCache of the attribute in the dict of that module."""
+
+    def __init__(self, w_dict, cache):
+        self.dict_wref = weakref.ref(w_dict)
+        self.cache_ref = cache.ref
+
+def LOAD_ATTR_module_cached(pycode, w_module, nameindex):
+    # not used if we_are_jitted()
+    caches = pycode._module_attr_caches
+    if caches is not None:
+        entry = caches[nameindex]
+        if entry is not None and entry.dict_wref() is w_module.w_dict:
+            cache = entry.cache_ref()
+            if cache is not None:
+                w_value = cache.getvalue(pycode.space)
+                if w_value is not None:
+                    return w_value
+    return _load_attr_module_slowpath(pycode, w_module, nameindex)
+
+@objectmodel.dont_inline
+def _load_attr_module_slowpath(pycode, w_module, nameindex):
+    space = pycode.space
+    w_name = pycode.co_names_w[nameindex]
+    if space._side_effects_ok():
+        _fill_module_attr_cache(space, pycode, w_module, nameindex,
+                                space.text_w(w_name))
+    return space.getattr(w_module, w_name)
+
+def _fill_module_attr_cache(space, pycode, w_module, nameindex, name):
+    from pypy.interpreter.module import Module
+    w_type = space.type(w_module)
+    if w_type is not space.gettypeobject(Module.typedef):
+        return      # a subclass of 'module', may override __getattribute__
+    if w_type.lookup(name) is not None:
+        return      # '__dict__', '__doc__', ...: not just a dict lookup
+    w_dict = w_module.w_dict
+    if not isinstance(w_dict, W_ModuleDictObject):
+        return
+    cache = w_dict.get_global_cache(name)
+    if cache is None:
+        return
+    if pycode._module_attr_caches is None:
+        pycode._module_attr_caches = [None] * len(pycode.co_names_w)
+    pycode._module_attr_caches[nameindex] = ModuleAttrCache(w_dict, cache)
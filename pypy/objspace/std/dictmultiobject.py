@@ -1,5 +1,7 @@
 """The builtin dict implementation"""
 
+import math
+
 from rpython.rlib import jit, rerased, objectmodel, rutf8
 from rpython.rlib.debug import mark_dict_non_null
 from rpython.rlib.objectmodel import newlist_hint, r_dict, specialize
@@ -12,6 +14,7 @@ from pypy.interpreter.gateway import (
 from pypy.interpreter.mixedmodule import MixedModule
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.typedef import TypeDef
+from pypy.objspace.std.floatobject import int_to_float_key
 from pypy.objspace.std.util import negate
 
 
@@ -412,6 +415,7 @@ def _add_indirections():
                     length w_keys values items \
                     iterkeys itervalues iteritems \
                     listview_bytes listview_ascii listview_int \
+                    listview_float \
                     view_as_kwargs".split()
 
     def make_method(method):
@@ -617,6 +621,9 @@ class DictStrategy(object):
     def listview_int(self, w_dict):
         return None
 
+    def listview_float(self, w_dict):
+        return None
+
     def view_as_kwargs(self, w_dict):
         return (None, None)
 
@@ -721,25 +728,56 @@ class EmptyDictStrategy(DictStrategy):
         w_type = self.space.type(w_key)
         if self.space.is_w(w_type, self.space.w_int):
             self.switch_to_int_strategy(w_dict)
+        elif (self.space.is_w(w_type, self.space.w_float) and
+                not math.isnan(self.space.float_w(w_key))):
+            self.switch_to_float_strategy(w_dict)
         elif w_type.compares_by_identity():
             self.switch_to_identity_strategy(w_dict)
+        elif self.space.is_w(w_type, self.space.w_tuple):
+            self.switch_to_pair_strategy(w_dict, w_key)
         else:
             self.switch_to_object_strategy(w_dict)
 
     def switch_to_bytes_strategy(self, w_dict):
-        strategy = self.space.fromcache(BytesDictStrategy)
+        if self.space.config.objspace.std.withsharedkeydicts:
+            from pypy.objspace.std.sharedkeydict import (
+                get_empty_shared_key_strategy)
+            strategy = get_empty_shared_key_strategy(self.space)
+        elif self.space.config.objspace.std.withsmalldicts:
+            from pypy.objspace.std.smalldict import SmallBytesDictStrategy
+            strategy = self.space.fromcache(SmallBytesDictStrategy)
+        else:
+            strategy = self.space.fromcache(BytesDictStrategy)
         storage = strategy.get_empty_storage()
         w_dict.set_strategy(strategy)
         w_dict.dstorage = storage
 
     def switch_to_unicode_strategy(self, w_dict):
-        strategy = self.space.fromcache(UnicodeDictStrategy)
+        if self.space.config.objspace.std.withsmalldicts:
+            from pypy.objspace.std.smalldict import SmallUnicodeDictStrategy
+            strategy = self.space.fromcache(SmallUnicodeDictStrategy)
+        else:
+            strategy = self.space.fromcache(UnicodeDictStrategy)
         storage = strategy.get_empty_storage()
         w_dict.set_strategy(strategy)
         w_dict.dstorage = storage
 
     def switch_to_int_strategy(self, w_dict):
-        strategy = self.space.fromcache(IntDictStrategy)
+        if self.space.config.objspace.std.withsmalldicts:
+            from pypy.objspace.std.smalldict import SmallIntDictStrategy
+            strategy = self.space.fromcache(SmallIntDictStrategy)
+        else:
+            strategy = self.space.fromcache(IntDictStrategy)
+        storage = strategy.get_empty_storage()
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = storage
+
+    def switch_to_float_strategy(self, w_dict):
+        if self.space.config.objspace.std.withsmalldicts:
+            from pypy.objspace.std.smalldict import SmallFloatDictStrategy
+            strategy = self.space.fromcache(SmallFloatDictStrategy)
+        else:
+            strategy = self.space.fromcache(FloatDictStrategy)
         storage = strategy.get_empty_storage()
         w_dict.set_strategy(strategy)
         w_dict.dstorage = storage
@@ -751,6 +789,15 @@ class EmptyDictStrategy(DictStrategy):
         w_dict.set_strategy(strategy)
         w_dict.dstorage = storage
 
+    def switch_to_pair_strategy(self, w_dict, w_key):
+        from pypy.objspace.std.pairdict import get_pair_strategy
+        strategy = get_pair_strategy(self.space, w_key)
+        if strategy is None:
+            strategy = self.space.fromcache(ObjectDictStrategy)
+        storage = strategy.get_empty_storage()
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = storage
+
     def switch_to_object_strategy(self, w_dict):
         strategy = self.space.fromcache(ObjectDictStrategy)
         storage = strategy.get_empty_storage()
@@ -1391,6 +1438,87 @@ class IntDictStrategy(AbstractTypedStrategy, DictStrategy):
 create_iterator_classes(IntDictStrategy)
 
 
+class FloatDictStrategy(AbstractTypedStrategy, DictStrategy):
+    """Strategy for dicts whose keys are all floats.  NaN keys are not
+    allowed: a NaN is only equal to itself, by identity, which is lost
+    when the key is unwrapped.  0.0 and -0.0 are equal, and the key that
+    is kept is the first one inserted, like with the object strategy.
+    Ints can be looked up without switching to the object strategy,
+    because they are equal to the float of the same value."""
+
+    erase, unerase = rerased.new_erasing_pair("float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        return self.space.newfloat(unwrapped)
+
+    def unwrap(self, wrapped):
+        return self.space.float_w(wrapped)
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return (space.is_w(space.type(w_obj), space.w_float) and
+                not math.isnan(space.float_w(w_obj)))
+
+    def _never_equal_to(self, w_lookup_type):
+        space = self.space
+        return (space.is_w(w_lookup_type, space.w_NoneType) or
+                space.is_w(w_lookup_type, space.w_bytes) or
+                space.is_w(w_lookup_type, space.w_unicode)
+                )
+
+    def _is_lookup_type(self, w_key):
+        space = self.space
+        w_type = space.type(w_key)
+        return (space.is_w(w_type, space.w_float) or
+                space.is_w(w_type, space.w_int))
+
+    def _lookup_key(self, w_key):
+        # NaN is never found, which is what we want: it is not equal to
+        # any of the keys
+        space = self.space
+        if space.is_w(space.type(w_key), space.w_int):
+            return int_to_float_key(space.int_w(w_key))
+        return space.float_w(w_key)
+
+    def getitem(self, w_dict, w_key):
+        if self._is_lookup_type(w_key):
+            d = self.unerase(w_dict.dstorage)
+            return d.get(self._lookup_key(w_key), None)
+        return AbstractTypedStrategy.getitem(self, w_dict, w_key)
+
+    def delitem(self, w_dict, w_key):
+        if self._is_lookup_type(w_key):
+            del self.unerase(w_dict.dstorage)[self._lookup_key(w_key)]
+            return
+        AbstractTypedStrategy.delitem(self, w_dict, w_key)
+
+    def pop(self, w_dict, w_key, w_default):
+        if self._is_lookup_type(w_key):
+            key = self._lookup_key(w_key)
+            d = self.unerase(w_dict.dstorage)
+            if w_default is None:
+                return d.pop(key)
+            else:
+                return d.pop(key, w_default)
+        return AbstractTypedStrategy.pop(self, w_dict, w_key, w_default)
+
+    def listview_float(self, w_dict):
+        return self.unerase(w_dict.dstorage).keys()
+
+    def wrapkey(space, key):
+        return space.newfloat(key)
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_float(self.listview_float(w_dict))
+
+create_iterator_classes(FloatDictStrategy)
+
+
 def update1(space, w_dict, w_data):
     if isinstance(w_data, W_DictMultiObject):    # optimization case only
         update1_dict_dict(space, w_dict, w_data)
@@ -755,6 +755,18 @@ def _hash_float(space, v):
     return x
 
 
+def int_to_float_key(intval):
+    """Return the float that is equal to the int 'intval', or NaN if
+    there is none.  Used by the float strategies of dicts and sets to look
+    up ints: NaN is not equal to any of their keys."""
+    floatval = float(intval)
+    # (double-)floats have always at least 48 bits of precision
+    if LONG_BIT > 32 and not int_between(-1, intval >> 48, 1):
+        if not rbigint.fromfloat(floatval).eq(rbigint.fromint(intval)):
+            return NAN
+    return floatval
+
+
 def _divmod_w(space, w_float1, w_float2):
     x = w_float1.floatval
     y = w_float2.floatval
@@ -15,8 +15,9 @@ from rpython.rlib import debug, jit, rerased, rutf8
 from rpython.rlib.listsort import make_timsort_class
 from rpython.rlib.objectmodel import (
     import_from_mixin, instantiate, newlist_hint, resizelist_hint, specialize)
-from rpython.rlib.rarithmetic import ovfcheck
+from rpython.rlib.rarithmetic import LONG_BIT, ovfcheck, widen
 from rpython.rlib import longlong2float
+from rpython.rtyper.lltypesystem import rffi
 from rpython.tool.sourcetools import func_with_new_name
 from rpython.rlib.rstring import StringBuilder
 
@@ -69,6 +70,36 @@ def make_empty_list_with_size(space, hint):
     return W_ListObject.from_storage_and_strategy(space, storage, strategy)
 
 
+def _get_int_range(list_i):
+    # the range always includes 0, which doesn't matter: 0 fits everywhere
+    minval = maxval = 0
+    for intval in list_i:
+        if intval < minval:
+            minval = intval
+        elif intval > maxval:
+            maxval = intval
+    return minval, maxval
+
+def get_integer_strategy(space, minval, maxval):
+    """Return the strategy that stores ints between minval and maxval in
+    the smallest amount of memory."""
+    if space.config.objspace.std.withnarrowintlists:
+        if Int8ListStrategy.MIN <= minval and maxval <= Int8ListStrategy.MAX:
+            return space.fromcache(Int8ListStrategy)
+        if Int16ListStrategy.MIN <= minval and maxval <= Int16ListStrategy.MAX:
+            return space.fromcache(Int16ListStrategy)
+        if (LONG_BIT > 32 and Int32ListStrategy.MIN <= minval and
+                maxval <= Int32ListStrategy.MAX):
+            return space.fromcache(Int32ListStrategy)
+    return space.fromcache(IntegerListStrategy)
+
+def get_integer_strategy_for_list_int(space, list_i):
+    if space.config.objspace.std.withnarrowintlists:
+        minval, maxval = _get_int_range(list_i)
+        return get_integer_strategy(space, minval, maxval)
+    return space.fromcache(IntegerListStrategy)
+
+
 @jit.look_inside_iff(lambda space, list_w, sizehint:
         jit.loop_unrolling_heuristic(list_w, len(list_w), UNROLL_CUTOFF))
 def get_strategy_from_list_objects(space, list_w, sizehint):
@@ -88,6 +119,15 @@ def get_strategy_from_list_objects(space, list_w, sizehint):
                 check_int_or_float = (type(w_obj) is W_FloatObject)
                 break
         else:
+            if space.config.objspace.std.withnarrowintlists:
+                minval = maxval = space.int_w(w_firstobj)
+                for i in range(1, len(list_w)):
+                    intval = space.int_w(list_w[i])
+                    if intval < minval:
+                        minval = intval
+                    elif intval > maxval:
+                        maxval = intval
+                return get_integer_strategy(space, minval, maxval)
             return space.fromcache(IntegerListStrategy)
 
     elif type(w_firstobj) is W_BytesObject:
@@ -98,14 +138,19 @@ def get_strategy_from_list_objects(space, list_w, sizehint):
         else:
             return space.fromcache(BytesListStrategy)
 
-    elif type(w_firstobj) is W_UnicodeObject and w_firstobj.is_ascii():
-        # check for all-unicodes containing only ascii
+    elif type(w_firstobj) is W_UnicodeObject:
+        # check for all-unicodes, and if they contain only ascii
+        is_ascii = w_firstobj.is_ascii()
         for i in range(1, len(list_w)):
             item = list_w[i]
-            if type(item) is not W_UnicodeObject or not item.is_ascii():
+            if type(item) is not W_UnicodeObject:
                 break
+            if not item.is_ascii():
+                is_ascii = False
         else:
-            return space.fromcache(AsciiListStrategy)
+            if is_ascii:
+                return space.fromcache(AsciiListStrategy)
+            return space.fromcache(Utf8ListStrategy)
 
     elif type(w_firstobj) is W_FloatObject:
         # check for all-floats
@@ -384,6 +429,11 @@ class W_ListObject(W_Root):
         not use the list strategy, return None."""
         return self.strategy.getitems_ascii(self)
 
+    def getitems_utf8(self):
+        """Return the items in the list as utf8-encoded strings, if the list
+        uses the ascii or utf8 strategy, and None otherwise."""
+        return self.strategy.getitems_utf8(self)
+
     def getitems_int(self):
         """Return the items in the list as unwrapped ints. If the list does not
         use the list strategy, return None."""
@@ -393,6 +443,23 @@ class W_ListObject(W_Root):
         """Return the items in the list as unwrapped floats. If the list does not
         use the list strategy, return None."""
         return self.strategy.getitems_float(self)
+
+    def getstorage_int(self):
+        """Return the storage of the list as a list of unwrapped ints, if the
+        list uses the IntegerListStrategy, and None otherwise. Unlike
+        getitems_int() the result is never a copy: modifying it in-place
+        modifies the list."""
+        if self.strategy is self.space.fromcache(IntegerListStrategy):
+            return IntegerListStrategy.unerase(self.lstorage)
+        return None
+
+    def getstorage_float(self):
+        """Return the storage of the list as a list of unwrapped floats, if
+        the list uses the FloatListStrategy, and None otherwise. Modifying the
+        result in-place modifies the list."""
+        if self.strategy is self.space.fromcache(FloatListStrategy):
+            return FloatListStrategy.unerase(self.lstorage)
+        return None
     # ___________________________________________________
 
     def mul(self, times):
@@ -862,6 +929,11 @@ class ListStrategy(object):
     def init_from_list_w(self, w_list, list_w):
         raise NotImplementedError
 
+    def init_from_list_int(self, w_list, list_i):
+        """Initializes the storage from a list of unwrapped ints. Only for
+        the integer strategies."""
+        raise NotImplementedError
+
     def clone(self, w_list):
         raise NotImplementedError
 
@@ -911,6 +983,9 @@ class ListStrategy(object):
     def getitems_ascii(self, w_list):
         return None
 
+    def getitems_utf8(self, w_list):
+        return None
+
     def getitems_int(self, w_list):
         return None
 
@@ -1086,11 +1161,14 @@ class EmptyListStrategy(ListStrategy):
 
     def switch_to_correct_strategy(self, w_list, w_item):
         if type(w_item) is W_IntObject:
-            strategy = self.space.fromcache(IntegerListStrategy)
+            intval = self.space.int_w(w_item)
+            strategy = get_integer_strategy(self.space, intval, intval)
         elif type(w_item) is W_BytesObject:
             strategy = self.space.fromcache(BytesListStrategy)
         elif type(w_item) is W_UnicodeObject and w_item.is_ascii():
             strategy = self.space.fromcache(AsciiListStrategy)
+        elif type(w_item) is W_UnicodeObject:
+            strategy = self.space.fromcache(Utf8ListStrategy)
         elif type(w_item) is W_FloatObject:
             strategy = self.space.fromcache(FloatListStrategy)
         else:
@@ -1151,8 +1229,9 @@ class EmptyListStrategy(ListStrategy):
 
         intlist = space.unpackiterable_int(w_iterable)
         if intlist is not None:
-            w_list.strategy = strategy = space.fromcache(IntegerListStrategy)
-            w_list.lstorage = strategy.erase(intlist)
+            strategy = get_integer_strategy_for_list_int(space, intlist)
+            w_list.strategy = strategy
+            strategy.init_from_list_int(w_list, intlist)
             return
 
         floatlist = space.unpackiterable_float(w_iterable)
@@ -1894,11 +1973,15 @@ class IntegerListStrategy(ListStrategy):
     def getitems_int(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    def init_from_list_int(self, w_list, list_i):
+        w_list.lstorage = self.erase(list_i)
+
 
     _base_extend_from_list = _extend_from_list
 
     def _extend_from_list(self, w_list, w_other):
-        if isinstance(w_other.strategy, BaseRangeListStrategy):
+        if (isinstance(w_other.strategy, BaseRangeListStrategy) or
+            isinstance(w_other.strategy, BaseNarrowIntegerListStrategy)):
             l = self.unerase(w_list.lstorage)
             other = w_other.getitems_int()
             assert other is not None
@@ -1915,7 +1998,8 @@ class IntegerListStrategy(ListStrategy):
     _base_setslice = setslice
 
     def setslice(self, w_list, start, step, slicelength, w_other):
-        if w_other.strategy is self.space.fromcache(RangeListStrategy):
+        if (w_other.strategy is self.space.fromcache(RangeListStrategy) or
+            isinstance(w_other.strategy, BaseNarrowIntegerListStrategy)):
             storage = self.erase(w_other.getitems_int())
             w_other = W_ListObject.from_storage_and_strategy(
                     self.space, storage, self)
@@ -1929,7 +2013,8 @@ class IntegerListStrategy(ListStrategy):
 
     @staticmethod
     def int_2_float_or_int(w_list):
-        l = IntegerListStrategy.unerase(w_list.lstorage)
+        l = w_list.getitems_int()
+        assert l is not None
         if not longlong2float.CAN_ALWAYS_ENCODE_INT32:
             for intval in l:
                 if not longlong2float.can_encode_int32(intval):
@@ -1964,6 +2049,180 @@ class IntegerListStrategy(ListStrategy):
         return space.newtext(res)
 
 
+class BaseNarrowIntegerListStrategy(ListStrategy):
+    """Base class of the strategies for lists of ints that all fit in
+    8, 16 or 32 bits.  The storage is a list of rffi.SIGNEDCHAR,
+    rffi.SHORT or rffi.INT.  When an int that doesn't fit is added, the
+    list switches to the narrowest strategy in which all its items fit,
+    and ultimately to IntegerListStrategy.  See the 'withnarrowintlists'
+    option.
+    """
+
+
+class AbstractNarrowIntegerStrategy(object):
+    import_from_mixin(AbstractUnwrappedStrategy)
+
+    # the concrete classes define ITEMTYPE, MIN, MAX, _none_value,
+    # _sorter_class and the erasing pair
+
+    def wrap(self, item):
+        return self.space.newint(widen(item))
+
+    def unwrap(self, w_int):
+        return rffi.cast(self.ITEMTYPE, self.space.int_w(w_int))
+
+    # note: the items must be widened before any comparison, the rtyper
+    # doesn't support arithmetic on the small integer types
+
+    def _quick_cmp(self, a, b):
+        return widen(a) == widen(b)
+
+    def is_correct_type(self, w_obj):
+        if type(w_obj) is not W_IntObject:
+            return False
+        intval = self.space.int_w(w_obj)
+        return self.MIN <= intval <= self.MAX
+
+    def list_is_correct_type(self, w_list):
+        return w_list.strategy is self
+
+    def _from_list_int(self, list_i):
+        return [rffi.cast(self.ITEMTYPE, intval) for intval in list_i]
+
+    def init_from_list_int(self, w_list, list_i):
+        w_list.lstorage = self.erase(self._from_list_int(list_i))
+
+    def getitems_int(self, w_list):
+        l = self.unerase(w_list.lstorage)
+        return [widen(item) for item in l]
+
+    def find_or_count(self, w_list, w_obj, start, stop, count):
+        if self.is_correct_type(w_obj):
+            return self._safe_find_or_count(
+                w_list, self.unwrap(w_obj), start, stop, count)
+        if type(w_obj) is W_IntObject:
+            # out of range, cannot be in the list
+            if count:
+                return 0
+            raise ValueError
+        return ListStrategy.find_or_count(
+            self, w_list, w_obj, start, stop, count)
+
+    def _safe_find_or_count(self, w_list, obj, start, stop, count):
+        l = self.unerase(w_list.lstorage)
+        intval = widen(obj)
+        result = 0
+        for i in range(start, min(stop, len(l))):
+            if widen(l[i]) == intval:
+                if count:
+                    result += 1
+                else:
+                    return i
+        if count:
+            return result
+        raise ValueError
+
+    def sort(self, w_list, reverse):
+        l = self.unerase(w_list.lstorage)
+        sorter = self._sorter_class(l, len(l))
+        sorter.sort()
+        if reverse:
+            l.reverse()
+
+    def switch_to_wider_strategy(self, w_list, minval, maxval):
+        """Switch to the narrowest strategy that can store both the current
+        items and the ints between minval and maxval."""
+        strategy = get_integer_strategy(self.space, min(minval, self.MIN),
+                                        max(maxval, self.MAX))
+        list_i = self.getitems_int(w_list)
+        w_list.strategy = strategy
+        strategy.init_from_list_int(w_list, list_i)
+
+    def switch_to_next_strategy(self, w_list, w_sample_item):
+        if type(w_sample_item) is W_IntObject:
+            intval = self.space.int_w(w_sample_item)
+            self.switch_to_wider_strategy(w_list, intval, intval)
+        elif type(w_sample_item) is W_FloatObject:
+            # IntegerListStrategy knows how to switch to IntOrFloat
+            self.switch_to_wider_strategy(w_list, -sys.maxint - 1, sys.maxint)
+        else:
+            w_list.switch_to_object_strategy()
+
+
+    _base_extend_from_list = _extend_from_list
+
+    def _extend_from_list(self, w_list, w_other):
+        if not self.list_is_correct_type(w_other):
+            list_i = w_other.getitems_int()
+            if list_i is not None:
+                minval, maxval = _get_int_range(list_i)
+                if minval < self.MIN or maxval > self.MAX:
+                    self.switch_to_wider_strategy(w_list, minval, maxval)
+                    w_list.extend(w_other)
+                    return
+                l = self.unerase(w_list.lstorage)
+                l += self._from_list_int(list_i)
+                return
+        return self._base_extend_from_list(w_list, w_other)
+
+
+    _base_setslice = setslice
+
+    def setslice(self, w_list, start, step, slicelength, w_other):
+        if not self.list_is_correct_type(w_other):
+            list_i = w_other.getitems_int()
+            if list_i is not None:
+                minval, maxval = _get_int_range(list_i)
+                if minval < self.MIN or maxval > self.MAX:
+                    self.switch_to_wider_strategy(w_list, minval, maxval)
+                    w_list.setslice(start, step, slicelength, w_other)
+                    return
+                storage = self.erase(self._from_list_int(list_i))
+                w_other = W_ListObject.from_storage_and_strategy(
+                        self.space, storage, self)
+        return self._base_setslice(w_list, start, step, slicelength, w_other)
+
+
+class Int8ListStrategy(BaseNarrowIntegerListStrategy):
+    import_from_mixin(AbstractNarrowIntegerStrategy)
+
+    ITEMTYPE = rffi.SIGNEDCHAR
+    MIN = -2 ** 7
+    MAX = 2 ** 7 - 1
+    _none_value = rffi.cast(rffi.SIGNEDCHAR, 0)
+
+    erase, unerase = rerased.new_erasing_pair("int8")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+
+class Int16ListStrategy(BaseNarrowIntegerListStrategy):
+    import_from_mixin(AbstractNarrowIntegerStrategy)
+
+    ITEMTYPE = rffi.SHORT
+    MIN = -2 ** 15
+    MAX = 2 ** 15 - 1
+    _none_value = rffi.cast(rffi.SHORT, 0)
+
+    erase, unerase = rerased.new_erasing_pair("int16")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+
+class Int32ListStrategy(BaseNarrowIntegerListStrategy):
+    """Only used on 64-bit machines."""
+    import_from_mixin(AbstractNarrowIntegerStrategy)
+
+    ITEMTYPE = rffi.INT
+    MIN = -2 ** 31
+    MAX = 2 ** 31 - 1
+    _none_value = rffi.cast(rffi.INT, 0)
+
+    erase, unerase = rerased.new_erasing_pair("int32")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+
 class FloatListStrategy(ListStrategy):
     import_from_mixin(AbstractUnwrappedStrategy)
 
@@ -2003,6 +2262,7 @@ class FloatListStrategy(ListStrategy):
 
     def _extend_from_list(self, w_list, w_other):
         if (w_other.strategy is self.space.fromcache(IntegerListStrategy) or
+            isinstance(w_other.strategy, BaseNarrowIntegerListStrategy) or
             w_other.strategy is self.space.fromcache(IntOrFloatListStrategy)):
             # xxx a case that we don't optimize: [3.4].extend([9999999999999])
             # will cause a switch to int-or-float, followed by another
@@ -2017,6 +2277,7 @@ class FloatListStrategy(ListStrategy):
 
     def setslice(self, w_list, start, step, slicelength, w_other):
         if (w_other.strategy is self.space.fromcache(IntegerListStrategy) or
+            isinstance(w_other.strategy, BaseNarrowIntegerListStrategy) or
             w_other.strategy is self.space.fromcache(IntOrFloatListStrategy)):
             if self.switch_to_int_or_float_strategy(w_list):
                 w_list.setslice(start, step, slicelength, w_other)
@@ -2156,7 +2417,8 @@ class IntOrFloatListStrategy(ListStrategy):
         l += longlong_list
 
     def _extend_from_list(self, w_list, w_other):
-        if w_other.strategy is self.space.fromcache(IntegerListStrategy):
+        if (w_other.strategy is self.space.fromcache(IntegerListStrategy) or
+            isinstance(w_other.strategy, BaseNarrowIntegerListStrategy)):
             try:
                 longlong_list = IntegerListStrategy.int_2_float_or_int(w_other)
             except ValueError:
@@ -2179,7 +2441,8 @@ class IntOrFloatListStrategy(ListStrategy):
         return W_ListObject.from_storage_and_strategy(self.space, storage, self)
 
     def setslice(self, w_list, start, step, slicelength, w_other):
-        if w_other.strategy is self.space.fromcache(IntegerListStrategy):
+        if (w_other.strategy is self.space.fromcache(IntegerListStrategy) or
+            isinstance(w_other.strategy, BaseNarrowIntegerListStrategy)):
             try:
                 longlong_list = IntegerListStrategy.int_2_float_or_int(w_other)
             except ValueError:
@@ -2310,6 +2573,116 @@ class AsciiListStrategy(ListStrategy):
     def getitems_ascii(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    def getitems_utf8(self, w_list):
+        return self.unerase(w_list.lstorage)
+
+    def find_or_count(self, w_list, w_obj, start, stop, count):
+        if self.is_correct_type(w_obj):
+            return self._safe_find_or_count(
+                w_list, self.unwrap(w_obj), start, stop, count)
+        if type(w_obj) is W_UnicodeObject:
+            # not ascii, cannot be in the list
+            if count:
+                return 0
+            raise ValueError
+        return ListStrategy.find_or_count(
+            self, w_list, w_obj, start, stop, count)
+
+    def switch_to_utf8_strategy(self, w_list):
+        # the storage is the same list of utf8 strings, no need to copy it
+        l = self.unerase(w_list.lstorage)
+        strategy = self.space.fromcache(Utf8ListStrategy)
+        w_list.strategy = strategy
+        w_list.lstorage = strategy.erase(l)
+
+    def switch_to_next_strategy(self, w_list, w_sample_item):
+        if type(w_sample_item) is W_UnicodeObject:
+            self.switch_to_utf8_strategy(w_list)
+        else:
+            w_list.switch_to_object_strategy()
+
+
+    _base_extend_from_list = _extend_from_list
+
+    def _extend_from_list(self, w_list, w_other):
+        if w_other.strategy is self.space.fromcache(Utf8ListStrategy):
+            self.switch_to_utf8_strategy(w_list)
+            w_list.extend(w_other)
+            return
+        return self._base_extend_from_list(w_list, w_other)
+
+
+    _base_setslice = setslice
+
+    def setslice(self, w_list, start, step, slicelength, w_other):
+        if w_other.strategy is self.space.fromcache(Utf8ListStrategy):
+            self.switch_to_utf8_strategy(w_list)
+            w_list.setslice(start, step, slicelength, w_other)
+            return
+        return self._base_setslice(w_list, start, step, slicelength, w_other)
+
+
+class Utf8ListStrategy(ListStrategy):
+    """Strategy for lists of unicodes, some of which contain non-ascii
+    characters.  They are stored as utf8-encoded strings, and their length
+    is computed again when they are wrapped.  Lists of ascii unicodes use
+    AsciiListStrategy instead, which doesn't need to compute the length.
+    """
+    import_from_mixin(AbstractUnwrappedStrategy)
+
+    _none_value = ""
+
+    def wrap(self, stringval):
+        assert stringval is not None
+        return self.space.newutf8(stringval,
+                                  rutf8.codepoints_in_utf8(stringval))
+
+    def unwrap(self, w_string):
+        return self.space.utf8_w(w_string)
+
+    def _quick_cmp(self, a, b):
+        return a is b
+
+    erase, unerase = rerased.new_erasing_pair("utf8")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def is_correct_type(self, w_obj):
+        return type(w_obj) is W_UnicodeObject
+
+    def list_is_correct_type(self, w_list):
+        return w_list.strategy is self.space.fromcache(Utf8ListStrategy)
+
+    def sort(self, w_list, reverse):
+        # comparing utf8 strings gives the same order as comparing the
+        # sequences of code points
+        l = self.unerase(w_list.lstorage)
+        sorter = StringSort(l, len(l))
+        sorter.sort()
+        if reverse:
+            l.reverse()
+
+    def getitems_utf8(self, w_list):
+        return self.unerase(w_list.lstorage)
+
+    _base_extend_from_list = _extend_from_list
+
+    def _extend_from_list(self, w_list, w_other):
+        if w_other.strategy is self.space.fromcache(AsciiListStrategy):
+            l = self.unerase(w_list.lstorage)
+            l += w_other.getitems_ascii()
+            return
+        return self._base_extend_from_list(w_list, w_other)
+
+    _base_setslice = setslice
+
+    def setslice(self, w_list, start, step, slicelength, w_other):
+        if w_other.strategy is self.space.fromcache(AsciiListStrategy):
+            storage = self.erase(w_other.getitems_ascii())
+            w_other = W_ListObject.from_storage_and_strategy(
+                    self.space, storage, self)
+        return self._base_setslice(w_list, start, step, slicelength, w_other)
+
 # _______________________________________________________
 
 init_signature = Signature(['sequence'], None, None)
@@ -2326,6 +2699,9 @@ TimSort = make_timsort_class()
 IntBaseTimSort = make_timsort_class()
 FloatBaseTimSort = make_timsort_class()
 IntOrFloatBaseTimSort = make_timsort_class()
+Int8BaseTimSort = make_timsort_class()
+Int16BaseTimSort = make_timsort_class()
+Int32BaseTimSort = make_timsort_class()
 
 
 class KeyContainer(W_Root):
@@ -2354,6 +2730,21 @@ class FloatSort(FloatBaseTimSort):
         return a < b
 
 
+class Int8Sort(Int8BaseTimSort):
+    def lt(self, a, b):
+        return widen(a) < widen(b)
+
+
+class Int16Sort(Int16BaseTimSort):
+    def lt(self, a, b):
+        return widen(a) < widen(b)
+
+
+class Int32Sort(Int32BaseTimSort):
+    def lt(self, a, b):
+        return widen(a) < widen(b)
+
+
 class IntOrFloatSort(IntOrFloatBaseTimSort):
     def lt(self, a, b):
         fa = longlong2float.maybe_decode_longlong_as_float(a)
@@ -2391,6 +2782,11 @@ class CustomKeyCompareSort(CustomCompareSort):
         return CustomCompareSort.lt(self, a.w_key, b.w_key)
 
 
+Int8ListStrategy._sorter_class = Int8Sort
+Int16ListStrategy._sorter_class = Int16Sort
+Int32ListStrategy._sorter_class = Int32Sort
+
+
 W_ListObject.typedef = TypeDef("list",
     __doc__ = """list() -> new empty list
 list(iterable) -> new list initialized from iterable's items""",
@@ -5,6 +5,7 @@ from rpython.rlib.rarithmetic import intmask, r_uint, LONG_BIT
 from rpython.rlib.longlong2float import longlong2float, float2longlong
 
 from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.module import Module
 from pypy.interpreter.typedef import _share_methods
 from pypy.objspace.std.dictmultiobject import (
     W_DictMultiObject, DictStrategy, ObjectDictStrategy, BaseKeyIterator,
@@ -1274,6 +1275,10 @@ def LOAD_ATTR_caching(pycode, w_obj, nameindex):
 
 def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
     space = pycode.space
+    if map is None and isinstance(w_obj, Module):
+        # module attributes use the cells of the module dict instead
+        from pypy.objspace.std.celldict import LOAD_ATTR_module_cached
+        return LOAD_ATTR_module_cached(pycode, w_obj, nameindex)
     w_name = pycode.co_names_w[nameindex]
     if map is not None:
         w_type = map.terminator.w_cls
@@ -0,0 +1,156 @@
+## ----------------------------------------------------------------------------
+## dict strategies for keys that are pairs (see dictmultiobject.py)
+
+from rpython.rlib import rerased
+from pypy.objspace.std.dictmultiobject import (AbstractTypedStrategy,
+                                               DictStrategy,
+                                               create_iterator_classes)
+from pypy.objspace.std.specialisedtupleobject import Cls_ii
+from pypy.objspace.std.tupleobject import W_AbstractTupleObject
+
+
+def _is_pair_of(space, w_obj, w_type0, w_type1):
+    # exact tuples only: subclasses may override __eq__ and __hash__
+    if not space.is_w(space.type(w_obj), space.w_tuple):
+        return False
+    assert isinstance(w_obj, W_AbstractTupleObject)
+    if w_obj.length() != 2:
+        return False
+    return (space.is_w(space.type(w_obj.getitem(space, 0)), w_type0) and
+            space.is_w(space.type(w_obj.getitem(space, 1)), w_type1))
+
+def _never_equal_to_tuple(space, w_lookup_type):
+    # XXX there are many more types
+    return (space.is_w(w_lookup_type, space.w_NoneType) or
+            space.is_w(w_lookup_type, space.w_int) or
+            space.is_w(w_lookup_type, space.w_float) or
+            space.is_w(w_lookup_type, space.w_bytes) or
+            space.is_w(w_lookup_type, space.w_unicode))
+
+def _is_not_a_pair(space, w_obj):
+    # tuples of another length are never equal to the keys.  They are
+    # still hashed, to raise TypeError if they are not hashable.
+    if not space.is_w(space.type(w_obj), space.w_tuple):
+        return False
+    assert isinstance(w_obj, W_AbstractTupleObject)
+    if w_obj.length() == 2:
+        return False
+    space.hash(w_obj)
+    return True
+
+def get_pair_strategy(space, w_key):
+    """Return the strategy for a dict whose first key is 'w_key', if it is
+    a pair that one of the strategies below can store, or None."""
+    if type(w_key) is Cls_ii:
+        return space.fromcache(IntPairDictStrategy)
+    if _is_pair_of(space, w_key, space.w_int, space.w_int):
+        return space.fromcache(IntPairDictStrategy)
+    if _is_pair_of(space, w_key, space.w_bytes, space.w_int):
+        return space.fromcache(BytesIntPairDictStrategy)
+    return None
+
+
+class AbstractPairStrategy(object):
+    """Lookups of tuples that are not pairs don't switch the strategy.
+    setdefault() is not special-cased, as it must store the key."""
+    _mixin_ = True
+
+    def _never_equal_to(self, w_lookup_type):
+        return _never_equal_to_tuple(self.space, w_lookup_type)
+
+    def getitem(self, w_dict, w_key):
+        if _is_not_a_pair(self.space, w_key):
+            return None
+        return AbstractTypedStrategy.getitem(self, w_dict, w_key)
+
+    def delitem(self, w_dict, w_key):
+        if _is_not_a_pair(self.space, w_key):
+            raise KeyError
+        AbstractTypedStrategy.delitem(self, w_dict, w_key)
+
+    def pop(self, w_dict, w_key, w_default):
+        if _is_not_a_pair(self.space, w_key):
+            if w_default is not None:
+                return w_default
+            raise KeyError
+        return AbstractTypedStrategy.pop(self, w_dict, w_key, w_default)
+
+
+# these strategies are selected by EmptyDictStrategy.switch_to_correct_strategy
+class IntPairDictStrategy(AbstractPairStrategy, AbstractTypedStrategy,
+                          DictStrategy):
+    """
+    Strategy for keys that are tuples of two ints, e.g. coordinates in a
+    grid.  The keys are stored as RPython tuples, so the storage doesn't
+    contain any tuple object: they are only built again when iterating
+    over the keys.  With the JIT, the tuple built for a lookup like
+    d[x, y] is virtual, so the lookup does not allocate anything.
+    """
+
+    erase, unerase = rerased.new_erasing_pair("intpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        space = self.space
+        x, y = unwrapped
+        return space.newtuple2(space.newint(x), space.newint(y))
+
+    def unwrap(self, wrapped):
+        if type(wrapped) is Cls_ii:
+            return (wrapped.value0, wrapped.value1)
+        space = self.space
+        assert isinstance(wrapped, W_AbstractTupleObject)
+        return (space.int_w(wrapped.getitem(space, 0)),
+                space.int_w(wrapped.getitem(space, 1)))
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def is_correct_type(self, w_obj):
+        if type(w_obj) is Cls_ii:
+            return True
+        space = self.space
+        return _is_pair_of(space, w_obj, space.w_int, space.w_int)
+
+    def wrapkey(space, key):
+        x, y = key
+        return space.newtuple2(space.newint(x), space.newint(y))
+
+create_iterator_classes(IntPairDictStrategy)
+
+
+class BytesIntPairDictStrategy(AbstractPairStrategy, AbstractTypedStrategy,
+                               DictStrategy):
+    """
+    Strategy for keys that are tuples of a string and an int.  Like
+    IntPairDictStrategy, the keys are stored as RPython tuples.
+    """
+
+    erase, unerase = rerased.new_erasing_pair("bytesintpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        space = self.space
+        s, x = unwrapped
+        return space.newtuple2(space.newbytes(s), space.newint(x))
+
+    def unwrap(self, wrapped):
+        space = self.space
+        assert isinstance(wrapped, W_AbstractTupleObject)
+        return (space.bytes_w(wrapped.getitem(space, 0)),
+                space.int_w(wrapped.getitem(space, 1)))
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return _is_pair_of(space, w_obj, space.w_bytes, space.w_int)
+
+    def wrapkey(space, key):
+        s, x = key
+        return space.newtuple2(space.newbytes(s), space.newint(x))
+
+create_iterator_classes(BytesIntPairDictStrategy)
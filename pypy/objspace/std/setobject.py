@@ -4,6 +4,7 @@ from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.typedef import TypeDef
 from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.floatobject import W_FloatObject, int_to_float_key
 from pypy.objspace.std.intobject import W_IntObject
 from pypy.objspace.std.unicodeobject import W_UnicodeObject
 from pypy.objspace.std.util import IDTAG_SPECIAL, IDTAG_SHIFT
@@ -11,12 +12,22 @@ from pypy.objspace.std.util import IDTAG_SPECIAL, IDTAG_SHIFT
 from rpython.rlib.objectmodel import r_dict
 from rpython.rlib.objectmodel import iterkeys_with_hash, contains_with_hash
 from rpython.rlib.objectmodel import setitem_with_hash, delitem_with_hash
-from rpython.rlib.rarithmetic import intmask, r_uint
+from rpython.rlib.rarithmetic import intmask, r_uint, LONG_BIT
 from rpython.rlib import rerased, jit, rutf8
 
+import math
+
 
 UNROLL_CUTOFF = 5
 
+# parameters of BitsetSetStrategy: a bitmap of up to BITSET_MIN_WORDS words,
+# or with at least one member per word on average, is used instead of a
+# hash table.  It is only abandoned when removing members makes it four
+# times sparser than that.
+BITSET_SHIFT = 6 if LONG_BIT == 64 else 5
+BITSET_MASK = LONG_BIT - 1
+BITSET_MIN_WORDS = 4
+
 
 class W_BaseSetObject(W_Root):
     typedef = None
@@ -90,10 +101,18 @@ class W_BaseSetObject(W_Root):
         """ If this is a unicode set return its contents as a list of uwnrapped unicodes. Otherwise return None. """
         return self.strategy.listview_ascii(self)
 
+    def listview_utf8(self):
+        """ If this is a unicode set return its contents as a list of utf8-encoded strings. Otherwise return None. """
+        return self.strategy.listview_utf8(self)
+
     def listview_int(self):
         """ If this is an int set return its contents as a list of uwnrapped ints. Otherwise return None. """
         return self.strategy.listview_int(self)
 
+    def listview_float(self):
+        """ If this is a float set return its contents as a list of uwnrapped floats. Otherwise return None. """
+        return self.strategy.listview_float(self)
+
     def get_storage_copy(self):
         """ Returns a copy of the storage. Needed when we want to clone all elements from one set and
         put them into another. """
@@ -727,9 +746,15 @@ class SetStrategy(object):
     def listview_ascii(self, w_set):
         return None
 
+    def listview_utf8(self, w_set):
+        return None
+
     def listview_int(self, w_set):
         return None
 
+    def listview_float(self, w_set):
+        return None
+
     #def erase(self, storage):
     #    raise NotImplementedError
 
@@ -825,12 +850,19 @@ class EmptySetStrategy(SetStrategy):
         return clone
 
     def add(self, w_set, w_key):
-        if type(w_key) is W_IntObject:
+        if (type(w_key) is W_IntObject and
+                self.space.config.objspace.std.withintbitsets):
+            strategy = self.space.fromcache(BitsetSetStrategy)
+        elif type(w_key) is W_IntObject:
             strategy = self.space.fromcache(IntegerSetStrategy)
         elif type(w_key) is W_BytesObject:
             strategy = self.space.fromcache(BytesSetStrategy)
         elif type(w_key) is W_UnicodeObject and w_key.is_ascii():
             strategy = self.space.fromcache(AsciiSetStrategy)
+        elif type(w_key) is W_UnicodeObject:
+            strategy = self.space.fromcache(Utf8SetStrategy)
+        elif type(w_key) is W_FloatObject and not math.isnan(w_key.floatval):
+            strategy = self.space.fromcache(FloatSetStrategy)
         elif self.space.type(w_key).compares_by_identity():
             strategy = self.space.fromcache(IdentitySetStrategy)
         else:
@@ -1278,6 +1310,10 @@ class BytesSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(BitsetSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1311,12 +1347,19 @@ class AsciiSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def listview_ascii(self, w_set):
         return self.unerase(w_set.sstorage).keys()
 
+    def listview_utf8(self, w_set):
+        return self.unerase(w_set.sstorage).keys()
+
     def is_correct_type(self, w_key):
         return type(w_key) is W_UnicodeObject and w_key.is_ascii()
 
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(BitsetSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1332,6 +1375,92 @@ class AsciiSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def iter(self, w_set):
         return UnicodeIteratorImplementation(self.space, self, w_set)
 
+    def switch_to_utf8_strategy(self, w_set):
+        # the storage is the same dict of utf8 strings, no need to copy it
+        d = self.unerase(w_set.sstorage)
+        strategy = self.space.fromcache(Utf8SetStrategy)
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.erase(d)
+
+    def add(self, w_set, w_key):
+        if type(w_key) is W_UnicodeObject and not w_key.is_ascii():
+            self.switch_to_utf8_strategy(w_set)
+            w_set.add(w_key)
+            return
+        AbstractUnwrappedSetStrategy.add(self, w_set, w_key)
+
+    def remove(self, w_set, w_item):
+        if type(w_item) is W_UnicodeObject and not w_item.is_ascii():
+            return False
+        return AbstractUnwrappedSetStrategy.remove(self, w_set, w_item)
+
+    def has_key(self, w_set, w_key):
+        if type(w_key) is W_UnicodeObject and not w_key.is_ascii():
+            return False
+        return AbstractUnwrappedSetStrategy.has_key(self, w_set, w_key)
+
+    def update(self, w_set, w_other):
+        if w_other.strategy is self.space.fromcache(Utf8SetStrategy):
+            self.switch_to_utf8_strategy(w_set)
+            w_set.update(w_other)
+            return
+        AbstractUnwrappedSetStrategy.update(self, w_set, w_other)
+
+
+class Utf8SetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    """Strategy for sets of unicodes, some of which contain non-ascii
+    characters.  Like in Utf8ListStrategy, they are stored as utf8-encoded
+    strings.
+    """
+
+    erase, unerase = rerased.new_erasing_pair("utf8")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(utf8).intersect')
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def get_empty_dict(self):
+        return {}
+
+    def listview_utf8(self, w_set):
+        return self.unerase(w_set.sstorage).keys()
+
+    def is_correct_type(self, w_key):
+        return type(w_key) is W_UnicodeObject
+
+    def may_contain_equal_elements(self, strategy):
+        if strategy is self.space.fromcache(IntegerSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(BitsetSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(EmptySetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IdentitySetStrategy):
+            return False
+        return True
+
+    def unwrap(self, w_item):
+        return self.space.utf8_w(w_item)
+
+    def wrap(self, item):
+        return self.space.newutf8(item, rutf8.codepoints_in_utf8(item))
+
+    def iter(self, w_set):
+        return Utf8IteratorImplementation(self.space, self, w_set)
+
+    def update(self, w_set, w_other):
+        if w_other.strategy is self.space.fromcache(AsciiSetStrategy):
+            d_set = self.unerase(w_set.sstorage)
+            d_set.update(AsciiSetStrategy.unerase(w_other.sstorage))
+            return
+        AbstractUnwrappedSetStrategy.update(self, w_set, w_other)
+
 
 class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     erase, unerase = rerased.new_erasing_pair("integer")
@@ -1358,6 +1487,8 @@ class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
             return False
         elif strategy is self.space.fromcache(AsciiSetStrategy):
             return False
+        elif strategy is self.space.fromcache(Utf8SetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1373,6 +1504,513 @@ class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def iter(self, w_set):
         return IntegerIteratorImplementation(self.space, self, w_set)
 
+    def update(self, w_set, w_other):
+        if w_other.strategy is self.space.fromcache(BitsetSetStrategy):
+            d_set = self.unerase(w_set.sstorage)
+            for key in w_other.listview_int():
+                d_set[key] = None
+            return
+        AbstractUnwrappedSetStrategy.update(self, w_set, w_other)
+
+
+class BitsetStorage(object):
+    """Storage of BitsetSetStrategy.  Bit 'i' of 'words[j]' is set if the
+    integer '((start + j) << BITSET_SHIFT) | i' is in the set; 'count' is
+    the number of bits set."""
+
+    def __init__(self, start, words, count):
+        self.start = start
+        self.words = words
+        self.count = count
+
+    def copy(self):
+        return BitsetStorage(self.start, self.words[:], self.count)
+
+    def word_at(self, wordno):
+        i = wordno - self.start
+        if 0 <= i < len(self.words):
+            return self.words[i]
+        return r_uint(0)
+
+
+class BitsetSetStrategy(SetStrategy):
+    """Strategy for sets of ints that fall in a small range, enabled by
+    'objspace.std.withintbitsets'.  The set operations between two such
+    sets work a machine word at a time.  When the members become too
+    sparse, the set switches to the IntegerSetStrategy."""
+
+    erase, unerase = rerased.new_erasing_pair("bitset")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(bitset).intersect')
+
+    def get_empty_storage(self):
+        return self.erase(BitsetStorage(0, [], 0))
+
+    def listview_int(self, w_set):
+        return _bitset_keys(self.unerase(w_set.sstorage))
+
+    def is_correct_type(self, w_key):
+        return type(w_key) is W_IntObject
+
+    def may_contain_equal_elements(self, strategy):
+        if strategy is self.space.fromcache(BytesSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(AsciiSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(Utf8SetStrategy):
+            return False
+        elif strategy is self.space.fromcache(EmptySetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IdentitySetStrategy):
+            return False
+        return True
+
+    def wrap(self, item):
+        return self.space.newint(item)
+
+    def _integer_storage(self, w_set):
+        strategy = self.space.fromcache(IntegerSetStrategy)
+        keys = _bitset_keys(self.unerase(w_set.sstorage))
+        return strategy.get_storage_from_unwrapped_list(keys)
+
+    def _as_integer_set(self, w_set):
+        strategy = self.space.fromcache(IntegerSetStrategy)
+        storage = self._integer_storage(w_set)
+        return w_set.from_storage_and_strategy(storage, strategy)
+
+    def switch_to_integer_strategy(self, w_set):
+        w_set.sstorage = self._integer_storage(w_set)
+        w_set.strategy = self.space.fromcache(IntegerSetStrategy)
+
+    def _normalized(self, bitset):
+        """ Returns (storage, strategy) for the result of an operation,
+        going back to the IntegerSetStrategy if it is too sparse."""
+        _bitset_trim(bitset)
+        if _bitset_too_sparse(len(bitset.words), bitset.count * 4):
+            strategy = self.space.fromcache(IntegerSetStrategy)
+            storage = strategy.get_storage_from_unwrapped_list(
+                _bitset_keys(bitset))
+            return storage, strategy
+        return self.erase(bitset), self
+
+    # __________________ methods called on W_SetObject _________________
+
+    def clear(self, w_set):
+        w_set.switch_to_empty_strategy()
+
+    def copy_real(self, w_set):
+        storage = self.get_storage_copy(w_set)
+        return w_set.from_storage_and_strategy(storage, self)
+
+    def length(self, w_set):
+        return self.unerase(w_set.sstorage).count
+
+    def get_storage_copy(self, w_set):
+        return self.erase(self.unerase(w_set.sstorage).copy())
+
+    def add(self, w_set, w_key):
+        if type(w_key) is W_IntObject:
+            self._add_int(w_set, w_key.intval)
+        else:
+            w_set.switch_to_object_strategy(self.space)
+            w_set.add(w_key)
+
+    def _add_int(self, w_set, value):
+        """ Adds 'value' to the set.  Returns False if this made the set
+        switch to the IntegerSetStrategy."""
+        bitset = self.unerase(w_set.sstorage)
+        wordno = value >> BITSET_SHIFT
+        bit = r_uint(1) << (value & BITSET_MASK)
+        i = wordno - bitset.start
+        words = bitset.words
+        if 0 <= i < len(words):
+            if not words[i] & bit:
+                words[i] |= bit
+                bitset.count += 1
+            return True
+        if not words:
+            bitset.start = wordno
+            words.append(bit)
+            bitset.count = 1
+            return True
+        if i < 0:
+            nwords = len(words) - i
+        else:
+            nwords = i + 1
+        if _bitset_too_sparse(nwords, bitset.count + 1):
+            self.switch_to_integer_strategy(w_set)
+            w_set.add(self.space.newint(value))
+            return False
+        if i < 0:
+            newwords = [r_uint(0)] * nwords
+            newwords[0] = bit
+            for j in range(len(words)):
+                newwords[j - i] = words[j]
+            bitset.words = newwords
+            bitset.start = wordno
+        else:
+            while len(words) < i:
+                words.append(r_uint(0))
+            words.append(bit)
+        bitset.count += 1
+        return True
+
+    def remove(self, w_set, w_item):
+        if type(w_item) is W_BytesObject or type(w_item) is W_UnicodeObject:
+            return False
+        if type(w_item) is not W_IntObject:
+            self.switch_to_integer_strategy(w_set)
+            return w_set.remove(w_item)
+        bitset = self.unerase(w_set.sstorage)
+        value = w_item.intval
+        i = (value >> BITSET_SHIFT) - bitset.start
+        bit = r_uint(1) << (value & BITSET_MASK)
+        words = bitset.words
+        if not 0 <= i < len(words) or not words[i] & bit:
+            return False
+        words[i] &= ~bit
+        bitset.count -= 1
+        while words and not words[-1]:
+            words.pop()
+        if _bitset_too_sparse(len(words), bitset.count * 4):
+            self.switch_to_integer_strategy(w_set)
+        return True
+
+    def getdict_w(self, w_set):
+        result = newset(self.space)
+        for key in _bitset_keys(self.unerase(w_set.sstorage)):
+            result[self.wrap(key)] = None
+        return result
+
+    def getkeys(self, w_set):
+        keys = _bitset_keys(self.unerase(w_set.sstorage))
+        return [self.wrap(key) for key in keys]
+
+    def has_key(self, w_set, w_key):
+        if type(w_key) is W_BytesObject or type(w_key) is W_UnicodeObject:
+            return False
+        if type(w_key) is not W_IntObject:
+            self.switch_to_integer_strategy(w_set)
+            return w_set.has_key(w_key)
+        return _bitset_contains(self.unerase(w_set.sstorage), w_key.intval)
+
+    def equals(self, w_set, w_other):
+        if w_set.length() != w_other.length():
+            return False
+        if w_set.length() == 0:
+            return True
+        if w_other.strategy is self:
+            return self._issubset_bitset(w_set, w_other)
+        if not self.may_contain_equal_elements(w_other.strategy):
+            return False
+        return self._issubset_wrapped(w_set, w_other)
+
+    def _difference_wrapped(self, w_set, w_other):
+        result = self.unerase(w_set.sstorage).copy()
+        words = result.words
+        for i in range(len(words)):
+            word = words[i]
+            while word:
+                bit = word & (~word + 1)
+                word &= ~bit
+                value = ((result.start + i) << BITSET_SHIFT) | _lowest_bit(bit)
+                if w_other.has_key(self.wrap(value)):
+                    words[i] &= ~bit
+                    result.count -= 1
+        return result
+
+    def _difference_base(self, w_set, w_other):
+        if w_other.strategy is self:
+            bitset = self.unerase(w_set.sstorage)
+            other = self.unerase(w_other.sstorage)
+            words = bitset.words[:]
+            count = 0
+            for i in range(len(words)):
+                words[i] &= ~other.word_at(bitset.start + i)
+                count += _popcount(words[i])
+            result = BitsetStorage(bitset.start, words, count)
+        elif not self.may_contain_equal_elements(w_other.strategy):
+            result = self.unerase(w_set.sstorage).copy()
+        else:
+            result = self._difference_wrapped(w_set, w_other)
+        return self._normalized(result)
+
+    def difference(self, w_set, w_other):
+        storage, strategy = self._difference_base(w_set, w_other)
+        return w_set.from_storage_and_strategy(storage, strategy)
+
+    def difference_update(self, w_set, w_other):
+        storage, strategy = self._difference_base(w_set, w_other)
+        w_set.strategy = strategy
+        w_set.sstorage = storage
+
+    def _symmetric_difference_bitset(self, w_set, w_other):
+        bitset = self.unerase(w_set.sstorage)
+        other = self.unerase(w_other.sstorage)
+        if not bitset.words:
+            return other.copy()
+        if not other.words:
+            return bitset.copy()
+        start = min(bitset.start, other.start)
+        stop = max(bitset.start + len(bitset.words),
+                   other.start + len(other.words))
+        words = [r_uint(0)] * (stop - start)
+        count = 0
+        for i in range(len(words)):
+            word = bitset.word_at(start + i) ^ other.word_at(start + i)
+            words[i] = word
+            count += _popcount(word)
+        return BitsetStorage(start, words, count)
+
+    def symmetric_difference(self, w_set, w_other):
+        if w_other.length() == 0:
+            return w_set.copy_real()
+        if w_other.strategy is not self:
+            return self._as_integer_set(w_set).symmetric_difference(w_other)
+        result = self._symmetric_difference_bitset(w_set, w_other)
+        storage, strategy = self._normalized(result)
+        return w_set.from_storage_and_strategy(storage, strategy)
+
+    def symmetric_difference_update(self, w_set, w_other):
+        if w_other.length() == 0:
+            return
+        if w_other.strategy is not self:
+            self.switch_to_integer_strategy(w_set)
+            w_set.symmetric_difference_update(w_other)
+            return
+        result = self._symmetric_difference_bitset(w_set, w_other)
+        storage, strategy = self._normalized(result)
+        w_set.strategy = strategy
+        w_set.sstorage = storage
+
+    def _intersect_bitset(self, w_set, w_other):
+        bitset = self.unerase(w_set.sstorage)
+        other = self.unerase(w_other.sstorage)
+        start = max(bitset.start, other.start)
+        stop = min(bitset.start + len(bitset.words),
+                   other.start + len(other.words))
+        if stop <= start:
+            return BitsetStorage(0, [], 0)
+        words = [r_uint(0)] * (stop - start)
+        count = 0
+        for i in range(len(words)):
+            word = bitset.word_at(start + i) & other.word_at(start + i)
+            words[i] = word
+            count += _popcount(word)
+        return BitsetStorage(start, words, count)
+
+    def _intersect_wrapped(self, w_set, w_other):
+        result = newset(self.space)
+        for key in _bitset_keys(self.unerase(w_set.sstorage)):
+            self.intersect_jmp.jit_merge_point()
+            w_key = self.wrap(key)
+            if w_other.has_key(w_key):
+                result[w_key] = None
+
+        strategy = self.space.fromcache(ObjectSetStrategy)
+        return strategy.erase(result)
+
+    def _intersect_base(self, w_set, w_other):
+        if w_other.strategy is self:
+            return self._normalized(self._intersect_bitset(w_set, w_other))
+        elif not self.may_contain_equal_elements(w_other.strategy):
+            strategy = self.space.fromcache(EmptySetStrategy)
+            return strategy.get_empty_storage(), strategy
+        elif w_other.strategy is self.space.fromcache(IntegerSetStrategy):
+            # the result only contains ints, which are all in 'w_set'
+            bitset = self.unerase(w_set.sstorage)
+            words = [r_uint(0)] * len(bitset.words)
+            result = BitsetStorage(bitset.start, words, 0)
+            for key in w_other.listview_int():
+                if _bitset_contains(bitset, key):
+                    words[(key >> BITSET_SHIFT) - bitset.start] |= (
+                        r_uint(1) << (key & BITSET_MASK))
+                    result.count += 1
+            return self._normalized(result)
+        strategy = self.space.fromcache(ObjectSetStrategy)
+        if w_set.length() > w_other.length():
+            # swap operands
+            storage = w_other.strategy._intersect_wrapped(w_other, w_set)
+        else:
+            storage = self._intersect_wrapped(w_set, w_other)
+        return storage, strategy
+
+    def intersect(self, w_set, w_other):
+        storage, strategy = self._intersect_base(w_set, w_other)
+        return w_set.from_storage_and_strategy(storage, strategy)
+
+    def intersect_update(self, w_set, w_other):
+        storage, strategy = self._intersect_base(w_set, w_other)
+        w_set.strategy = strategy
+        w_set.sstorage = storage
+
+    def _issubset_bitset(self, w_set, w_other):
+        bitset = self.unerase(w_set.sstorage)
+        other = self.unerase(w_other.sstorage)
+        for i in range(len(bitset.words)):
+            if bitset.words[i] & ~other.word_at(bitset.start + i):
+                return False
+        return True
+
+    def _issubset_wrapped(self, w_set, w_other):
+        for key in _bitset_keys(self.unerase(w_set.sstorage)):
+            if not w_other.has_key(self.wrap(key)):
+                return False
+        return True
+
+    def issubset(self, w_set, w_other):
+        if w_set.length() == 0:
+            return True
+        if w_other.strategy is self:
+            return self._issubset_bitset(w_set, w_other)
+        elif not self.may_contain_equal_elements(w_other.strategy):
+            return False
+        return self._issubset_wrapped(w_set, w_other)
+
+    def isdisjoint(self, w_set, w_other):
+        if w_other.length() == 0:
+            return True
+        if w_other.strategy is self:
+            bitset = self.unerase(w_set.sstorage)
+            other = self.unerase(w_other.sstorage)
+            for i in range(len(bitset.words)):
+                if bitset.words[i] & other.word_at(bitset.start + i):
+                    return False
+            return True
+        elif not self.may_contain_equal_elements(w_other.strategy):
+            return True
+        if w_set.length() > w_other.length():
+            return w_other.isdisjoint(w_set)
+        for key in _bitset_keys(self.unerase(w_set.sstorage)):
+            if w_other.has_key(self.wrap(key)):
+                return False
+        return True
+
+    def update(self, w_set, w_other):
+        if w_other.length() == 0:
+            return
+        if w_other.strategy is self:
+            bitset = self.unerase(w_set.sstorage)
+            other = self.unerase(w_other.sstorage)
+            if not bitset.words:
+                w_set.sstorage = w_other.get_storage_copy()
+                return
+            start = min(bitset.start, other.start)
+            stop = max(bitset.start + len(bitset.words),
+                       other.start + len(other.words))
+            if _bitset_too_sparse(stop - start, bitset.count + other.count):
+                self.switch_to_integer_strategy(w_set)
+                w_set.update(w_other)
+                return
+            words = [r_uint(0)] * (stop - start)
+            count = 0
+            for i in range(len(words)):
+                word = bitset.word_at(start + i) | other.word_at(start + i)
+                words[i] = word
+                count += _popcount(word)
+            w_set.sstorage = self.erase(BitsetStorage(start, words, count))
+            return
+        if w_other.strategy is self.space.fromcache(IntegerSetStrategy):
+            for key in w_other.listview_int():
+                if not self._add_int(w_set, key):
+                    w_set.update(w_other)
+                    return
+            return
+        self.switch_to_integer_strategy(w_set)
+        w_set.update(w_other)
+
+    def iter(self, w_set):
+        return BitsetIteratorImplementation(self.space, self, w_set)
+
+    def popitem(self, w_set):
+        bitset = self.unerase(w_set.sstorage)
+        words = bitset.words
+        while words and not words[-1]:
+            words.pop()
+        if not words:
+            raise oefmt(self.space.w_KeyError, "pop from an empty set")
+        i = len(words) - 1
+        word = words[i]
+        index = _highest_bit(word)
+        words[i] = word & ~(r_uint(1) << index)
+        bitset.count -= 1
+        return self.wrap(((bitset.start + i) << BITSET_SHIFT) | index)
+
+
+class FloatSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    """Strategy for sets of floats.  NaNs are not allowed, because they
+    are only equal to themselves, by identity, which is lost when they are
+    unwrapped.  Ints can be looked up without switching to the object
+    strategy."""
+
+    erase, unerase = rerased.new_erasing_pair("float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(float).intersect')
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def get_empty_dict(self):
+        return {}
+
+    def listview_float(self, w_set):
+        return self.unerase(w_set.sstorage).keys()
+
+    def is_correct_type(self, w_key):
+        return type(w_key) is W_FloatObject and not math.isnan(w_key.floatval)
+
+    def may_contain_equal_elements(self, strategy):
+        if strategy is self.space.fromcache(BytesSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(AsciiSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(Utf8SetStrategy):
+            return False
+        elif strategy is self.space.fromcache(EmptySetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IdentitySetStrategy):
+            return False
+        return True
+
+    def _lookup_key(self, w_key):
+        # returns the float to look up, or NaN if 'w_key' cannot be
+        # equal to any element.  Only called for floats and ints.
+        if type(w_key) is W_IntObject:
+            return int_to_float_key(w_key.intval)
+        assert isinstance(w_key, W_FloatObject)
+        return w_key.floatval
+
+    def remove(self, w_set, w_item):
+        if type(w_item) is W_IntObject or type(w_item) is W_FloatObject:
+            d = self.unerase(w_set.sstorage)
+            try:
+                del d[self._lookup_key(w_item)]
+                return True
+            except KeyError:
+                return False
+        return AbstractUnwrappedSetStrategy.remove(self, w_set, w_item)
+
+    def has_key(self, w_set, w_key):
+        if type(w_key) is W_IntObject or type(w_key) is W_FloatObject:
+            d = self.unerase(w_set.sstorage)
+            return self._lookup_key(w_key) in d
+        return AbstractUnwrappedSetStrategy.has_key(self, w_set, w_key)
+
+    def unwrap(self, w_item):
+        return self.space.float_w(w_item)
+
+    def wrap(self, item):
+        return self.space.newfloat(item)
+
+    def iter(self, w_set):
+        return FloatIteratorImplementation(self.space, self, w_set)
+
 
 class ObjectSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     erase, unerase = rerased.new_erasing_pair("object")
@@ -1445,10 +2083,16 @@ class IdentitySetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
             return False
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        if strategy is self.space.fromcache(BitsetSetStrategy):
+            return False
+        if strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         if strategy is self.space.fromcache(BytesSetStrategy):
             return False
         if strategy is self.space.fromcache(AsciiSetStrategy):
             return False
+        if strategy is self.space.fromcache(Utf8SetStrategy):
+            return False
         return True
 
     def unwrap(self, w_item):
@@ -1536,6 +2180,19 @@ class UnicodeIteratorImplementation(IteratorImplementation):
             return None
 
 
+class Utf8IteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        for key in self.iterator:
+            return self.space.newutf8(key, rutf8.codepoints_in_utf8(key))
+        else:
+            return None
+
+
 class IntegerIteratorImplementation(IteratorImplementation):
     #XXX same implementation in dictmultiobject on dictstrategy-branch
     def __init__(self, space, strategy, w_set):
@@ -1550,6 +2207,39 @@ class IntegerIteratorImplementation(IteratorImplementation):
         else:
             return None
 
+class BitsetIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        self.bitset = strategy.unerase(w_set.sstorage)
+        self.wordindex = -1
+        self.word = r_uint(0)
+
+    def next_entry(self):
+        words = self.bitset.words
+        while not self.word:
+            self.wordindex += 1
+            if self.wordindex >= len(words):
+                return None
+            self.word = words[self.wordindex]
+        word = self.word
+        index = _lowest_bit(word)
+        self.word = word & (word - 1)
+        wordno = self.bitset.start + self.wordindex
+        return self.space.newint((wordno << BITSET_SHIFT) | index)
+
+class FloatIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        # note that this 'for' loop only runs once, at most
+        for key in self.iterator:
+            return self.space.newfloat(key)
+        else:
+            return None
+
 class IdentityIteratorImplementation(IteratorImplementation):
     def __init__(self, space, strategy, w_set):
         IteratorImplementation.__init__(self, space, strategy, w_set)
@@ -1634,11 +2324,23 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
         w_set.sstorage = strategy.get_storage_from_unwrapped_list(unicodelist)
         return
 
+    utf8list = space.listview_utf8(w_iterable)
+    if utf8list is not None:
+        strategy = space.fromcache(Utf8SetStrategy)
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.get_storage_from_unwrapped_list(utf8list)
+        return
+
     intlist = space.listview_int(w_iterable)
     if intlist is not None:
-        strategy = space.fromcache(IntegerSetStrategy)
+        _set_int_strategy(space, w_set, intlist)
+        return
+
+    floatlist = space.listview_float(w_iterable)
+    if floatlist is not None and not _contains_nan(floatlist):
+        strategy = space.fromcache(FloatSetStrategy)
         w_set.strategy = strategy
-        w_set.sstorage = strategy.get_storage_from_unwrapped_list(intlist)
+        w_set.sstorage = strategy.get_storage_from_unwrapped_list(floatlist)
         return
 
     length_hint = space.length_hint(w_iterable, 0)
@@ -1660,6 +2362,10 @@ def _pick_correct_strategy_unroll(space, w_set, w_iterable):
         if type(w_item) is not W_IntObject:
             break
     else:
+        if space.config.objspace.std.withintbitsets:
+            intlist = [space.int_w(w_item) for w_item in iterable_w]
+            _set_int_strategy(space, w_set, intlist)
+            return
         w_set.strategy = space.fromcache(IntegerSetStrategy)
         w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
         return
@@ -1674,11 +2380,27 @@ def _pick_correct_strategy_unroll(space, w_set, w_iterable):
         return
 
     # check for unicode
+    is_ascii = True
+    for w_item in iterable_w:
+        if type(w_item) is not W_UnicodeObject:
+            break
+        if not w_item.is_ascii():
+            is_ascii = False
+    else:
+        if is_ascii:
+            w_set.strategy = space.fromcache(AsciiSetStrategy)
+        else:
+            w_set.strategy = space.fromcache(Utf8SetStrategy)
+        w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
+        return
+
+    # check for floats
     for w_item in iterable_w:
-        if type(w_item) is not W_UnicodeObject or not w_item.is_ascii():
+        if (type(w_item) is not W_FloatObject or
+                math.isnan(w_item.floatval)):
             break
     else:
-        w_set.strategy = space.fromcache(AsciiSetStrategy)
+        w_set.strategy = space.fromcache(FloatSetStrategy)
         w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
         return
 
@@ -1695,6 +2417,113 @@ def _pick_correct_strategy_unroll(space, w_set, w_iterable):
     w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
 
 
+def _popcount(word):
+    count = 0
+    while word:
+        word &= word - 1
+        count += 1
+    return count
+
+def _lowest_bit(word):
+    # index of the lowest bit set in the non-zero r_uint 'word'
+    index = 0
+    shift = LONG_BIT >> 1
+    while shift:
+        if not word & ((r_uint(1) << shift) - 1):
+            word >>= shift
+            index += shift
+        shift >>= 1
+    return index
+
+def _highest_bit(word):
+    # index of the highest bit set in the non-zero r_uint 'word'
+    index = 0
+    shift = LONG_BIT >> 1
+    while shift:
+        if word >> shift:
+            word >>= shift
+            index += shift
+        shift >>= 1
+    return index
+
+def _bitset_too_sparse(nwords, count):
+    return nwords > BITSET_MIN_WORDS and nwords > count
+
+def _bitset_from_ints(items):
+    """Returns a BitsetStorage containing 'items', or None if they are too
+    sparse for BitsetSetStrategy."""
+    if not items:
+        return BitsetStorage(0, [], 0)
+    start = stop = items[0] >> BITSET_SHIFT
+    for item in items:
+        wordno = item >> BITSET_SHIFT
+        if wordno < start:
+            start = wordno
+        elif wordno > stop:
+            stop = wordno
+    if _bitset_too_sparse(stop - start + 1, len(items)):
+        return None
+    words = [r_uint(0)] * (stop - start + 1)
+    count = 0
+    for item in items:
+        i = (item >> BITSET_SHIFT) - start
+        bit = r_uint(1) << (item & BITSET_MASK)
+        if not words[i] & bit:
+            words[i] |= bit
+            count += 1
+    return BitsetStorage(start, words, count)
+
+def _bitset_contains(bitset, value):
+    word = bitset.word_at(value >> BITSET_SHIFT)
+    return bool(word & (r_uint(1) << (value & BITSET_MASK)))
+
+def _bitset_keys(bitset):
+    keys = [0] * bitset.count
+    n = 0
+    for i in range(len(bitset.words)):
+        word = bitset.words[i]
+        base = (bitset.start + i) << BITSET_SHIFT
+        while word:
+            keys[n] = base | _lowest_bit(word)
+            n += 1
+            word &= word - 1
+    return keys
+
+def _bitset_trim(bitset):
+    # remove the empty words at both ends
+    words = bitset.words
+    start = 0
+    stop = len(words)
+    while stop > 0 and not words[stop - 1]:
+        stop -= 1
+    while start < stop and not words[start]:
+        start += 1
+    if start > 0 or stop < len(words):
+        assert stop >= 0
+        bitset.words = words[start:stop]
+        bitset.start += start
+    if not bitset.words:
+        bitset.start = 0
+
+def _set_int_strategy(space, w_set, intlist):
+    if space.config.objspace.std.withintbitsets:
+        bitset = _bitset_from_ints(intlist)
+        if bitset is not None:
+            strategy = space.fromcache(BitsetSetStrategy)
+            w_set.strategy = strategy
+            w_set.sstorage = strategy.erase(bitset)
+            return
+    strategy = space.fromcache(IntegerSetStrategy)
+    w_set.strategy = strategy
+    w_set.sstorage = strategy.get_storage_from_unwrapped_list(intlist)
+
+def _contains_nan(floatlist):
+    for floatval in floatlist:
+        if math.isnan(floatval):
+            return True
+    return False
+
+
 def get_printable_location(tp, strategy):
     return "update_set: %s %s" % (tp.iterator_greenkey_printable(), strategy)
 
@@ -0,0 +1,236 @@
+"""dict implementation specialized for dicts with string keys that are
+populated with the same keys in the same order, like the records produced
+by csv.DictReader or by the row factories of database drivers.
+
+Similar to JsonDictStrategy: the keys are stored in a map that is shared
+by all the dicts built the same way, and the dicts only store a list of
+values.  A dict switches to the BytesDictStrategy when it is modified in
+another way than by adding a new key or replacing a value.
+"""
+
+from rpython.rlib import jit, rerased
+
+from pypy.objspace.std.dictmultiobject import (
+    BytesDictStrategy, DictStrategy, W_DictObject, _never_equal_to_string,
+    create_iterator_classes)
+from pypy.objspace.std.kwargsdict import ZipItemsWithHash
+
+
+# the maximum number of keys of a shared map
+SHARED_MAP_MAX_LENGTH = 32
+# the maximum number of different keys that can follow the keys of a
+# non-empty map; dicts that are filled with unrelated keys devolve quickly
+SHARED_MAP_MAX_TRANSITIONS = 16
+# the maximum number of different first keys
+SHARED_MAP_MAX_ROOT_TRANSITIONS = 64
+# the maximum number of shared maps that start with the same first key.
+# When a family of maps is exhausted, only the dicts that start with
+# this key devolve.
+SHARED_MAP_MAX_FAMILY_COUNT = 256
+
+
+class SharedKeyMapCache(object):
+    def __init__(self, space):
+        self.root = SharedKeyMap(space, None, [], {})
+
+
+class SharedKeyMapFamily(object):
+    """The maps whose keys start with the same first key."""
+
+    def __init__(self):
+        self.count = 0
+
+
+class SharedKeyMap(object):
+    _immutable_fields_ = ['family', 'keys[*]', 'indexes', 'strategy']
+
+    def __init__(self, space, family, keys, indexes):
+        self.space = space
+        self.family = family      # None for the root map
+        self.keys = keys
+        self.indexes = indexes
+        self.transitions = None
+        self.strategy = SharedKeyDictStrategy(space, self)
+        if family is not None:
+            family.count += 1
+
+    @jit.elidable
+    def get_index(self, key):
+        return self.indexes.get(key, -1)
+
+    @jit.elidable
+    def get_next_map(self, key):
+        """Returns the map with the keys of this map followed by 'key', or
+        None if no more maps can be made.  The result never changes."""
+        if self.transitions is None:
+            self.transitions = {}
+        next_map = self.transitions.get(key, None)
+        if next_map is not None:
+            return next_map
+        if not self.keys:
+            if len(self.transitions) >= SHARED_MAP_MAX_ROOT_TRANSITIONS:
+                return None
+            family = SharedKeyMapFamily()
+        else:
+            family = self.family
+            if (len(self.keys) >= SHARED_MAP_MAX_LENGTH or
+                    len(self.transitions) >= SHARED_MAP_MAX_TRANSITIONS or
+                    family.count >= SHARED_MAP_MAX_FAMILY_COUNT):
+                return None
+        keys = self.keys + [key]
+        indexes = self.indexes.copy()
+        indexes[key] = len(self.keys)
+        next_map = SharedKeyMap(self.space, family, keys, indexes)
+        self.transitions[key] = next_map
+        return next_map
+
+
+def get_empty_shared_key_strategy(space):
+    return space.fromcache(SharedKeyMapCache).root.strategy
+
+
+class SharedKeyDictStrategy(DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("sharedkeydict")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    _immutable_fields_ = ['map']
+
+    def __init__(self, space, map):
+        DictStrategy.__init__(self, space)
+        self.map = map
+
+    def wrap(self, key):
+        return self.space.newbytes(key)
+
+    def wrapkey(space, key):
+        return space.newbytes(key)
+
+    def get_empty_storage(self):
+        assert not self.map.keys
+        return self.erase([])
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_bytes)
+
+    def _never_equal_to(self, w_lookup_type):
+        return _never_equal_to_string(self.space, w_lookup_type)
+
+    def length(self, w_dict):
+        return len(self.unerase(w_dict.dstorage))
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        if self.is_correct_type(w_key):
+            return self.getitem_str(w_dict, space.bytes_w(w_key))
+        elif self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_bytes_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
+    def getitem_str(self, w_dict, key):
+        storage_w = self.unerase(w_dict.dstorage)
+        if jit.isconstant(key):
+            jit.promote(self)
+        index = self.map.get_index(key)
+        if index == -1:
+            return None
+        return storage_w[index]
+
+    def setitem(self, w_dict, w_key, w_value):
+        if self.is_correct_type(w_key):
+            self.setitem_str(w_dict, self.space.bytes_w(w_key), w_value)
+        else:
+            self.switch_to_bytes_strategy(w_dict)
+            w_dict.setitem(w_key, w_value)
+
+    def setitem_str(self, w_dict, key, w_value):
+        storage_w = self.unerase(w_dict.dstorage)
+        if jit.isconstant(key):
+            jit.promote(self)
+        index = self.map.get_index(key)
+        if index != -1:
+            storage_w[index] = w_value
+            return
+        next_map = self.map.get_next_map(key)
+        if next_map is None:
+            self.switch_to_bytes_strategy(w_dict)
+            w_dict.setitem_str(key, w_value)
+            return
+        storage_w.append(w_value)
+        w_dict.set_strategy(next_map.strategy)
+
+    def setdefault(self, w_dict, w_key, w_default):
+        if self.is_correct_type(w_key):
+            key = self.space.bytes_w(w_key)
+            w_result = self.getitem_str(w_dict, key)
+            if w_result is not None:
+                return w_result
+            self.setitem_str(w_dict, key, w_default)
+            return w_default
+        self.switch_to_bytes_strategy(w_dict)
+        return w_dict.setdefault(w_key, w_default)
+
+    def delitem(self, w_dict, w_key):
+        self.switch_to_bytes_strategy(w_dict)
+        return w_dict.delitem(w_key)
+
+    def popitem(self, w_dict):
+        self.switch_to_bytes_strategy(w_dict)
+        return w_dict.popitem()
+
+    def switch_to_bytes_strategy(self, w_dict):
+        strategy = self.space.fromcache(BytesDictStrategy)
+        storage = self._make_bytes_dict(w_dict)
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = storage
+
+    def _make_bytes_dict(self, w_dict):
+        strategy = self.space.fromcache(BytesDictStrategy)
+        values_w = self.unerase(w_dict.dstorage)
+        storage = strategy.get_empty_storage()
+        d_new = strategy.unerase(storage)
+        keys = self.map.keys
+        assert len(keys) == len(values_w)
+        for i in range(len(keys)):
+            d_new[keys[i]] = values_w[i]
+        return storage
+
+    def copy(self, w_dict):
+        values_w = self.unerase(w_dict.dstorage)
+        return W_DictObject(self.space, self, self.erase(values_w[:]))
+
+    def listview_bytes(self, w_dict):
+        return self.map.keys[:]
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_bytes(self.listview_bytes(w_dict))
+
+    def values(self, w_dict):
+        return self.unerase(w_dict.dstorage)[:]
+
+    def items(self, w_dict):
+        space = self.space
+        keys = self.map.keys
+        values_w = self.unerase(w_dict.dstorage)
+        return [space.newtuple2(self.wrap(keys[i]), values_w[i])
+                for i in range(len(keys))]
+
+    def view_as_kwargs(self, w_dict):
+        return self.map.keys[:], self.unerase(w_dict.dstorage)[:]
+
+    def getiterkeys(self, w_dict):
+        return iter(self.map.keys)
+
+    def getitervalues(self, w_dict):
+        return iter(self.unerase(w_dict.dstorage))
+
+    def getiteritems_with_hash(self, w_dict):
+        return ZipItemsWithHash(self.map.keys, self.unerase(w_dict.dstorage))
+
+    def getiterreversed(self, w_dict):
+        return reversed(self.map.keys)
+
+create_iterator_classes(SharedKeyDictStrategy)
@@ -0,0 +1,347 @@
+"""dict implementation specialized for dicts with only a few keys.
+
+Based on two lists containing the unwrapped keys and the values, which are
+searched linearly.  The dict switches to the hash-based strategy for the
+same key type when it grows larger than SMALL_DICT_MAX_LENGTH.
+"""
+
+from rpython.rlib import jit, rerased, objectmodel
+
+from pypy.objspace.std.dictmultiobject import (
+    UNROLL_CUTOFF, BytesDictStrategy, DictStrategy, FloatDictStrategy,
+    IntDictStrategy, ObjectDictStrategy, UnicodeDictStrategy, W_DictObject,
+    create_iterator_classes, unicode_eq, unicode_hash)
+
+
+SMALL_DICT_MAX_LENGTH = 8
+
+
+class AbstractSmallDictStrategy(object):
+    _mixin_ = True
+
+    # the hash-based strategy with the same key type, whose wrap(),
+    # unwrap(), is_correct_type() and _never_equal_to() are used
+    full_strategy_class = None
+
+    @staticmethod
+    def erase(storage):
+        raise NotImplementedError("abstract base class")
+
+    @staticmethod
+    def unerase(obj):
+        raise NotImplementedError("abstract base class")
+
+    def __init__(self, space):
+        DictStrategy.__init__(self, space)
+        self.full_strategy = space.fromcache(self.full_strategy_class)
+
+    def wrap(self, unwrapped):
+        return self.full_strategy.wrap(unwrapped)
+
+    def unwrap(self, wrapped):
+        return self.full_strategy.unwrap(wrapped)
+
+    def is_correct_type(self, w_obj):
+        return self.full_strategy.is_correct_type(w_obj)
+
+    def _never_equal_to(self, w_lookup_type):
+        return self.full_strategy._never_equal_to(w_lookup_type)
+
+    def _is_lookup_type(self, w_key):
+        return self.is_correct_type(w_key)
+
+    def _lookup_key(self, w_key):
+        return self.unwrap(w_key)
+
+    def _key_eq(self, key1, key2):
+        return key1 == key2
+
+    def _key_hash(self, key):
+        return objectmodel.compute_hash(key)
+
+    def get_empty_storage(self):
+        return self.erase(([], []))
+
+    @jit.look_inside_iff(lambda self, keys, key:
+            jit.isconstant(len(keys)) and jit.isconstant(key))
+    def _find(self, keys, key):
+        for i in range(len(keys)):
+            if self._key_eq(keys[i], key):
+                return i
+        return -1
+
+    def _getitem_unwrapped(self, w_dict, key):
+        keys, values_w = self.unerase(w_dict.dstorage)
+        i = self._find(keys, key)
+        if i < 0:
+            return None
+        return values_w[i]
+
+    def _setitem_unwrapped(self, w_dict, key, w_value):
+        keys, values_w = self.unerase(w_dict.dstorage)
+        i = self._find(keys, key)
+        if i >= 0:
+            values_w[i] = w_value
+        elif len(keys) >= SMALL_DICT_MAX_LENGTH:
+            self.switch_to_full_strategy(w_dict)
+            w_dict.setitem(self.wrap(key), w_value)
+        else:
+            keys.append(key)
+            values_w.append(w_value)
+
+    def setitem(self, w_dict, w_key, w_value):
+        if self.is_correct_type(w_key):
+            self._setitem_unwrapped(w_dict, self.unwrap(w_key), w_value)
+        else:
+            self.switch_to_object_strategy(w_dict)
+            w_dict.setitem(w_key, w_value)
+
+    def setitem_str(self, w_dict, key, w_value):
+        self.switch_to_object_strategy(w_dict)
+        w_dict.setitem(self.space.newtext(key), w_value)
+
+    def setdefault(self, w_dict, w_key, w_default):
+        if self.is_correct_type(w_key):
+            key = self.unwrap(w_key)
+            w_result = self._getitem_unwrapped(w_dict, key)
+            if w_result is not None:
+                return w_result
+            self._setitem_unwrapped(w_dict, key, w_default)
+            return w_default
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.setdefault(w_key, w_default)
+
+    def delitem(self, w_dict, w_key):
+        space = self.space
+        if self._is_lookup_type(w_key):
+            keys, values_w = self.unerase(w_dict.dstorage)
+            i = self._find(keys, self._lookup_key(w_key))
+            if i < 0:
+                raise KeyError
+            del keys[i]
+            del values_w[i]
+        elif self._never_equal_to(space.type(w_key)):
+            raise KeyError
+        else:
+            self.switch_to_object_strategy(w_dict)
+            w_dict.delitem(w_key)
+
+    def length(self, w_dict):
+        return len(self.unerase(w_dict.dstorage)[0])
+
+    def getitem_str(self, w_dict, key):
+        return self.getitem(w_dict, self.space.newtext(key))
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        if self._is_lookup_type(w_key):
+            return self._getitem_unwrapped(w_dict, self._lookup_key(w_key))
+        elif self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
+    def w_keys(self, w_dict):
+        keys = self.unerase(w_dict.dstorage)[0]
+        return self.space.newlist([self.wrap(key) for key in keys])
+
+    def values(self, w_dict):
+        return self.unerase(w_dict.dstorage)[1][:] # to make non-resizable
+
+    def items(self, w_dict):
+        space = self.space
+        keys, values_w = self.unerase(w_dict.dstorage)
+        return [space.newtuple2(self.wrap(keys[i]), values_w[i])
+                for i in range(len(keys))]
+
+    def popitem(self, w_dict):
+        keys, values_w = self.unerase(w_dict.dstorage)
+        if not keys:
+            raise KeyError
+        key = keys.pop()
+        w_value = values_w.pop()
+        return self.wrap(key), w_value
+
+    def pop(self, w_dict, w_key, w_default):
+        space = self.space
+        if self._is_lookup_type(w_key):
+            keys, values_w = self.unerase(w_dict.dstorage)
+            i = self._find(keys, self._lookup_key(w_key))
+            if i >= 0:
+                del keys[i]
+                return values_w.pop(i)
+        elif not self._never_equal_to(space.type(w_key)):
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.get_strategy().pop(w_dict, w_key, w_default)
+        if w_default is not None:
+            return w_default
+        raise KeyError
+
+    def clear(self, w_dict):
+        w_dict.dstorage = self.get_empty_storage()
+
+    def switch_to_object_strategy(self, w_dict):
+        strategy = self.space.fromcache(ObjectDictStrategy)
+        keys, values_w = self.unerase(w_dict.dstorage)
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for i in range(len(keys)):
+            d_new[self.wrap(keys[i])] = values_w[i]
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = strategy.erase(d_new)
+
+    def switch_to_full_strategy(self, w_dict):
+        strategy = self.full_strategy
+        keys, values_w = self.unerase(w_dict.dstorage)
+        storage = strategy.get_empty_storage()
+        d_new = strategy.unerase(storage)
+        for i in range(len(keys)):
+            d_new[keys[i]] = values_w[i]
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = storage
+
+    def copy(self, w_dict):
+        keys, values_w = self.unerase(w_dict.dstorage)
+        return W_DictObject(self.space, self,
+                            self.erase((keys[:], values_w[:])))
+
+    def move_to_end(self, w_dict, w_key, last_flag):
+        if self.is_correct_type(w_key):
+            keys, values_w = self.unerase(w_dict.dstorage)
+            i = self._find(keys, self.unwrap(w_key))
+            if i < 0:
+                self.space.raise_key_error(w_key)
+            key = keys.pop(i)
+            w_value = values_w.pop(i)
+            if last_flag:
+                keys.append(key)
+                values_w.append(w_value)
+            else:
+                keys.insert(0, key)
+                values_w.insert(0, w_value)
+        else:
+            self.switch_to_object_strategy(w_dict)
+            w_dict.nondescr_move_to_end(w_dict.space, w_key, last_flag)
+
+    def prepare_update(self, w_dict, num_extra):
+        if self.length(w_dict) + num_extra > SMALL_DICT_MAX_LENGTH:
+            self.switch_to_full_strategy(w_dict)
+            self.full_strategy.prepare_update(w_dict, num_extra)
+
+    # --------------- iterator interface -----------------
+
+    def getiterkeys(self, w_dict):
+        return iter(self.unerase(w_dict.dstorage)[0])
+
+    def getitervalues(self, w_dict):
+        return iter(self.unerase(w_dict.dstorage)[1])
+
+    def getiteritems_with_hash(self, w_dict):
+        keys, values_w = self.unerase(w_dict.dstorage)
+        return iter([(keys[i], values_w[i], self._key_hash(keys[i]))
+                     for i in range(len(keys))])
+
+    def getiterreversed(self, w_dict):
+        return reversed(self.unerase(w_dict.dstorage)[0])
+
+    def _unrolling_heuristic(self, w_dict):
+        keys = self.unerase(w_dict.dstorage)[0]
+        return jit.loop_unrolling_heuristic(keys, len(keys), UNROLL_CUTOFF)
+
+
+class SmallBytesDictStrategy(AbstractSmallDictStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("smallbytes")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    full_strategy_class = BytesDictStrategy
+
+    def setitem_str(self, w_dict, key, w_value):
+        assert key is not None
+        self._setitem_unwrapped(w_dict, key, w_value)
+
+    def getitem_str(self, w_dict, key):
+        assert key is not None
+        return self._getitem_unwrapped(w_dict, key)
+
+    def listview_bytes(self, w_dict):
+        return self.unerase(w_dict.dstorage)[0][:]
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_bytes(self.listview_bytes(w_dict))
+
+    def view_as_kwargs(self, w_dict):
+        keys, values_w = self.unerase(w_dict.dstorage)
+        return keys[:], values_w[:] # copy to make non-resizable
+
+    def wrapkey(space, key):
+        return space.newbytes(key)
+
+create_iterator_classes(SmallBytesDictStrategy)
+
+
+class SmallUnicodeDictStrategy(AbstractSmallDictStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("smallunicode")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    full_strategy_class = UnicodeDictStrategy
+
+    def _key_eq(self, key1, key2):
+        return unicode_eq(key1, key2)
+
+    def _key_hash(self, key):
+        return unicode_hash(key)
+
+    def wrapkey(space, key):
+        return key
+
+create_iterator_classes(SmallUnicodeDictStrategy)
+
+
+class SmallIntDictStrategy(AbstractSmallDictStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("smallint")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    full_strategy_class = IntDictStrategy
+
+    def listview_int(self, w_dict):
+        return self.unerase(w_dict.dstorage)[0][:]
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_int(self.listview_int(w_dict))
+
+    def wrapkey(space, key):
+        return space.newint(key)
+
+create_iterator_classes(SmallIntDictStrategy)
+
+
+class SmallFloatDictStrategy(AbstractSmallDictStrategy, DictStrategy):
+    """Like FloatDictStrategy, NaN keys are not allowed, and ints can be
+    looked up without switching to the object strategy."""
+
+    erase, unerase = rerased.new_erasing_pair("smallfloat")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    full_strategy_class = FloatDictStrategy
+
+    def _is_lookup_type(self, w_key):
+        return self.full_strategy._is_lookup_type(w_key)
+
+    def _lookup_key(self, w_key):
+        return self.full_strategy._lookup_key(w_key)
+
+    def listview_float(self, w_dict):
+        return self.unerase(w_dict.dstorage)[0][:]
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_float(self.listview_float(w_dict))
+
+    def wrapkey(space, key):
+        return space.newfloat(key)
+
+create_iterator_classes(SmallFloatDictStrategy)
@@ -18,3 +18,17 @@ class TestCallMethod:
                 callmethod.LOOKUP_METHOD)
         assert (self.space.FrameClass.CALL_METHOD.im_func ==
                 callmethod.CALL_METHOD)
+
+    def test_module_attribute_cache(self):
+        space = self.space
+        w_code = space.appexec([], """():
+            import sys
+            def f():
+                return sys.getrecursionlimit(), sys.maxint
+            f(); f()
+            return f.__code__
+        """)
+        names = w_code.co_names
+        caches = w_code._module_attr_caches
+        assert caches[names.index('getrecursionlimit')] is not None
+        assert caches[names.index('maxint')] is not None
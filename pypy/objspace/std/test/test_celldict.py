@@ -114,6 +114,60 @@ class AppTestModuleDict(object):
         d1 = d.copy()
         assert d1 == {"__name__": "abc", "__doc__": None, "s": 12, "x": object}
 
+    def test_module_attribute_cache(self):
+        m1 = type(__builtins__)("m1")
+        m2 = type(__builtins__)("m2")
+        def f(m):
+            return m.x
+        def g(m):
+            return m.func()
+        m1.x = 1
+        m1.func = lambda: 10
+        m2.x = 2
+        m2.func = lambda: 20
+        for i in range(3):
+            assert f(m1) == 1
+            assert g(m1) == 10
+            assert f(m2) == 2
+            assert g(m2) == 20
+        m1.x = 3
+        m1.x = 4     # int cell
+        m1.func = lambda: 30
+        assert f(m1) == 4
+        assert g(m1) == 30
+        del m1.x
+        raises(AttributeError, f, m1)
+        m1.__dict__["x"] = 5
+        assert f(m1) == 5
+        m1.__dict__.clear()
+        raises(AttributeError, f, m1)
+        raises(AttributeError, g, m1)
+        m1.x = 6
+        assert f(m1) == 6
+        m1.__dict__.popitem()
+        raises(AttributeError, f, m1)
+        # switch the dict of m2 to the object strategy
+        m2.__dict__[42] = 42
+        assert f(m2) == 2
+        m2.x = 7
+        assert f(m2) == 7
+        assert g(m2) == 20
+
+    def test_module_attribute_cache_type_attributes(self):
+        m = type(__builtins__)("m", "docstring")
+        def f(m):
+            return m.__doc__, m.__dict__
+        for i in range(3):
+            assert f(m) == ("docstring", m.__dict__)
+        class SubModule(type(__builtins__)):
+            def __getattribute__(self, name):
+                return name
+        def g(m):
+            return m.y
+        m.y = 5
+        assert g(m) == 5
+        assert g(SubModule("sub")) == "y"
+
 
 class TestModuleDictImplementation(BaseTestRDictImplementation):
     StrategyClass = ModuleDictStrategy
@@ -156,6 +156,12 @@ class TestW_DictObject(object):
         w_d.initialize_content([(w(1), w("a")), (w(2), w("b"))])
         assert self.space.listview_int(w_d) == [1, 2]
 
+    def test_listview_float_dict(self):
+        w = self.space.wrap
+        w_d = self.space.newdict()
+        w_d.initialize_content([(w(1.5), w("a")), (w(2.5), w("b"))])
+        assert self.space.listview_float(w_d) == [1.5, 2.5]
+
     def test_keys_on_string_unicode_int_dict(self, monkeypatch):
         w = self.space.wrap
         wb = self.space.newbytes
@@ -821,6 +827,14 @@ class AppTest_DictMultiObject(AppTest_DictObject):
             assert (x == 1 or x == 2) and len(d) == 1
 
 
+class AppTest_DictMultiObjectWithSmallDicts(AppTest_DictMultiObject):
+    spaceconfig = {"objspace.std.withsmalldicts": True}
+
+
+class AppTest_DictMultiObjectWithSharedKeys(AppTest_DictMultiObject):
+    spaceconfig = {"objspace.std.withsharedkeydicts": True}
+
+
 class AppTestDictViews:
     def test_dictview(self):
         d = {1: 2, 3: 4}
@@ -1194,6 +1208,44 @@ class AppTestStrategies(object):
         assert "IntDictStrategy" in self.get_strategy(d)
         assert d[1L] == "hi"
 
+    def test_empty_to_float(self):
+        d = {}
+        d[1.5] = "hi"
+        assert "FloatDictStrategy" in self.get_strategy(d)
+        assert d[1.5] == "hi"
+        d[-0.0] = "zero"
+        d[0.0] = "zero again"
+        assert len(d) == 2
+        assert str(d.keys()[1]) == "-0.0"
+        assert d[0] == "zero again"
+        assert d.get(1) is None
+        assert d.get(2**53 + 1) is None
+        assert d.get(None) is None
+        assert "FloatDictStrategy" in self.get_strategy(d)
+        assert d.pop(0) == "zero again"
+        assert "FloatDictStrategy" in self.get_strategy(d)
+        raises(KeyError, "del d[0]")
+        assert d.keys() == [1.5]
+        assert list(d.iteritems()) == [(1.5, "hi")]
+        d[1] = "int"
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d == {1.5: "hi", 1: "int"}
+        assert type(d.keys()[1]) is int
+
+    def test_float_nan(self):
+        nan = float('nan')
+        d = {}
+        d[nan] = 1
+        assert "FloatDictStrategy" not in self.get_strategy(d)
+        assert d[nan] == 1
+        d = {1.5: 2}
+        assert d.get(nan) is None
+        assert "FloatDictStrategy" in self.get_strategy(d)
+        d[nan] = 3
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d[nan] == 3
+        assert d[1.5] == 2
+
     def test_iter_dict_length_change(self):
         d = {1: 2, 3: 4, 5: 6}
         it = d.iteritems()
@@ -1340,6 +1392,8 @@ class Config:
         class std:
             methodcachesizeexp = 11
             withmethodcachecounter = False
+            withsmalldicts = False
+            withsharedkeydicts = False
         honor__builtins__ = False
 
 FakeSpace.config = Config()
@@ -1955,6 +1955,10 @@ class AppTestWithoutStrategies:
         assert notshared == []
 
 
+class AppTestListObjectWithNarrowInts(AppTestListObject):
+    spaceconfig = {"objspace.std.withnarrowintlists": True}
+
+
 class AppTestListFastSubscr:
     spaceconfig = {"objspace.std.optimized_list_getitem": True}
 
@@ -4,7 +4,8 @@ from pypy.objspace.std.listobject import (
     W_ListObject, EmptyListStrategy, ObjectListStrategy, IntegerListStrategy,
     FloatListStrategy, BytesListStrategy, RangeListStrategy,
     SimpleRangeListStrategy, make_range_list, AsciiListStrategy,
-    IntOrFloatListStrategy)
+    IntOrFloatListStrategy, Int8ListStrategy, Int16ListStrategy,
+    Int32ListStrategy, Utf8ListStrategy)
 from pypy.objspace.std import listobject
 from pypy.objspace.std.test.test_listobject import TestW_ListObject
 
@@ -543,6 +544,22 @@ class TestW_ListStrategies(TestW_ListObject):
         l2.append(self.space.wrap("four"))
         assert l2 == l1.getitems()
 
+    def test_getstorage_does_not_copy(self):
+        space = self.space
+        w = space.wrap
+        l1 = W_ListObject(space, [w(1), w(2), w(3)])
+        storage = l1.getstorage_int()
+        storage.append(4)
+        assert space.unwrap(l1) == [1, 2, 3, 4]
+        assert l1.getstorage_float() is None
+        l2 = W_ListObject(space, [w(1.5), w(2.5)])
+        assert l2.getstorage_int() is None
+        l2.getstorage_float()[0] = 3.5
+        assert space.unwrap(l2) == [3.5, 2.5]
+        l3 = make_range_list(space, 1, 1, 3)
+        assert l3.getstorage_int() is None
+        assert W_ListObject(space, [w(1), w("two")]).getstorage_int() is None
+
     def test_clone(self):
         l1 = W_ListObject(self.space, [self.space.wrap(1), self.space.wrap(2), self.space.wrap(3)])
         clone = l1.clone()
@@ -605,6 +622,56 @@ class TestW_ListStrategies(TestW_ListObject):
         l3 = W_ListObject(self.space, [self.space.newbytes("eins"), self.space.newutf8("zwei", 4)])
         assert isinstance(l3.strategy, ObjectListStrategy)
 
+    def test_utf8(self):
+        space = self.space
+        w = space.wrap
+        l = W_ListObject(space, [w(u'a'), w(u'\xe9t\xe9'), w(u'\u1234')])
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        assert space.utf8_w(l.getitem(1)) == '\xc3\xa9t\xc3\xa9'
+        assert space.len_w(l.getitem(1)) == 3
+        assert l.find_or_count(w(u'\u1234')) == 2
+        l.sort(False)
+        assert l.getitems_utf8() == ['a', '\xc3\xa9t\xc3\xa9', '\xe1\x88\xb4']
+        l.append(w(u'b'))
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        l.append(w(2))
+        assert isinstance(l.strategy, ObjectListStrategy)
+
+        l = W_ListObject(space, [])
+        l.append(w(u'\xe9'))
+        assert isinstance(l.strategy, Utf8ListStrategy)
+
+        # ascii lists switch without copying the storage
+        l = W_ListObject(space, [w(u'a'), w(u'b')])
+        assert isinstance(l.strategy, AsciiListStrategy)
+        storage = l.getitems_ascii()
+        assert l.find_or_count(w(u'\xe9'), count=True) == 0
+        l.append(w(u'\xe9'))
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        assert l.getitems_utf8() is storage
+        assert l.getitems_utf8() == ['a', 'b', '\xc3\xa9']
+
+        l = W_ListObject(space, [w(u'a'), w(u'b')])
+        l.extend(W_ListObject(space, [w(u'\xe9'), w(u'c')]))
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        l.extend(W_ListObject(space, [w(u'd')]))
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        assert l.getitems_utf8() == ['a', 'b', '\xc3\xa9', 'c', 'd']
+        l.setslice(0, 1, 2, W_ListObject(space, [w(u'x')]))
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        assert l.getitems_utf8() == ['x', '\xc3\xa9', 'c', 'd']
+
+    def test_listview_utf8(self):
+        space = self.space
+        w = space.wrap
+        assert space.listview_utf8(space.wrap(1)) == None
+        w_l = space.newlist([w(u'a'), w(u'\xe9')])
+        assert space.listview_utf8(w_l) == ['a', '\xc3\xa9']
+        w_l = space.newlist([w(u'a'), w(u'b')])
+        assert space.listview_utf8(w_l) == ['a', 'b']
+        w_l = space.newlist([w(u'a'), w(1)])
+        assert space.listview_utf8(w_l) == None
+
     def test_listview_bytes(self):
         space = self.space
         assert space.listview_bytes(space.wrap(1)) == None
@@ -1051,6 +1118,110 @@ class TestW_ListStrategies(TestW_ListObject):
         assert isinstance(w_item, space.StringObjectCls)
 
 
+class TestW_NarrowIntListStrategies:
+    spaceconfig = {"objspace.std.withnarrowintlists": True}
+
+    def test_check_strategy(self):
+        space = self.space
+        w = space.wrap
+        l = W_ListObject(space, [w(1), w(-128), w(127)])
+        assert isinstance(l.strategy, Int8ListStrategy)
+        l = W_ListObject(space, [w(1), w(128)])
+        assert isinstance(l.strategy, Int16ListStrategy)
+        l = W_ListObject(space, [w(1), w(-2 ** 31)])
+        if sys.maxint > 2 ** 31:
+            assert isinstance(l.strategy, Int32ListStrategy)
+        else:
+            assert isinstance(l.strategy, IntegerListStrategy)
+        l = W_ListObject(space, [w(1), w(sys.maxint)])
+        assert isinstance(l.strategy, IntegerListStrategy)
+        l = W_ListObject(space, [])
+        l.append(w(5))
+        assert isinstance(l.strategy, Int8ListStrategy)
+
+    def test_widen(self):
+        space = self.space
+        w = space.wrap
+        l = W_ListObject(space, [w(1), w(-2)])
+        l.append(w(1000))
+        assert isinstance(l.strategy, Int16ListStrategy)
+        l.insert(0, w(-sys.maxint - 1))
+        assert isinstance(l.strategy, IntegerListStrategy)
+        assert space.unwrap(l) == [-sys.maxint - 1, 1, -2, 1000]
+
+        l = W_ListObject(space, [w(1), w(-2)])
+        l.setitem(1, w(1 << 20))
+        if sys.maxint > 2 ** 31:
+            assert isinstance(l.strategy, Int32ListStrategy)
+        assert space.unwrap(l) == [1, 1 << 20]
+
+        l = W_ListObject(space, [w(1), w(-2)])
+        l.append(w(2.5))
+        assert isinstance(l.strategy, IntOrFloatListStrategy)
+        assert space.unwrap(l) == [1, -2, 2.5]
+
+        l = W_ListObject(space, [w(1), w(-2)])
+        l.append(w("x"))
+        assert isinstance(l.strategy, ObjectListStrategy)
+        assert space.unwrap(l) == [1, -2, "x"]
+
+    def test_extend_and_setslice(self):
+        space = self.space
+        w = space.wrap
+        l = W_ListObject(space, [w(1000), w(2)])
+        l.extend(W_ListObject(space, [w(3), w(4)]))
+        assert isinstance(l.strategy, Int16ListStrategy)
+        assert l.getitems_int() == [1000, 2, 3, 4]
+
+        l = W_ListObject(space, [w(1), w(2)])
+        l.extend(W_ListObject(space, [w(3), w(40000)]))
+        assert isinstance(l.strategy, Int32ListStrategy if sys.maxint > 2 ** 31
+                                      else IntegerListStrategy)
+        assert l.getitems_int() == [1, 2, 3, 40000]
+
+        l = W_ListObject(space, [w(1), w(2)])
+        l.extend(make_range_list(space, 0, 100, 3))
+        assert isinstance(l.strategy, Int16ListStrategy)
+        assert l.getitems_int() == [1, 2, 0, 100, 200]
+
+        l = W_ListObject(space, [w(sys.maxint)])
+        l.extend(W_ListObject(space, [w(3), w(4)]))
+        assert isinstance(l.strategy, IntegerListStrategy)
+        assert l.getitems_int() == [sys.maxint, 3, 4]
+
+        l = W_ListObject(space, [w(1), w(2), w(3)])
+        l.setslice(0, 1, 2, W_ListObject(space, [w(1000)]))
+        assert isinstance(l.strategy, Int16ListStrategy)
+        assert l.getitems_int() == [1000, 3]
+
+        l = W_ListObject(space, [w(1.5)])
+        l.extend(W_ListObject(space, [w(3), w(4)]))
+        assert isinstance(l.strategy, IntOrFloatListStrategy)
+        assert space.unwrap(l) == [1.5, 3, 4]
+
+    def test_find_sort(self):
+        space = self.space
+        w = space.wrap
+        l = W_ListObject(space, [w(5), w(-3), w(100), w(5)])
+        assert l.find_or_count(w(5), count=True) == 2
+        assert l.find_or_count(w(100)) == 2
+        assert l.find_or_count(w(1000), count=True) == 0
+        assert l.find_or_count(w(100.0)) == 2
+        py.test.raises(ValueError, l.find_or_count, w(1000))
+        l.sort(False)
+        assert l.getitems_int() == [-3, 5, 5, 100]
+        l.sort(True)
+        assert l.getitems_int() == [100, 5, 5, -3]
+        assert isinstance(l.strategy, Int8ListStrategy)
+
+    def test_list_from_iterable(self):
+        space = self.space
+        w_l = space.appexec([], """():
+            return list(x * 7 for x in range(10))""")
+        assert isinstance(w_l.strategy, Int8ListStrategy)
+        assert w_l.getitems_int() == [x * 7 for x in range(10)]
+
+
 class TestW_ListStrategiesDisabled:
     spaceconfig = {"objspace.std.withliststrategies": False}
 
@@ -0,0 +1,87 @@
+import py
+
+class AppTestPairDict(object):
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__repr__ doesn't work on appdirect")
+
+    def w_get_strategy(self, obj):
+        import __pypy__
+        r = __pypy__.internal_repr(obj)
+        return r[r.find("(") + 1: r.find(")")]
+
+    def test_int_pairs(self):
+        d = {}
+        d[1, 2] = "a"
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+        d[3, -4] = "b"
+        assert d[1, 2] == "a"
+        assert d.get((1, 3)) is None
+        assert (3, -4) in d
+        assert d.get((1, 2, 3)) is None
+        assert d.get(5) is None
+        assert d.get(None) is None
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+        assert sorted(d) == [(1, 2), (3, -4)]
+        assert sorted(d.items()) == [((1, 2), "a"), ((3, -4), "b")]
+        assert d.pop((3, -4)) == "b"
+        del d[1, 2]
+        assert d == {}
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+
+    def test_bytes_int_pairs(self):
+        d = {("x", 1): 5, ("y", 2): 6}
+        assert "BytesIntPairDictStrategy" in self.get_strategy(d)
+        assert d["x", 1] == 5
+        assert d.get(("x", 2)) is None
+        assert sorted(d.keys()) == [("x", 1), ("y", 2)]
+        assert d[u"x", 1] == 5
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+
+    def test_equal_keys_of_other_types(self):
+        d = {(1, 2): "a"}
+        assert d[1.0, 2] == "a"
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        d = {(1, 2): "a"}
+        d[1, "2"] = "b"
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d == {(1, 2): "a", (1, "2"): "b"}
+
+    def test_not_pairs(self):
+        d = {(1, 2, 3): "a"}
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        d = {(1.5, 2): "a"}
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        class T(tuple):
+            def __hash__(self):
+                return 42
+        d = {T((1, 2)): "a"}
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        d = {(1, 2): "a"}
+        d[T((3, 4))] = "b"
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d[T((3, 4))] == "b"
+
+    def test_lookup_not_pairs(self):
+        d = {(1, 2): "a", (3, 4): "b"}
+        assert (1, 2, 3) not in d
+        assert () not in d
+        raises(KeyError, "del d[(1, 2, 3)]")
+        raises(KeyError, d.pop, (1, 2, 3))
+        assert d.pop((1, 2, 3), "x") == "x"
+        raises(TypeError, "del d[(1, 2, [])]")
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+        d = {("x", 1): 5}
+        raises(KeyError, "del d[(1, 2, 3)]")
+        assert d.pop(("x", 1, 2), None) is None
+        assert "BytesIntPairDictStrategy" in self.get_strategy(d)
+        assert d.setdefault(("x", 1, 2), 6) == 6
+        assert d == {("x", 1): 5, ("x", 1, 2): 6}
+
+    def test_big_ints(self):
+        import sys
+        d = {(sys.maxint, -sys.maxint - 1): 1}
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+        assert d.keys() == [(sys.maxint, -sys.maxint - 1)]
+        assert d.get((sys.maxint + 1, 0)) is None
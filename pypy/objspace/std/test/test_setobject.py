@@ -81,7 +81,7 @@ class TestW_SetObject:
     def test_create_set_from_list(self):
         from pypy.interpreter.baseobjspace import W_Root
         from pypy.objspace.std.setobject import BytesSetStrategy, ObjectSetStrategy
-        from pypy.objspace.std.floatobject import W_FloatObject
+        from pypy.objspace.std.setobject import FloatSetStrategy
 
         w = self.space.wrap
         wb = self.space.newbytes
@@ -116,9 +116,8 @@ class TestW_SetObject:
         w_list = W_ListObject(self.space, [w(1.0), w(2.0), w(3.0)])
         w_set = W_SetObject(self.space)
         _initialize_set(self.space, w_set, w_list)
-        assert w_set.strategy is self.space.fromcache(ObjectSetStrategy)
-        for item in w_set.strategy.unerase(w_set.sstorage):
-            assert isinstance(item, W_FloatObject)
+        assert w_set.strategy is self.space.fromcache(FloatSetStrategy)
+        assert w_set.strategy.unerase(w_set.sstorage) == {1.0:None, 2.0:None, 3.0:None}
 
         # changed cached object, need to change it back for other tests to pass
         intstr.get_storage_from_list = tmp_func
@@ -1070,6 +1069,35 @@ class AppTestAppSetTest:
         s.intersection_update(set())
         assert strategy(s) == "EmptySetStrategy"
 
+    def test_float_strategy(self):
+        from __pypy__ import strategy
+        s = set([1.5, 2.5])
+        assert strategy(s) == "FloatSetStrategy"
+        s.add(0.0)
+        s.add(-0.0)
+        assert len(s) == 3
+        assert 1.5 in s
+        assert 0 in s
+        assert 1 not in s
+        assert strategy(s) == "FloatSetStrategy"
+        assert s & set([0, 1]) == set([0])
+        assert s - set([0]) == set([1.5, 2.5])
+        assert set([2.5]) <= s
+        s.add(2)
+        assert strategy(s) == "ObjectSetStrategy"
+        assert s == set([0.0, 1.5, 2.5, 2])
+        #
+        nan = float('nan')
+        s = set()
+        s.add(nan)
+        assert strategy(s) != "FloatSetStrategy"
+        assert nan in s
+        s = set([1.5])
+        assert nan not in s
+        s.add(nan)
+        assert strategy(s) == "ObjectSetStrategy"
+        assert nan in s
+
     def test_weird_exception_from_iterable(self):
         def f():
            raise ValueError
@@ -1095,3 +1123,82 @@ class AppTestAppSetTest:
         x = frozenset()
         raises(TypeError, set.add.im_func, x, 1)
         raises(TypeError, set.__ior__.im_func, x, set([2]))
+
+
+class AppTestAppSetTestWithBitsets(AppTestAppSetTest):
+    spaceconfig = {"objspace.std.withintbitsets": True}
+
+    def test_update_bug_strategy(self):
+        from __pypy__ import strategy
+        s = set([1, 2, 3])
+        assert strategy(s) == "BitsetSetStrategy"
+        s.update(set())
+        assert strategy(s) == "BitsetSetStrategy"
+        #
+        s = set([1, 2, 3])
+        s |= set()
+        assert strategy(s) == "BitsetSetStrategy"
+        #
+        s = set([1, 2, 3]).difference(set())
+        assert strategy(s) == "BitsetSetStrategy"
+        #
+        s = set([1, 2, 3])
+        s.difference_update(set())
+        assert strategy(s) == "BitsetSetStrategy"
+        #
+        s = set([1, 2, 3]).symmetric_difference(set())
+        assert strategy(s) == "BitsetSetStrategy"
+        #
+        s = set([1, 2, 3])
+        s.symmetric_difference_update(set())
+        assert strategy(s) == "BitsetSetStrategy"
+        #
+        s = set([1, 2, 3]).intersection(set())
+        assert strategy(s) == "EmptySetStrategy"
+        #
+        s = set([1, 2, 3])
+        s.intersection_update(set())
+        assert strategy(s) == "EmptySetStrategy"
+
+    def test_bitset_algebra(self):
+        seed = [42]
+        def randrange(start, stop):
+            seed[0] = (seed[0] * 1103515245 + 12345) % 2147483648
+            return start + seed[0] % (stop - start)
+        for i in range(50):
+            a = [randrange(-200, 2000) for j in range(randrange(0, 40))]
+            b = [randrange(-200, 2000) for j in range(randrange(0, 40))]
+            s1 = set(a)
+            s2 = set(b)
+            assert sorted(s1 & s2) == sorted([x for x in s1 if x in b])
+            assert sorted(s1 | s2) == sorted(set(a + b))
+            assert sorted(s1 - s2) == sorted([x for x in s1 if x not in b])
+            assert sorted(s1 ^ s2) == sorted((s1 - s2) | (s2 - s1))
+            assert (s1 <= s2) == all([x in s2 for x in s1])
+            assert s1.isdisjoint(s2) == (not (s1 & s2))
+            assert s1 == set(list(s1))
+            s3 = set(s1)
+            s3 &= s2
+            assert s3 == s1 & s2
+            s3 = set(s1)
+            s3 ^= s2
+            assert s3 == s1 ^ s2
+            s3 = set(s1)
+            s3 -= s2
+            assert s3 == s1 - s2
+            while s3:
+                x = s3.pop()
+                assert x in s1 and x not in s3
+
+    def test_bitset_mixed(self):
+        s = set([1, 2, 3])
+        assert 2.0 in s
+        assert 2.5 not in s
+        assert s == set([1.0, 2.0, 3.0])
+        assert s & set([2.0, 5.0]) == set([2])
+        assert s | set(["a"]) == set([1, 2, 3, "a"])
+        s = set(range(100))
+        s.discard("x")
+        assert len(s) == 100
+        assert frozenset(range(10)) == frozenset(list(range(10)))
+        assert hash(frozenset(range(10))) == hash(frozenset(list(range(10))[::-1]))
@@ -2,7 +2,8 @@ from pypy.objspace.std.setobject import W_SetObject
 from pypy.objspace.std.setobject import (
     BytesIteratorImplementation, BytesSetStrategy, EmptySetStrategy,
     IntegerIteratorImplementation, IntegerSetStrategy, ObjectSetStrategy,
-    UnicodeIteratorImplementation, AsciiSetStrategy)
+    UnicodeIteratorImplementation, AsciiSetStrategy, FloatSetStrategy,
+    Utf8SetStrategy, BitsetSetStrategy, BitsetIteratorImplementation)
 from pypy.objspace.std.listobject import W_ListObject
 
 class TestW_SetStrategies:
@@ -29,6 +30,26 @@ class TestW_SetStrategies:
         s = W_SetObject(self.space, self.wrapped([u"a", u"b"]))
         assert s.strategy is self.space.fromcache(AsciiSetStrategy)
 
+    def test_from_float_list(self):
+        s = W_SetObject(self.space, self.wrapped([1.5, 2.5, -0.0]))
+        assert s.strategy is self.space.fromcache(FloatSetStrategy)
+        assert sorted(self.space.listview_float(s)) == [-0.0, 1.5, 2.5]
+
+        s = W_SetObject(self.space, self.wrapped([1.5, float('nan')]))
+        assert s.strategy is self.space.fromcache(ObjectSetStrategy)
+
+    def test_float_lookup_int(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([1.0, 2.5]))
+        assert s.has_key(space.wrap(1))
+        assert not s.has_key(space.wrap(2))
+        assert not s.has_key(space.wrap(float('nan')))
+        assert not s.has_key(space.wrap(2**53 + 1))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        assert s.remove(space.wrap(1))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        assert s.length() == 1
+
     def test_switch_to_object(self):
         s = W_SetObject(self.space, self.wrapped([1,2,3,4,5]))
         s.add(self.space.wrap("six"))
@@ -44,6 +65,42 @@ class TestW_SetStrategies:
         s.add(self.space.wrap(u"six"))
         assert s.strategy is self.space.fromcache(AsciiSetStrategy)
 
+    def test_switch_to_utf8(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([u"a", u"b"]))
+        assert s.strategy is space.fromcache(AsciiSetStrategy)
+        assert not s.has_key(space.wrap(u"\xe9"))
+        assert not s.remove(space.wrap(u"\xe9"))
+        assert s.strategy is space.fromcache(AsciiSetStrategy)
+        s.add(space.wrap(u"\xe9"))
+        assert s.strategy is space.fromcache(Utf8SetStrategy)
+        assert s.has_key(space.wrap(u"\xe9"))
+        assert s.has_key(space.wrap(u"a"))
+        s.add(space.wrap(u"c"))
+        assert s.strategy is space.fromcache(Utf8SetStrategy)
+        assert sorted(space.listview_utf8(s)) == ["a", "b", "c", "\xc3\xa9"]
+
+        s = W_SetObject(space, self.wrapped([u"\u1234", u"b"]))
+        assert s.strategy is space.fromcache(Utf8SetStrategy)
+        s2 = W_SetObject(space, self.wrapped([u"a"]))
+        s2.update(s)
+        assert s2.strategy is space.fromcache(Utf8SetStrategy)
+        s.update(W_SetObject(space, self.wrapped([u"c"])))
+        assert s.strategy is space.fromcache(Utf8SetStrategy)
+        assert sorted(space.listview_utf8(s2.intersect(s))) == [
+            "b", "\xe1\x88\xb4"]
+        s.add(space.wrap(1))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+
+    def test_utf8_iter(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([u"\xe9t\xe9"]))
+        w_iter = s.iter()
+        w_item = w_iter.next_entry()
+        assert space.utf8_w(w_item) == "\xc3\xa9t\xc3\xa9"
+        assert space.len_w(w_item) == 3
+        assert w_iter.next_entry() is None
+
     def test_symmetric_difference(self):
         s1 = W_SetObject(self.space, self.wrapped([1,2,3,4,5]))
         s2 = W_SetObject(self.space, self.wrapped(["six", "seven"]))
@@ -144,3 +201,127 @@ class TestW_SetStrategies:
         #
         #s = W_SetObject(space, self.wrapped([u"a", u"b"]))
         #assert sorted(space.listview_unicode(s)) == [u"a", u"b"]
+
+
+class TestW_BitsetSetStrategy:
+    spaceconfig = {"objspace.std.withintbitsets": True}
+
+    def wrapped(self, l):
+        return W_ListObject(self.space, [self.space.wrap(x) for x in l])
+
+    def keys(self, s):
+        return sorted(self.space.listview_int(s))
+
+    def test_from_list(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([1, 2, 3, 200, -60]))
+        assert s.strategy is space.fromcache(BitsetSetStrategy)
+        assert s.length() == 5
+        assert self.keys(s) == [-60, 1, 2, 3, 200]
+        #
+        s = W_SetObject(space, self.wrapped([1, 2, 10**9]))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        #
+        s = W_SetObject(space, self.wrapped([5, 5, 5]))
+        assert s.strategy is space.fromcache(BitsetSetStrategy)
+        assert s.length() == 1
+
+    def test_add(self):
+        space = self.space
+        s = W_SetObject(space)
+        s.add(space.wrap(3))
+        assert s.strategy is space.fromcache(BitsetSetStrategy)
+        s.add(space.wrap(-60))
+        s.add(space.wrap(130))
+        s.add(space.wrap(3))
+        assert s.strategy is space.fromcache(BitsetSetStrategy)
+        assert self.keys(s) == [-60, 3, 130]
+        s.add(space.wrap(10**9))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        assert self.keys(s) == [-60, 3, 130, 10**9]
+        #
+        s = W_SetObject(space, self.wrapped([1, 2]))
+        s.add(space.wrap("three"))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+
+    def test_remove_switches_when_sparse(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped(range(0, 4000, 10)))
+        assert s.strategy is space.fromcache(BitsetSetStrategy)
+        for i in range(10, 3990, 10):
+            assert s.remove(space.wrap(i))
+            if s.strategy is not space.fromcache(BitsetSetStrategy):
+                break
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        assert not s.has_key(space.wrap(10))
+        assert s.has_key(space.wrap(3990))
+        #
+        s = W_SetObject(space, self.wrapped([1, 2]))
+        assert not s.remove(space.wrap(3))
+        assert not s.remove(space.wrap("a"))
+        assert not s.has_key(space.wrap(u"a"))
+        assert s.strategy is space.fromcache(BitsetSetStrategy)
+
+    def test_algebra(self):
+        space = self.space
+        a = range(0, 300, 3)
+        b = range(-50, 200, 2)
+        s1 = W_SetObject(space, self.wrapped(a))
+        s2 = W_SetObject(space, self.wrapped(b))
+        bitset = space.fromcache(BitsetSetStrategy)
+        #
+        s = s1.intersect(s2)
+        assert s.strategy is bitset
+        assert self.keys(s) == sorted(set(a) & set(b))
+        s = s1.difference(s2)
+        assert s.strategy is bitset
+        assert self.keys(s) == sorted(set(a) - set(b))
+        s = s1.symmetric_difference(s2)
+        assert s.strategy is bitset
+        assert self.keys(s) == sorted(set(a) ^ set(b))
+        s = s1.copy_real()
+        s.update(s2)
+        assert s.strategy is bitset
+        assert self.keys(s) == sorted(set(a) | set(b))
+        assert s1.issubset(s)
+        assert not s1.issubset(s2)
+        assert not s1.isdisjoint(s2)
+        assert s.equals(s2.symmetric_difference(s1).symmetric_difference(
+            s1.intersect(s2)))
+        #
+        s3 = W_SetObject(space, self.wrapped([1000, 1001]))
+        assert s1.isdisjoint(s3)
+        assert s1.intersect(s3).length() == 0
+
+    def test_algebra_with_integer_strategy(self):
+        space = self.space
+        s1 = W_SetObject(space, self.wrapped([1, 2, 3, 4]))
+        s2 = W_SetObject(space, self.wrapped([3, 4, 10**9]))
+        assert s2.strategy is space.fromcache(IntegerSetStrategy)
+        s = s1.intersect(s2)
+        assert s.strategy is space.fromcache(BitsetSetStrategy)
+        assert self.keys(s) == [3, 4]
+        assert self.keys(s1.difference(s2)) == [1, 2]
+        s2.update(s1)
+        assert s2.strategy is space.fromcache(IntegerSetStrategy)
+        assert self.keys(s2) == [1, 2, 3, 4, 10**9]
+        s1.update(s2)
+        assert s1.strategy is space.fromcache(IntegerSetStrategy)
+        assert self.keys(s1) == [1, 2, 3, 4, 10**9]
+
+    def test_iter(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([130, -1, 2]))
+        it = s.iter()
+        assert isinstance(it, BitsetIteratorImplementation)
+        assert space.unwrap(it.next()) == -1
+        assert space.unwrap(it.next()) == 2
+        assert space.unwrap(it.next()) == 130
+        assert it.next() is None
+
+    def test_popitem(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([-1, 2, 130]))
+        result = [space.int_w(s.popitem()) for i in range(3)]
+        assert sorted(result) == [-1, 2, 130]
+        assert s.length() == 0
@@ -0,0 +1,136 @@
+import py
+
+from pypy.objspace.std.sharedkeydict import (
+    SHARED_MAP_MAX_LENGTH, SHARED_MAP_MAX_TRANSITIONS,
+    SHARED_MAP_MAX_ROOT_TRANSITIONS, SHARED_MAP_MAX_FAMILY_COUNT,
+    SharedKeyMapCache)
+
+
+class TestSharedKeyMap(object):
+    spaceconfig = {"objspace.std.withsharedkeydicts": True}
+
+    def test_transitions(self):
+        root = self.space.fromcache(SharedKeyMapCache).root
+        m1 = root.get_next_map("a")
+        assert m1.keys == ["a"]
+        assert root.get_next_map("a") is m1
+        m2 = m1.get_next_map("b")
+        assert m2.keys == ["a", "b"]
+        assert m2.get_index("a") == 0
+        assert m2.get_index("b") == 1
+        assert m2.get_index("c") == -1
+        assert m1.get_index("b") == -1
+        assert m2.strategy.map is m2
+
+    def test_limits(self):
+        root = self.space.fromcache(SharedKeyMapCache).root
+        m = root
+        for i in range(SHARED_MAP_MAX_LENGTH):
+            m = m.get_next_map("x%d" % i)
+        assert m.get_next_map("y") is None
+        #
+        m = root.get_next_map("z")
+        for i in range(SHARED_MAP_MAX_TRANSITIONS):
+            assert m.get_next_map("y%d" % i) is not None
+        assert m.get_next_map("other") is None
+        assert m.get_next_map("y0") is not None
+
+    def test_root_limit(self):
+        root = SharedKeyMapCache(self.space).root
+        for i in range(SHARED_MAP_MAX_ROOT_TRANSITIONS):
+            assert root.get_next_map("k%d" % i) is not None
+        assert root.get_next_map("other") is None
+        assert root.get_next_map("k0") is not None
+
+    def test_family_limit(self):
+        root = SharedKeyMapCache(self.space).root
+        m1 = root.get_next_map("a")
+        maps = [m1]
+        i = 0
+        while True:
+            m = maps[i].get_next_map("x%d" % len(maps))
+            if m is None:
+                break
+            maps.append(m)
+            if len(maps[i].transitions) == SHARED_MAP_MAX_TRANSITIONS:
+                i += 1
+        assert len(maps) == SHARED_MAP_MAX_FAMILY_COUNT
+        # the maps that start with another key are not affected
+        m2 = root.get_next_map("b")
+        assert m2.get_next_map("c") is not None
+        assert m1.get_next_map("x1") is maps[1]
+
+
+class AppTestSharedKeyDict(object):
+    spaceconfig = {"objspace.std.withsharedkeydicts": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__repr__ doesn't work on appdirect")
+
+    def w_get_strategy(self, obj):
+        import __pypy__
+        r = __pypy__.internal_repr(obj)
+        return r[r.find("(") + 1: r.find(")")]
+
+    def test_shared(self):
+        fieldnames = ["id", "name", "price"]
+        rows = [dict(zip(fieldnames, row))
+                for row in [(1, "a", 2.5), (2, "b", 3.5)]]
+        s = self.get_strategy(rows[0])
+        assert "SharedKeyDictStrategy" in s
+        assert self.get_strategy(rows[1]) == s
+        assert rows[0] == {"id": 1, "name": "a", "price": 2.5}
+        assert rows[1].keys() == fieldnames
+        assert rows[1].values() == [2, "b", 3.5]
+        assert rows[1].items() == [("id", 2), ("name", "b"),
+                                   ("price", 3.5)]
+        assert rows[0]["name"] == "a"
+        assert rows[0].get("other") is None
+        assert rows[0].get(5) is None
+        rows[0]["name"] = "c"
+        assert rows[0]["name"] == "c"
+        assert rows[1]["name"] == "b"
+        assert self.get_strategy(rows[0]) == s
+        #
+        d = {}
+        for key in fieldnames:
+            d[key] = None
+        assert self.get_strategy(d) == s
+        d2 = d.copy()
+        assert self.get_strategy(d2) == s
+        d2["id"] = 5
+        assert d["id"] is None
+
+    def test_devolve(self):
+        d = {"a": 1, "b": 2}
+        assert "SharedKeyDictStrategy" in self.get_strategy(d)
+        del d["a"]
+        assert "BytesDictStrategy" in self.get_strategy(d)
+        assert d == {"b": 2}
+        #
+        d = {"a": 1, "b": 2}
+        d[3] = 4
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d == {"a": 1, "b": 2, 3: 4}
+        #
+        d = {"a": 1}
+        assert d.pop("a") == 1
+        assert d == {}
+        #
+        d = dict.fromkeys(["k%d" % i for i in range(100)], 5)
+        assert "SharedKeyDictStrategy" not in self.get_strategy(d)
+        assert len(d) == 100 and d["k50"] == 5
+
+    def test_iter(self):
+        from __pypy__ import reversed_dict
+        d = {}
+        d["x"] = 1
+        d["y"] = 2
+        assert list(d) == ["x", "y"]
+        assert list(d.iteritems()) == [("x", 1), ("y", 2)]
+        assert list(reversed_dict(d)) == ["y", "x"]
+        it = iter(d)
+        next(it)
+        d["z"] = 3
+        raises(RuntimeError, next, it)
@@ -0,0 +1,93 @@
+import py
+
+class AppTestSmallDict(object):
+    spaceconfig = {"objspace.std.withsmalldicts": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__repr__ doesn't work on appdirect")
+
+    def w_get_strategy(self, obj):
+        import __pypy__
+        r = __pypy__.internal_repr(obj)
+        return r[r.find("(") + 1: r.find(")")]
+
+    def test_bytes(self):
+        d = {}
+        d["a"] = 1
+        assert "SmallBytesDictStrategy" in self.get_strategy(d)
+        d["b"] = 2
+        d["a"] = 3
+        assert d == {"a": 3, "b": 2}
+        assert d.keys() == ["a", "b"]
+        assert d.get("c") is None
+        assert d.get(1) is None
+        assert "SmallBytesDictStrategy" in self.get_strategy(d)
+        del d["a"]
+        raises(KeyError, "del d['a']")
+        assert d.items() == [("b", 2)]
+        assert d.pop("b") == 2
+        assert d.pop("b", 5) == 5
+        assert d == {}
+        assert "SmallBytesDictStrategy" in self.get_strategy(d)
+
+    def test_grow(self):
+        d = {}
+        for i in range(8):
+            d[str(i)] = i
+        assert "SmallBytesDictStrategy" in self.get_strategy(d)
+        d["8"] = 8
+        assert "SmallBytesDictStrategy" not in self.get_strategy(d)
+        assert "BytesDictStrategy" in self.get_strategy(d)
+        assert sorted(d.keys()) == [str(i) for i in range(9)]
+        #
+        d = {1: 2}
+        d.update(dict.fromkeys(range(10, 30)))
+        assert "IntDictStrategy" in self.get_strategy(d)
+        assert "SmallIntDictStrategy" not in self.get_strategy(d)
+        assert len(d) == 21 and d[1] == 2
+
+    def test_switch_to_object(self):
+        d = {1: "a", 2: "b"}
+        assert "SmallIntDictStrategy" in self.get_strategy(d)
+        d["x"] = "c"
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d == {1: "a", 2: "b", "x": "c"}
+
+    def test_unicode(self):
+        from __pypy__ import reversed_dict, move_to_end
+        d = {u"a": 1, u"\xe9": 2}
+        assert "SmallUnicodeDictStrategy" in self.get_strategy(d)
+        assert d[u"\xe9"] == 2
+        assert d.setdefault(u"a", 5) == 1
+        assert d.setdefault(u"b", 5) == 5
+        assert list(d) == [u"a", u"\xe9", u"b"]
+        assert list(reversed_dict(d)) == [u"b", u"\xe9", u"a"]
+        move_to_end(d, u"a")
+        move_to_end(d, u"b", last=False)
+        assert list(d) == [u"b", u"\xe9", u"a"]
+        assert "SmallUnicodeDictStrategy" in self.get_strategy(d)
+
+    def test_float(self):
+        d = {0.0: 1, 1.5: 2}
+        assert "SmallFloatDictStrategy" in self.get_strategy(d)
+        assert d[-0.0] == 1
+        assert d[0] == 1
+        assert d.get(float("nan")) is None
+        d[-0.0] = 3
+        assert str(d.keys()[0]) == "0.0"
+        assert d[0.0] == 3
+        assert "SmallFloatDictStrategy" in self.get_strategy(d)
+        assert d.popitem() == (1.5, 2)
+
+    def test_copy_and_iter(self):
+        d = {1: 2, 3: 4}
+        d2 = d.copy()
+        d2[5] = 6
+        assert d == {1: 2, 3: 4}
+        assert sorted(d2.items()) == [(1, 2), (3, 4), (5, 6)]
+        assert "SmallIntDictStrategy" in self.get_strategy(d2)
+        it = iter(d)
+        next(it)
+        d[7] = 8
+        raises(RuntimeError, next, it)
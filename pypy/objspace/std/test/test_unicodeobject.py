@@ -44,15 +44,66 @@ class TestUnicodeObject:
     def test_fast_iter(self):
         space = self.space
         w_uni = space.newutf8(u"aä".encode("utf-8"), 2)
-        old_index_storage = w_uni._index_storage
+        old_index = w_uni._index
         w_iter = space.iter(w_uni)
         w_char1 = w_iter.descr_next(space)
         w_char2 = w_iter.descr_next(space)
         py.test.raises(OperationError, w_iter.descr_next, space)
-        assert w_uni._index_storage is old_index_storage
+        assert w_uni._index is old_index
         assert space.eq_w(w_char1, w_uni._getitem_result(space, 0))
         assert space.eq_w(w_char2, w_uni._getitem_result(space, 1))
 
+    def test_find_no_index_storage(self):
+        space = self.space
+        u = u"\xe4b\u1234c\xe4b"
+        w_uni = space.newutf8(u.encode("utf-8"), len(u))
+        w_sub = space.newutf8("b", 1)
+        assert space.int_w(space.call_method(w_uni, 'find', w_sub)) == 1
+        assert space.int_w(space.call_method(w_uni, 'rfind', w_sub)) == 5
+        assert space.int_w(space.call_method(w_uni, 'index', w_sub)) == 1
+        assert space.int_w(space.call_method(w_uni, 'count', w_sub)) == 2
+        w_tup = space.call_method(w_uni, 'partition', w_sub)
+        w_before, _, w_after = space.fixedview(w_tup)
+        assert w_before._len() == 1 and w_after._len() == 4
+        assert space.is_true(space.contains(w_uni, w_sub))
+        assert not w_uni._has_index_storage()
+        w_index = space.call_method(w_uni, 'find', w_sub, space.newint(2))
+        assert space.int_w(w_index) == 5
+        w_index = space.call_method(w_uni, 'rfind', w_sub, space.newint(0),
+                                    space.newint(5))
+        assert space.int_w(w_index) == 1
+
+    def test_index_to_byte_cursor(self):
+        space = self.space
+        u = u"a\xe4\u1234\U00012345" * 100
+        w_uni = space.newutf8(u.encode("utf-8"), len(u))
+        for i in range(len(u)):
+            w_char = w_uni._getitem_result(space, i)
+            assert w_char._utf8 == u[i].encode("utf-8")
+        for i in range(len(u) - 1, -1, -3):
+            w_char = w_uni._getitem_result(space, i)
+            assert w_char._utf8 == u[i].encode("utf-8")
+        w_slice = w_uni._unicode_sliced(space, 10, 70)
+        assert w_slice._utf8 == u[10:70].encode("utf-8")
+        w_slice = w_uni._unicode_sliced(space, 350, 400)
+        assert w_slice._utf8 == u[350:400].encode("utf-8")
+        assert not w_uni._has_index_storage()
+        # a jump far away from the last position and from both ends
+        w_char = w_uni._getitem_result(space, 200)
+        assert w_char._utf8 == u[200].encode("utf-8")
+        assert w_uni._has_index_storage()
+
+    def test_no_index_for_ascii(self):
+        space = self.space
+        w_uni = space.newutf8("abcdef" * 100, 600)
+        w_char = w_uni._getitem_result(space, 300)
+        assert w_char._utf8 == "a"
+        w_slice = w_uni._unicode_sliced(space, 10, 590)
+        assert w_slice._len() == 580
+        assert space.int_w(space.call_method(
+            w_uni, 'find', space.newutf8("b", 1), space.newint(100))) == 103
+        assert w_uni._index is None
+
 
     if HAS_HYPOTHESIS:
         @given(strategies.text(), strategies.integers(min_value=0, max_value=10),
@@ -284,6 +335,10 @@ class AppTestUnicodeString:
         check(', '.join([u'a']), u'a')
         check(', '.join(['a', u'b']), u'a, b')
         check(u', '.join(['a', 'b']), u'a, b')
+        check(u'-'.join([u'\xe9', u'a', u'\u1234']), u'\xe9-a-\u1234')
+        check(u'\xe9'.join([u'a', u'b']), u'a\xe9b')
+        check(u''.join(set([u'\xe9'])), u'\xe9')
+        assert len(u'--'.join([u'\xe9t\xe9', u'\u1234'])) == 6
         try:
             u''.join([u'a', 2, 3])
         except TypeError as e:
@@ -32,6 +32,22 @@ __all__ = ['W_UnicodeObject', 'wrapunicode', 'plain_str2unicode',
            'unicode_from_string', 'unicode_to_decimal_w']
 
 MAX_UNROLL_NEXT_CODEPOINT_POS = 4
+# the maximum number of codepoints that _index_to_byte() walks from the
+# last position it returned, or from either end of the string, before it
+# builds the index storage instead
+MAX_CURSOR_WALK = 64
+
+class Utf8Index(object):
+    """ The lazily allocated index of a non-ASCII W_UnicodeObject: the last
+    position returned by _index_to_byte(), and the index storage once random
+    access needs it.
+    """
+
+    def __init__(self):
+        self.cursor_index = 0
+        self.cursor_bytepos = 0
+        self.storage = rutf8.null_storage()
+
 
 @jit.elidable
 def next_codepoint_pos_dont_look_inside(utf8, p):
@@ -56,7 +72,7 @@ class W_UnicodeObject(W_Root):
         assert length >= 0
         self._utf8 = utf8str
         self._length = length
-        self._index_storage = rutf8.null_storage()
+        self._index = None     # a Utf8Index, only for non-ASCII strings
         if not we_are_translated() and not sys.platform == 'win32':
             # utf8str must always be a valid utf8 string, except maybe with
             # explicit surrogate characters---which .decode('utf-8') doesn't
@@ -236,9 +252,9 @@ class W_UnicodeObject(W_Root):
         assert isinstance(w_value, W_UnicodeObject)
         w_newobj = space.allocate_instance(W_UnicodeObject, w_unicodetype)
         W_UnicodeObject.__init__(w_newobj, w_value._utf8, w_value._length)
-        if w_value._index_storage:
-            # copy the storage if it's there
-            w_newobj._index_storage = w_value._index_storage
+        if w_value._index is not None:
+            # share the index if it's there
+            w_newobj._index = w_value._index
         return w_newobj
 
     def descr_repr(self, space):
@@ -488,6 +504,12 @@ class W_UnicodeObject(W_Root):
                 return space.newutf8(l[0], len(l[0]))
             s = self._utf8.join(l)
             return space.newutf8(s, len(s))
+        l = space.listview_utf8(w_list)
+        if l is not None:
+            if len(l) == 1:
+                return space.newutf8(l[0], rutf8.codepoints_in_utf8(l[0]))
+            s = self._utf8.join(l)
+            return space.newutf8(s, rutf8.codepoints_in_utf8(s))
         return self._StringMethods_descr_join(space, w_list)
 
     def _join_return_one(self, space, w_obj):
@@ -861,7 +883,7 @@ class W_UnicodeObject(W_Root):
         if pos < 0:
             return space.newtuple([self, self._empty(), self._empty()])
         else:
-            lgt = rutf8.check_utf8(value, True, stop=pos)
+            lgt = self._codepoints_in_utf8(0, pos)
             return space.newtuple(
                 [W_UnicodeObject(value[0:pos], lgt), w_sub,
                  W_UnicodeObject(value[pos + len(sub._utf8):len(value)],
@@ -879,7 +901,7 @@ class W_UnicodeObject(W_Root):
         if pos < 0:
             return space.newtuple([self._empty(), self._empty(), self])
         else:
-            lgt = rutf8.check_utf8(value, True, stop=pos)
+            lgt = self._codepoints_in_utf8(0, pos)
             return space.newtuple(
                 [W_UnicodeObject(value[0:pos], lgt), w_sub,
                  W_UnicodeObject(value[pos + len(sub._utf8):len(value)],
@@ -922,13 +944,25 @@ class W_UnicodeObject(W_Root):
 
     descr_rmul = descr_mul
 
+    def _get_index(self):
+        return jit.conditional_call_elidable(self._index,
+                    W_UnicodeObject._create_index, self)
+
+    def _create_index(self):
+        index = Utf8Index()
+        self._index = index
+        return index
+
+    def _has_index_storage(self):
+        return self._index is not None and bool(self._index.storage)
+
     def _get_index_storage(self):
-        return jit.conditional_call_elidable(self._index_storage,
+        return jit.conditional_call_elidable(self._get_index().storage,
                     W_UnicodeObject._compute_index_storage, self)
 
     def _compute_index_storage(self):
         storage = rutf8.create_utf8_index_storage(self._utf8, self._length)
-        self._index_storage = storage
+        self._get_index().storage = storage
         return storage
 
     def _getitem_result(self, space, index):
@@ -978,9 +1012,44 @@ class W_UnicodeObject(W_Root):
         if self.is_ascii():
             assert index >= 0
             return index
+        if not self._has_index_storage():
+            bytepos = self._index_to_byte_from_cursor(index)
+            if bytepos >= 0:
+                return bytepos
         return rutf8.codepoint_position_at_index(
             self._utf8, self._get_index_storage(), index)
 
+    @jit.dont_look_inside
+    def _index_to_byte_from_cursor(self, index):
+        """ walks to 'index' from the last position returned, or from the
+        closest end of the string.  Sequential access, and any access to
+        short strings, never needs the index storage this way.  Returns -1
+        if 'index' is too far away.
+        """
+        if index < 0 or index > self._length:
+            return -1
+        utf8index = self._get_index()
+        cursor_index = utf8index.cursor_index
+        bytepos = utf8index.cursor_bytepos
+        if index < abs(index - cursor_index):
+            cursor_index = 0
+            bytepos = 0
+        if self._length - index < abs(index - cursor_index):
+            cursor_index = self._length
+            bytepos = len(self._utf8)
+        if abs(index - cursor_index) > MAX_CURSOR_WALK:
+            return -1
+        utf8 = self._utf8
+        while cursor_index < index:
+            bytepos = rutf8.next_codepoint_pos(utf8, bytepos)
+            cursor_index += 1
+        while cursor_index > index:
+            bytepos = rutf8.prev_codepoint_pos(utf8, bytepos)
+            cursor_index -= 1
+        utf8index.cursor_index = index
+        utf8index.cursor_bytepos = bytepos
+        return bytepos
+
     def _codepoints_in_utf8(self, start, end):
         if self.is_ascii():
             return end - start
@@ -1031,14 +1100,23 @@ class W_UnicodeObject(W_Root):
             res_index = self._utf8.find(w_sub._utf8, start_index, end_index)
             if res_index < 0:
                 return None
-            res = self._byte_to_index(res_index)
+            if self.is_ascii() or self._has_index_storage():
+                res = self._byte_to_index(res_index)
+            else:
+                # don't build the index storage just to convert the result:
+                # counting the codepoints skipped by the search is linear
+                # in what the search itself already scanned
+                res = start + self._codepoints_in_utf8(start_index, res_index)
             assert res >= 0
             return space.newint(res)
         else:
             res_index = self._utf8.rfind(w_sub._utf8, start_index, end_index)
             if res_index < 0:
                 return None
-            res = self._byte_to_index(res_index)
+            if self.is_ascii() or self._has_index_storage():
+                res = self._byte_to_index(res_index)
+            else:
+                res = end - self._codepoints_in_utf8(res_index, end_index)
             assert res >= 0
             return space.newint(res)
 
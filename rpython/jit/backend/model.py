@@ -306,6 +306,16 @@ class CompiledLoopToken(object):
         debug_print("allocating Loop #", self.number)
         debug_stop("jit-mem-looptoken-alloc")
 
+    def get_code_size(self):
+        """Return the number of bytes of machine code and raw data
+        allocated for this loop and its bridges (0 if the backend does
+        not track it)."""
+        size = 0
+        if self.asmmemmgr_blocks is not None:
+            for rawstart, rawstop in self.asmmemmgr_blocks:
+                size += rawstop - rawstart
+        return size
+
     def compiling_a_bridge(self):
         self.cpu.tracker.total_compiled_bridges += 1
         self.bridges_count += 1
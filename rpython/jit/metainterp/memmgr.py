@@ -2,6 +2,7 @@ import math
 from rpython.rlib.rarithmetic import r_int64
 from rpython.rlib.debug import debug_start, debug_print, debug_stop
 from rpython.rlib.objectmodel import we_are_translated
+from rpython.rlib.listsort import make_timsort_class
 
 #
 # Logic to decide which loops are old and not used any more.
@@ -19,6 +20,22 @@ from rpython.rlib.objectmodel import we_are_translated
 # 'generation' field is much smaller than the current generation, and
 # removed from the set.
 #
+# Additionally, with the 'code_memory_limit' parameter, the total size of
+# the machine code of the loops in 'alive_loops' is bounded.  Every time a
+# loop is entered from the interpreter, its generation is bumped (see
+# keep_loop_alive()), so the generation is also a "last used" timestamp.
+# When a new loop or bridge is about to be compiled and the limit is
+# exceeded, we remove the least recently used loops from 'alive_loops'
+# until we are below the limit again.  Like above, the memory is really
+# released only when the GC frees the LoopTokens, so the machine code in
+# use can stay above the limit until the next collection.
+#
+# The total size is not recomputed each time: 'code_size' is a running
+# total, and each LoopToken remembers in 'counted_code_size' how much it
+# contributes to it.  The size of a loop is refreshed whenever its
+# generation is bumped, which is enough to account for the bridges
+# attached to it since the last time it was entered.
+#
 
 class MemoryManager(object):
 
@@ -38,6 +55,9 @@ class MemoryManager(object):
         self.current_generation = r_int64(1)
         self.next_check = r_int64(-1)
         self.alive_loops = {}
+        self.max_code_size = 0      # in bytes, 0 = no limit
+        self.code_size = 0          # of the loops in 'alive_loops'
+        self.num_evicted = 0
 
     def set_max_age(self, max_age, check_frequency=0):
         if max_age <= 0:
@@ -49,16 +69,34 @@ class MemoryManager(object):
             self.check_frequency = check_frequency
             self.next_check = self.current_generation + 1
 
+    def set_max_code_size(self, kilobytes):
+        if kilobytes <= 0:
+            self.max_code_size = 0
+        else:
+            self.max_code_size = kilobytes * 1024
+
     def next_generation(self):
         self.current_generation += 1
         if self.current_generation == self.next_check:
             self._kill_old_loops_now()
             self.next_check = self.current_generation + self.check_frequency
+        if self.max_code_size > 0:
+            self._evict_least_recently_used()
 
     def keep_loop_alive(self, looptoken):
         if looptoken.generation != self.current_generation:
             looptoken.generation = self.current_generation
-            self.alive_loops[looptoken] = None
+            if looptoken not in self.alive_loops:
+                looptoken.counted_code_size = 0
+                self.alive_loops[looptoken] = None
+            size = _get_code_size(looptoken)
+            self.code_size += size - looptoken.counted_code_size
+            looptoken.counted_code_size = size
+
+    def _forget_loop(self, looptoken):
+        del self.alive_loops[looptoken]
+        self.code_size -= looptoken.counted_code_size
+        looptoken.counted_code_size = 0
 
     def _kill_old_loops_now(self):
         debug_start("jit-mem-collect")
@@ -70,7 +108,7 @@ class MemoryManager(object):
         for looptoken in self.alive_loops.keys():
             if (0 <= looptoken.generation < max_generation or
                 looptoken.invalidated):
-                del self.alive_loops[looptoken]
+                self._forget_loop(looptoken)
         newtotal = len(self.alive_loops)
         debug_print("Loop tokens freed: ", oldtotal - newtotal)
         debug_print("Loop tokens left:  ", newtotal)
@@ -82,8 +120,41 @@ class MemoryManager(object):
             rgc.collect(); rgc.collect(); rgc.collect()
         debug_stop("jit-mem-collect")
 
+    def get_code_size(self):
+        return self.code_size
+
+    def _evict_least_recently_used(self):
+        if self.code_size <= self.max_code_size:
+            return
+        debug_start("jit-mem-evict")
+        debug_print("Code size before:  ", self.code_size)
+        looptokens = self.alive_loops.keys()
+        GenerationSort(looptokens).sort()    # least recently used first
+        evicted = 0
+        for looptoken in looptokens:
+            if self.code_size <= self.max_code_size:
+                break
+            self._forget_loop(looptoken)
+            evicted += 1
+        self.num_evicted += evicted
+        debug_print("Loop tokens evicted:", evicted)
+        debug_print("Code size after:   ", self.code_size)
+        debug_stop("jit-mem-evict")
+
     def release_all_loops(self):
         debug_start("jit-mem-releaseall")
         debug_print("Loop tokens cleared:", len(self.alive_loops))
+        for looptoken in self.alive_loops:
+            looptoken.counted_code_size = 0
         self.alive_loops.clear()
+        self.code_size = 0
         debug_stop("jit-mem-releaseall")
+
+GenerationSort = make_timsort_class(
+    lt=lambda token1, token2: token1.generation < token2.generation)
+
+def _get_code_size(looptoken):
+    clt = looptoken.compiled_loop_token
+    if clt is None:
+        return 0
+    return clt.get_code_size()
@@ -2770,7 +2770,24 @@ class MetaInterp(object):
         length = self.history.length()
         if (length > warmrunnerstate.trace_limit or
                 self.history.trace_tag_overflow()):
+            if (self.force_finish_trace and
+                    not self.history.trace_tag_overflow() and
+                    length <= warmrunnerstate.trace_limit * 1.25):
+                # we are going to split the trace at the next
+                # jit_merge_point, see debug_merge_point()
+                return
             jd_sd, greenkey_of_huge_function = self.find_biggest_function()
+            if (greenkey_of_huge_function is None and
+                    not self.force_finish_trace and
+                    not self.history.trace_tag_overflow()):
+                # huge code, but not because of inlining: instead of
+                # aborting, keep tracing until the next jit_merge_point
+                # (a safe point to leave the trace) and close the trace
+                # there with a GUARD_ALWAYS_FAILS.  The rest of the code
+                # will be traced later as a bridge from that guard.
+                self.prepare_trace_segmenting()
+                self.force_finish_trace = True
+                return
             self.staticdata.stats.record_aborted(greenkey_of_huge_function)
             self.portal_trace_positions = None
             if greenkey_of_huge_function is not None:
@@ -1,6 +1,7 @@
 
 import py
 from rpython.rlib.jit import JitDriver, JitHookInterface, Counters, dont_look_inside
+from rpython.rlib.jit import set_param
 from rpython.rlib import jit_hooks
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.jit.codewriter.policy import JitPolicy
@@ -202,6 +203,57 @@ class JitHookInterfaceTests(object):
         self.meta_interp(main, [5])
         self.check_jitcell_token_count(2)
 
+    def test_trace_on_first_entry(self):
+        driver = JitDriver(greens = ['s'], reds = ['i'], name='jit')
+
+        def loop(i, s):
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                i -= 1
+
+        def main(s):
+            set_param(driver, 'threshold', 1000)
+            loop(10, s)
+            assert not jit_hooks.get_jitcell_at_key("jit", s)
+            jit_hooks.trace_on_first_entry("jit", s)
+            loop(3, s + 1)
+            assert not jit_hooks.get_jitcell_at_key("jit", s + 1)
+            loop(3, s)
+            assert jit_hooks.get_jitcell_at_key("jit", s)
+
+        self.meta_interp(main, [5])
+        self.check_jitcell_token_count(1)
+
+    def test_mark_as_hot(self):
+        driver = JitDriver(greens = ['s'], reds = ['i'], name='jit')
+
+        def loop(i, s):
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                i -= 1
+
+        def num_loops():
+            return jit_hooks.stats_get_counter_value(None,
+                                           Counters.TOTAL_COMPILED_LOOPS)
+
+        def main(s):
+            set_param(driver, 'threshold', 1000)
+            set_param(driver, 'profile_threshold', 5)
+            jit_hooks.mark_as_hot("jit", s)
+            loop(3, s)
+            if num_loops() != 0:
+                return 1000 + num_loops()
+            loop(10, s + 1)
+            if num_loops() != 0:
+                return 2000 + num_loops()
+            loop(10, s)
+            if num_loops() != 1:
+                return 3000 + num_loops()
+            return 42
+
+        res = self.meta_interp(main, [5], ProfilerClass=Profiler)
+        assert res == 42
+
     def test_dont_trace_here(self):
         driver = JitDriver(greens = ['s'], reds = ['i', 'k'], name='jit')
 
@@ -349,6 +401,29 @@ class JitHookInterfaceTests(object):
                                no_stats_history=True)
         assert res == 42
 
+    def test_memmgr_stats(self):
+        driver = JitDriver(greens = [], reds = ['i'])
+        def loop(i):
+            while i > 0:
+                driver.jit_merge_point(i=i)
+                i -= 1
+        def main():
+            set_param(None, 'code_memory_limit', 100000)
+            if jit_hooks.stats_memmgr_alive_loops(None) != 0:
+                return 1000
+            loop(30)
+            if jit_hooks.stats_memmgr_alive_loops(None) != 1:
+                return 2000 + jit_hooks.stats_memmgr_alive_loops(None)
+            if jit_hooks.stats_memmgr_code_size(None) < 0:
+                return 3000
+            # the limit is not reached, nothing was evicted
+            if jit_hooks.stats_memmgr_evicted(None) != 0:
+                return 4000
+            return 42
+
+        res = self.meta_interp(main, [])
+        assert res == 42
+
 
 class LLJitHookInterfaceTests(JitHookInterfaceTests):
     # use this for any backend, instead of the super class
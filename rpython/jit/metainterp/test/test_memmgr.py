@@ -20,7 +20,22 @@ from rpython.rlib import rgc
 
 class FakeLoopToken:
     generation = 0
+    counted_code_size = 0
     invalidated = False
+    compiled_loop_token = None
+
+class FakeCompiledLoopToken:
+    calls = 0
+    def __init__(self, size):
+        self.size = size
+    def get_code_size(self):
+        FakeCompiledLoopToken.calls += 1
+        return self.size
+
+def sized_loop_token(size):
+    token = FakeLoopToken()
+    token.compiled_loop_token = FakeCompiledLoopToken(size)
+    return token
 
 
 class _TestMemoryManager:
@@ -79,6 +94,117 @@ class _TestMemoryManager:
                 assert tokens[i] in memmgr.alive_loops
 
 
+class TestCodeMemoryLimit:
+    # no gc.collect() involved here, so these tests can run in-process
+
+    def test_no_limit(self):
+        memmgr = MemoryManager()
+        tokens = [sized_loop_token(1024) for i in range(10)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        assert memmgr.alive_loops == dict.fromkeys(tokens)
+        assert memmgr.get_code_size() == 10 * 1024
+        assert memmgr.num_evicted == 0
+
+    def test_evict_oldest(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_code_size(4)
+        tokens = [sized_loop_token(1024) for i in range(10)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        assert memmgr.alive_loops == dict.fromkeys(tokens[6:])
+        assert memmgr.get_code_size() == 4 * 1024
+        assert memmgr.num_evicted == 6
+
+    def test_evict_least_recently_used(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_code_size(3)
+        tokens = [sized_loop_token(1024) for i in range(6)]
+        for i in range(len(tokens)):
+            memmgr.keep_loop_alive(tokens[i])
+            memmgr.next_generation()
+            # tokens[0] keeps being entered
+            memmgr.keep_loop_alive(tokens[0])
+        assert memmgr.alive_loops == dict.fromkeys([tokens[0], tokens[4],
+                                                    tokens[5]])
+        assert memmgr.num_evicted == 3
+
+    def test_big_loops(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_code_size(4)
+        small = sized_loop_token(512)
+        big = sized_loop_token(3072)
+        nocode = FakeLoopToken()
+        for token in [nocode, big, small]:
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        assert memmgr.alive_loops == dict.fromkeys([nocode, big, small])
+        memmgr.keep_loop_alive(sized_loop_token(1024))
+        memmgr.next_generation()
+        # 'nocode' is evicted first, but it doesn't help
+        assert nocode not in memmgr.alive_loops
+        assert big not in memmgr.alive_loops
+        assert small in memmgr.alive_loops
+        assert memmgr.get_code_size() == 1536
+
+    def test_disable_limit(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_code_size(1)
+        memmgr.set_max_code_size(0)
+        tokens = [sized_loop_token(1024) for i in range(3)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        assert memmgr.alive_loops == dict.fromkeys(tokens)
+
+    def test_size_not_recomputed(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_code_size(8)
+        tokens = [sized_loop_token(1024) for i in range(50)]
+        FakeCompiledLoopToken.calls = 0
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        # one call per loop entered, not one per alive loop per generation
+        assert FakeCompiledLoopToken.calls == 50
+        assert memmgr.alive_loops == dict.fromkeys(tokens[42:])
+        assert memmgr.get_code_size() == 8 * 1024
+
+    def test_bridge_counted_on_next_entry(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_code_size(4)
+        loop = sized_loop_token(1024)
+        other = sized_loop_token(1024)
+        memmgr.keep_loop_alive(loop)
+        memmgr.next_generation()
+        memmgr.keep_loop_alive(other)
+        memmgr.next_generation()
+        assert memmgr.get_code_size() == 2048
+        loop.compiled_loop_token.size += 2048     # a bridge was attached
+        memmgr.next_generation()
+        memmgr.keep_loop_alive(loop)
+        assert memmgr.get_code_size() == 4096
+        loop.compiled_loop_token.size += 1024
+        memmgr.next_generation()
+        memmgr.keep_loop_alive(loop)
+        memmgr.next_generation()
+        # 'other' is the least recently used
+        assert memmgr.alive_loops == {loop: None}
+        assert memmgr.get_code_size() == 4096
+
+    def test_release_all_loops(self):
+        memmgr = MemoryManager()
+        token = sized_loop_token(1024)
+        memmgr.keep_loop_alive(token)
+        memmgr.release_all_loops()
+        assert memmgr.get_code_size() == 0
+        memmgr.next_generation()
+        memmgr.keep_loop_alive(token)
+        assert memmgr.get_code_size() == 1024
+
+
 class _TestIntegration(LLJitMixin):
     # See comments in TestMemoryManager.  To get temporarily the normal
     # behavior just rename this class to TestIntegration.
@@ -1,6 +1,7 @@
 import py
 from rpython.rlib.jit import JitDriver, set_param, Counters, set_user_param
 from rpython.rlib.jit import unroll_safe, dont_look_inside, promote
+from rpython.rlib.objectmodel import dont_inline
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.jit.metainterp.warmspot import get_stats
 from rpython.jit.metainterp.jitprof import Profiler
@@ -154,13 +155,62 @@ class TraceLimitTests:
                 result += f(s, i+100)
         # idea of this test: we have a tiny loop that's just compiled
         # immediately. then at some point n <= 10 and we switch to "-" * 50.
-        # That's a huge bridge. The first time we trace that, it doesn't work,
-        # but then we set the flag on the loop "expect huge bridges", next time
-        # we make a segmented trace
+        # That's a huge bridge. The first time we trace that, it is too long,
+        # so we keep tracing until the next merge point and make a segmented
+        # trace there. We also set the flag on the loop "expect huge bridges".
         self.meta_interp(g, [10], backendopt=True, ProfilerClass=Profiler)
         stats = get_stats()
         assert stats.metainterp_sd.profiler.counters[
-            Counters.ABORT_SEGMENTED_TRACE] == 4
+            Counters.ABORT_TOO_LONG] == 0
+        assert stats.metainterp_sd.profiler.counters[
+            Counters.ABORT_SEGMENTED_TRACE] == 5
+
+    def test_huge_loop_is_split_without_aborting(self):
+        def p(pc, code):
+            return "%s %d %s" % (code, pc, code[pc])
+        myjitdriver = JitDriver(greens=['pc', 'code'], reds=['n'],
+                                get_printable_location=p)
+
+        @dont_inline
+        def dec(n):
+            return n - 1
+
+        def f(code, n):
+            pc = 0
+            while pc < len(code):
+                myjitdriver.jit_merge_point(n=n, code=code, pc=pc)
+                op = code[pc]
+                if op == "-":
+                    n = dec(n)
+                elif op == "l":
+                    if n > 0:
+                        myjitdriver.can_enter_jit(n=n, code=code, pc=0)
+                        pc = 0
+                        continue
+                else:
+                    assert 0
+                pc += 1
+            return n
+        def g(m):
+            set_param(None, 'trace_limit', 40)
+            if m > 1000000:
+                f('', 0)
+            result = 0
+            s = '-' * 100 + 'l'
+            for i in range(m):
+                result += f(s, i * 1000 + 2000)
+            return result
+        res = self.meta_interp(g, [10], backendopt=True, ProfilerClass=Profiler)
+        assert res == g(10)
+        stats = get_stats()
+        # the loop body is too long for a single trace.  No inlined function
+        # is to blame, so the trace is split at a merge point the first time
+        # already, instead of being aborted and traced again
+        assert stats.metainterp_sd.profiler.counters[
+            Counters.ABORT_TOO_LONG] == 0
+        assert stats.metainterp_sd.profiler.counters[
+            Counters.ABORT_SEGMENTED_TRACE] > 0
+        self.check_resops(label=1, jump=1, omit_finish=False)
 
     def test_bug_segmented_trace_makes_no_progress(self):
         def p(pc, code):
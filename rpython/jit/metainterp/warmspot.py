@@ -210,7 +210,7 @@ def reset_stats():
 def reset_jit():
     """Helper for some tests (see micronumpy/test/test_zjit.py)"""
     reset_stats()
-    pyjitpl._warmrunnerdesc.memory_manager.alive_loops.clear()
+    pyjitpl._warmrunnerdesc.memory_manager.release_all_loops()
     pyjitpl._warmrunnerdesc.jitcounter._clear_all()
 
 def get_translator():
@@ -697,7 +697,8 @@ class WarmRunnerDesc(object):
                 jitdrivers_by_name[name] = jd
         m = _find_jit_markers(self.translator.graphs,
                               ('get_jitcell_at_key', 'trace_next_iteration',
-                               'dont_trace_here', 'trace_next_iteration_hash', 'mark_as_being_traced'))
+                               'dont_trace_here', 'trace_next_iteration_hash', 'mark_as_being_traced',
+                               'trace_on_first_entry', 'mark_as_hot'))
         accessors = {}
 
         def get_accessor(name, jitdriver_name, function, ARGS, green_arg_spec):
@@ -751,6 +752,10 @@ class WarmRunnerDesc(object):
                 func = JitCell.dont_trace_here
             elif op.args[0].value == 'mark_as_being_traced':
                 func = JitCell.mark_as_being_traced
+            elif op.args[0].value == 'trace_on_first_entry':
+                func = JitCell.trace_on_first_entry
+            elif op.args[0].value == 'mark_as_hot':
+                func = JitCell.mark_as_hot
             elif op.args[0].value == 'trace_next_iteration_hash':
                 func = JitCell.trace_next_iteration_hash
             else:
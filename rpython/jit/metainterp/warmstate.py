@@ -133,6 +133,8 @@ JC_DONT_TRACE_HERE = 0x02
 JC_TEMPORARY       = 0x04
 JC_TRACING_OCCURRED= 0x08
 JC_FORCE_FINISH    = 0x10
+JC_TRACE_ON_ENTRY  = 0x20
+JC_PROFILED        = 0x40
 
 class BaseJitCell(object):
     """Subclasses of BaseJitCell are used in tandem with the single
@@ -183,6 +185,18 @@ class BaseJitCell(object):
         JC_FORCE_FINISH: when from a cell with that flag set, if the trace
         becomes too long, "segment" it, ie finish it with a guard_always_fails.
         this prevents re-tracing and failing this again and again.
+
+        JC_TRACE_ON_ENTRY: start tracing the next time this greenkey is
+        reached, without waiting for the JitCounter to reach the threshold.
+        Set by jit_hooks.trace_on_first_entry(), e.g. to replay the loops
+        that were compiled by a previous run of the same program.  Unlike
+        trace_next_iteration(), it is not lost if the counters decay or
+        collide.  The flag is cleared when tracing starts.
+
+        JC_PROFILED: known to be hot from a hotness profile loaded with
+        jit_hooks.mark_as_hot().  Count with the 'profile_threshold'
+        parameter instead of the normal thresholds.  The flag is cleared
+        when tracing starts, so if tracing aborts we count normally again.
     """
     flags = 0     # JC_xxx flags
     wref_procedure_token = None
@@ -203,7 +217,7 @@ class BaseJitCell(object):
         if tmp:
             self.flags |= JC_TEMPORARY
         else:
-            self.flags &= ~JC_TEMPORARY
+            self.flags &= ~(JC_TEMPORARY | JC_TRACE_ON_ENTRY | JC_PROFILED)
 
     def _makeref(self, token):
         assert token is not None
@@ -223,6 +237,8 @@ class BaseJitCell(object):
             # don't remove, we need to remember that we should really finish a
             # trace for this
             return False
+        if self.flags & (JC_TRACE_ON_ENTRY | JC_PROFILED):
+            return False    # not reached yet
         return True   # Other JitCells can be removed.
 
 # ____________________________________________________________
@@ -256,6 +272,9 @@ class WarmEnterState(object):
     def set_param_function_threshold(self, threshold):
         self.increment_function_threshold = self._compute_threshold(threshold)
 
+    def set_param_profile_threshold(self, threshold):
+        self.increment_profile_threshold = self._compute_threshold(threshold)
+
     def set_param_trace_eagerness(self, value):
         self.increment_trace_eagerness = self._compute_threshold(value)
 
@@ -296,6 +315,12 @@ class WarmEnterState(object):
             self.warmrunnerdesc.memory_manager is not None):   # all for tests
             self.warmrunnerdesc.memory_manager.set_max_age(value)
 
+    def set_param_code_memory_limit(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if (self.warmrunnerdesc is not None and
+            self.warmrunnerdesc.memory_manager is not None):   # all for tests
+            self.warmrunnerdesc.memory_manager.set_max_code_size(value)
+
     def set_param_retrace_limit(self, value):
         if self.warmrunnerdesc:
             if self.warmrunnerdesc.memory_manager:
@@ -382,6 +407,7 @@ class WarmEnterState(object):
         func_execute_token = self.cpu.make_execute_token(*ARGS)
         cpu = self.cpu
         jitcounter = self.warmrunnerdesc.jitcounter
+        warmstate = self
         result_type = jitdriver_sd.result_type
 
         def execute_assembler(loop_token, *args):
@@ -429,6 +455,8 @@ class WarmEnterState(object):
             jitcounter.decay_all_counters()
             if rstack.stack_almost_full():
                 return
+            if cell is not None:
+                cell.flags &= ~JC_PROFILED
             greenargs = args[:num_green_args]
             if cell is None:
                 cell = JitCell(*greenargs)
@@ -470,11 +498,21 @@ class WarmEnterState(object):
 
             # Here, we have found 'cell'.
             #
-            if cell.flags & (JC_TRACING | JC_TEMPORARY):
+            if cell.flags & (JC_TRACING | JC_TEMPORARY | JC_TRACE_ON_ENTRY |
+                              JC_PROFILED):
                 if cell.flags & JC_TRACING:
                     # tracing already happening in some outer invocation of
                     # this function. don't trace a second time.
                     return
+                if cell.flags & JC_TRACE_ON_ENTRY:
+                    # preloaded with trace_on_first_entry(): trace now
+                    cell.flags &= ~JC_TRACE_ON_ENTRY
+                    bound_reached(hash, cell, *args)
+                    return
+                if cell.flags & JC_PROFILED:
+                    # preloaded with mark_as_hot(): count with a lower
+                    # threshold
+                    increment_threshold = warmstate.increment_profile_threshold
                 # attached by compile_tmp_callback().  count normally
                 if jitcounter.tick(hash, increment_threshold):
                     bound_reached(hash, cell, *args)
@@ -649,6 +687,20 @@ class WarmEnterState(object):
             def mark_as_being_traced(*greenargs):
                 cell = JitCell._ensure_jit_cell_at_key(*greenargs)
                 cell.flags |= JC_TRACING
+
+            @staticmethod
+            def trace_on_first_entry(*greenargs):
+                cell = JitCell._ensure_jit_cell_at_key(*greenargs)
+                if (cell.get_procedure_token() is None or
+                        cell.flags & JC_TEMPORARY):
+                    cell.flags |= JC_TRACE_ON_ENTRY
+
+            @staticmethod
+            def mark_as_hot(*greenargs):
+                cell = JitCell._ensure_jit_cell_at_key(*greenargs)
+                if (cell.get_procedure_token() is None or
+                        cell.flags & JC_TEMPORARY):
+                    cell.flags |= JC_PROFILED
         #
         self.JitCell = JitCell
         return JitCell
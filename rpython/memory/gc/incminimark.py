@@ -52,6 +52,18 @@ Environment variables can be used to fine-tune the following parameters:
                          in time.  Defaults to a conservative value depending
                          on nursery size and maximum object size inside the
                          nursery.  Useful for debugging by setting it to 0.
+
+ PYPY_GC_TRIM_AFTER      Return to the OS the memory of the free pages in
+                         arenas that stayed unused for this number of major
+                         collections.  Off by default: the free pages
+                         stay resident.
+
+ PYPY_GC_MAX_PAUSE_MS    Target for the duration of each incremental step
+                         of a major collection, in milliseconds.  A marking
+                         or sweeping step stops early when it reaches it,
+                         and the rest of its work is done by the following
+                         steps.  Defaults to 0, meaning no time limit: the
+                         steps are only sized by the amount of work.
 """
 # XXX Should find a way to bound the major collection threshold by the
 # XXX total addressable size.  Maybe by keeping some minimarkpage arenas
@@ -306,6 +318,13 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.max_heap_size_already_raised = False
         self.max_delta = float(r_uint(-1))
         self.max_number_of_pinned_objects = 0      # computed later
+        self.trim_free_pages_after = -1    # off by default
+        self.major_collects_until_trim = -1
+        self.num_frozen_objects = 0
+        self.frozen_rawmalloced_size = r_uint(0)
+        self.max_pause = 0.0       # in seconds; 0.0 means no time limit
+        self.step_time_limited = False
+        self.time_limited_steps_in_a_row = 0
         #
         self.card_page_indices = card_page_indices
         if self.card_page_indices > 0:
@@ -505,6 +524,15 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 self.gc_nursery_debug = True
             else:
                 self.gc_nursery_debug = False
+            #
+            trim_after = env.read_uint_from_env('PYPY_GC_TRIM_AFTER')
+            if trim_after > 0:
+                self.trim_free_pages_after = trim_after
+                self.major_collects_until_trim = trim_after
+            #
+            max_pause_ms = env.read_float_from_env('PYPY_GC_MAX_PAUSE_MS')
+            if max_pause_ms > 0.0:
+                self.max_pause = max_pause_ms / 1000.0
             self._minor_collection()    # to empty the nursery
             llarena.arena_free(self.nursery)
             self.nursery_size = newsize
@@ -1083,6 +1111,79 @@ class IncrementalMiniMarkGC(MovingGCBase):
             if self.max_heap_size < self.next_major_collection_threshold:
                 self.next_major_collection_threshold = self.max_heap_size
 
+    def trim_free_memory(self):
+        """Return to the OS the memory of all the free pages in arenas,
+        without waiting for them to be unused for 'PYPY_GC_TRIM_AFTER'
+        major collections.  Returns the number of bytes returned.
+        """
+        released = self.ac.trim_free_pages(False)
+        debug_start("gc-trim")
+        debug_print("bytes returned to the OS:", released)
+        debug_stop("gc-trim")
+        return released
+
+    def freeze(self):
+        """Do a full collection, and then move all the surviving objects
+        into a permanent generation.  These objects are never freed, and
+        the following major collections don't mark them: they get the
+        GCFLAG_NO_HEAP_PTRS flag, like prebuilt objects, which makes them
+        immortal; and when the write barrier triggers on one of them,
+        it is added to 'prebuilt_root_objects'.  The pages of the
+        ArenaCollection that contain them are not swept any more either.
+        After a fork(), the memory of these objects remains shared with
+        the parent process as long as they are not modified.  Returns
+        False if there were pinned objects, in which case nothing is done.
+        """
+        self.minor_and_major_collection()
+        self._minor_collection()    # in case finalizers allocated objects
+        if self.pinned_objects_in_nursery > 0:
+            return False
+        debug_start("gc-freeze")
+        self.ac.freeze_pages(self._freeze_arena_object)
+        while self.old_rawmalloced_objects.non_empty():
+            obj = self.old_rawmalloced_objects.pop()
+            self._freeze_object(obj)
+            totalsize = self.gcheaderbuilder.size_gc_header + self.get_size(obj)
+            self.frozen_rawmalloced_size += raw_malloc_usage(totalsize)
+        #
+        # All the objects in these lists are frozen now, so they will
+        # never die: forget them.  It is fine for weakrefs too, because
+        # a frozen weakref can only point to a frozen object.
+        self.old_objects_with_finalizers.delete()
+        self.old_objects_with_finalizers = self.AddressDeque()
+        self.old_objects_with_destructors.delete()
+        self.old_objects_with_destructors = self.AddressStack()
+        self.old_objects_with_weakrefs.delete()
+        self.old_objects_with_weakrefs = self.AddressStack()
+        debug_print("frozen objects:", self.num_frozen_objects)
+        debug_stop("gc-freeze")
+        return True
+
+    def _freeze_arena_object(self, hdr):
+        self._freeze_object(hdr + self.gcheaderbuilder.size_gc_header)
+        return False      # don't free it
+
+    def _freeze_object(self, obj):
+        hdr = self.header(obj)
+        if hdr.tid & GCFLAG_HAS_CARDS:
+            # the card marking logic doesn't clear GCFLAG_NO_HEAP_PTRS;
+            # use 'prebuilt_root_objects' directly for these large arrays
+            self.prebuilt_root_objects.append(obj)
+        else:
+            hdr.tid |= GCFLAG_NO_HEAP_PTRS | GCFLAG_TRACK_YOUNG_PTRS
+        self.num_frozen_objects += 1
+
+    def _trim_idle_free_pages(self):
+        # Called at the end of every major collection
+        if self.trim_free_pages_after <= 0:
+            return
+        self.major_collects_until_trim -= 1
+        if self.major_collects_until_trim > 0:
+            return
+        self.major_collects_until_trim = self.trim_free_pages_after
+        released = self.ac.trim_free_pages(True)
+        debug_print("bytes returned to the OS:", released)
+
     def raw_malloc_memory_pressure(self, sizehint, adr):
         # Decrement by 'sizehint' plus a very little bit extra.  This
         # is needed e.g. for _rawffi, which may allocate a lot of tiny
@@ -2320,6 +2421,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
         start = time.time()
         debug_start("gc-collect-step")
         oldstate = self.gc_state
+        deadline = self._get_step_deadline(start)
+        self.step_time_limited = False
         debug_print("starting gc state: ", GC_STATES[self.gc_state])
         # Debugging checks
         if self.pinned_objects_in_nursery == 0:
@@ -2385,7 +2488,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
             if estimate_from_nursery > estimate:
                 estimate = estimate_from_nursery
             estimate = intmask(estimate)
-            remaining = self.visit_all_objects_step(estimate)
+            remaining = self.visit_all_objects_step(estimate, deadline)
             #
             if remaining >= estimate // 2:
                 if self.more_objects_to_trace.non_empty():
@@ -2470,7 +2573,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 # a total object size of at least '3 * nursery_size' bytes
                 # is processed.
                 limit = 3 * self.nursery_size // self.small_request_threshold
-                nobjects = self.free_unvisited_rawmalloc_objects_step(limit)
+                nobjects = self.free_unvisited_rawmalloc_objects_step(
+                    limit, deadline)
                 debug_print("freeing raw objects:", limit-nobjects,
                             "freed, limit was", limit)
                 done = False    # the 2nd half below must still be done
@@ -2480,8 +2584,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 # GCFLAG_VISITED on the others.  Visit at most '3 *
                 # nursery_size' bytes.
                 limit = 3 * self.nursery_size // self.ac.page_size
-                done = self.ac.mass_free_incremental(self._free_if_unvisited,
-                                                     limit)
+                done = self.mass_free_step(limit, deadline)
                 status = done and "No more pages left." or "More to do."
                 debug_print("freeing GC objects, up to", limit, "pages.", status)
             # XXX tweak the limits above
@@ -2512,6 +2615,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
                             self.ac.arenas_count)
                 debug_print("bytes used in arenas: ",
                             self.ac.total_memory_used)
+                self._trim_idle_free_pages()
                 debug_print("bytes raw-malloced:   ",
                             self.stat_rawmalloced_total_size, " => ",
                             self.rawmalloced_total_size)
@@ -2566,11 +2670,53 @@ class IncrementalMiniMarkGC(MovingGCBase):
         duration = time.time() - start
         self.total_gc_time += duration
         debug_print("time taken: ", duration)
+        if self.step_time_limited:
+            debug_print("stopped early: reached the max pause time")
+            self.time_limited_steps_in_a_row += 1
+        else:
+            self.time_limited_steps_in_a_row = 0
         debug_stop("gc-collect-step")
         self.hooks.fire_gc_collect_step(
             duration=duration,
             oldstate=oldstate,
-            newstate=self.gc_state)
+            newstate=self.gc_state,
+            time_limited=self.step_time_limited)
+
+    # With a max pause time, the marking and sweeping steps look at the
+    # clock every PAUSE_CHECK_OBJECTS objects or PAUSE_CHECK_PAGES pages,
+    # and stop when the time is over.  This cannot go on forever: if the
+    # program keeps adding objects to mark faster than the short steps can
+    # mark them, the major collection would never finish.  So after
+    # MAX_TIME_LIMITED_STEPS_IN_A_ROW steps stopped early, the next one
+    # ignores the time limit and does its full amount of work.
+    PAUSE_CHECK_OBJECTS = 128
+    PAUSE_CHECK_PAGES = 8
+    MAX_TIME_LIMITED_STEPS_IN_A_ROW = 8
+
+    def _get_step_deadline(self, start):
+        # Returns the time at which the current step should stop, or 0.0
+        # if it is only limited by the amount of work.
+        if self.max_pause <= 0.0:
+            return 0.0
+        if (self.time_limited_steps_in_a_row >=
+                self.MAX_TIME_LIMITED_STEPS_IN_A_ROW):
+            return 0.0
+        return start + self.max_pause
+
+    def mass_free_step(self, max_pages, deadline):
+        if deadline == 0.0:
+            return self.ac.mass_free_incremental(self._free_if_unvisited,
+                                                 max_pages)
+        while True:
+            chunk = min(max_pages, self.PAUSE_CHECK_PAGES)
+            if self.ac.mass_free_incremental(self._free_if_unvisited, chunk):
+                return True
+            max_pages -= chunk
+            if max_pages <= 0:
+                return False
+            if time.time() >= deadline:
+                self.step_time_limited = True
+                return False
 
     def _sweep_old_objects_pointing_to_pinned(self, obj, new_list):
         if self.header(obj).tid & GCFLAG_VISITED:
@@ -2622,11 +2768,19 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.old_rawmalloced_objects = swap
 
     # Returns true when finished processing objects
-    def free_unvisited_rawmalloc_objects_step(self, nobjects):
+    def free_unvisited_rawmalloc_objects_step(self, nobjects, deadline=0.0):
+        check = self.PAUSE_CHECK_OBJECTS
         while self.raw_malloc_might_sweep.non_empty() and nobjects > 0:
             obj = self.raw_malloc_might_sweep.pop()
             self.free_rawmalloced_object_if_unvisited(obj, GCFLAG_VISITED)
             nobjects -= 1
+            if deadline != 0.0:
+                check -= 1
+                if check == 0:
+                    if time.time() >= deadline:
+                        self.step_time_limited = True
+                        break
+                    check = self.PAUSE_CHECK_OBJECTS
 
         return nobjects
 
@@ -2693,12 +2847,20 @@ class IncrementalMiniMarkGC(MovingGCBase):
 
     TEST_VISIT_SINGLE_STEP = False    # for tests
 
-    def visit_all_objects_step(self, size_to_track):
+    def visit_all_objects_step(self, size_to_track, deadline=0.0):
         # Objects can be added to pending by visit
         pending = self.objects_to_trace
+        check = self.PAUSE_CHECK_OBJECTS
         while pending.non_empty():
             obj = pending.pop()
             size_to_track -= self.visit(obj)
+            if deadline != 0.0:
+                check -= 1
+                if check == 0:
+                    check = self.PAUSE_CHECK_OBJECTS
+                    if time.time() >= deadline:
+                        self.step_time_limited = True
+                        size_to_track = -1
             if size_to_track < 0 or self.TEST_VISIT_SINGLE_STEP:
                 return 0
         return size_to_track
@@ -2874,6 +3036,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
             pending.append(x)
             while pending.non_empty():
                 y = pending.pop()
+                if self.header(y).tid & GCFLAG_NO_HEAP_PTRS:
+                    continue     # immortal object, see freeze()
                 state = self._finalization_state(y)
                 if state == 0:
                     self._bump_finalization_state_from_0_to_1(y)
@@ -3075,6 +3239,13 @@ class IncrementalMiniMarkGC(MovingGCBase):
             return intmask(self.nursery_size)
         elif stats_no == rgc.TOTAL_GC_TIME:
             return int(self.total_gc_time * 1000)
+        elif stats_no == rgc.TRIMMED_ARENA_MEMORY:
+            return intmask(self.ac.total_memory_trimmed)
+        elif stats_no == rgc.FROZEN_MEMORY:
+            return intmask(self.ac.total_memory_frozen +
+                           self.frozen_rawmalloced_size)
+        elif stats_no == rgc.FROZEN_OBJECTS:
+            return self.num_frozen_objects
         return 0
 
 
@@ -24,6 +24,11 @@ ARENA = lltype.Struct('ArenaReference',
     ('totalpages', lltype.Signed),
     # -- A chained list of free pages in the arena.  Ends with NULL.
     ('freepages', llmemory.Address),
+    # -- The number of pages at the end of 'freepages' that stayed free
+    #    since the last call to trim_free_pages(), and the number of pages
+    #    at the end of 'freepages' that were returned to the OS.  See below.
+    ('nidlepages', lltype.Signed),
+    ('ntrimmedpages', lltype.Signed),
     # -- A linked list of arenas.  See below.
     ('nextarena', ARENA_PTR),
     )
@@ -40,6 +45,17 @@ ARENA_NULL = lltype.nullptr(ARENA)
 # arena in 'current_arena'; when it is exhausted we pick another arena
 # with the smallest value for nfreepages (but > 0).
 
+# Entirely free arenas are returned to the OS at the end of a major
+# collection, but free pages in the other arenas stay resident.  To fix
+# this, trim_free_pages() returns the memory of free pages to the OS with
+# madvise(), except for the start of the page, where the chained list of
+# free pages is stored.  Runs of free pages that are adjacent in memory
+# are returned with a single madvise().  Pages are always taken from and
+# added to the head of the 'freepages' list, so the pages that stayed
+# free since the last call form the tail of the list.  We only need to
+# count them, in 'nidlepages'; similarly, the pages already returned to
+# the OS are counted in 'ntrimmedpages'.
+
 # ____________________________________________________________
 #
 # Each page in an arena can be:
@@ -104,6 +120,7 @@ class ArenaCollection(object):
         self.full_page_for_size     = self._new_page_ptr_list(length)
         self.old_page_for_size      = self._new_page_ptr_list(length)
         self.old_full_page_for_size = self._new_page_ptr_list(length)
+        self.size_class_with_old_pages = -1   # no mass_free() in progress
         self.nblocks_for_size = lltype.malloc(rffi.CArray(lltype.Signed),
                                               length, flavor='raw',
                                               immortal=True)
@@ -143,6 +160,14 @@ class ArenaCollection(object):
         self.peak_memory_used = r_uint(0)
         self.total_memory_alloced = r_uint(0)
         self.peak_memory_alloced = r_uint(0)
+        #
+        # the memory of the free pages currently returned to the OS
+        self.total_memory_trimmed = r_uint(0)
+        #
+        # the memory used by the objects in the pages removed by
+        # freeze_pages(), which is included in 'total_memory_used'
+        self.total_memory_frozen = r_uint(0)
+        self.trim_offset = 0      # computed at run-time
 
 
     def _new_page_ptr_list(self, length):
@@ -208,6 +233,12 @@ class ArenaCollection(object):
             #
             # The 'result' was part of the chained list; read the next.
             arena.nfreepages -= 1
+            if arena.nidlepages > arena.nfreepages:
+                arena.nidlepages = arena.nfreepages
+            if arena.ntrimmedpages > arena.nfreepages:
+                # 'result' was returned to the OS; it will be paged in again
+                arena.ntrimmedpages = arena.nfreepages
+                self.total_memory_trimmed -= r_uint(self._trimmed_page_size())
             freepages = result.address[0]
             llarena.arena_reset(result,
                                 llmemory.sizeof(llmemory.Address),
@@ -315,6 +346,8 @@ class ArenaCollection(object):
         arena.base = arena_base
         arena.nfreepages = 0        # they are all uninitialized pages
         arena.totalpages = npages
+        arena.nidlepages = 0
+        arena.ntrimmedpages = 0
         arena.freepages = firstpage
         self.num_uninitialized_pages = npages
         self.current_arena = arena
@@ -329,7 +362,7 @@ class ArenaCollection(object):
         """
         self.peak_memory_used = max(self.peak_memory_used,
                                     self.total_memory_used)
-        self.total_memory_used = r_uint(0)
+        self.total_memory_used = self.total_memory_frozen
         #
         size_class = self.small_request_threshold >> WORD_POWER_2
         self.size_class_with_old_pages = size_class
@@ -405,6 +438,8 @@ class ArenaCollection(object):
                 if arena.nfreepages == arena.totalpages:
                     #
                     # The whole arena is empty.  Free it.
+                    self.total_memory_trimmed -= r_uint(
+                        arena.ntrimmedpages * self._trimmed_page_size())
                     llarena.arena_reset(arena.base, self.arena_size, 4)
                     llarena.arena_free(arena.base)
                     self.total_memory_alloced -= self.arena_size
@@ -488,6 +523,40 @@ class ArenaCollection(object):
         return max_pages
 
 
+    def freeze_pages(self, freeze_func):
+        """Call freeze_func(obj) on all objects, and forget all the pages
+        that contain objects: they will never be freed, nor even visited
+        again, and no more objects are allocated in them.  Must not be
+        called between mass_free_prepare() and the end of the
+        mass_free_incremental() calls.
+        """
+        ll_assert(self.size_class_with_old_pages < 0,
+                  "freeze_pages() called during mass_free_incremental()")
+        total_memory_used = self.total_memory_used
+        self.total_memory_used = r_uint(0)
+        size_class = self.small_request_threshold >> WORD_POWER_2
+        while size_class >= 1:
+            block_size = size_class * WORD
+            self._freeze_pages_in(self.page_for_size, size_class,
+                                  block_size, freeze_func)
+            self._freeze_pages_in(self.full_page_for_size, size_class,
+                                  block_size, freeze_func)
+            size_class -= 1
+        # walk_page() recomputed in 'total_memory_used' the size of the
+        # objects that we just froze
+        self.total_memory_frozen += self.total_memory_used
+        self.total_memory_used = total_memory_used
+    freeze_pages._annspecialcase_ = 'specialize:arg(1)'
+
+    def _freeze_pages_in(self, page_for_size, size_class, block_size,
+                         freeze_func):
+        page = page_for_size[size_class]
+        page_for_size[size_class] = PAGE_NULL
+        while page != PAGE_NULL:
+            self.walk_page(page, block_size, freeze_func)
+            page = page.nextpage
+    _freeze_pages_in._annspecialcase_ = 'specialize:arg(4)'
+
     def free_page(self, page):
         """Free a whole page."""
         #
@@ -504,6 +573,111 @@ class ArenaCollection(object):
         arena.freepages = pageaddr
 
 
+    def trim_free_pages(self, idle_only):
+        """Return to the OS the memory of the free pages, apart from the
+        start of each page.  If 'idle_only' is True, only do it for the
+        pages that stayed free since the previous call to this method.
+        Returns the number of bytes that are returned to the OS now.
+        """
+        released = 0
+        if self.current_arena:
+            released += self._trim_arena(self.current_arena, idle_only)
+        i = 0
+        while i < self.max_pages_per_arena:
+            arena = self.arenas_lists[i]
+            while arena != ARENA_NULL:
+                released += self._trim_arena(arena, idle_only)
+                arena = arena.nextarena
+            i += 1
+        self.total_memory_trimmed += r_uint(released)
+        return released
+
+    def _trim_arena(self, arena, idle_only):
+        # Walk the free pages of the arena: first the ones to skip, then
+        # the ones to trim, then the ones that are already trimmed.
+        if idle_only:
+            ntrim = arena.nidlepages
+        else:
+            ntrim = arena.nfreepages
+        arena.nidlepages = arena.nfreepages
+        nskip = arena.nfreepages - ntrim
+        ntrim -= arena.ntrimmedpages
+        if ntrim <= 0:
+            return 0
+        size = self._trimmed_page_size()
+        if size == 0:
+            return 0
+        offset = self.page_size - size
+        pageaddr = arena.freepages
+        while nskip > 0:
+            pageaddr = pageaddr.address[0]
+            nskip -= 1
+        arena.ntrimmedpages += ntrim
+        released = ntrim * size
+        while ntrim > 0:
+            # Find the run of pages that follow 'pageaddr' in the chained
+            # list and that are also adjacent in memory, in increasing or
+            # in decreasing order.
+            npages = 1
+            ascending = False
+            lastaddr = pageaddr
+            nextaddr = pageaddr.address[0]
+            while npages < ntrim:
+                if nextaddr == lastaddr + self.page_size and (
+                        npages == 1 or ascending):
+                    ascending = True
+                elif nextaddr + self.page_size == lastaddr and not ascending:
+                    pass
+                else:
+                    break
+                lastaddr = nextaddr
+                nextaddr = lastaddr.address[0]
+                npages += 1
+            if ascending:
+                lowaddr = pageaddr
+            else:
+                lowaddr = lastaddr
+            #
+            # Return the whole run to the OS with a single call, apart
+            # from the start of its lowest page, and then write again the
+            # start of the other pages.  This pages in again the same
+            # memory as trimming every page individually would keep.
+            llarena.arena_reset(lowaddr + offset,
+                                (npages - 1) * self.page_size + size, 4)
+            self._rechain_trimmed_run(pageaddr, lastaddr, nextaddr, lowaddr,
+                                      ascending)
+            pageaddr = nextaddr
+            ntrim -= npages
+        return released
+
+    def _rechain_trimmed_run(self, pageaddr, lastaddr, nextaddr, lowaddr,
+                             ascending):
+        while True:
+            if pageaddr == lastaddr:
+                linkaddr = nextaddr
+            elif ascending:
+                linkaddr = pageaddr + self.page_size
+            else:
+                linkaddr = pageaddr - self.page_size
+            if pageaddr != lowaddr:
+                llarena.arena_reserve(pageaddr,
+                                      llmemory.sizeof(llmemory.Address))
+                pageaddr.address[0] = linkaddr
+            if pageaddr == lastaddr:
+                break
+            pageaddr = linkaddr
+
+    def _trimmed_page_size(self):
+        # The number of bytes of a free page that can be returned to the
+        # OS.  Pages are aligned to 'page_size', which is a multiple of
+        # the OS page size; we keep the first OS page.  With a 'page_size'
+        # not larger than the OS page size, there is nothing to return.
+        if self.trim_offset == 0:
+            self.trim_offset = max(_os_page_size(), WORD)
+        if self.page_size <= self.trim_offset:
+            return 0
+        return self.page_size - self.trim_offset
+
     def walk_page(self, page, block_size, ok_to_free_func):
         """Walk over all objects in a page, and ask ok_to_free_func()."""
         #
@@ -566,6 +740,7 @@ class ArenaCollection(object):
         #
         # Return the number of surviving objects.
         return surviving
+    walk_page._annspecialcase_ = 'specialize:arg(3)'
 
 
     def _nuninitialized(self, page, size_class):
@@ -600,6 +775,12 @@ def _start_of_page_untranslated(addr, page_size):
     ofs = ((addr.offset - shift) // page_size) * page_size + shift
     return llarena.fakearenaaddress(addr.arena, ofs)
 
+def _os_page_size():
+    if we_are_translated():
+        return llarena.posixpagesize.get()
+    else:
+        return WORD  # for testing, any offset is fine
+
 def _dummy_size(size):
     if we_are_translated():
         return size
@@ -57,3 +57,11 @@ class SimpleArenaCollection(object):
         self.mass_free_prepare()
         res = self.mass_free_incremental(ok_to_free_func, sys.maxint)
         assert res
+
+    def trim_free_pages(self, idle_only):
+        return 0
+
+    def freeze_pages(self, freeze_func):
+        for rawobj, nsize in self.all_objects:
+            freeze_func(rawobj)
+        self.all_objects = []
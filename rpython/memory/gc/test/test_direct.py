@@ -822,6 +822,74 @@ class TestIncrementalMiniMarkGCFull(DirectGCTest):
         # s is freed
         py.test.raises(RuntimeError, 's.x')
 
+    def test_trim_free_memory(self, debuglog):
+        from rpython.rlib import rgc
+        for i in range(90):
+            s = self.malloc(S)
+            s.x = i
+            self.stackroots.append(s)
+        self.gc.collect()
+        self.stackroots[:] = [s for s in self.stackroots if s.x % 9 == 0]
+        self.gc.collect()
+        trimmed = self.gc.get_stats(rgc.TRIMMED_ARENA_MEMORY)
+        assert trimmed == 0     # not done by collections by default
+        debuglog.reset()
+        released = self.gc.trim_free_memory()
+        assert released > 0
+        assert debuglog.summary() == {'gc-trim': 1}
+        assert self.gc.get_stats(rgc.TRIMMED_ARENA_MEMORY) == (
+            trimmed + released)
+        assert self.gc.trim_free_memory() == 0
+        assert [s.x for s in self.stackroots] == range(0, 90, 9)
+        #
+        # the free pages can still be reused
+        for i in range(90):
+            self.stackroots.append(self.malloc(S))
+        self.gc.collect()
+        assert self.gc.get_stats(rgc.TRIMMED_ARENA_MEMORY) < (
+            trimmed + released)
+
+    def test_freeze(self, debuglog):
+        from rpython.rlib import rgc
+        s = self.malloc(S)
+        s.x = 42
+        self.stackroots.append(s)
+        t = self.malloc(S)
+        t.x = 43
+        self.write(s, 'next', t)
+        lst = self.malloc(VAR, 3)
+        self.stackroots.append(lst)
+        assert self.gc.freeze()
+        assert 'gc-freeze' in debuglog.summary()
+        lst = self.stackroots.pop()
+        s = self.stackroots.pop()
+        assert self.gc.get_stats(rgc.FROZEN_OBJECTS) == 3
+        assert self.gc.get_stats(rgc.FROZEN_MEMORY) > 0
+        hdr_s = self.gc.header(llmemory.cast_ptr_to_adr(s))
+        hdr_t = self.gc.header(llmemory.cast_ptr_to_adr(s.next))
+        assert hdr_s.tid & incminimark.GCFLAG_NO_HEAP_PTRS
+        assert hdr_t.tid & incminimark.GCFLAG_NO_HEAP_PTRS
+        #
+        # the major collections don't mark or free the frozen objects
+        tid_s = hdr_s.tid
+        self.gc.debug_gc_step_until(incminimark.STATE_SWEEPING)
+        assert hdr_s.tid == tid_s
+        self.gc.collect()
+        assert hdr_s.tid == tid_s
+        assert s.x == 42 and s.next.x == 43
+        #
+        # writing into a frozen object makes it a root
+        u = self.malloc(S)
+        u.x = 44
+        self.write(s, 'prev', u)
+        self.writearray(lst, 1, u)
+        self.gc.collect()
+        assert not hdr_s.tid & incminimark.GCFLAG_NO_HEAP_PTRS
+        assert s.prev.x == 44
+        assert lst[1].x == 44
+        self.gc.collect()
+        assert s.prev.x == 44
+
     def test_collect_step(self, debuglog):
         from rpython.rlib import rgc
         n = 0
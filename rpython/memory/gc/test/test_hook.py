@@ -33,11 +33,12 @@ class MyGcHooks(GcHooks):
             'total_memory_used': total_memory_used,
             'pinned_objects': pinned_objects})
 
-    def on_gc_collect_step(self, duration, oldstate, newstate):
+    def on_gc_collect_step(self, duration, oldstate, newstate, time_limited):
         self.durations.append(duration)
         self.steps.append({
             'oldstate': oldstate,
-            'newstate': newstate})
+            'newstate': newstate,
+            'time_limited': time_limited})
 
     def on_gc_collect(self, num_major_collects,
                       arenas_count_before, arenas_count_after,
@@ -90,10 +91,14 @@ class TestIncMiniMarkHooks(BaseDirectGCTest):
         self.malloc(S)
         self.gc.collect()
         assert self.gc.hooks.steps == [
-            {'oldstate': m.STATE_SCANNING, 'newstate': m.STATE_MARKING},
-            {'oldstate': m.STATE_MARKING, 'newstate': m.STATE_SWEEPING},
-            {'oldstate': m.STATE_SWEEPING, 'newstate': m.STATE_FINALIZING},
-            {'oldstate': m.STATE_FINALIZING, 'newstate': m.STATE_SCANNING}
+            {'oldstate': m.STATE_SCANNING, 'newstate': m.STATE_MARKING,
+             'time_limited': False},
+            {'oldstate': m.STATE_MARKING, 'newstate': m.STATE_SWEEPING,
+             'time_limited': False},
+            {'oldstate': m.STATE_SWEEPING, 'newstate': m.STATE_FINALIZING,
+             'time_limited': False},
+            {'oldstate': m.STATE_FINALIZING, 'newstate': m.STATE_SCANNING,
+             'time_limited': False},
         ]
         assert self.gc.hooks.collects == [
             {'num_major_collects': 1,
@@ -123,6 +128,42 @@ class TestIncMiniMarkHooks(BaseDirectGCTest):
             }
             ]
 
+    def test_on_gc_collect_step_time_limited(self, monkeypatch):
+        from rpython.memory.gc import incminimark as m
+        class FakeTime(object):
+            now = 0.0
+            def time(self):
+                self.now += 1.0
+                return self.now
+        for i in range(50):
+            p = self.malloc(S)
+            p.x = i
+            self.stackroots.append(p)
+        self.gc.collect()
+        #
+        monkeypatch.setattr(m, 'time', FakeTime())
+        self.gc.max_pause = 0.5
+        self.gc.PAUSE_CHECK_OBJECTS = 1
+        self.gc.hooks._gc_collect_step_enabled = True
+        self.gc.collect()
+        steps = self.gc.hooks.steps
+        assert steps[0] == {'oldstate': m.STATE_SCANNING,
+                            'newstate': m.STATE_MARKING,
+                            'time_limited': False}
+        # every marking step visits one object and stops, except that
+        # after MAX_TIME_LIMITED_STEPS_IN_A_ROW such steps, one step
+        # ignores the time limit
+        limit = self.gc.MAX_TIME_LIMITED_STEPS_IN_A_ROW
+        marking = steps[1:limit + 2]
+        assert [step['time_limited'] for step in marking] == (
+            [True] * limit + [False])
+        for step in marking:
+            assert step['oldstate'] == m.STATE_MARKING
+        assert steps[-1]['newstate'] == m.STATE_SCANNING
+        assert self.gc.time_limited_steps_in_a_row == 0
+        for i in range(50):
+            assert self.stackroots[i].x == i    # still alive
+
     def test_hook_disabled(self):
         self.gc._minor_collection()
         self.gc.collect()
@@ -400,6 +400,87 @@ def test_mass_free_half_page_becomes_more_free():
     assert freepages(ac) == NULL
     assert ac.full_page_for_size[2] == PAGE_NULL
 
+def test_trim_free_pages():
+    pagesize = hdrsize + 7*WORD
+    trimsize = pagesize - WORD
+    ac = arena_collection_for_test(pagesize, "#..#.")
+    assert ac.current_arena.nfreepages == 3
+    assert ac.trim_free_pages(True) == 0     # no page was idle so far
+    assert ac.trim_free_pages(True) == 3 * trimsize
+    assert ac.total_memory_trimmed == 3 * trimsize
+    assert ac.trim_free_pages(True) == 0     # already done
+    assert ac.trim_free_pages(False) == 0
+    # the chained list of free pages is still there
+    assert freepages(ac) == pagenum(ac, 1)
+    assert pagenum(ac, 1).address[0] == pagenum(ac, 2)
+    assert pagenum(ac, 2).address[0] == pagenum(ac, 4)
+    usagemap = pagenum(ac, 1).arena.usagemap
+    ofs = pagenum(ac, 1).offset
+    assert usagemap[ofs + WORD:ofs + pagesize].tostring() == '#' * trimsize
+    #
+    page = ac.allocate_new_page(1); checkpage(ac, page, 1)
+    assert ac.current_arena.ntrimmedpages == 2
+    assert ac.total_memory_trimmed == 2 * trimsize
+
+def test_trim_free_pages_idle_only():
+    pagesize = hdrsize + 7*WORD
+    trimsize = pagesize - WORD
+    ac = arena_collection_for_test(pagesize, "#..#.")
+    assert ac.trim_free_pages(True) == 0
+    # reuse one page and free it again: it is not idle any more
+    page = ac.allocate_new_page(1); checkpage(ac, page, 1)
+    ac.page_for_size[1] = PAGE_NULL
+    ac.free_page(page)
+    assert freepages(ac) == pagenum(ac, 1)
+    assert ac.trim_free_pages(True) == 2 * trimsize
+    assert ac.current_arena.ntrimmedpages == 2
+    assert ac.trim_free_pages(False) == trimsize
+    assert ac.current_arena.ntrimmedpages == 3
+    assert ac.total_memory_trimmed == 3 * trimsize
+
+def test_trim_free_pages_coalesced(monkeypatch):
+    pagesize = hdrsize + 7*WORD
+    trimsize = pagesize - WORD
+    resets = []
+    def my_arena_reset(addr, size, zero):
+        if zero == 4:
+            resets.append((addr, size))
+        return arena_reset(addr, size, zero)
+    arena_reset = llarena.arena_reset
+    monkeypatch.setattr(llarena, 'arena_reset', my_arena_reset)
+    ac = arena_collection_for_test(pagesize, "#...#..")
+    # the chained list is 1, 2, 3, 5, 6: two runs of adjacent pages
+    assert ac.trim_free_pages(False) == 5 * trimsize
+    assert resets == [(pagenum(ac, 1) + WORD, 2 * pagesize + trimsize),
+                      (pagenum(ac, 5) + WORD, pagesize + trimsize)]
+    assert freepages(ac) == pagenum(ac, 1)
+    assert pagenum(ac, 1).address[0] == pagenum(ac, 2)
+    assert pagenum(ac, 2).address[0] == pagenum(ac, 3)
+    assert pagenum(ac, 3).address[0] == pagenum(ac, 5)
+    assert pagenum(ac, 5).address[0] == pagenum(ac, 6)
+    assert pagenum(ac, 6).address[0] == NULL
+    #
+    # free pages in increasing order: the list is 3, 2, 1
+    pages = []
+    for i in range(3):
+        pages.append(ac.allocate_new_page(1))
+        ac.page_for_size[1] = PAGE_NULL
+    for page in pages:
+        ac.page_for_size[1] = PAGE_NULL
+        ac.free_page(page)
+    assert freepages(ac) == pagenum(ac, 3)
+    del resets[:]
+    assert ac.trim_free_pages(False) == 3 * trimsize
+    assert resets == [(pagenum(ac, 1) + WORD, 2 * pagesize + trimsize)]
+    assert pagenum(ac, 3).address[0] == pagenum(ac, 2)
+    assert pagenum(ac, 2).address[0] == pagenum(ac, 1)
+    assert pagenum(ac, 1).address[0] == pagenum(ac, 5)
+    for i in [3, 2, 1, 5]:
+        page = ac.allocate_new_page(1); checkpage(ac, page, i)
+        ac.page_for_size[1] = PAGE_NULL
+    assert ac.current_arena.ntrimmedpages == 1
+    assert freepages(ac) == pagenum(ac, 6)
+
 # ____________________________________________________________
 
 def test_random(incremental=False):
@@ -472,6 +553,13 @@ def test_random(incremental=False):
             assert not (set(live_objects) & set(live_objects_extra))
             live_objects.update(live_objects_extra)
             #
+            # Return some free pages to the OS
+            if random.random() < 0.5:
+                ac.trim_free_pages(random.random() < 0.5)
+            trimsize = pagesize - WORD
+            assert ac.total_memory_trimmed == trimsize * sum(
+                [a.ntrimmedpages for a in ac._all_arenas()])
+            #
     except DoneTesting:
         pass
 
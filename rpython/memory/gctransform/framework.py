@@ -432,6 +432,14 @@ class BaseFrameworkGCTransformer(GCTransformer):
             self.get_stats_ptr = getfn(get_stats, [annmodel.SomeInteger()],
                 annmodel.SomeInteger())
 
+        if getattr(GCClass, 'trim_free_memory', False):
+            self.trim_free_memory_ptr = getfn(
+                GCClass.trim_free_memory.im_func, [s_gc],
+                annmodel.SomeInteger())
+        if getattr(GCClass, 'freeze', False):
+            self.freeze_ptr = getfn(GCClass.freeze.im_func, [s_gc],
+                                    annmodel.s_Bool)
+
 
         self.identityhash_ptr = getfn(GCClass.identityhash.im_func,
                                       [s_gc, s_gcref],
@@ -890,6 +898,24 @@ class BaseFrameworkGCTransformer(GCTransformer):
         hop.genop("same_as", [rmodel.inputconst(lltype.Signed, 0)],
             resultvar=hop.spaceop.result)
 
+    def gct_gc_freeze_heap(self, hop):
+        if hasattr(self, 'freeze_ptr'):
+            livevars = self.push_roots(hop)
+            hop.genop("direct_call", [self.freeze_ptr, self.c_const_gc],
+                      resultvar=hop.spaceop.result)
+            self.pop_roots(hop, livevars)
+            return
+        hop.genop("same_as", [rmodel.inputconst(lltype.Bool, False)],
+            resultvar=hop.spaceop.result)
+
+    def gct_gc_trim_free_memory(self, hop):
+        if hasattr(self, 'trim_free_memory_ptr'):
+            return hop.genop("direct_call",
+                [self.trim_free_memory_ptr, self.c_const_gc],
+                resultvar=hop.spaceop.result)
+        hop.genop("same_as", [rmodel.inputconst(lltype.Signed, 0)],
+            resultvar=hop.spaceop.result)
+
 
     def gct_gc__collect(self, hop):
         op = hop.spaceop
@@ -1430,7 +1430,7 @@ class MyGcHooks(GcHooks):
     def on_gc_minor(self, duration, total_memory_used, pinned_objects):
         self.stats.minors += 1
 
-    def on_gc_collect_step(self, duration, oldstate, newstate):
+    def on_gc_collect_step(self, duration, oldstate, newstate, time_limited):
         self.stats.steps += 1
 
     def on_gc_collect(self, num_major_collects,
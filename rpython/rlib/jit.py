@@ -565,11 +565,13 @@ ENABLE_ALL_OPTS = (
 PARAMETER_DOCS = {
     'threshold': 'number of times a loop has to run for it to become hot',
     'function_threshold': 'number of times a function must run for it to become traced from start',
+    'profile_threshold': 'number of times a loop or function known to be hot from a loaded hotness profile must run for it to become traced',
     'trace_eagerness': 'number of times a guard has to fail before we start compiling a bridge',
     'decay': 'amount to regularly decay counters by (0=none, 1000=max)',
-    'trace_limit': 'number of recorded operations before we abort tracing with ABORT_TOO_LONG',
+    'trace_limit': 'number of recorded operations before we abort tracing with ABORT_TOO_LONG, or split the trace at the next merge point if no inlined function is to blame',
     'inlining': 'inline python functions or not (1/0)',
     'loop_longevity': 'a parameter controlling how long loops will be kept before being freed, an estimate',
+    'code_memory_limit': 'maximum size of the machine code of the loops kept alive, in KB (0=no limit); the least recently used loops are evicted first, and their machine code is only freed when the GC later collects them, so the memory in use can stay above the limit until then',
     'retrace_limit': 'how many times we can try retracing before giving up',
     'pureop_historylength': 'how many pure operations the optimizer should remember for CSE (internal)',
     'max_retrace_guards': 'number of extra guards a retrace can cause',
@@ -587,11 +589,13 @@ PARAMETER_DOCS = {
 
 PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'function_threshold': 1619, # slightly more than one above, also prime
+              'profile_threshold': 53,
               'trace_eagerness': 200,
               'decay': 40,
               'trace_limit': 6000,
               'inlining': 1,
               'loop_longevity': 1000,
+              'code_memory_limit': 0,
               'retrace_limit': 0,
               'pureop_historylength': 16,
               'max_retrace_guards': 15,
@@ -128,6 +128,18 @@ def stats_asmmemmgr_allocated(warmrunnerdesc):
 def stats_asmmemmgr_used(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.asmmemmgr.get_stats()[1]
 
+@register_helper(annmodel.SomeInteger())
+def stats_memmgr_alive_loops(warmrunnerdesc):
+    return len(warmrunnerdesc.memory_manager.alive_loops)
+
+@register_helper(annmodel.SomeInteger())
+def stats_memmgr_code_size(warmrunnerdesc):
+    return warmrunnerdesc.memory_manager.get_code_size()
+
+@register_helper(annmodel.SomeInteger())
+def stats_memmgr_evicted(warmrunnerdesc):
+    return warmrunnerdesc.memory_manager.num_evicted
+
 @register_helper(None)
 def stats_memmgr_release_all(warmrunnerdesc):
     warmrunnerdesc.memory_manager.release_all_loops()
@@ -161,4 +173,6 @@ get_jitcell_at_key = _new_hook('get_jitcell_at_key', SomePtr(llmemory.GCREF))
 trace_next_iteration = _new_hook('trace_next_iteration', None)
 dont_trace_here = _new_hook('dont_trace_here', None)
 mark_as_being_traced = _new_hook('mark_as_being_traced', None)
+trace_on_first_entry = _new_hook('trace_on_first_entry', None)
+mark_as_hot = _new_hook('mark_as_hot', None)
 trace_next_iteration_hash = _new_hook('trace_next_iteration_hash', None)
@@ -63,6 +63,20 @@ def set_max_heap_size(nbytes):
     """
     pass
 
+def trim_free_memory():
+    """Return to the OS the memory of the free pages kept by the GC.
+    Returns the number of bytes returned.
+    """
+    return 0
+
+def freeze_heap():
+    """Do a full collection and move all surviving objects into a
+    permanent generation, which is never freed and never written to by
+    the GC again.  Useful before fork(), to keep the memory shared with
+    the child processes.  Returns False if it is not possible right now.
+    """
+    return True
+
 def must_split_gc_address_space():
     """Returns True if we have a "split GC address space", i.e. if
     we are translating with an option that doesn't support taking raw
@@ -226,6 +240,28 @@ class SetMaxHeapSizeEntry(ExtRegistryEntry):
         return hop.genop('gc_set_max_heap_size', [v_nbytes],
                          resulttype=lltype.Void)
 
+class FreezeHeapEntry(ExtRegistryEntry):
+    _about_ = freeze_heap
+
+    def compute_result_annotation(self):
+        from rpython.annotator import model as annmodel
+        return annmodel.s_Bool
+
+    def specialize_call(self, hop):
+        hop.exception_cannot_occur()
+        return hop.genop('gc_freeze_heap', [], resulttype=hop.r_result)
+
+class TrimFreeMemoryEntry(ExtRegistryEntry):
+    _about_ = trim_free_memory
+
+    def compute_result_annotation(self):
+        from rpython.annotator import model as annmodel
+        return annmodel.SomeInteger()
+
+    def specialize_call(self, hop):
+        hop.exception_cannot_occur()
+        return hop.genop('gc_trim_free_memory', [], resulttype=hop.r_result)
+
 def can_move(p):
     """Check if the GC object 'p' is at an address that can move.
     Must not be called with None.  With non-moving GCs, it is always False.
@@ -845,7 +881,8 @@ def cast_gcref_to_int(gcref):
 (TOTAL_MEMORY, TOTAL_ALLOCATED_MEMORY, TOTAL_MEMORY_PRESSURE,
  PEAK_MEMORY, PEAK_ALLOCATED_MEMORY, TOTAL_ARENA_MEMORY,
  TOTAL_RAWMALLOCED_MEMORY, PEAK_ARENA_MEMORY, PEAK_RAWMALLOCED_MEMORY,
- NURSERY_SIZE, TOTAL_GC_TIME) = range(11)
+ NURSERY_SIZE, TOTAL_GC_TIME, TRIMMED_ARENA_MEMORY, FROZEN_MEMORY,
+ FROZEN_OBJECTS) = range(14)
 
 @not_rpython
 def get_stats(stat_no):
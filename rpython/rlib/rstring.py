@@ -524,6 +524,10 @@ def _search_normal(value, other, start, end, mode):
             return 0
         return -1
 
+    if (mode != SEARCH_RFIND and m >= TWO_WAY_MIN_NEEDLE and
+            n >= TWO_WAY_MIN_HAYSTACK):
+        return _two_way_search(value, other, start, end, mode)
+
     mlast = m - 1
     skip = mlast
     mask = 0
@@ -592,6 +596,97 @@ def _search_normal(value, other, start, end, mode):
         return -1
     return count
 
+# The bloom filter search above can degrade to O(n*m) for long needles that
+# are almost found many times.  Long needles in long enough haystacks use
+# the Two-Way algorithm of Crochemore and Perrin instead, which is linear
+# in the worst case and needs only constant extra space.
+TWO_WAY_MIN_NEEDLE = 100
+TWO_WAY_MIN_HAYSTACK = 2500
+
+@specialize.argtype(0)
+def _lex_search(needle, invert_alphabet):
+    """Return the start and the period of the lexicographically maximal
+    suffix of 'needle', or of the minimal suffix if 'invert_alphabet'.
+    """
+    m = len(needle)
+    max_suffix = 0
+    candidate = 1
+    k = 0
+    period = 1
+    while candidate + k < m:
+        a = needle[candidate + k]
+        b = needle[max_suffix + k]
+        if (b < a) if invert_alphabet else (a < b):
+            candidate += k + 1
+            k = 0
+            period = candidate - max_suffix
+        elif a == b:
+            if k + 1 != period:
+                k += 1
+            else:
+                candidate += period
+                k = 0
+        else:
+            max_suffix = candidate
+            candidate += 1
+            k = 0
+            period = 1
+    return max_suffix, period
+
+@specialize.argtype(0)
+def _critical_factorization(needle):
+    """Split 'needle' into a left and a right part at a critical position.
+    Returns (cut, period) where 'period' is the period of the right part.
+    """
+    cut1, period1 = _lex_search(needle, False)
+    cut2, period2 = _lex_search(needle, True)
+    if cut1 > cut2:
+        return cut1, period1
+    return cut2, period2
+
+@specialize.argtype(0, 1)
+def _two_way_search(value, other, start, end, mode):
+    m = len(other)
+    cut, period = _critical_factorization(other)
+    # is the period of the right part also a period of the whole needle?
+    periodic = cut + period <= m
+    if periodic:
+        for i in range(cut):
+            if other[i] != other[i + period]:
+                periodic = False
+                break
+    if not periodic:
+        period = max(cut, m - cut) + 1
+    count = 0
+    memory = 0
+    j = start
+    while j <= end - m:
+        # match the right part, skipping what is known to match already
+        i = max(cut, memory)
+        while i < m and other[i] == value[i + j]:
+            i += 1
+        if i < m:
+            j += i - cut + 1
+            memory = 0
+            continue
+        # match the left part
+        i = cut - 1
+        while i >= memory and other[i] == value[i + j]:
+            i -= 1
+        if i < memory:
+            if mode != SEARCH_COUNT:
+                return j
+            count += 1
+            j += m
+            memory = 0
+        else:
+            j += period
+            if periodic:
+                memory = m - period
+    if mode != SEARCH_COUNT:
+        return -1
+    return count
+
 # -------------- numeric parsing support --------------------
 
 def strip_spaces(s):
@@ -267,6 +267,29 @@ def test_search():
     check_search(count, 'a', 'ab', 0, 1, res=0)
     check_search(count, 'ac', 'ab', 0, 2, res=0)
 
+def test_search_two_way():
+    from rpython.rlib.rstring import TWO_WAY_MIN_NEEDLE, TWO_WAY_MIN_HAYSTACK
+    def check(value, sub):
+        assert len(sub) >= TWO_WAY_MIN_NEEDLE
+        assert len(value) >= TWO_WAY_MIN_HAYSTACK
+        for start, end in [(0, len(value)), (7, len(value) - 3), (500, 3000)]:
+            assert (_search(value, sub, start, end, SEARCH_FIND) ==
+                    value.find(sub, start, end))
+            assert (_search(value, sub, start, end, SEARCH_COUNT) ==
+                    value.count(sub, start, end))
+            assert (_search(list(value), sub, start, end, SEARCH_FIND) ==
+                    value.find(sub, start, end))
+
+    check('a' * 5000, 'a' * 100 + 'b')
+    check('a' * 5000 + 'b', 'a' * 150 + 'b')
+    check('ab' * 3000, 'ab' * 60)
+    check('ab' * 3000, 'b' + 'a' * 100)
+    check(('abc' * 40 + 'x') * 40, 'abc' * 40 + 'x' + 'abc')
+    check(u'\u1234' * 3000 + u'x', u'\u1234' * 200 + u'x')
+    value = ''.join([chr(65 + (i * 7919) % 3) for i in range(6000)])
+    for i in range(0, 5000, 37):
+        check(value, value[i:i + 100 + i % 50])
+
 
 class TestTranslates(BaseRtypingTest):
     def test_split_rsplit(self):
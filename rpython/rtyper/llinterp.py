@@ -758,6 +758,12 @@ class LLFrame(object):
     def op_gc_get_stats(self, obj):
         raise NotImplementedError("gc_get_stats")
 
+    def op_gc_trim_free_memory(self):
+        raise NotImplementedError("gc_trim_free_memory")
+
+    def op_gc_freeze_heap(self):
+        raise NotImplementedError("gc_freeze_heap")
+
     def op_gc_writebarrier_before_copy(self, source, dest,
                                        source_start, dest_start, length):
         if hasattr(self.heap, 'writebarrier_before_copy'):
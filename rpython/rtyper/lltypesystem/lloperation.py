@@ -520,6 +520,8 @@ LL_OPERATIONS = {
     'gc_gcflag_extra'     : LLOp(),
     'gc_add_memory_pressure': LLOp(),
     'gc_get_stats'        : LLOp(),
+    'gc_trim_free_memory' : LLOp(),
+    'gc_freeze_heap'      : LLOp(canmallocgc=True),
     'gc_fq_next_dead'     : LLOp(),
     'gc_fq_register'      : LLOp(),
     'gc_ignore_finalizer' : LLOp(canrun=True),
@@ -1701,6 +1701,76 @@ class TestIncrementalMiniMarkGC(TestMiniMarkGC):
         res = self.run("total_memory_pressure")
         assert res == 30 # total reachable is 3
 
+    def define_trim_free_memory(cls):
+        class A(object):
+            def __init__(self, i):
+                self.i = i
+        class Glob(object):
+            pass
+        glob = Glob()
+
+        def f():
+            glob.l = [A(i) for i in range(200000)]
+            rgc.collect()
+            glob.l = [a for a in glob.l if a.i % 1000 == 0]
+            rgc.collect()
+            before = rgc.get_stats(rgc.TRIMMED_ARENA_MEMORY)
+            released = rgc.trim_free_memory()
+            after = rgc.get_stats(rgc.TRIMMED_ARENA_MEMORY)
+            if released <= 0 or after != before + released:
+                return -1
+            if rgc.trim_free_memory() != 0:
+                return -2
+            # the pages returned to the OS can be reused
+            glob.l2 = [A(i) for i in range(200000)]
+            for i in range(len(glob.l)):
+                if glob.l[i].i != i * 1000:
+                    return -3
+            return 1
+        return f
+
+    def test_trim_free_memory(self):
+        res = self.run("trim_free_memory")
+        assert res == 1
+
+    def define_freeze_heap(cls):
+        import weakref
+        class A(object):
+            next = None
+            def __init__(self, i):
+                self.i = i
+        class Glob(object):
+            pass
+        glob = Glob()
+
+        def f():
+            glob.l = [A(i) for i in range(10000)]
+            glob.big = [None] * 100000
+            glob.w = weakref.ref(glob.l[5])
+            if not rgc.freeze_heap():
+                return -1
+            if rgc.get_stats(rgc.FROZEN_OBJECTS) < 10002:
+                return -2
+            for j in range(5):
+                glob.l2 = [A(i) for i in range(10000)]
+                glob.l[j].next = A(-j)
+                glob.big[j * 1000] = A(-j)
+                rgc.collect()
+            for j in range(5):
+                if glob.l[j].next.i != -j or glob.big[j * 1000].i != -j:
+                    return -3
+            for i in range(len(glob.l)):
+                if glob.l[i].i != i:
+                    return -4
+            if glob.w() is not glob.l[5]:
+                return -5
+            return 1
+        return f
+
+    def test_freeze_heap(self):
+        res = self.run("freeze_heap")
+        assert res == 1
+
     def define_random_pin(self):
         class A:
             foo = None